@@ -0,0 +1,171 @@
+from core.analyze.clump import Clump
+from core.analyze.components import hot_components, index_regions
+from core.analyze.densegraph import DenseGraph
+from core.analyze.graph import Graph
+from core.analyze.snapshot import read_snapshot
+import argparse
+import json
+import mmap
+import struct
+import numpy as np
+
+COLUMNAR_MAGIC = b"LIONSNAP"
+COLUMNAR_VERSION = 1
+PREFIX = struct.Struct("<8sII")  # 魔数、格式版本、头部JSON的字节数
+ALIGNMENT = 64  # 每一列的起始偏移按64字节对齐
+COLUMNS = ("region_ids", "vertex_weights", "edge_sources", "edge_targets", "edge_weights")
+
+def align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def as_weights(weights):
+    # 整数权重保存为int64，以便读取后与原图的结果类型一致，其余保存为float64
+    weights = np.asarray(weights)
+    return weights.astype(np.int64 if len(weights) and weights.dtype.kind in 'iub' else np.float64)
+
+def save_columnar(graph, filename):
+    """
+    将图保存为列式快照。文件由定长前缀、JSON头部和按64字节对齐的连续列组成：
+    region_ids和vertex_weights按regionID升序排列，边的两个端点保存为region_ids中的下标。
+    权重为衰减后的值，超边展开为两两之间的边权；滑动窗口的时间片不保存。
+    :param graph: Graph、DenseGraph或其他提供export_weights的图对象
+    :param filename: 快照文件名
+    """
+    vertex_weights, edge_weights = graph.export_weights()
+    sources, targets, weights = zip(*edge_weights) if edge_weights else ((), (), ())
+    region_ids, vertex_positions, sources, targets = index_regions(list(vertex_weights), sources, targets)
+    if len(region_ids) and region_ids.dtype.kind not in 'iu':
+        raise ValueError("Columnar snapshots require integer region IDs")
+    values = as_weights(list(vertex_weights.values()))
+    columns = {
+        "region_ids": region_ids.astype(np.int64),
+        "vertex_weights": np.zeros(len(region_ids), dtype=values.dtype),
+        "edge_sources": sources.astype(np.int64),
+        "edge_targets": targets.astype(np.int64),
+        "edge_weights": as_weights(weights),
+    }
+    columns["vertex_weights"][vertex_positions] = values
+    decay = getattr(graph, 'decay', None)
+    header = {
+        "weight": graph.weight,
+        "theta": graph.theta,
+        "top_hot_threshold": graph.top_hot_threshold,
+        "half_life": decay.half_life if decay else 0,
+        "vertex_count": len(region_ids),
+        "edge_count": len(columns["edge_sources"]),
+        "columns": {},
+    }
+    # 列的偏移依赖头部长度，先用不小于实际偏移的占位值计算头部长度，再计算实际偏移
+    layout = {name: [1 << 62, column.dtype.str, len(column)] for name, column in columns.items()}
+    header["columns"] = layout
+    offset = align(PREFIX.size + len(json.dumps(header)))
+    for name in COLUMNS:
+        layout[name][0] = offset
+        offset = align(offset + columns[name].nbytes)
+    encoded = json.dumps(header).encode()
+    with open(filename, 'wb') as file:
+        file.write(PREFIX.pack(COLUMNAR_MAGIC, COLUMNAR_VERSION, len(encoded)))
+        file.write(encoded)
+        for name in COLUMNS:
+            file.seek(layout[name][0])
+            file.write(columns[name].tobytes())
+        file.truncate(offset)
+
+class ColumnarSnapshot:
+    def __init__(self, filename):
+        """
+        通过mmap打开列式快照，各列是直接指向映射内存的只读NumPy数组，不逐个反序列化对象。
+        :param filename: 快照文件名
+        """
+        with open(filename, 'rb') as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_size = PREFIX.unpack_from(self.buffer)
+        if magic != COLUMNAR_MAGIC:
+            self.close()
+            raise ValueError(f"{filename} is not a columnar graph snapshot")
+        if version > COLUMNAR_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported columnar snapshot version: {version}")
+        self.version = version
+        self.header = json.loads(bytes(self.buffer[PREFIX.size:PREFIX.size + header_size]))
+        for name, (offset, dtype, count) in self.header["columns"].items():
+            setattr(self, name, np.frombuffer(self.buffer, dtype=np.dtype(dtype), count=count, offset=offset))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        关闭映射，关闭后不能再访问各列。
+        """
+        for name in COLUMNS:
+            self.__dict__.pop(name, None)
+        try:
+            self.buffer.close()
+        except BufferError:
+            pass  # 调用方仍持有列的引用时由垃圾回收释放映射
+
+    def export_weights(self):
+        """
+        导出点权和边权，格式与Graph.export_weights相同。
+        :return: (点权字典, 边列表)
+        """
+        region_ids = self.region_ids.tolist()
+        vertex_weights = dict(zip(region_ids, self.vertex_weights.tolist()))
+        edge_weights = [(region_ids[source], region_ids[target], weight) for source, target, weight
+                        in zip(self.edge_sources.tolist(), self.edge_targets.tolist(), self.edge_weights.tolist())]
+        return vertex_weights, edge_weights
+
+    def get_hot_region(self, edge_thresh):
+        """
+        直接在列上计算热点闭包，结果与保存前的图调用get_hot_region相同。
+        :param edge_thresh: 边权阈值，大于该值的边才会被认定为高关联
+        :return: 一个列表，每一项是一个Clump对象，表示一个热点闭包
+        """
+        vertex_weights = self.vertex_weights
+        # 种子按(-点权, regionID)排序，region_ids已按升序排列
+        seeds = np.flatnonzero(vertex_weights > 0)
+        seeds = seeds[np.argsort(-vertex_weights[seeds], kind='stable')]
+        hot = self.edge_weights > edge_thresh
+        components = hot_components(len(self.region_ids), self.edge_sources[hot], self.edge_targets[hot],
+                                    vertex_weights, seeds)
+        region_ids = self.region_ids.tolist()
+        return [Clump({region_ids[index] for index in members.tolist()}, clump_hot) for members, clump_hot in components]
+
+    def graph_params(self):
+        return {name: self.header[name] for name in ("weight", "theta", "top_hot_threshold", "half_life")}
+
+    def to_dense_graph(self):
+        """
+        由各列直接构建DenseGraph。
+        :return: DenseGraph对象
+        """
+        return DenseGraph.from_arrays(self.region_ids, self.vertex_weights, self.edge_sources, self.edge_targets,
+                                      self.edge_weights, **self.graph_params())
+
+    def to_graph(self):
+        """
+        构建可继续写入的Graph，需要逐个创建顶点和边对象。
+        :return: Graph对象
+        """
+        graph = Graph(**self.graph_params())
+        graph.import_weights(*self.export_weights())
+        return graph
+
+def convert_pickle(pickle_filename, columnar_filename):
+    """
+    将pickle格式的历史快照（包括gzip压缩的快照）转换为列式快照。
+    :param pickle_filename: pickle快照文件名
+    :param columnar_filename: 列式快照文件名
+    """
+    save_columnar(read_snapshot(pickle_filename), columnar_filename)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="将pickle格式的历史快照转换为列式快照")
+    parser.add_argument("source", help="pickle快照文件名")
+    parser.add_argument("target", help="列式快照文件名")
+    args = parser.parse_args()
+    convert_pickle(args.source, args.target)
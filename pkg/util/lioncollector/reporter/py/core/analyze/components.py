@@ -0,0 +1,52 @@
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+def index_regions(*region_id_arrays):
+    """
+    为出现过的regionID分配连续下标，并把每个数组中的regionID换算为下标。
+    :param region_id_arrays: regionID数组
+    :return: (按下标排列的regionID数组, 每个输入数组对应的下标数组...)
+    """
+    arrays = [np.asarray(region_ids) for region_ids in region_id_arrays]
+    non_empty = [region_ids for region_ids in arrays if len(region_ids)]
+    if not non_empty:
+        return (np.zeros(0, dtype=np.int64), *(np.zeros(0, dtype=np.int64) for _ in arrays))
+    # 一次排序同时完成去重和下标换算
+    universe, inverse = np.unique(np.concatenate(non_empty), return_inverse=True)
+    positions = []
+    offset = 0
+    for region_ids in arrays:
+        positions.append(inverse[offset:offset + len(region_ids)])
+        offset += len(region_ids)
+    return (universe, *positions)
+
+def hot_components(vertex_count, sources, targets, vertex_weights, seeds):
+    """
+    用稀疏矩阵的连通分量计算热点闭包，结果与从种子顶点依次出发的BFS相同：
+    只输出包含种子顶点的连通分量，按分量中第一个出现的种子排序，闭包总点权由按分量标签的bincount得到。
+    :param vertex_count: 顶点数量，顶点用0到vertex_count-1的下标表示
+    :param sources: 高关联边的一个端点下标数组
+    :param targets: 与sources一一对应的另一个端点下标数组
+    :param vertex_weights: 按下标排列的点权数组
+    :param seeds: 种子顶点下标数组，已按BFS的出发顺序排列
+    :return: 列表，元素为(闭包中的顶点下标数组, 闭包总点权)
+    """
+    seeds = np.asarray(seeds, dtype=np.int64)
+    if vertex_count == 0 or len(seeds) == 0:
+        return []
+    matrix = coo_matrix((np.ones(len(sources), dtype=bool), (sources, targets)), shape=(vertex_count, vertex_count))
+    component_count, labels = connected_components(matrix.tocsr(), directed=False)
+    vertex_weights = np.asarray(vertex_weights)
+    hot = np.bincount(labels, weights=vertex_weights, minlength=component_count)
+    if vertex_weights.dtype.kind in 'iu':
+        # 整数点权的和在float64中是精确的，转换回整数以与BFS的结果类型一致
+        hot = hot.astype(np.int64)
+    # 每个分量按其中最先出现的种子排序
+    seed_labels, first_seen = np.unique(labels[seeds], return_index=True)
+    seed_labels = seed_labels[np.argsort(first_seen)]
+    # 按标签把顶点分组，members[starts[label]:starts[label + 1]]即为该分量的顶点
+    members = np.argsort(labels, kind='stable')
+    starts = np.zeros(component_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(labels, minlength=component_count), out=starts[1:])
+    return [(members[starts[label]:starts[label + 1]], hot[label].item()) for label in seed_labels.tolist()]
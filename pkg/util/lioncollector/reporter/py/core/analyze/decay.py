@@ -0,0 +1,59 @@
+import time
+
+class DecayScale:
+    def __init__(self, half_life=0, max_exponent=900):
+        """
+        初始化全局衰减系数：权重按半衰期指数衰减，但不逐个修改已有权重。
+        写入时把增量乘以当前系数2^((now - origin) / half_life)，读取时再除以当前系数，
+        因此所有权重共享同一个缩放系数，排序不受影响，也不需要全图扫描。
+        系数的指数超过max_exponent时需要调用方重新设定基准时间并整体缩小权重，避免浮点溢出。
+        :param half_life: 半衰期（秒），小于等于0表示不衰减
+        :param max_exponent: 系数允许的最大指数
+        """
+        self.half_life = half_life
+        self.max_exponent = max_exponent
+        self.origin = time.time()  # 系数为1的基准时间
+
+    def enabled(self):
+        return self.half_life > 0
+
+    def factor(self, now=None):
+        """
+        计算当前的缩放系数。
+        :param now: 当前时间，默认为time.time()
+        :return: 缩放系数，不衰减时为1
+        """
+        if self.half_life <= 0:
+            return 1.0
+        now = time.time() if now is None else now
+        return 2.0 ** ((now - self.origin) / self.half_life)
+
+    def needs_rebase(self, now=None):
+        """
+        判断是否需要重新设定基准时间。
+        :param now: 当前时间，默认为time.time()
+        """
+        if self.half_life <= 0:
+            return False
+        now = time.time() if now is None else now
+        return (now - self.origin) / self.half_life > self.max_exponent
+
+    def rebase(self, now=None):
+        """
+        把基准时间移动到当前时间，调用方需要把所有已保存的权重除以返回的系数。
+        :param now: 当前时间，默认为time.time()
+        :return: 旧基准下的当前系数
+        """
+        now = time.time() if now is None else now
+        factor = self.factor(now)
+        self.origin = now
+        return factor
+
+def decayed(value, factor):
+    """
+    把保存的权重换算为衰减后的实际权重，不衰减时保持原始类型。
+    :param value: 保存的权重
+    :param factor: 当前的缩放系数
+    :return: 实际权重
+    """
+    return value if factor == 1 else value / factor
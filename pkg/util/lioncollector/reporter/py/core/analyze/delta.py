@@ -0,0 +1,220 @@
+from itertools import chain
+import struct
+import threading
+import numpy as np
+
+DELTA_MAGIC = b"LIONDLTA"
+DELTA_VERSION = 1
+# 魔数、格式版本、序号、来源名字节数、顶点数、边数、超边数、超边成员总数
+DELTA_HEADER = struct.Struct("<8sIQIIIII")
+
+class GraphDelta:
+    def __init__(self, source="", sequence=0, vertex_weights=None, edge_weights=None, hyperedge_weights=None):
+        """
+        初始化图增量：一段时间内写入的点权、边权和超边权重的累加值，权重为导出时刻衰减后的值。
+        :param source: 来源名称，合并方按来源记录已合并的序号，重复的增量被忽略；为空时不检查
+        :param sequence: 同一来源内从1开始递增的序号
+        :param vertex_weights: 点权增量字典，键为regionID
+        :param edge_weights: 边权增量字典，键为frozenset(regionID1, regionID2)
+        :param hyperedge_weights: 超边权重增量字典，键为frozenset(regionID, ...)
+        """
+        self.source = source
+        self.sequence = sequence
+        self.vertex_weights = vertex_weights if vertex_weights is not None else {}
+        self.edge_weights = edge_weights if edge_weights is not None else {}
+        self.hyperedge_weights = hyperedge_weights if hyperedge_weights is not None else {}
+
+    def __len__(self):
+        return len(self.vertex_weights) + len(self.edge_weights) + len(self.hyperedge_weights)
+
+    @classmethod
+    def from_graph(cls, graph, source="", sequence=0):
+        """
+        把整个图作为一个增量，超边展开为两两之间的边权。
+        :param graph: Graph、DenseGraph或其他提供export_weights的图对象
+        :return: GraphDelta对象
+        """
+        vertex_weights, edge_weights = graph.export_weights()
+        return cls(source, sequence, vertex_weights,
+                   {frozenset((region_id1, region_id2)): weight for region_id1, region_id2, weight in edge_weights})
+
+    def encode(self):
+        """
+        编码为紧凑的二进制格式：定长头部之后依次是来源名和各列连续数组，regionID为int64，权重为float64。
+        :return: 字节串
+        """
+        source = self.source.encode()
+        hyperedges = list(self.hyperedge_weights)
+        members = list(chain.from_iterable(hyperedges))
+        # 自环边的键只有一个region，两个端点相同
+        endpoints = [tuple(edge_key) * (3 - len(edge_key)) for edge_key in self.edge_weights]
+        try:
+            columns = [
+                np.fromiter(self.vertex_weights, dtype=np.int64, count=len(self.vertex_weights)),
+                np.fromiter(self.vertex_weights.values(), dtype=np.float64, count=len(self.vertex_weights)),
+                np.array([endpoint[0] for endpoint in endpoints], dtype=np.int64),
+                np.array([endpoint[1] for endpoint in endpoints], dtype=np.int64),
+                np.fromiter(self.edge_weights.values(), dtype=np.float64, count=len(self.edge_weights)),
+                np.fromiter(map(len, hyperedges), dtype=np.int32, count=len(hyperedges)),
+                np.array(members, dtype=np.int64),
+                np.fromiter(self.hyperedge_weights.values(), dtype=np.float64, count=len(hyperedges)),
+            ]
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError("Graph deltas can only be encoded with integer region IDs")
+        header = DELTA_HEADER.pack(DELTA_MAGIC, DELTA_VERSION, self.sequence, len(source), len(self.vertex_weights),
+                                   len(self.edge_weights), len(hyperedges), len(members))
+        return b"".join([header, source] + [column.tobytes() for column in columns])
+
+    @classmethod
+    def decode(cls, data):
+        """
+        从encode生成的字节串解码。
+        :param data: 字节串
+        :return: GraphDelta对象
+        """
+        magic, version, sequence, source_size, vertex_count, edge_count, hyperedge_count, member_count = \
+            DELTA_HEADER.unpack_from(data)
+        if magic != DELTA_MAGIC:
+            raise ValueError("Data is not an encoded graph delta")
+        if version > DELTA_VERSION:
+            raise ValueError(f"Unsupported graph delta version: {version}")
+        offset = DELTA_HEADER.size
+        source = bytes(data[offset:offset + source_size]).decode()
+        offset += source_size
+        columns = []
+        for dtype, count in ((np.int64, vertex_count), (np.float64, vertex_count), (np.int64, edge_count),
+                             (np.int64, edge_count), (np.float64, edge_count), (np.int32, hyperedge_count),
+                             (np.int64, member_count), (np.float64, hyperedge_count)):
+            column = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+            columns.append(column.tolist())
+            offset += column.nbytes
+        region_ids, vertex_weights, sources, targets, edge_weights, sizes, members, hyperedge_weights = columns
+        hyperedges = []
+        start = 0
+        for size in sizes:
+            hyperedges.append(frozenset(members[start:start + size]))
+            start += size
+        return cls(source, sequence, dict(zip(region_ids, vertex_weights)),
+                   {frozenset((source_id, target_id)): weight
+                    for source_id, target_id, weight in zip(sources, targets, edge_weights)},
+                   dict(zip(hyperedges, hyperedge_weights)))
+
+    def save(self, filename):
+        """
+        将增量保存到文件中。
+        :param filename: 保存的文件名
+        """
+        with open(filename, 'wb') as file:
+            file.write(self.encode())
+
+    @classmethod
+    def load(cls, filename):
+        """
+        从文件中加载增量。
+        :param filename: 保存的文件名
+        :return: GraphDelta对象
+        """
+        with open(filename, 'rb') as file:
+            return cls.decode(file.read())
+
+class DeltaTracker:
+    def __init__(self, source=""):
+        """
+        初始化增量记录器：累加自上次导出以来写入的权重，保存的是乘以衰减系数后的值，导出时再除以当前系数。
+        :param source: 导出的增量的来源名称
+        """
+        self.source = source
+        self.sequence = 0  # 最近一次导出的增量序号
+        self.vertex_weights = {}
+        self.edge_weights = {}
+        self.hyperedge_weights = {}
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        # 序列化时排除线程锁
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        # 反序列化时恢复状态并重新初始化线程锁
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def record_vertex(self, region_id, stored):
+        """
+        记录对点权的累加。
+        :param region_id: regionID
+        :param stored: 实际累加到Vertex上的权重（乘以衰减系数后）
+        """
+        with self.lock:
+            self.vertex_weights[region_id] = self.vertex_weights.get(region_id, 0) + stored
+
+    def record_edge(self, edge_key, stored):
+        """
+        记录对边权的累加。
+        :param edge_key: frozenset(regionID1, regionID2)
+        :param stored: 实际累加到Edge上的权重（乘以衰减系数后）
+        """
+        with self.lock:
+            self.edge_weights[edge_key] = self.edge_weights.get(edge_key, 0) + stored
+
+    def record_hyperedge(self, hyperedge_key, stored):
+        """
+        记录对超边权重的累加。
+        :param hyperedge_key: frozenset(regionID, ...)
+        :param stored: 实际累加到Hyperedge上的权重（乘以衰减系数后）
+        """
+        with self.lock:
+            self.hyperedge_weights[hyperedge_key] = self.hyperedge_weights.get(hyperedge_key, 0) + stored
+
+    def record_bulk(self, region_ids, vertex_stored, edge_keys, edge_stored):
+        """
+        记录一批聚合后的点权和边权累加，只获取一次锁。
+        """
+        with self.lock:
+            for region_id, stored in zip(region_ids, vertex_stored):
+                self.vertex_weights[region_id] = self.vertex_weights.get(region_id, 0) + stored
+            for edge_key, stored in zip(edge_keys, edge_stored):
+                self.edge_weights[edge_key] = self.edge_weights.get(edge_key, 0) + stored
+
+    def rescale(self, factor):
+        """
+        把记录的累加量除以factor，用于衰减基准时间调整后保持一致。
+        :param factor: 缩小的倍数
+        """
+        with self.lock:
+            for weights in (self.vertex_weights, self.edge_weights, self.hyperedge_weights):
+                for key in weights:
+                    weights[key] /= factor
+
+    def reset(self, source, sequence):
+        """
+        丢弃记录的累加量并把序号设为已导出的序号，用于重放预写日志中的增量导出标记。
+        :param source: 增量的来源名称
+        :param sequence: 已导出的增量序号
+        """
+        with self.lock:
+            self.source = source
+            self.sequence = sequence
+            self.vertex_weights = {}
+            self.edge_weights = {}
+            self.hyperedge_weights = {}
+
+    def drain(self, factor):
+        """
+        取出累加的增量并清空记录，序号加1。
+        :param factor: 当前的衰减系数
+        :return: GraphDelta对象
+        """
+        with self.lock:
+            vertex_weights, self.vertex_weights = self.vertex_weights, {}
+            edge_weights, self.edge_weights = self.edge_weights, {}
+            hyperedge_weights, self.hyperedge_weights = self.hyperedge_weights, {}
+            self.sequence += 1
+            sequence = self.sequence
+        if factor != 1:
+            for weights in (vertex_weights, edge_weights, hyperedge_weights):
+                for key in weights:
+                    weights[key] /= factor
+        return GraphDelta(self.source, sequence, vertex_weights, edge_weights, hyperedge_weights)
@@ -0,0 +1,437 @@
+from core.analyze.clump import Clump
+from core.analyze.decay import DecayScale
+from core.analyze.snapshot import read_snapshot
+from array import array
+from collections import deque
+from itertools import combinations
+import copy
+import numpy as np
+import pickle
+import threading
+
+class DenseGraph:
+    def __init__(self, weight=10, theta=1, top_hot_threshold=0, compact_min=65536, half_life=0):
+        """
+        初始化基于NumPy数组的图结构，公开接口与Graph相同。
+        regionID映射为连续下标，点权保存在数组中；边以(较小下标, 较大下标)编码为int64键，
+        新写入的边先追加到COO缓冲区，积累到一定数量后再与已合并的有序边数组一起去重累加。
+        :param weight: 不同region之间的边权系数，默认为10
+        :param theta: 相同region之间的边权系数，默认为1
+        :param top_hot_threshold: 点权阈值，用于筛选top-hot region
+        :param compact_min: COO缓冲区合并的最小条数
+        :param half_life: 点权和边权的半衰期（秒），默认为0表示不衰减
+        """
+        self.weight = weight  # 不同region之间的边权系数
+        self.theta = theta  # 相同region之间的边权系数
+        self.top_hot_threshold = top_hot_threshold  # 点权阈值
+        self.compact_min = compact_min
+        self.region_index = {}  # 键为regionID，值为顶点下标
+        self.region_ids = []  # 按下标排列的regionID
+        self.vertex_weights = np.zeros(1024, dtype=np.float64)  # 点权数组，容量按需翻倍
+        self.edge_keys = np.zeros(0, dtype=np.int64)  # 已合并的边键，升序且不重复
+        self.edge_weights = np.zeros(0, dtype=np.float64)  # 与edge_keys一一对应的边权
+        self.pending_keys = array('q')  # 未合并的边键
+        self.pending_weights = array('d')  # 未合并的边权增量
+        self.decay = DecayScale(half_life)  # 全局衰减系数，数组中保存的是乘以系数后的权重
+        self.lock = threading.Lock()  # 保护所有数组的锁
+
+    def __getstate__(self):
+        # 序列化前合并缓冲区，并排除线程锁和未使用的数组容量
+        with self.lock:
+            self.compact()
+            state = self.__dict__.copy()
+            state['vertex_weights'] = self.vertex_weights[:len(self.region_ids)].copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        # 反序列化时恢复状态并重新初始化线程锁
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def copy(self):
+        """
+        在锁内合并缓冲区并复制数组，得到与当前时刻一致的独立副本，用于在锁外序列化快照。
+        复制只涉及连续数组和字典的浅拷贝，持锁时间远小于序列化整个图。
+        :return: DenseGraph对象
+        """
+        graph = DenseGraph.__new__(DenseGraph)
+        with self.lock:
+            self.compact()
+            state = self.__dict__.copy()
+            state['region_index'] = dict(self.region_index)
+            state['region_ids'] = list(self.region_ids)
+            state['vertex_weights'] = self.vertex_weights[:len(self.region_ids)].copy()
+            state['edge_keys'] = self.edge_keys.copy()
+            state['edge_weights'] = self.edge_weights.copy()
+            state['pending_keys'] = array('q')
+            state['pending_weights'] = array('d')
+            state['decay'] = copy.copy(self.decay)
+        del state['lock']
+        graph.__setstate__(state)
+        return graph
+
+    @staticmethod
+    def encode_edge(index1, index2):
+        """
+        将两个顶点下标编码为边键，较小下标在高32位。
+        """
+        if index1 > index2:
+            index1, index2 = index2, index1
+        return (index1 << 32) | index2
+
+    def index_of(self, region_id):
+        """
+        获取regionID对应的顶点下标，不存在时分配新下标，调用方需持有锁。
+        :param region_id: regionID
+        :return: 顶点下标
+        """
+        index = self.region_index.get(region_id)
+        if index is None:
+            index = len(self.region_ids)
+            self.region_index[region_id] = index
+            self.region_ids.append(region_id)
+            if index >= len(self.vertex_weights):
+                grown = np.zeros(len(self.vertex_weights) * 2, dtype=np.float64)
+                grown[:index] = self.vertex_weights[:index]
+                self.vertex_weights = grown
+        return index
+
+    def compact(self):
+        """
+        将COO缓冲区中的边合并到有序边数组中，相同的边权重累加，调用方需持有锁。
+        """
+        if not self.pending_keys:
+            return
+        keys = np.concatenate((self.edge_keys, np.frombuffer(self.pending_keys, dtype=np.int64)))
+        weights = np.concatenate((self.edge_weights, np.frombuffer(self.pending_weights, dtype=np.float64)))
+        self.edge_keys, inverse = np.unique(keys, return_inverse=True)
+        self.edge_weights = np.bincount(inverse.ravel(), weights=weights, minlength=len(self.edge_keys))
+        self.pending_keys = array('q')
+        self.pending_weights = array('d')
+
+    def scale(self):
+        """
+        获取写入时使用的衰减系数，系数过大时先整体缩小已保存的权重，调用方需持有锁。
+        :return: 缩放系数
+        """
+        if self.decay.needs_rebase():
+            self.compact()
+            factor = self.decay.rebase()
+            self.vertex_weights /= factor
+            self.edge_weights /= factor
+        return self.decay.factor()
+
+    def maybe_compact(self):
+        """
+        缓冲区超过已合并边数和compact_min时合并，使合并的均摊开销与写入量成正比，调用方需持有锁。
+        """
+        if len(self.pending_keys) >= max(self.compact_min, len(self.edge_keys)):
+            self.compact()
+
+    def add_vertex(self, region_id):
+        """
+        添加一个新的顶点到图中。
+        :param region_id: 要添加的regionID
+        """
+        with self.lock:
+            self.index_of(region_id)
+
+    def increment_vertex_weight(self, region_id, value=1):
+        """
+        增加某个顶点的点权。
+        :param region_id: 要增加点权的regionID
+        :param value: 增加的值，默认为1
+        """
+        with self.lock:
+            # 先分配下标，index_of可能替换点权数组
+            index = self.index_of(region_id)
+            self.vertex_weights[index] += value * self.scale()
+
+    def add_edge(self, region_id1, region_id2, weight=1):
+        """
+        在图中添加一条边。
+        :param region_id1: 边的第一个regionID
+        :param region_id2: 边的第二个regionID
+        """
+        theta = self.theta * weight
+        self.add_edge_weight(region_id1, region_id2, theta if region_id1 == region_id2 else self.weight * theta)
+
+    def add_edge_weight(self, region_id1, region_id2, value):
+        """
+        直接累加边权（不再乘以边权系数），边不存在时创建。
+        :param region_id1: 边的第一个regionID
+        :param region_id2: 边的第二个regionID
+        :param value: 累加到边上的权重
+        """
+        with self.lock:
+            self.pending_keys.append(self.encode_edge(self.index_of(region_id1), self.index_of(region_id2)))
+            self.pending_weights.append(value * self.scale())
+            self.maybe_compact()
+
+    def add_transaction(self, region_ids, weight=1):
+        """
+        添加一个事务，更新点权和边权。
+        :param region_ids: 事务访问的regionID列表
+        :param weight: 事务的权重，默认为1
+        """
+        with self.lock:
+            factor = self.scale()
+            weight *= factor
+            edge_value = self.theta * weight * self.weight
+            indexes = [self.index_of(region_id) for region_id in region_ids]
+            vertex_weights = self.vertex_weights
+            for index in indexes:
+                vertex_weights[index] += weight
+            for index1, index2 in combinations(indexes, 2):
+                if index1 != index2:
+                    self.pending_keys.append(self.encode_edge(index1, index2))
+                    self.pending_weights.append(edge_value)
+            self.maybe_compact()
+
+    def add_transactions(self, batch, weights=None):
+        """
+        批量添加事务，等价于对每个事务依次调用add_transaction。
+        :param batch: 事务列表，每一项是一个regionID列表
+        :param weights: 与batch一一对应的事务权重列表，默认为None表示权重均为1
+        """
+        if weights is None:
+            for region_ids in batch:
+                self.add_transaction(region_ids)
+        else:
+            for region_ids, weight in zip(batch, weights):
+                self.add_transaction(region_ids, weight)
+
+    def get_vertex_weight(self, region_id):
+        """
+        获取某个顶点的点权。
+        :param region_id: 目标regionID
+        :return: 点权，顶点不存在时返回None
+        """
+        with self.lock:
+            index = self.region_index.get(region_id)
+            return None if index is None else self.vertex_weights[index].item() / self.decay.factor()
+
+    def get_edge_weight(self, region_id1, region_id2):
+        """
+        获取某条边的边权。
+        :param region_id1: 边的第一个regionID
+        :param region_id2: 边的第二个regionID
+        :return: 边权，边不存在时返回None
+        """
+        with self.lock:
+            index1 = self.region_index.get(region_id1)
+            index2 = self.region_index.get(region_id2)
+            if index1 is None or index2 is None:
+                return None
+            self.compact()
+            key = self.encode_edge(index1, index2)
+            position = np.searchsorted(self.edge_keys, key)
+            if position < len(self.edge_keys) and self.edge_keys[position] == key:
+                return self.edge_weights[position].item() / self.decay.factor()
+            return None
+
+    def vertex_count(self):
+        return len(self.region_ids)
+
+    def edge_count(self):
+        with self.lock:
+            self.compact()
+            return len(self.edge_keys)
+
+    def hot_order(self):
+        """
+        按点权降序、regionID升序排列点权不为0的顶点，与Graph优先队列的出队顺序一致，调用方需持有锁。
+        :return: 顶点下标数组
+        """
+        weights = self.vertex_weights[:len(self.region_ids)]
+        candidates = np.flatnonzero(weights)
+        region_ids = np.asarray(self.region_ids)[candidates]
+        if region_ids.dtype.kind in 'iuf':
+            return candidates[np.lexsort((region_ids, -weights[candidates]))]
+        # regionID不是数值时退回到Python排序
+        return candidates[sorted(range(len(candidates)), key=lambda i: (-weights[candidates[i]], region_ids[i]))]
+
+    def get_top_hot_regions(self, k=None):
+        """
+        获取当前点权超过阈值的region列表，按点权降序排列，每个region只出现一次。
+        :param k: 最多返回的region数量，默认为None表示返回所有超过阈值的region
+        :return: 列表，元素为(regionID, 点权)的元组
+        """
+        with self.lock:
+            factor = self.decay.factor()
+            weights = self.vertex_weights
+            top_regions = [(self.region_ids[index], weights[index].item() / factor) for index in self.hot_order()
+                           if weights[index] >= self.top_hot_threshold * factor]
+        return top_regions[:k]
+
+    def get_adjacent_regions(self, region_id):
+        """
+        获取某个region的相邻region集合。
+        :param region_id: 目标regionID
+        :return: 相邻regionID的集合
+        """
+        with self.lock:
+            index = self.region_index.get(region_id)
+            if index is None:
+                return set()
+            self.compact()
+            low = self.edge_keys >> 32
+            high = self.edge_keys & 0xFFFFFFFF
+            neighbors = np.concatenate((high[low == index], low[high == index]))
+            return {self.region_ids[neighbor] for neighbor in neighbors.tolist()}
+
+    def build_adjacency(self, edge_thresh):
+        """
+        用边权大于阈值的边构建CSR邻接表，调用方需持有锁。
+        :param edge_thresh: 边权阈值
+        :return: (indptr, indices)
+        """
+        self.compact()
+        keys = self.edge_keys[self.edge_weights > edge_thresh]
+        low = keys >> 32
+        high = keys & 0xFFFFFFFF
+        rows = np.concatenate((low, high))
+        cols = np.concatenate((high, low))
+        order = np.argsort(rows, kind='stable')
+        indptr = np.zeros(len(self.region_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(self.region_ids)), out=indptr[1:])
+        return indptr, cols[order]
+
+    def get_hot_region(self, edge_thresh, vectorized=False):
+        """
+        获取当前图中的热点闭包。
+        :param edge_thresh: 边权阈值，大于该值的边才会被认定为高关联
+        :param vectorized: 是否用稀疏矩阵的连通分量代替逐个顶点的BFS，结果相同，需要scipy
+        :return: 一个列表，每一项是一个Clump对象，表示一个热点闭包
+        """
+        if vectorized:
+            return self.get_hot_region_vectorized(edge_thresh)
+        hot_clumps = []
+        with self.lock:
+            factor = self.decay.factor()
+            indptr, indices = self.build_adjacency(edge_thresh * factor)
+            indptr = indptr.tolist()
+            indices = indices.tolist()
+            weights = self.vertex_weights[:len(self.region_ids)].tolist()
+            visited = bytearray(len(self.region_ids))
+            for seed in self.hot_order().tolist():
+                if visited[seed]:
+                    continue
+                # 使用BFS进行扩散
+                clump_region_ids = set()
+                clump_hot = 0
+                visited[seed] = 1
+                queue_bfs = deque([seed])
+                while queue_bfs:
+                    current = queue_bfs.popleft()
+                    clump_region_ids.add(self.region_ids[current])
+                    clump_hot += weights[current]
+                    for neighbor in indices[indptr[current]:indptr[current + 1]]:
+                        if not visited[neighbor]:
+                            visited[neighbor] = 1
+                            queue_bfs.append(neighbor)
+                hot_clumps.append(Clump(clump_region_ids, clump_hot / factor))
+        return hot_clumps
+
+    def get_hot_region_vectorized(self, edge_thresh):
+        """
+        用高关联边的连通分量一次求出所有热点闭包，结果与get_hot_region的BFS相同。
+        :param edge_thresh: 边权阈值，大于该值的边才会被认定为高关联
+        :return: 一个列表，每一项是一个Clump对象，表示一个热点闭包
+        """
+        from core.analyze.components import hot_components
+
+        with self.lock:
+            factor = self.decay.factor()
+            self.compact()
+            keys = self.edge_keys[self.edge_weights > edge_thresh * factor]
+            components = hot_components(len(self.region_ids), keys >> 32, keys & 0xFFFFFFFF,
+                                        self.vertex_weights[:len(self.region_ids)], self.hot_order())
+            region_ids = self.region_ids
+            return [Clump({region_ids[index] for index in members.tolist()}, clump_hot / factor)
+                    for members, clump_hot in components]
+
+    def export_weights(self):
+        """
+        导出当前图衰减后的点权和边权。
+        :return: (点权字典, 边列表)，点权字典的键为regionID，边列表的元素为(regionID1, regionID2, 边权)
+        """
+        with self.lock:
+            self.compact()
+            factor = self.decay.factor()
+            region_ids = self.region_ids
+            vertex_weights = dict(zip(region_ids, (self.vertex_weights[:len(region_ids)] / factor).tolist()))
+            edge_weights = [(region_ids[key >> 32], region_ids[key & 0xFFFFFFFF], weight)
+                            for key, weight in zip(self.edge_keys.tolist(), (self.edge_weights / factor).tolist())]
+        return vertex_weights, edge_weights
+
+    def import_weights(self, vertex_weights, edge_weights):
+        """
+        将导出的点权和边权累加到当前图中。
+        :param vertex_weights: 点权字典，键为regionID
+        :param edge_weights: 边列表，元素为(regionID1, regionID2, 边权)
+        """
+        with self.lock:
+            factor = self.scale()
+            for region_id, weight in vertex_weights.items():
+                index = self.index_of(region_id)
+                self.vertex_weights[index] += weight * factor
+            for region_id1, region_id2, weight in edge_weights:
+                self.pending_keys.append(self.encode_edge(self.index_of(region_id1), self.index_of(region_id2)))
+                self.pending_weights.append(weight * factor)
+            self.compact()
+
+    @classmethod
+    def from_graph(cls, graph, compact_min=65536):
+        """
+        从Graph对象（包括历史快照）转换得到DenseGraph。
+        :param graph: Graph对象
+        :param compact_min: COO缓冲区合并的最小条数
+        :return: DenseGraph对象
+        """
+        dense = cls(weight=graph.weight, theta=graph.theta, top_hot_threshold=graph.top_hot_threshold,
+                    compact_min=compact_min, half_life=graph.decay.half_life)
+        dense.import_weights(*graph.export_weights())
+        return dense
+
+    @classmethod
+    def from_arrays(cls, region_ids, vertex_weights, sources, targets, edge_weights, **kwargs):
+        """
+        由按列存放的点权和边权直接构建DenseGraph，不逐个写入。
+        :param region_ids: regionID数组，互不重复
+        :param vertex_weights: 与region_ids一一对应的点权数组
+        :param sources: 边的一个端点在region_ids中的下标数组
+        :param targets: 与sources一一对应的另一个端点下标数组
+        :param edge_weights: 与sources一一对应的边权数组
+        :param kwargs: 传给构造函数的参数
+        :return: DenseGraph对象
+        """
+        dense = cls(**kwargs)
+        dense.region_ids = np.asarray(region_ids).tolist()
+        dense.region_index = {region_id: index for index, region_id in enumerate(dense.region_ids)}
+        dense.vertex_weights = np.zeros(max(1024, len(dense.region_ids)), dtype=np.float64)
+        dense.vertex_weights[:len(dense.region_ids)] = vertex_weights
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        keys = (np.minimum(sources, targets) << 32) | np.maximum(sources, targets)
+        dense.edge_keys, inverse = np.unique(keys, return_inverse=True)
+        dense.edge_weights = np.bincount(inverse.ravel(), weights=edge_weights, minlength=len(dense.edge_keys))
+        return dense
+
+    def save(self, filename):
+        """
+        将当前DenseGraph对象保存到文件中。
+        :param filename: 保存的文件名
+        """
+        with open(filename, 'wb') as file:
+            pickle.dump(self, file)
+
+    @staticmethod
+    def load(filename):
+        """
+        从文件中加载DenseGraph对象，同时支持定时快照保存的gzip压缩文件。
+        :param filename: 保存的文件名
+        :return: 加载的DenseGraph对象
+        """
+        return read_snapshot(filename)
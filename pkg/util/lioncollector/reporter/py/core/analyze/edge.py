@@ -11,6 +11,7 @@ class Edge:
         self.region_id1 = region_id1
         self.region_id2 = region_id2
         self.weight = weight
+        self.referenced = True  # 自上次淘汰扫描以来是否被写入过
         self.lock = threading.Lock()  # 线程锁
 
     def __getstate__(self):
@@ -22,6 +23,7 @@ class Edge:
     def __setstate__(self, state):
         # 反序列化时恢复状态并重新初始化线程锁
         self.__dict__.update(state)
+        self.__dict__.setdefault('referenced', True)  # 旧版本快照没有访问标记
         self.lock = threading.Lock()  # 重新初始化线程锁
 
     def increment_weight(self, value=1):
@@ -30,4 +32,5 @@ class Edge:
         :param value: 增加的值，默认为1
         """
         with self.lock:
-            self.weight += value
\ No newline at end of file
+            self.weight += value
+            self.referenced = True
\ No newline at end of file
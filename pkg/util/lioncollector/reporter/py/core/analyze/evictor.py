@@ -0,0 +1,116 @@
+import heapq
+import threading
+import time
+
+# 淘汰策略
+LOWEST_WEIGHT = "weight"  # 在扫描到的边中淘汰边权最小的
+CLOCK = "clock"  # 跳过上次扫描后被写入过的边（二次机会），再淘汰其中边权最小的
+EVICTION_POLICIES = (LOWEST_WEIGHT, CLOCK)
+
+class EdgeEvictor:
+    def __init__(self, graph, max_edges, policy=CLOCK, batch_size=256, sample_factor=4, interval=0.1):
+        """
+        初始化冷边淘汰器：边数超过预算时，在后台按桶增量扫描Graph.edges并淘汰冷边，
+        每一步只扫描少量桶、每个桶只短暂持有该桶的锁，不会因为全图扫描阻塞写入。
+        创建后Graph的写入都在window_lock内完成，与删除边互斥，已查到Edge对象的写入不会落在被删除的边上。
+        :param graph: Graph对象
+        :param max_edges: 边数预算
+        :param policy: 淘汰策略，取值为weight或clock
+        :param batch_size: 每一步最多淘汰的边数
+        :param sample_factor: 每一步收集的候选边数量与淘汰数量的比例
+        :param interval: 两次检查之间的间隔时间（秒）
+        """
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy: {policy}")
+        self.graph = graph
+        self.graph.evicting = True
+        self.max_edges = max_edges
+        self.policy = policy
+        self.batch_size = batch_size
+        self.sample_factor = sample_factor
+        self.interval = interval
+        self.cursor = 0  # 下一次扫描的桶编号
+        self.evicted_count = 0  # 已淘汰的边数量
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def collect_candidates(self, count):
+        """
+        从游标位置开始逐桶收集候选边，最多扫描一轮。
+        :param count: 需要收集的候选边数量
+        :return: 候选列表，元素为(Edge对象, 扫描时的边权)
+        """
+        edges = self.graph.edges
+        candidates = []
+        for _ in range(edges.num_buckets):
+            if len(candidates) >= count:
+                break
+            bucket_index = self.cursor
+            self.cursor = (self.cursor + 1) % edges.num_buckets
+            for edge in edges.bucket_values(bucket_index):
+                if self.policy == CLOCK and edge.referenced:
+                    edge.referenced = False  # 给最近写入过的边一次机会
+                    continue
+                candidates.append((edge, edge.weight))
+        return candidates
+
+    def evict_step(self):
+        """
+        执行一步淘汰：超过预算时淘汰最多batch_size条冷边，并清理邻接表和孤立顶点。
+        候选边在锁外选出，删除前在与写入共用的window_lock内重新检查，选出后又被写入过的边不再淘汰。
+        :return: 本步淘汰的边数
+        """
+        excess = len(self.graph.edges) - self.max_edges
+        if excess <= 0:
+            return 0
+        count = min(excess, self.batch_size)
+        candidates = self.collect_candidates(count * self.sample_factor)
+        victims = heapq.nsmallest(count, candidates, key=lambda candidate: candidate[1])
+        evicted = 0
+        # 写入在window_lock内完成，删除期间不会有写入拿着被删除的边或向邻接表加回对方
+        with self.graph.snapshot_gate, self.graph.window_lock:
+            for edge, weight in victims:
+                edge_key = frozenset({edge.region_id1, edge.region_id2})
+                if self.graph.edges.get(edge_key) is not edge or edge.weight != weight:
+                    continue
+                self.graph.remove_edge(edge.region_id1, edge.region_id2)
+                self.graph.remove_isolated_vertex(edge.region_id1)
+                self.graph.remove_isolated_vertex(edge.region_id2)
+                evicted += 1
+        self.evicted_count += evicted
+        return evicted
+
+    def run(self):
+        while not self.stop_event.is_set():
+            # 仍然超过预算时让出GIL后继续，否则等待下一次检查
+            if self.evict_step():
+                time.sleep(0)
+            else:
+                self.stop_event.wait(self.interval)
+
+    def start(self):
+        """
+        启动后台淘汰线程。
+        """
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """
+        停止后台淘汰线程。
+        """
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+
+    def get_stats(self):
+        """
+        获取淘汰统计信息。
+        :return: 字典，包含当前边数、边数预算和已淘汰的边数
+        """
+        return {
+            "edges": len(self.graph.edges),
+            "max_edges": self.max_edges,
+            "evicted_edges": self.evicted_count,
+        }
@@ -1,39 +1,125 @@
 from core.analyze.vertex import Vertex
 from core.analyze.edge import Edge
+from core.analyze.hyperedge import Hyperedge
 from core.analyze.clump import Clump
+from core.analyze.decay import DecayScale, decayed
+from core.analyze.window import EpochRing
+from core.analyze.snapshot import SnapshotGate, read_snapshot
+from core.analyze.delta import GraphDelta, DeltaTracker
+from core.analyze.view import VersionedViews
 from core.util.bucketDict import BucketedDict
-import heapq
-from itertools import combinations
+from core.util.indexedHeap import IndexedHeap
+from core.util.disjointSet import DisjointSet
+from itertools import chain, combinations
 from collections import deque
+import numpy as np
 import pickle
 import threading
+import time
+
+# 批量写入的事务数少于该值时，NumPy聚合的固定开销超过收益，逐个写入
+BULK_MIN_TRANSACTIONS = 32
 
 class Graph:
-    def __init__(self, weight=10, theta=1, top_hot_threshold=0):
+    def __init__(self, weight=10, theta=1, top_hot_threshold=0, half_life=0, window_seconds=0, window_epochs=6,
+                 hyperedge_min_size=0):
         """
         初始化图结构。
         :param weight: 不同region之间的边权系数，默认为10
         :param theta: 相同region之间的边权系数，默认为1
         :param top_hot_threshold: 点权阈值，用于筛选top-hot region
+        :param half_life: 点权和边权的半衰期（秒），默认为0表示不衰减
+        :param window_seconds: 滑动窗口长度（秒），大于0时只保留最近窗口内的事务贡献
+        :param window_epochs: 滑动窗口中的时间片数量
+        :param hyperedge_min_size: 事务中不同region的数量不小于该值时保存为超边（事务内重复的region只计一次），
+            不展开为两两之间的边，默认为0表示总是展开
         """
+        if hyperedge_min_size > 0 and window_seconds > 0:
+            raise ValueError("Hyperedges are not supported together with a sliding window")
         self.vertices = BucketedDict()  # 顶点集合，键为regionID，值为Vertex对象
         self.edges = BucketedDict()  # 边集合，键为frozenset(regionID1, regionID2)，值为Edge对象
         self.weight = weight  # 不同region之间的边权系数
         self.theta = theta  # 相同region之间的边权系数
         self.top_hot_threshold = top_hot_threshold  # 点权阈值
-        self.top_hot_queue = []  # 优先队列，按点权降序排列
-        self.queue_lock = threading.Lock()  # 优先队列的锁
+        self.top_hot_index = IndexedHeap()  # 热点索引，每个顶点一项，按点权降序排列
+        self.queue_lock = threading.Lock()  # 热点索引的锁
+        self.decay = DecayScale(half_life)  # 全局衰减系数，Vertex和Edge中保存的是乘以系数后的权重
+        self.decay_lock = threading.Lock()  # 开启衰减时串行化带系数的写入和基准时间的调整
+        self.window = EpochRing(window_seconds, window_epochs) if window_seconds > 0 else None  # 滑动窗口
+        self.window_lock = threading.Lock()  # 开启滑动窗口或淘汰冷边时串行化写入、过期时间片的扣减和边的删除
+        self.evicting = False  # 挂载冷边淘汰器后为True，写入和淘汰都在window_lock内完成
+        self.clump_threshold = None  # 增量维护热点闭包使用的边权阈值，None表示不维护
+        self.clump_index = None  # 按clump_threshold维护连通分量的并查集
+        self.clump_dirty = False  # 删除边或点权减少后并查集失效，下次查询时重建
+        self.clump_lock = threading.Lock()  # 保护并查集的锁
+        self.hyperedge_min_size = hyperedge_min_size  # 保存为超边的最小region数量，0表示不使用超边
+        self.hyperedges = BucketedDict()  # 超边集合，键为frozenset(regionID, ...)，值为Hyperedge对象
+        self.region_hyperedges = {}  # 键为regionID，值为包含该region的超边键集合
+        self.hyperedge_lock = threading.Lock()  # 保护超边的创建和region_hyperedges
+        self.snapshot_gate = SnapshotGate()  # 写入入口的闸门，快照冻结闸门以得到一致的时间点
+        self.ingest_log = None  # 预写日志，不为None时事务在写入前先追加到日志
+        self.ingest_checkpoint = 0  # 快照对应的日志检查点段编号，恢复时从该段开始重放
+        self.delta_tracker = None  # 记录自上次导出以来的写入，None表示不记录
+        self.merged_sequences = {}  # 已合并的增量，键为来源名称，值为最近合并的序号
+        self.read_views = None  # 版本化读视图，None表示分析直接读取正在写入的图
 
     def __getstate__(self):
         # 序列化时排除线程锁
         state = self.__dict__.copy()
         del state['queue_lock']
+        del state['decay_lock']
+        del state['window_lock']
+        del state['clump_lock']
+        del state['hyperedge_lock']
+        del state['snapshot_gate']
+        state['ingest_log'] = None
+        state['read_views'] = None  # 读视图是内存中的副本，加载后按需重新开启
+        state['evicting'] = False  # 淘汰器不随快照保存，加载后重新挂载
         return state
 
     def __setstate__(self, state):
         # 反序列化时恢复状态并重新初始化线程锁
         self.__dict__.update(state)
         self.queue_lock = threading.Lock()  # 重新初始化线程锁
+        self.decay_lock = threading.Lock()
+        self.window_lock = threading.Lock()
+        self.clump_lock = threading.Lock()
+        self.hyperedge_lock = threading.Lock()
+        self.snapshot_gate = SnapshotGate()
+        self.ingest_log = None
+        self.read_views = None
+        self.evicting = False
+        if 'ingest_checkpoint' not in state:
+            self.ingest_checkpoint = 0  # 旧版本快照没有预写日志
+        if 'delta_tracker' not in state:
+            self.delta_tracker = None  # 旧版本快照没有增量导出
+            self.merged_sequences = {}
+        for name in ('vertices', 'edges'):
+            if isinstance(state[name], dict):
+                # 旧版本快照使用普通字典，转换为BucketedDict
+                bucketed = BucketedDict()
+                for key, value in state[name].items():
+                    bucketed.set(key, value)
+                setattr(self, name, bucketed)
+        if 'decay' not in state:
+            self.decay = DecayScale()  # 旧版本快照没有衰减
+        if 'window' not in state:
+            self.window = None  # 旧版本快照没有滑动窗口
+        if 'clump_threshold' not in state:
+            self.clump_threshold = None
+            self.clump_index = None
+            self.clump_dirty = False
+        if 'hyperedges' not in state:
+            self.hyperedge_min_size = 0  # 旧版本快照没有超边
+            self.hyperedges = BucketedDict()
+            self.region_hyperedges = {}
+        if 'top_hot_queue' in state:
+            # 旧版本快照中的优先队列每次增加点权都会插入一项，按顶点去重后重建热点索引
+            self.top_hot_index = IndexedHeap()
+            for _, region_id in self.__dict__.pop('top_hot_queue'):
+                vertex = self.vertices.get(region_id)
+                if vertex:
+                    self.top_hot_index.update(region_id, -vertex.weight)
 
     def add_vertex(self, region_id):
         """
@@ -45,16 +131,43 @@ class Graph:
 
     def increment_vertex_weight(self, region_id, value=1):
         """
-        增加某个顶点的点权，并更新优先队列。
+        增加某个顶点的点权，并原地更新热点索引。
         :param region_id: 要增加点权的regionID
         :param value: 增加的值，默认为1
         """
+        if self.window is None and not self.evicting:
+            self.apply_vertex_weight(region_id, value)
+            return
+        with self.window_lock:
+            stored = self.apply_vertex_weight(region_id, value)
+            if self.window is None:
+                return
+            self.subtract_epochs(self.window.record_vertex(region_id, stored, time.time()))
+
+    def apply_vertex_weight(self, region_id, value):
+        """
+        累加点权并更新热点索引。
+        :return: 实际累加到Vertex上的权重（乘以衰减系数后）
+        """
         self.add_vertex(region_id)
         vertex = self.vertices.get(region_id)
+        stored = 0
         if vertex:
-            vertex.increment_weight(value)
+            if self.clump_threshold is None:
+                stored = self.increment_scaled(vertex, value)
+            else:
+                # 点权和并查集中的总点权一起更新，避免与重建交错
+                with self.clump_lock:
+                    stored = self.increment_scaled(vertex, value)
+                    self.clump_index.add(region_id)
+                    self.clump_index.add_weight(region_id, stored, vertex.weight)
             with self.queue_lock:
-                heapq.heappush(self.top_hot_queue, (-vertex.weight, region_id))
+                self.top_hot_index.update(region_id, -vertex.weight)
+            if self.delta_tracker:
+                self.delta_tracker.record_vertex(region_id, stored)
+            if self.read_views:
+                self.read_views.record_vertex(region_id, stored)
+        return stored
 
     def add_edge(self, region_id1, region_id2, weight=1):
         """
@@ -62,18 +175,45 @@ class Graph:
         :param region_id1: 边的第一个regionID
         :param region_id2: 边的第二个regionID
         """
+        theta = self.theta * weight
+        self.add_edge_weight(region_id1, region_id2, theta if region_id1 == region_id2 else self.weight * theta)
+
+    def add_edge_weight(self, region_id1, region_id2, value):
+        """
+        直接累加边权（不再乘以边权系数），边不存在时创建，并更新邻接表。
+        :param region_id1: 边的第一个regionID
+        :param region_id2: 边的第二个regionID
+        :param value: 累加到边上的权重
+        """
+        if self.window is None and not self.evicting:
+            self.apply_edge_weight(region_id1, region_id2, value)
+            return
+        with self.window_lock:
+            stored = self.apply_edge_weight(region_id1, region_id2, value)
+            if self.window is None:
+                return
+            edge_key = frozenset({region_id1, region_id2})
+            self.subtract_epochs(self.window.record_edge(edge_key, stored, time.time()))
+
+    def apply_edge_weight(self, region_id1, region_id2, value):
+        """
+        累加边权，边不存在时创建，并更新邻接表。
+        :return: 实际累加到Edge上的权重（乘以衰减系数后）
+        """
         self.add_vertex(region_id1)
         self.add_vertex(region_id2)
-        theta = self.theta * weight
         edge_key = frozenset({region_id1, region_id2})
         edge = self.edges.get(edge_key)
         if edge:
-            edge.increment_weight(theta if region_id1 == region_id2 else self.weight * theta)
+            stored = self.increment_scaled(edge, value)
+        elif self.decay.enabled():
+            edge = Edge(region_id1, region_id2, 0)
+            self.edges.set(edge_key, edge)
+            stored = self.increment_scaled(edge, value)
         else:
-            if region_id1 == region_id2:
-                self.edges.set(edge_key, Edge(region_id1, region_id2, theta))
-            else:
-                self.edges.set(edge_key, Edge(region_id1, region_id2, self.weight * theta))
+            stored = value
+            edge = Edge(region_id1, region_id2, value)
+            self.edges.set(edge_key, edge)
         # 更新邻接表
         vertex1 = self.vertices.get(region_id1)
         vertex2 = self.vertices.get(region_id2)
@@ -81,26 +221,269 @@ class Graph:
             vertex1.add_adjacent_region(region_id2)
         if vertex2:
             vertex2.add_adjacent_region(region_id1)
+        if self.clump_threshold is not None and edge.weight > self.clump_threshold:
+            # 边权超过阈值时合并两端所在的闭包
+            with self.clump_lock:
+                self.clump_index.add(region_id1)
+                self.clump_index.add(region_id2)
+                self.clump_index.union(region_id1, region_id2)
+        if self.delta_tracker:
+            self.delta_tracker.record_edge(edge_key, stored)
+        if self.read_views:
+            self.read_views.record_edge(edge_key, stored)
+        return stored
 
-    def get_top_hot_regions(self):
+    def increment_scaled(self, element, value):
         """
-        获取当前点权超过阈值的region列表，按点权降序排列。
-        :return: 列表，元素为(regionID, 点权)的元组
+        按当前的全局衰减系数累加点权或边权。
+        :param element: Vertex或Edge对象
+        :param value: 增加的实际权重
+        :return: 实际累加到对象上的权重
         """
-        top_regions = []
-        temp = []
+        if not self.decay.enabled():
+            element.increment_weight(value)
+            return value
+        with self.decay_lock:
+            now = time.time()
+            if self.decay.needs_rebase(now):
+                self.rebase_decay(now)
+            stored = value * self.decay.factor(now)
+            element.increment_weight(stored)
+            return stored
+
+    def rebase_decay(self, now):
+        """
+        重新设定衰减基准时间，把所有保存的权重除以旧系数，调用方需持有decay_lock。
+        只有系数的指数超过上限时才会发生，频率为每max_exponent个半衰期一次。
+        :param now: 当前时间
+        """
+        factor = self.decay.rebase(now)
+        for vertex in self.vertices.values():
+            with vertex.lock:
+                vertex.weight /= factor
+        for edge in self.edges.values():
+            with edge.lock:
+                edge.weight /= factor
+        for hyperedge in self.hyperedges.values():
+            with hyperedge.lock:
+                hyperedge.weight /= factor
         with self.queue_lock:
-            while self.top_hot_queue:
-                neg_weight, region_id = heapq.heappop(self.top_hot_queue)
+            for neg_weight, region_id in self.top_hot_index.heap.copy():
+                self.top_hot_index.update(region_id, neg_weight / factor)
+        if self.window:
+            self.window.rescale(factor)
+        if self.delta_tracker:
+            self.delta_tracker.rescale(factor)
+        if self.read_views:
+            self.read_views.rescale(factor)
+
+    def expire_window(self, now=None):
+        """
+        滚动滑动窗口，从图中减去过期时间片的贡献。只在开启滑动窗口时生效。
+        :param now: 当前时间，默认为time.time()
+        """
+        if self.window is None:
+            return
+        with self.snapshot_gate, self.window_lock:
+            self.subtract_epochs(self.window.advance(time.time() if now is None else now))
+
+    def subtract_epochs(self, epochs):
+        """
+        从图中减去过期时间片的贡献，权重归零的边和顶点被删除，调用方需持有window_lock。
+        :param epochs: 过期的时间片列表
+        """
+        if epochs and self.clump_threshold is not None:
+            self.clump_dirty = True
+        for epoch in epochs:
+            # 残差阈值与保存的权重同量级，用于吸收开启衰减时的浮点误差
+            epsilon = 1e-9 * self.decay.factor()
+            touched = set(epoch.vertex_weights)
+            for region_id, stored in epoch.vertex_weights.items():
                 vertex = self.vertices.get(region_id)
-                if vertex and vertex.weight >= self.top_hot_threshold:
-                    top_regions.append((region_id, -neg_weight))  # 负值转正值
-                else:
-                    heapq.heappush(temp, (neg_weight, region_id))  # 重新放入队列
-            # 将未处理的region重新放回队列
-            for item in temp:
-                heapq.heappush(self.top_hot_queue, item)
-        return top_regions
+                if not vertex:
+                    continue
+                vertex.increment_weight(-stored)
+                with self.queue_lock:
+                    if abs(vertex.weight) <= epsilon:
+                        vertex.weight = 0
+                        self.top_hot_index.remove(region_id)
+                    else:
+                        self.top_hot_index.update(region_id, -vertex.weight)
+                if self.read_views:
+                    if vertex.weight == 0:
+                        self.read_views.remove_vertex(region_id)
+                    else:
+                        self.read_views.record_vertex(region_id, -stored)
+            for edge_key, stored in epoch.edge_weights.items():
+                edge = self.edges.get(edge_key)
+                if not edge:
+                    continue
+                edge.increment_weight(-stored)
+                if self.read_views:
+                    self.read_views.record_edge(edge_key, -stored)
+                if abs(edge.weight) <= epsilon:
+                    self.remove_edge(edge.region_id1, edge.region_id2)
+                    touched.update(edge_key)
+            for region_id in touched:
+                self.remove_isolated_vertex(region_id)
+
+    def remove_edge(self, region_id1, region_id2):
+        """
+        删除一条边，并从两端顶点的邻接表中删除对方。开启滑动窗口或淘汰冷边时调用方需持有window_lock。
+        :param region_id1: 边的第一个regionID
+        :param region_id2: 边的第二个regionID
+        """
+        edge_key = frozenset({region_id1, region_id2})
+        edge = self.edges.get(edge_key)
+        self.edges.delete(edge_key)
+        if edge and self.clump_threshold is not None and edge.weight > self.clump_threshold:
+            # 只有超过阈值的边参与合并，删除低于阈值的边不影响并查集
+            self.clump_dirty = True
+        if self.window:
+            self.window.forget_edge(edge_key)
+        if self.read_views:
+            self.read_views.remove_edge(edge_key)
+        vertex1 = self.vertices.get(region_id1)
+        vertex2 = self.vertices.get(region_id2)
+        if vertex1:
+            vertex1.remove_adjacent_region(region_id2)
+        if vertex2:
+            vertex2.remove_adjacent_region(region_id1)
+
+    def remove_isolated_vertex(self, region_id):
+        """
+        点权为0且没有相连边的顶点不再有用，将其删除。
+        :param region_id: 要检查的regionID
+        """
+        vertex = self.vertices.get(region_id)
+        if vertex and vertex.weight == 0 and not vertex.get_adjacent_regions() and region_id not in self.region_hyperedges:
+            self.remove_vertex(region_id)
+
+    def remove_vertex(self, region_id):
+        """
+        删除一个顶点及其热点索引项，调用方需保证该顶点已经没有相连的边。开启滑动窗口或淘汰冷边时调用方需持有window_lock。
+        :param region_id: 要删除的regionID
+        """
+        vertex = self.vertices.get(region_id)
+        self.vertices.delete(region_id)
+        if vertex and vertex.weight and self.clump_threshold is not None:
+            # 没有相连边、点权为0的顶点不会出现在输出的闭包中
+            self.clump_dirty = True
+        if self.window:
+            self.window.forget_vertex(region_id)
+        if self.read_views:
+            self.read_views.remove_vertex(region_id)
+        with self.queue_lock:
+            self.top_hot_index.remove(region_id)
+
+    def get_vertex_weight(self, region_id):
+        """
+        获取某个顶点衰减后的点权。
+        :param region_id: 目标regionID
+        :return: 点权，顶点不存在时返回None
+        """
+        vertex = self.vertices.get(region_id)
+        return decayed(vertex.weight, self.decay.factor()) if vertex else None
+
+    def get_edge_weight(self, region_id1, region_id2):
+        """
+        获取某条边衰减后的边权。
+        :param region_id1: 边的第一个regionID
+        :param region_id2: 边的第二个regionID
+        :return: 边权，边不存在时返回None
+        """
+        edge = self.edges.get(frozenset({region_id1, region_id2}))
+        weight = edge.weight if edge else None
+        if self.region_hyperedges:
+            # 加上同时包含两个region的超边
+            with self.hyperedge_lock:
+                common = self.region_hyperedges.get(region_id1, set()) & self.region_hyperedges.get(region_id2, set())
+            for hyperedge_key in common:
+                weight = (weight or 0) + self.hyperedges.get(hyperedge_key).weight
+        return decayed(weight, self.decay.factor()) if weight is not None else None
+
+    def register_clump_threshold(self, edge_thresh):
+        """
+        注册增量维护热点闭包的边权阈值：之后边权超过阈值时立即用并查集合并两端，
+        get_clumps和该阈值下的get_hot_region只需输出结果，不再遍历全图。
+        点权会随时间减少的衰减模式下闭包可能需要拆分，因此不支持。
+        :param edge_thresh: 边权阈值
+        """
+        if self.decay.enabled():
+            raise ValueError("Incremental clumps are not supported together with decay")
+        if self.hyperedge_min_size:
+            raise ValueError("Incremental clumps are not supported together with hyperedges")
+        self.clump_threshold = edge_thresh
+        self.rebuild_clump_index()
+
+    def rebuild_clump_index(self):
+        """
+        按当前图重建并查集，复杂度为O(V+E)，只在注册阈值或删除边、点权减少之后发生。
+        """
+        with self.clump_lock:
+            clump_index = DisjointSet()
+            for region_id, vertex in self.vertices.items():
+                clump_index.add(region_id, vertex.weight)
+            for edge in self.edges.values():
+                if edge.weight > self.clump_threshold:
+                    clump_index.add(edge.region_id1)
+                    clump_index.add(edge.region_id2)
+                    clump_index.union(edge.region_id1, edge.region_id2)
+            self.clump_index = clump_index
+            self.clump_dirty = False
+
+    def get_clumps(self):
+        """
+        获取注册阈值下的热点闭包，顺序与get_hot_region相同，复杂度与输出大小成正比（外加按闭包排序）。
+        :return: 一个列表，每一项是一个Clump对象，表示一个热点闭包
+        """
+        if self.clump_threshold is None:
+            raise ValueError("No clump threshold registered")
+        if self.clump_dirty:
+            self.rebuild_clump_index()
+        with self.clump_lock:
+            # 只输出包含有点权顶点的闭包，与get_hot_region只从热点索引出发一致
+            return [Clump(set(members), hot) for (neg_weight, _), members, hot in self.clump_index.groups()
+                    if neg_weight < 0]
+
+    def enable_read_views(self, max_age=1.0):
+        """
+        开启版本化读视图：此后get_hot_region在get_read_view发布的只读版本上计算，
+        BFS不再读取正在写入的顶点和边，写入额外记录一次权重的累加量，内存中多保存一份所有权重。
+        开启时冻结写入并复制全图的权重，只在开启时发生一次。
+        :param max_age: get_hot_region复用最近发布版本的最长时间（秒），0表示每次查询都发布新版本
+        """
+        self.snapshot_gate.freeze()
+        try:
+            if self.read_views is None:
+                read_views = VersionedViews(max_age)
+                read_views.record_all(self)
+                self.read_views = read_views
+        finally:
+            self.snapshot_gate.thaw()
+
+    def get_read_view(self, max_age=0):
+        """
+        获取一个一致的只读版本，版本号随每次发布递增。
+        :param max_age: 最近发布的版本不超过该时长（秒）时直接复用，0表示总是发布新版本
+        :return: MaterializedView对象
+        """
+        if self.read_views is None:
+            raise ValueError("Read views are not enabled")
+        self.expire_window()
+        return self.read_views.publish(self, max_age)
+
+    def get_top_hot_regions(self, k=None):
+        """
+        获取当前点权超过阈值的region列表，按点权降序排列，复杂度为O(k log k)。
+        :param k: 最多返回的region数量，默认为None表示返回所有超过阈值的region
+        :return: 列表，元素为(regionID, 点权)的元组
+        """
+        self.expire_window()
+        factor = self.decay.factor()
+        with self.queue_lock:
+            top_items = self.top_hot_index.smallest(k, limit=-self.top_hot_threshold * factor)
+        return [(region_id, decayed(-neg_weight, factor)) for neg_weight, region_id in top_items]  # 负值转正值
 
     def get_adjacent_regions(self, region_id):
         """
@@ -109,46 +492,111 @@ class Graph:
         :return: 相邻regionID的集合
         """
         vertex = self.vertices.get(region_id)
-        return vertex.get_adjacent_regions() if vertex else set()
+        adjacent_regions = vertex.get_adjacent_regions() if vertex else set()
+        if self.region_hyperedges:
+            with self.hyperedge_lock:
+                hyperedge_keys = list(self.region_hyperedges.get(region_id, ()))
+            adjacent_regions = adjacent_regions.union(*hyperedge_keys) - {region_id}
+        return adjacent_regions
     
-    def get_hot_region(self, edge_thresh):
+    def get_hot_region(self, edge_thresh, vectorized=False):
         """
         获取当前图中的热点闭包。
         :param edge_thresh: 边权阈值，大于该值的边才会被认定为高关联
+        :param vectorized: 是否用稀疏矩阵的连通分量代替逐个顶点的BFS，结果相同，适合离线分析大图，需要scipy
         :return: 一个列表，每一项是一个Clump对象，表示一个热点闭包
         """
+        self.expire_window()
+        if self.clump_threshold is not None and edge_thresh == self.clump_threshold:
+            return self.get_clumps()
+        if self.read_views is not None:
+            # 在一致的只读版本上计算，不读取正在写入的顶点和边；最近发布的版本足够新时直接复用
+            return self.get_read_view(self.read_views.max_age).get_hot_region(edge_thresh)
+        if vectorized:
+            return self.get_hot_region_vectorized(edge_thresh)
         visited = set()  # 缓存已经处理过的regionID
         hot_clumps = []  # 存储所有热点闭包
+        # 保存的权重都乘以了同一个衰减系数，把阈值也乘以该系数
+        factor = self.decay.factor()
+        edge_thresh *= factor
 
+        # 只在复制热点索引时持有锁，排序和扩散不阻塞写入
         with self.queue_lock:
-            temp_queue = self.top_hot_queue.copy()
-            while temp_queue:
-                neg_weight, region_id = heapq.heappop(temp_queue)
-                if region_id in visited:
+            seeds = self.top_hot_index.heap.copy()
+        seeds.sort()
+        # 超边产生的高关联连接
+        hyperedge_neighbors = {}
+        for region_id1, region_id2 in self.hyperedge_links(edge_thresh):
+            hyperedge_neighbors.setdefault(region_id1, []).append(region_id2)
+            hyperedge_neighbors.setdefault(region_id2, []).append(region_id1)
+        for neg_weight, region_id in seeds:
+            if region_id in visited:
+                continue  # 如果已经处理过，跳过
+            # 初始化当前闭包的regionID集合和总点权
+            clump_region_ids = set()
+            clump_hot = 0
+            # 使用BFS进行扩散
+            queue_bfs = deque([region_id])
+            while queue_bfs:
+                current_region = queue_bfs.popleft()
+                if current_region in visited:
                     continue  # 如果已经处理过，跳过
-                # 初始化当前闭包的regionID集合和总点权
-                clump_region_ids = set()
-                clump_hot = 0
-                # 使用BFS进行扩散
-                queue_bfs = deque([region_id])
-                while queue_bfs:
-                    current_region = queue_bfs.popleft()
-                    if current_region in visited:
-                        continue  # 如果已经处理过，跳过
-                    visited.add(current_region)
-                    clump_region_ids.add(current_region)
-                    vertex = self.vertices.get(current_region)
-                    if vertex:
-                        clump_hot += vertex.weight
-                        # 遍历相邻节点
-                        for neighbor in vertex.get_adjacent_regions():
-                            edge_key = frozenset({current_region, neighbor})
-                            edge = self.edges.get(edge_key)
-                            if edge and edge.weight > edge_thresh and neighbor not in visited:
-                                queue_bfs.append(neighbor)
-                # 将当前闭包添加到结果中
-                if clump_region_ids:
-                    hot_clumps.append(Clump(clump_region_ids, clump_hot))
+                visited.add(current_region)
+                clump_region_ids.add(current_region)
+                vertex = self.vertices.get(current_region)
+                if vertex:
+                    clump_hot += vertex.weight
+                    # 遍历相邻节点
+                    for neighbor in vertex.get_adjacent_regions():
+                        edge_key = frozenset({current_region, neighbor})
+                        edge = self.edges.get(edge_key)
+                        if edge and edge.weight > edge_thresh and neighbor not in visited:
+                            queue_bfs.append(neighbor)
+                    for neighbor in hyperedge_neighbors.get(current_region, ()):
+                        if neighbor not in visited:
+                            queue_bfs.append(neighbor)
+            # 将当前闭包添加到结果中
+            if clump_region_ids:
+                hot_clumps.append(Clump(clump_region_ids, decayed(clump_hot, factor)))
+        return hot_clumps
+
+    def get_hot_region_vectorized(self, edge_thresh):
+        """
+        将高关联边导出为稀疏矩阵，用连通分量一次求出所有热点闭包，结果与get_hot_region的BFS相同。
+        :param edge_thresh: 边权阈值，大于该值的边才会被认定为高关联
+        :return: 一个列表，每一项是一个Clump对象，表示一个热点闭包
+        """
+        from core.analyze.components import hot_components, index_regions
+
+        factor = self.decay.factor()
+        edge_thresh *= factor
+        with self.queue_lock:
+            seeds = self.top_hot_index.heap.copy()
+        # 逐桶复制顶点和高关联边的字段，不构造(键, 值)元组
+        vertex_ids, vertex_weights, sources, targets = [], [], [], []
+        for bucket_index in range(self.vertices.num_buckets):
+            vertices = self.vertices.bucket_values(bucket_index)
+            vertex_ids += [vertex.region_id for vertex in vertices]
+            vertex_weights += [vertex.weight for vertex in vertices]
+        for bucket_index in range(self.edges.num_buckets):
+            edges = [edge for edge in self.edges.bucket_values(bucket_index) if edge.weight > edge_thresh]
+            sources += [edge.region_id1 for edge in edges]
+            targets += [edge.region_id2 for edge in edges]
+        for region_id1, region_id2 in self.hyperedge_links(edge_thresh):
+            sources.append(region_id1)
+            targets.append(region_id2)
+        # 种子按(-点权, regionID)排序，与BFS的出发顺序一致
+        seed_ids = np.array([region_id for _, region_id in seeds])
+        seed_ids = seed_ids[np.lexsort((seed_ids, [neg_weight for neg_weight, _ in seeds]))] if seeds else seed_ids
+        region_ids, vertex_positions, sources, targets, seed_positions = index_regions(
+            np.array(vertex_ids), sources, targets, seed_ids)
+        weights = np.zeros(len(region_ids), dtype=np.asarray(vertex_weights).dtype)
+        weights[vertex_positions] = vertex_weights
+
+        region_ids = region_ids.tolist()
+        hot_clumps = []
+        for members, clump_hot in hot_components(len(region_ids), sources, targets, weights, seed_positions):
+            hot_clumps.append(Clump({region_ids[position] for position in members.tolist()}, decayed(clump_hot, factor)))
         return hot_clumps
     
     def add_transaction(self, region_ids, weight=1):
@@ -157,15 +605,349 @@ class Graph:
         :param region_ids: 事务访问的regionID列表
         :param weight: 事务的权重，默认为1
         """
+        with self.snapshot_gate:
+            if self.ingest_log:
+                self.ingest_log.append([region_ids], [weight])
+            self.record_transaction(region_ids, weight)
+
+    def record_transaction(self, region_ids, weight=1):
+        """
+        更新事务的点权和边权，调用方需已进入snapshot_gate。
+        """
         # print(region_ids)
         # 更新点权
         for region_id in region_ids:
             self.increment_vertex_weight(region_id, weight)
+        if self.hyperedge_min_size:
+            distinct = frozenset(region_ids)
+            if len(distinct) >= self.hyperedge_min_size:
+                # 宽事务保存为超边，写入代价与region数量成线性关系
+                self.add_hyperedge(distinct, self.weight * self.theta * weight)
+                return
         # 更新边权
         for region_pair in combinations(region_ids, 2):
             if region_pair[0] != region_pair[1]:
                 self.add_edge(region_pair[0], region_pair[1], weight)
 
+    def attach_ingest_log(self, ingest_log):
+        """
+        挂载预写日志，此后add_transaction和add_transactions在同一次进入snapshot_gate时先追加日志再写入，
+        因此冻结闸门时日志中的事务恰好都已写入Graph。
+        :param ingest_log: IngestLog对象，None表示取消挂载
+        """
+        with self.snapshot_gate:
+            self.ingest_log = ingest_log
+
+    def add_hyperedge(self, region_ids, value):
+        """
+        累加超边的权重，超边不存在时创建并登记到每个region的超边集合中。
+        :param region_ids: 超边中的regionID集合（frozenset）
+        :param value: 超边中任意两个region之间累加的边权
+        """
+        hyperedge = self.hyperedges.get(region_ids)
+        if hyperedge is None:
+            with self.hyperedge_lock:
+                hyperedge = self.hyperedges.get(region_ids)
+                if hyperedge is None:
+                    hyperedge = Hyperedge(region_ids)
+                    self.hyperedges.set(region_ids, hyperedge)
+                    for region_id in region_ids:
+                        self.region_hyperedges.setdefault(region_id, set()).add(region_ids)
+        stored = self.increment_scaled(hyperedge, value)
+        if self.delta_tracker:
+            self.delta_tracker.record_hyperedge(region_ids, stored)
+        if self.read_views:
+            self.read_views.record_hyperedge(region_ids, stored)
+
+    def expand_hyperedges(self, hyperedges):
+        """
+        把超边展开为两两之间的边权，复杂度与超边大小的平方成正比，只在查询和导出时使用。
+        :param hyperedges: Hyperedge对象列表
+        :return: 字典，键为frozenset(regionID1, regionID2)，值为保存的边权之和
+        """
+        pair_weights = {}
+        for hyperedge in hyperedges:
+            for region_pair in combinations(hyperedge.region_ids, 2):
+                edge_key = frozenset(region_pair)
+                pair_weights[edge_key] = pair_weights.get(edge_key, 0) + hyperedge.weight
+        return pair_weights
+
+    def hyperedge_links(self, edge_thresh):
+        """
+        超边在阈值下产生的高关联连接。权重超过阈值的超边中任意两个region都是高关联，
+        用以其中一个region为中心的星形连接表示，连通性不变；其余超边两两展开后与普通边的边权累加，再与阈值比较。
+        :param edge_thresh: 乘以衰减系数后的边权阈值
+        :return: 列表，元素为(regionID1, regionID2)
+        """
+        if not self.region_hyperedges:
+            return []
+        links = []
+        light_hyperedges = []
+        for hyperedge in self.hyperedges.values():
+            if hyperedge.weight > edge_thresh:
+                center, *others = hyperedge.region_ids
+                links.extend((center, other) for other in others)
+            else:
+                light_hyperedges.append(hyperedge)
+        for edge_key, weight in self.expand_hyperedges(light_hyperedges).items():
+            edge = self.edges.get(edge_key)
+            if weight + (edge.weight if edge else 0) > edge_thresh:
+                links.append(tuple(edge_key))
+        return links
+
+    def add_transactions(self, batch, weights=None):
+        """
+        批量添加事务，结果与对每个事务依次调用add_transaction相同。
+        整批事务的点权增量和边权增量先用NumPy聚合：展平regionID，把region对编码为int64键，再用np.unique和bincount累加，
+        之后每个被访问的顶点和边只写入一次。事务内重复的region与add_transaction一样按出现次数计算，相同region之间的对被跳过。
+        :param batch: 事务列表，每一项是一个regionID列表
+        :param weights: 与batch一一对应的事务权重列表，默认为None表示权重均为1
+        """
+        with self.snapshot_gate:
+            if self.ingest_log:
+                self.ingest_log.append(batch, weights)
+            self.record_transactions(batch, weights)
+
+    def record_transactions(self, batch, weights=None):
+        """
+        批量更新事务的点权和边权，调用方需已进入snapshot_gate。
+        """
+        if weights is None:
+            weights = [1] * len(batch)
+        transactions = []
+        transaction_weights = []
+        for region_ids, weight in zip(batch, weights):
+            if self.hyperedge_min_size and len(set(region_ids)) >= self.hyperedge_min_size:
+                self.record_transaction(region_ids, weight)  # 宽事务保存为超边，写入代价已经是线性的
+            elif region_ids:
+                transactions.append(region_ids)
+                transaction_weights.append(weight)
+        if len(transactions) < BULK_MIN_TRANSACTIONS:
+            for region_ids, weight in zip(transactions, transaction_weights):
+                self.record_transaction(region_ids, weight)
+            return
+        lengths = np.fromiter(map(len, transactions), dtype=np.int64, count=len(transactions))
+        flat = np.asarray(list(chain.from_iterable(transactions)))
+        transaction_weights = np.asarray(transaction_weights)
+        if flat.dtype == object or transaction_weights.dtype == object:
+            # regionID或权重无法转换为同一种NumPy类型时逐个写入
+            for region_ids, weight in zip(transactions, transaction_weights.tolist()):
+                self.record_transaction(region_ids, weight)
+            return
+        region_table, flat_index = np.unique(flat, return_inverse=True)
+        region_count = len(region_table)
+        integral = transaction_weights.dtype.kind in 'iub'
+        # 点权增量：每次出现累加一次事务权重
+        vertex_totals = np.bincount(flat_index, weights=np.repeat(transaction_weights, lengths), minlength=region_count)
+        # 边权增量：按事务长度分组，用上三角下标一次取出同组事务中的所有region对
+        offsets = np.cumsum(lengths) - lengths
+        pair_keys = []
+        pair_weights = []
+        for length in np.unique(lengths[lengths >= 2]).tolist():
+            selected = np.flatnonzero(lengths == length)
+            members = flat_index[offsets[selected][:, None] + np.arange(length)]
+            first, second = np.triu_indices(length, 1)
+            left = members[:, first]
+            right = members[:, second]
+            keep = left != right
+            pair_keys.append((np.minimum(left, right) * region_count + np.maximum(left, right))[keep])
+            pair_weights.append(np.broadcast_to(transaction_weights[selected][:, None], left.shape)[keep])
+        if integral:
+            vertex_totals = vertex_totals.astype(np.int64)
+        region_pairs = []
+        pair_values = []
+        if pair_keys:
+            unique_keys, pair_index = np.unique(np.concatenate(pair_keys), return_inverse=True)
+            pair_totals = np.bincount(pair_index, weights=np.concatenate(pair_weights), minlength=len(unique_keys))
+            if integral:
+                pair_totals = pair_totals.astype(np.int64)
+            region_pairs = list(zip(region_table[unique_keys // region_count].tolist(),
+                                    region_table[unique_keys % region_count].tolist()))
+            pair_values = (self.weight * self.theta * pair_totals).tolist()
+        self.apply_bulk_weights(region_table.tolist(), vertex_totals.tolist(), region_pairs, pair_values)
+
+    def apply_bulk_weights(self, region_ids, vertex_totals, region_pairs, pair_values):
+        """
+        写入聚合后的点权和边权增量，每个顶点和边只查找一次。
+        滑动窗口和闭包索引需要逐个记录每次写入，此时沿用单次写入的路径。
+        :param region_ids: 去重后的regionID列表，包含region_pairs中的所有region
+        :param vertex_totals: 与region_ids一一对应的点权增量，为0的顶点只创建，不进入热点索引
+        :param region_pairs: 去重后的region对列表，元素为(regionID1, regionID2)
+        :param pair_values: 与region_pairs一一对应的边权增量（已乘以边权系数）
+        """
+        if self.window is not None or self.clump_threshold is not None:
+            for region_id, total in zip(region_ids, vertex_totals):
+                if total:
+                    self.increment_vertex_weight(region_id, total)
+                else:
+                    self.add_vertex(region_id)
+            for (region_id1, region_id2), value in zip(region_pairs, pair_values):
+                self.add_edge_weight(region_id1, region_id2, value)
+            return
+        if self.evicting:
+            # 整批写入只进入一次window_lock，淘汰器不会删除正在写入的边
+            with self.window_lock:
+                self.record_bulk_weights(region_ids, vertex_totals, region_pairs, pair_values)
+            return
+        self.record_bulk_weights(region_ids, vertex_totals, region_pairs, pair_values)
+
+    def record_bulk_weights(self, region_ids, vertex_totals, region_pairs, pair_values):
+        """
+        不开启滑动窗口和闭包索引时写入聚合后的增量，淘汰冷边时调用方需持有window_lock。
+        """
+        vertices, _ = self.vertices.setdefault_many(region_ids, lambda position: Vertex(region_ids[position]))
+        vertex_stored = [self.increment_scaled(vertex, total) if total else 0
+                         for vertex, total in zip(vertices, vertex_totals)]
+        # 整批顶点只进入一次热点索引的锁
+        with self.queue_lock:
+            for vertex, total in zip(vertices, vertex_totals):
+                if total:
+                    self.top_hot_index.update(vertex.region_id, -vertex.weight)
+        if not region_pairs:
+            if self.delta_tracker:
+                self.delta_tracker.record_bulk(region_ids, vertex_stored, [], [])
+            if self.read_views:
+                self.read_views.record_bulk(region_ids, vertex_stored, [], [])
+            return
+        decay_enabled = self.decay.enabled()
+        edge_keys = [frozenset(region_pair) for region_pair in region_pairs]
+        edges, created = self.edges.setdefault_many(
+            edge_keys, lambda position: Edge(*region_pairs[position], 0 if decay_enabled else pair_values[position]))
+        vertex_of = dict(zip(region_ids, vertices))
+        edge_stored = []
+        for edge, is_new, (region_id1, region_id2), value in zip(edges, created, region_pairs, pair_values):
+            edge_stored.append(self.increment_scaled(edge, value) if not is_new or decay_enabled else value)
+            if is_new:
+                # 已存在的边两端的邻接表中已经有对方
+                vertex_of[region_id1].add_adjacent_region(region_id2)
+                vertex_of[region_id2].add_adjacent_region(region_id1)
+        if self.delta_tracker:
+            self.delta_tracker.record_bulk(region_ids, vertex_stored, edge_keys, edge_stored)
+        if self.read_views:
+            self.read_views.record_bulk(region_ids, vertex_stored, edge_keys, edge_stored)
+
+    def export_weights(self):
+        """
+        导出当前图衰减后的点权和边权。
+        :return: (点权字典, 边列表)，点权字典的键为regionID，边列表的元素为(regionID1, regionID2, 边权)
+        """
+        self.expire_window()
+        factor = self.decay.factor()
+        vertex_weights = {region_id: decayed(vertex.weight, factor) for region_id, vertex in self.vertices.items()}
+        if not self.region_hyperedges:
+            edge_weights = [(edge.region_id1, edge.region_id2, decayed(edge.weight, factor)) for edge in self.edges.values()]
+            return vertex_weights, edge_weights
+        # 超边展开为两两之间的边权，与普通边累加
+        pair_weights = self.expand_hyperedges(self.hyperedges.values())
+        edge_weights = []
+        for edge in self.edges.values():
+            stored = edge.weight + pair_weights.pop(frozenset({edge.region_id1, edge.region_id2}), 0)
+            edge_weights.append((edge.region_id1, edge.region_id2, decayed(stored, factor)))
+        edge_weights.extend((*edge_key, decayed(stored, factor)) for edge_key, stored in pair_weights.items())
+        return vertex_weights, edge_weights
+
+    def import_weights(self, vertex_weights, edge_weights):
+        """
+        将导出的点权和边权累加到当前图中。
+        :param vertex_weights: 点权字典，键为regionID
+        :param edge_weights: 边列表，元素为(regionID1, regionID2, 边权)
+        """
+        for region_id, weight in vertex_weights.items():
+            if weight:
+                self.increment_vertex_weight(region_id, weight)
+            else:
+                self.add_vertex(region_id)
+        for region_id1, region_id2, weight in edge_weights:
+            self.add_edge_weight(region_id1, region_id2, weight)
+
+    def start_delta_tracking(self, source=""):
+        """
+        开始记录写入的增量，之后用export_delta定期导出自上次导出以来的变化，发送给汇总节点合并。
+        未导出的增量和序号随快照保存。挂载预写日志时，开始记录和每次导出都在日志中追加标记，
+        重放时丢弃标记之前已经导出的记录并恢复序号，重启后导出的增量既不重复，也不会因为序号回退被汇总节点丢弃。
+        没有预写日志时快照之后导出过的序号会丢失，重启后需要换一个来源名称。
+        淘汰删除的点和边以及滑动窗口的过期不计入增量，汇总节点需自行淘汰或开启滑动窗口。
+        :param source: 导出的增量的来源名称，汇总节点按来源去重，多个采集节点之间不能重复
+        """
+        # 冻结写入，使日志中的标记位置与开始记录的时间点一致
+        self.snapshot_gate.freeze()
+        try:
+            if self.delta_tracker is None:
+                self.delta_tracker = DeltaTracker(source)
+                if self.ingest_log:
+                    self.ingest_log.append_delta_marker(source, 0)
+            else:
+                self.delta_tracker.source = source
+        finally:
+            self.snapshot_gate.thaw()
+
+    def restore_delta_marker(self, source, sequence):
+        """
+        重放预写日志时遇到增量导出标记：标记之前的写入已经以不大于该序号的增量导出，丢弃记录并从该序号继续。
+        :param source: 增量的来源名称
+        :param sequence: 已导出的增量序号
+        """
+        if self.delta_tracker is None:
+            self.delta_tracker = DeltaTracker(source)
+        self.delta_tracker.reset(source, sequence)
+
+    def export_delta(self):
+        """
+        导出自上次导出以来写入的增量并清空记录，复杂度与增量中的点、边和超边数量成正比。
+        :return: GraphDelta对象，权重为导出时刻衰减后的值
+        """
+        if self.delta_tracker is None:
+            raise ValueError("Delta tracking is not started")
+        if self.ingest_log is None:
+            return self.drain_delta()
+        # 冻结写入，使日志中导出标记之前的事务恰好是已经导出的事务
+        self.snapshot_gate.freeze()
+        try:
+            delta = self.drain_delta()
+            self.ingest_log.append_delta_marker(delta.source, delta.sequence)
+        finally:
+            self.snapshot_gate.thaw()
+        return delta
+
+    def drain_delta(self):
+        """
+        取出增量记录并按当前衰减系数换算。
+        :return: GraphDelta对象
+        """
+        if not self.decay.enabled():
+            return self.delta_tracker.drain(1)
+        # 与基准时间的调整互斥，保证取出的记录和系数属于同一基准
+        with self.decay_lock:
+            return self.delta_tracker.drain(self.decay.factor())
+
+    def merge(self, other):
+        """
+        把另一个图或图增量累加到当前图中，复杂度与对方包含的点、边和超边数量成正比。
+        带来源名称的增量按序号去重，序号不大于已合并序号的增量被忽略，因此发送失败后可以安全重试。
+        合并的写入不追加到预写日志，汇总节点重启后需要采集节点重新发送完整的图。
+        :param other: GraphDelta对象，或提供export_weights的图对象（整体作为一个增量）
+        :return: 是否合并了该增量
+        """
+        delta = other if isinstance(other, GraphDelta) else GraphDelta.from_graph(other)
+        with self.snapshot_gate:
+            if delta.source:
+                if delta.sequence <= self.merged_sequences.get(delta.source, 0):
+                    return False
+                self.merged_sequences[delta.source] = delta.sequence
+            # 只作为边的端点出现的region以0增量创建
+            vertex_weights = dict.fromkeys(chain.from_iterable(delta.edge_weights), 0)
+            vertex_weights.update(delta.vertex_weights)
+            region_pairs = [tuple(edge_key) * (3 - len(edge_key)) for edge_key in delta.edge_weights]
+            self.apply_bulk_weights(list(vertex_weights), list(vertex_weights.values()), region_pairs,
+                                    list(delta.edge_weights.values()))
+            for hyperedge_key, weight in delta.hyperedge_weights.items():
+                if self.hyperedge_min_size and len(hyperedge_key) >= self.hyperedge_min_size:
+                    self.add_hyperedge(hyperedge_key, weight)
+                    continue
+                for region_id1, region_id2 in combinations(hyperedge_key, 2):
+                    self.add_edge_weight(region_id1, region_id2, weight)
+        return True
+
     def save(self, filename):
         """
         将当前Graph对象保存到文件中。
@@ -177,10 +959,8 @@ class Graph:
     @staticmethod
     def load(filename):
         """
-        从文件中加载Graph对象。
+        从文件中加载Graph对象，同时支持定时快照保存的gzip压缩文件。
         :param filename: 保存的文件名
         :return: 加载的Graph对象
         """
-        with open(filename, 'rb') as file:
-            graph = pickle.load(file)
-        return graph
\ No newline at end of file
+        return read_snapshot(filename)
\ No newline at end of file
@@ -0,0 +1,106 @@
+from core.analyze.clump import Clump
+from core.analyze.components import hot_components, index_regions
+from core.util.disjointSet import DisjointSet
+from collections import Counter
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import minimum_spanning_tree
+
+class ClumpHierarchy:
+    def __init__(self, vertex_weights, edge_weights):
+        """
+        初始化多阈值热点闭包层次：用一次Kruskal求出按边权的最大生成森林。
+        对任意阈值，森林中边权大于阈值的边连通的分量与图中所有大于阈值的边连通的分量相同，
+        因此不同阈值下的闭包都只需在森林（不超过顶点数-1条边）上计算，不再遍历整个图。
+        点权大于0的顶点作为种子，只输出包含种子的闭包，结果与get_hot_region相同。
+        :param vertex_weights: 点权字典，键为regionID
+        :param edge_weights: 边列表，元素为(regionID1, regionID2, 边权)，只保留边权大于0的边
+        """
+        sources, targets, weights = zip(*edge_weights) if edge_weights else ((), (), ())
+        region_ids, vertex_positions, sources, targets = index_regions(list(vertex_weights), sources, targets)
+        self.region_ids = region_ids.tolist()  # 按下标排列的regionID，下标顺序与regionID顺序相同
+        values = np.asarray(list(vertex_weights.values()))
+        self.vertex_weights = np.zeros(len(self.region_ids), dtype=values.dtype if len(values) else np.int64)
+        self.vertex_weights[vertex_positions] = values
+        # 种子按(-点权, regionID)排序，与BFS的出发顺序一致
+        seeds = np.flatnonzero(self.vertex_weights > 0)
+        self.seeds = seeds[np.argsort(-self.vertex_weights[seeds], kind='stable')]
+
+        weights = np.asarray(weights, dtype=np.float64)
+        keep = (sources != targets) & (weights > 0)
+        low = np.minimum(sources, targets)[keep]
+        high = np.maximum(sources, targets)[keep]
+        # 边权取负后求最小生成森林，即为最大生成森林
+        matrix = coo_matrix((-weights[keep], (low, high)), shape=(len(self.region_ids), len(self.region_ids)))
+        forest = minimum_spanning_tree(matrix.tocsr()).tocoo()
+        order = np.argsort(forest.data, kind='stable')  # 边权降序
+        self.forest_sources = forest.row[order].astype(np.int64)
+        self.forest_targets = forest.col[order].astype(np.int64)
+        self.forest_weights = -forest.data[order]
+
+    @classmethod
+    def from_graph(cls, graph):
+        """
+        从Graph或其他提供export_weights的图结构构建闭包层次。
+        :param graph: 图对象
+        :return: ClumpHierarchy对象
+        """
+        return cls(*graph.export_weights())
+
+    def count_above(self, edge_thresh):
+        """
+        森林中边权大于阈值的边数，这些边是按边权降序排列的森林边的前缀。
+        :param edge_thresh: 边权阈值
+        :return: 边数
+        """
+        return int(np.searchsorted(-self.forest_weights, -edge_thresh, side='left'))
+
+    def get_hot_region(self, edge_thresh):
+        """
+        获取某个阈值下的热点闭包，只在森林上计算。
+        :param edge_thresh: 边权阈值，大于该值的边才会被认定为高关联
+        :return: 一个列表，每一项是一个Clump对象，表示一个热点闭包
+        """
+        count = self.count_above(edge_thresh)
+        components = hot_components(len(self.region_ids), self.forest_sources[:count], self.forest_targets[:count],
+                                    self.vertex_weights, self.seeds)
+        region_ids = self.region_ids
+        return [Clump({region_ids[index] for index in members.tolist()}, clump_hot) for members, clump_hot in components]
+
+    def sweep(self, thresholds):
+        """
+        一次遍历森林，统计一组阈值下的闭包数量和大小。阈值从大到小处理，森林边按边权降序依次合并。
+        :param thresholds: 边权阈值列表
+        :return: 与thresholds顺序相同的列表，元素为字典，包含阈值、闭包数量、最大闭包的region数量和按降序排列的闭包大小
+        """
+        clumps = DisjointSet()
+        weights = self.vertex_weights.tolist()
+        for index, weight in enumerate(weights):
+            clumps.add(index, weight)
+        seeded = int(np.count_nonzero(self.vertex_weights > 0))
+        sizes = Counter({1: seeded}) if seeded else Counter()  # 键为包含种子的闭包大小，值为闭包数量
+        sources = self.forest_sources.tolist()
+        targets = self.forest_targets.tolist()
+        merged = 0
+        levels = {}
+        for edge_thresh in sorted(set(thresholds), reverse=True):
+            for source, target in zip(sources[merged:self.count_above(edge_thresh)], targets[merged:]):
+                root1 = clumps.find(source)
+                root2 = clumps.find(target)
+                # 排序键的点权部分小于0表示闭包中有种子
+                for root in (root1, root2):
+                    if clumps.leaders[root][0] < 0:
+                        sizes[len(clumps.members[root])] -= 1
+                clumps.union(root1, root2)
+                root = clumps.find(root1)
+                if clumps.leaders[root][0] < 0:
+                    sizes[len(clumps.members[root])] += 1
+                merged += 1
+            clump_sizes = sorted(sizes.elements(), reverse=True)
+            levels[edge_thresh] = {
+                "edge_thresh": edge_thresh,
+                "clump_count": len(clump_sizes),
+                "largest_clump": clump_sizes[0] if clump_sizes else 0,
+                "sizes": clump_sizes,
+            }
+        return [levels[edge_thresh] for edge_thresh in thresholds]
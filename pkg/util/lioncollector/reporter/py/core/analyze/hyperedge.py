@@ -0,0 +1,31 @@
+import threading
+
+class Hyperedge:
+    def __init__(self, region_ids, weight=0):
+        """
+        初始化超边，表示一组总是被同一个事务一起访问的region。
+        :param region_ids: 超边中的regionID集合（frozenset）
+        :param weight: 超边中任意两个region之间累加的边权，默认为0
+        """
+        self.region_ids = region_ids
+        self.weight = weight
+        self.lock = threading.Lock()  # 线程锁
+
+    def __getstate__(self):
+        # 序列化时排除线程锁
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        # 反序列化时恢复状态并重新初始化线程锁
+        self.__dict__.update(state)
+        self.lock = threading.Lock()  # 重新初始化线程锁
+
+    def increment_weight(self, value=1):
+        """
+        增加超边的权重。
+        :param value: 增加的值，默认为1
+        """
+        with self.lock:
+            self.weight += value
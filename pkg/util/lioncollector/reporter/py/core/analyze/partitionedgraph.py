@@ -0,0 +1,123 @@
+from core.analyze.graph import Graph
+from core.analyze.shardedgraph import GraphPartition, route_transactions
+import queue
+import threading
+
+class PartitionedGraph:
+    def __init__(self, partition_count, weight=10, theta=1, top_hot_threshold=0, max_pending_batches=64):
+        """
+        初始化单写者分区图：顶点按regionID、边按较小端点划分到各个分区，每个分区由一个写线程独占，
+        写入路径上不再获取BucketedDict、Vertex、Edge和优先队列的锁，线程之间只通过分区队列交互。
+        :param partition_count: 分区（写线程）数量
+        :param weight: 不同region之间的边权系数，默认为10
+        :param theta: 相同region之间的边权系数，默认为1
+        :param top_hot_threshold: 点权阈值，用于筛选top-hot region
+        :param max_pending_batches: 每个分区队列中最多积压的批次数，超过后写入方阻塞
+        """
+        self.partition_count = partition_count
+        self.weight = weight
+        self.theta = theta
+        self.top_hot_threshold = top_hot_threshold
+        self.partitions = [GraphPartition(partition_index, partition_count, weight=weight, theta=theta)
+                           for partition_index in range(partition_count)]
+        self.task_queues = [queue.Queue(maxsize=max_pending_batches) for _ in range(partition_count)]
+        self.threads = []
+        for partition, task_queue in zip(self.partitions, self.task_queues):
+            thread = threading.Thread(target=self.partition_main, args=(partition, task_queue), daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def partition_main(self, partition, task_queue):
+        """
+        分区写线程的主循环，分区的状态只在这个线程中读写。
+        :param partition: 当前线程独占的GraphPartition对象
+        :param task_queue: 接收任务的队列
+        """
+        while True:
+            op, payload = task_queue.get()
+            if op == "apply":
+                partition.apply(*payload)
+            elif op == "export":
+                payload.put(partition.export())
+            elif op == "sync":
+                payload.put(None)
+            elif op == "stop":
+                break
+
+    def add_transaction(self, region_ids, weight=1):
+        """
+        添加一个事务，更新点权和边权。
+        :param region_ids: 事务访问的regionID列表
+        :param weight: 事务的权重，默认为1
+        """
+        self.add_transactions([region_ids], [weight])
+
+    def add_transactions(self, batch, weights=None):
+        """
+        批量添加事务：按分区拆分后交给各分区的写线程。
+        :param batch: 事务列表，每一项是一个regionID列表
+        :param weights: 与batch一一对应的事务权重列表，默认为None表示权重均为1
+        """
+        routed = route_transactions(batch, weights, self.partition_count)
+        for task_queue, (partition_batch, partition_weights) in zip(self.task_queues, routed):
+            if partition_batch:
+                task_queue.put(("apply", (partition_batch, partition_weights)))
+
+    def broadcast(self, op):
+        """
+        向所有分区发送请求并等待全部应答。由于任务队列先进先出，应答时此前提交的事务都已写入。
+        :param op: 请求类型
+        :return: 按分区返回的结果列表
+        """
+        reply_queue = queue.Queue()
+        for task_queue in self.task_queues:
+            task_queue.put((op, reply_queue))
+        return [reply_queue.get() for _ in range(self.partition_count)]
+
+    def flush(self):
+        """
+        等待所有已提交的事务写入各分区。
+        """
+        self.broadcast("sync")
+
+    def merge(self):
+        """
+        合并所有分区的状态，得到一个完整的Graph对象。
+        :return: 合并后的Graph对象
+        """
+        graph = Graph(weight=self.weight, theta=self.theta, top_hot_threshold=self.top_hot_threshold)
+        for vertex_weights, edge_weights in self.broadcast("export"):
+            graph.import_weights(vertex_weights, edge_weights)
+        return graph
+
+    def get_top_hot_regions(self, k=None):
+        """
+        获取当前点权超过阈值的region列表，按点权降序排列。
+        :param k: 最多返回的region数量，默认为None表示返回所有超过阈值的region
+        :return: 列表，元素为(regionID, 点权)的元组
+        """
+        return self.merge().get_top_hot_regions(k)
+
+    def get_hot_region(self, edge_thresh):
+        """
+        获取当前图中的热点闭包。
+        :param edge_thresh: 边权阈值，大于该值的边才会被认定为高关联
+        :return: 一个列表，每一项是一个Clump对象，表示一个热点闭包
+        """
+        return self.merge().get_hot_region(edge_thresh)
+
+    def save(self, filename):
+        """
+        将合并后的Graph对象保存到文件中，文件格式与Graph.save相同。
+        :param filename: 保存的文件名
+        """
+        self.merge().save(filename)
+
+    def close(self):
+        """
+        停止所有分区写线程。
+        """
+        for task_queue in self.task_queues:
+            task_queue.put(("stop", None))
+        for thread in self.threads:
+            thread.join()
@@ -0,0 +1,233 @@
+from core.analyze.clump import Clump
+from core.analyze.components import index_regions
+import numpy as np
+from scipy.sparse import coo_matrix, csr_matrix
+
+class GraphPartitioner:
+    def __init__(self, part_count, imbalance=0.03, coarsen_to=None, match_rounds=1, refine_rounds=8, seed=0):
+        """
+        初始化多级k路图划分器：把共访问图划分为part_count个点权均衡的部分，并使切边的边权之和尽量小。
+        先用重边匹配逐级粗化，在最粗的图上贪心生长出初始划分，再逐级投影回细图并用标签传播优化。
+        :param part_count: 划分的部分数量，通常为store数量
+        :param imbalance: 允许的不均衡度，每个部分的点权不超过平均值的(1 + imbalance)倍
+        :param coarsen_to: 粗化到不超过该顶点数时停止，默认为None表示max(40 * part_count, 256)
+        :param match_rounds: 每一级粗化中重边匹配的轮数
+        :param refine_rounds: 每一级标签传播的最大轮数
+        :param seed: 随机数种子
+        """
+        if part_count < 1:
+            raise ValueError(f"part_count must be positive: {part_count}")
+        self.part_count = part_count
+        self.imbalance = imbalance
+        self.coarsen_to = coarsen_to if coarsen_to is not None else max(40 * part_count, 256)
+        self.match_rounds = match_rounds
+        self.refine_rounds = refine_rounds
+        self.rng = np.random.default_rng(seed)
+
+    def heaviest_neighbors(self, rows, cols, data, vertex_count):
+        """
+        求每个顶点边权最大的邻居，边权乘以微小的随机扰动用于打破平局。
+        :param rows: 边的起点数组，要求有序（CSR转换得到的边按行有序，按掩码筛选后仍然有序）
+        :param cols: 边的终点数组
+        :param data: 边权数组
+        :param vertex_count: 顶点数量
+        :return: 邻居数组，没有边的顶点对应自身
+        """
+        choice = np.arange(vertex_count)
+        if not len(rows):
+            return choice
+        noisy = data * (1 + 1e-9 * self.rng.random(len(data)))
+        starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+        maxima = np.repeat(np.maximum.reduceat(noisy, starts), np.diff(np.r_[starts, len(rows)]))
+        heaviest = np.flatnonzero(noisy == maxima)
+        heaviest = heaviest[np.r_[True, rows[heaviest][1:] != rows[heaviest][:-1]]]
+        choice[rows[heaviest]] = cols[heaviest]
+        return choice
+
+    def match(self, adjacency, vertex_weights, max_vertex_weight):
+        """
+        粗化时的顶点聚合：每个未匹配的顶点选择边权最大的未匹配邻居，互相选中的两个顶点合并，重复match_rounds轮；
+        之后仍未匹配的顶点并入边权最大的邻居所在的组，没有边的顶点按点权排序后两两合并。
+        合并后点权超过max_vertex_weight的聚合不会发生，避免出现无法均衡的大顶点。
+        :return: 粗化映射数组，元素为细图顶点对应的粗图顶点下标
+        """
+        vertex_count = adjacency.shape[0]
+        vertices = np.arange(vertex_count)
+        edges = adjacency.tocoo()
+        eligible = vertex_weights[edges.row] + vertex_weights[edges.col] <= max_vertex_weight
+        all_rows, all_cols, all_data = edges.row[eligible], edges.col[eligible], edges.data[eligible]
+        rows, cols, data = all_rows, all_cols, all_data
+        mate = vertices.copy()
+        for _ in range(self.match_rounds):
+            unmatched = mate == vertices
+            keep = unmatched[rows] & unmatched[cols]
+            rows, cols, data = rows[keep], cols[keep], data[keep]
+            if not len(rows):
+                break
+            choice = self.heaviest_neighbors(rows, cols, data, vertex_count)
+            mutual = (choice[choice] == vertices) & (choice != vertices)
+            mate[mutual] = choice[mutual]
+        leaders = np.minimum(vertices, mate)
+        # 仍未匹配的顶点并入最重邻居所在的组，每个组按边权降序接收顶点，直到点权达到上限
+        unmatched = mate == vertices
+        keep = unmatched[all_rows]
+        choice = self.heaviest_neighbors(all_rows[keep], all_cols[keep], all_data[keep], vertex_count)
+        joining = np.flatnonzero(unmatched & (choice != vertices))
+        if len(joining):
+            groups = leaders[choice[joining]]
+            joining = joining[np.argsort(groups, kind='stable')]
+            groups = leaders[choice[joining]]
+            cumulative = np.cumsum(vertex_weights[joining])
+            group_start = np.r_[True, groups[1:] != groups[:-1]]
+            offsets = np.maximum.accumulate(np.where(group_start, np.arange(len(joining)), 0))
+            cumulative -= (cumulative - vertex_weights[joining])[offsets]
+            group_weights = np.bincount(leaders, weights=vertex_weights, minlength=vertex_count)
+            accepted = group_weights[groups] + cumulative <= max_vertex_weight
+            leaders[joining[accepted]] = groups[accepted]
+        # 没有边的顶点不影响切边，按点权排序后两两合并
+        isolated = np.flatnonzero(np.diff(adjacency.indptr) == 0)
+        isolated = isolated[np.argsort(vertex_weights[isolated], kind='stable')]
+        pairs = isolated[:len(isolated) // 2 * 2].reshape(-1, 2)
+        pairs = pairs[vertex_weights[pairs].sum(axis=1) <= max_vertex_weight]
+        leaders[pairs[:, 1]] = pairs[:, 0]
+        _, coarse_map = np.unique(leaders, return_inverse=True)
+        return coarse_map
+
+    @staticmethod
+    def contract(adjacency, vertex_weights, coarse_map):
+        """
+        按粗化映射合并顶点，相同粗顶点之间的边权累加，粗顶点内部的边被去掉。
+        :return: (粗图邻接矩阵, 粗图点权数组)
+        """
+        coarse_count = int(coarse_map.max()) + 1
+        projection = csr_matrix((np.ones(len(coarse_map)), (np.arange(len(coarse_map)), coarse_map)),
+                                shape=(len(coarse_map), coarse_count))
+        coarse = (projection.T @ adjacency @ projection).tocoo()
+        keep = coarse.row != coarse.col
+        coarse = csr_matrix((coarse.data[keep], (coarse.row[keep], coarse.col[keep])), shape=(coarse_count, coarse_count))
+        return coarse, np.bincount(coarse_map, weights=vertex_weights, minlength=coarse_count)
+
+    def initial_partition(self, adjacency, vertex_weights, capacity):
+        """
+        在最粗的图上贪心生长初始划分：按点权降序处理顶点，放入容量允许且与之连接边权最大的部分，
+        连接边权相同时放入负载最小的部分。
+        :return: 划分数组，元素为顶点所属部分的编号
+        """
+        indptr, indices, data = adjacency.indptr.tolist(), adjacency.indices.tolist(), adjacency.data.tolist()
+        weights = vertex_weights.tolist()
+        parts = [-1] * len(weights)
+        loads = [0.0] * self.part_count
+        for vertex in np.argsort(-vertex_weights, kind='stable').tolist():
+            connection = [0.0] * self.part_count
+            for position in range(indptr[vertex], indptr[vertex + 1]):
+                part = parts[indices[position]]
+                if part >= 0:
+                    connection[part] += data[position]
+            candidates = [part for part in range(self.part_count) if loads[part] + weights[vertex] <= capacity]
+            if not candidates:
+                candidates = [min(range(self.part_count), key=lambda part: loads[part])]
+            best = max(candidates, key=lambda part: (connection[part], -loads[part]))
+            parts[vertex] = best
+            loads[best] += weights[vertex]
+        return np.asarray(parts, dtype=np.int64)
+
+    def refine(self, adjacency, vertex_weights, parts, capacity):
+        """
+        标签传播优化：每个顶点计算与各部分连接的边权，选出增益最大的目标部分。
+        每轮随机选一半有正增益的顶点，按增益降序在目标部分的剩余容量内移动，避免相邻顶点同时来回移动。
+        :return: 优化后的划分数组
+        """
+        vertex_count = len(parts)
+        rows = np.arange(vertex_count)
+        for _ in range(self.refine_rounds):
+            membership = csr_matrix((np.ones(vertex_count), (rows, parts)), shape=(vertex_count, self.part_count))
+            connection = (adjacency @ membership).toarray()
+            own = connection[rows, parts]
+            connection[rows, parts] = -np.inf
+            targets = connection.argmax(axis=1)
+            gains = connection[rows, targets] - own
+            candidates = np.flatnonzero((gains > 0) & (self.rng.random(vertex_count) < 0.5))
+            if not len(candidates):
+                break
+            room = capacity - np.bincount(parts, weights=vertex_weights, minlength=self.part_count)
+            # 按(目标部分, 增益降序)排序，计算每个目标部分内的累积点权
+            candidates = candidates[np.lexsort((-gains[candidates], targets[candidates]))]
+            candidate_targets = targets[candidates]
+            cumulative = np.cumsum(vertex_weights[candidates])
+            group_start = np.r_[True, candidate_targets[1:] != candidate_targets[:-1]]
+            offsets = np.maximum.accumulate(np.where(group_start, np.arange(len(candidates)), 0))
+            cumulative -= (cumulative - vertex_weights[candidates])[offsets]
+            accepted = cumulative <= room[candidate_targets]
+            if not accepted.any():
+                break
+            parts[candidates[accepted]] = candidate_targets[accepted]
+        return parts
+
+    def partition(self, vertex_count, sources, targets, edge_weights, vertex_weights):
+        """
+        对下标表示的图进行划分。
+        :param vertex_count: 顶点数量
+        :param sources: 边的一个端点下标数组
+        :param targets: 与sources一一对应的另一个端点下标数组
+        :param edge_weights: 边权数组
+        :param vertex_weights: 按下标排列的点权数组，用于衡量各部分的负载
+        :return: 划分数组，元素为顶点所属部分的编号
+        """
+        vertex_weights = np.asarray(vertex_weights, dtype=np.float64)
+        if vertex_weights.sum() <= 0:
+            vertex_weights = np.ones(vertex_count)  # 没有点权时按顶点数量均衡
+        keep = sources != targets
+        sources, targets, edge_weights = sources[keep], targets[keep], np.asarray(edge_weights, dtype=np.float64)[keep]
+        adjacency = coo_matrix((np.concatenate((edge_weights, edge_weights)),
+                                (np.concatenate((sources, targets)), np.concatenate((targets, sources)))),
+                               shape=(vertex_count, vertex_count)).tocsr()
+        capacity = vertex_weights.sum() / self.part_count * (1 + self.imbalance)
+        # 粗化：记录每一级的图和映射
+        levels = []
+        while adjacency.shape[0] > self.coarsen_to:
+            coarse_map = self.match(adjacency, vertex_weights, capacity / 4)
+            if coarse_map.max() + 1 > adjacency.shape[0] * 0.95:
+                break  # 几乎无法再合并
+            levels.append((adjacency, vertex_weights, coarse_map))
+            adjacency, vertex_weights = self.contract(adjacency, vertex_weights, coarse_map)
+        # 初始划分按平均负载放置，给标签传播留出移动的余量
+        parts = self.initial_partition(adjacency, vertex_weights, vertex_weights.sum() / self.part_count)
+        parts = self.refine(adjacency, vertex_weights, parts, capacity)
+        # 逐级投影回细图并优化
+        for adjacency, vertex_weights, coarse_map in reversed(levels):
+            parts = self.refine(adjacency, vertex_weights, parts[coarse_map], capacity)
+        return parts
+
+    def partition_weights(self, vertex_weights, edge_weights):
+        """
+        划分导出的点权和边权，得到规划器可以直接使用的热点闭包。
+        :param vertex_weights: 点权字典，键为regionID
+        :param edge_weights: 边列表，元素为(regionID1, regionID2, 边权)
+        :return: Clump列表，每个部分一个，按总点权降序排列，不包含空的部分
+        """
+        sources, targets, weights = zip(*edge_weights) if edge_weights else ((), (), ())
+        region_ids, vertex_positions, sources, targets = index_regions(list(vertex_weights), sources, targets)
+        region_ids = region_ids.tolist()
+        hot = np.zeros(len(region_ids))
+        hot[vertex_positions] = list(vertex_weights.values())
+        if not region_ids:
+            return []
+        parts = self.partition(len(region_ids), sources, targets, weights, hot)
+        clumps = []
+        order = np.argsort(parts, kind='stable')
+        bounds = np.searchsorted(parts[order], np.arange(self.part_count + 1))
+        part_hot = np.bincount(parts, weights=hot, minlength=self.part_count)
+        for part in range(self.part_count):
+            members = order[bounds[part]:bounds[part + 1]].tolist()
+            if members:
+                clumps.append(Clump({region_ids[index] for index in members}, part_hot[part].item()))
+        clumps.sort(key=lambda clump: -clump.hot)
+        return clumps
+
+    def partition_graph(self, graph):
+        """
+        划分Graph或其他提供export_weights的图结构。
+        :param graph: 图对象
+        :return: Clump列表，每个部分一个，按总点权降序排列
+        """
+        return self.partition_weights(*graph.export_weights())
@@ -0,0 +1,252 @@
+from core.analyze.graph import Graph
+from itertools import combinations, count, islice, repeat
+import heapq
+import multiprocessing
+import pickle
+import threading
+
+def vertex_owner(region_id, shard_count):
+    """
+    计算顶点所属的分片。
+    :param region_id: regionID
+    :param shard_count: 分片数量
+    :return: 分片编号
+    """
+    return hash(region_id) % shard_count
+
+def edge_owner(region_id1, region_id2, shard_count):
+    """
+    计算边所属的分片：边归属于较小端点所在的分片，因此拥有该边的分片一定会收到对应事务。
+    :param region_id1: 边的第一个regionID
+    :param region_id2: 边的第二个regionID
+    :param shard_count: 分片数量
+    :return: 分片编号
+    """
+    return vertex_owner(min(region_id1, region_id2), shard_count)
+
+class GraphPartition:
+    def __init__(self, partition_index, partition_count, weight=10, theta=1):
+        """
+        初始化单写者图分片：只保存本分片拥有的顶点和边的权重。
+        分片只由一个线程或进程写入，因此写入路径不需要任何锁。
+        :param partition_index: 当前分片编号
+        :param partition_count: 分片数量
+        :param weight: 不同region之间的边权系数
+        :param theta: 相同region之间的边权系数
+        """
+        self.partition_index = partition_index
+        self.partition_count = partition_count
+        self.edge_value = weight * theta  # 权重为1的事务在一条边上累加的边权
+        self.vertex_weights = {}  # 键为regionID，值为点权
+        self.edge_weights = {}  # 键为(较小regionID, 较大regionID)，值为边权
+
+    def apply(self, batch, weights=None):
+        """
+        写入一批事务中本分片拥有的顶点和边。
+        :param batch: 事务列表，每一项是一个regionID列表
+        :param weights: 与batch一一对应的事务权重列表，默认为None表示权重均为1
+        """
+        vertex_weights = self.vertex_weights
+        edge_weights = self.edge_weights
+        partition_index = self.partition_index
+        partition_count = self.partition_count
+        for region_ids, txn_weight in zip(batch, weights or repeat(1)):
+            for region_id in region_ids:
+                if vertex_owner(region_id, partition_count) == partition_index:
+                    vertex_weights[region_id] = vertex_weights.get(region_id, 0) + txn_weight
+            edge_value = self.edge_value * txn_weight
+            for region_id1, region_id2 in combinations(region_ids, 2):
+                if region_id1 == region_id2:
+                    continue
+                edge_key = (region_id1, region_id2) if region_id1 < region_id2 else (region_id2, region_id1)
+                if vertex_owner(edge_key[0], partition_count) == partition_index:
+                    edge_weights[edge_key] = edge_weights.get(edge_key, 0) + edge_value
+
+    def export(self):
+        """
+        导出本分片的点权和边权，格式与Graph.export_weights相同。
+        :return: (点权字典, 边列表)
+        """
+        edge_weights = [(region_id1, region_id2, weight) for (region_id1, region_id2), weight in self.edge_weights.items()]
+        return dict(self.vertex_weights), edge_weights
+
+    def top_hot_regions(self, top_hot_threshold, k=None):
+        """
+        获取本分片中点权不低于阈值的region，按(-点权, regionID)升序排列。
+        :param top_hot_threshold: 点权阈值
+        :param k: 最多返回的region数量，None表示返回所有
+        :return: 列表，元素为(-点权, regionID)的元组
+        """
+        items = ((-weight, region_id) for region_id, weight in self.vertex_weights.items()
+                 if weight >= top_hot_threshold)
+        return sorted(items) if k is None else heapq.nsmallest(k, items)
+
+def route_transactions(batch, weights, partition_count):
+    """
+    把事务分发给拥有其中某个顶点的分片。由于边归属于较小端点所在的分片，拥有某条边的分片一定会收到对应事务。
+    :param batch: 事务列表，每一项是一个regionID列表
+    :param weights: 与batch一一对应的事务权重列表，为None表示权重均为1
+    :param partition_count: 分片数量
+    :return: 按分片排列的(事务列表, 权重列表)
+    """
+    partition_batches = [[] for _ in range(partition_count)]
+    partition_weights = [[] for _ in range(partition_count)]
+    for region_ids, weight in zip(batch, weights or repeat(1)):
+        region_ids = tuple(region_ids)
+        for partition_index in {vertex_owner(region_id, partition_count) for region_id in region_ids}:
+            partition_batches[partition_index].append(region_ids)
+            partition_weights[partition_index].append(weight)
+    return list(zip(partition_batches, partition_weights))
+
+def shard_main(shard_index, shard_count, weight, theta, task_queue, result_queue):
+    """
+    分片进程的主循环：只写入本分片拥有的顶点和边。
+    :param shard_index: 当前分片编号
+    :param shard_count: 分片数量
+    :param weight: 不同region之间的边权系数
+    :param theta: 相同region之间的边权系数
+    :param task_queue: 接收任务的队列
+    :param result_queue: 返回结果的队列
+    """
+    partition = GraphPartition(shard_index, shard_count, weight=weight, theta=theta)
+    while True:
+        op, payload = task_queue.get()
+        if op == "apply":
+            partition.apply(*pickle.loads(payload))
+            continue
+        if op == "stop":
+            break
+        request_id, argument = payload
+        if op == "export":
+            result_queue.put((request_id, partition.export()))
+        elif op == "top":
+            result_queue.put((request_id, partition.top_hot_regions(*argument)))
+        elif op == "sync":
+            result_queue.put((request_id, None))
+
+class ShardedGraph:
+    def __init__(self, shard_count, weight=10, theta=1, top_hot_threshold=0, max_pending_batches=64):
+        """
+        初始化多进程分片图：顶点按regionID、边按端点对划分到各个分片进程，查询时再合并。
+        :param shard_count: 分片进程数量
+        :param weight: 不同region之间的边权系数，默认为10
+        :param theta: 相同region之间的边权系数，默认为1
+        :param top_hot_threshold: 点权阈值，用于筛选top-hot region
+        :param max_pending_batches: 每个分片队列中最多积压的批次数，超过后写入方阻塞
+        """
+        self.shard_count = shard_count
+        self.weight = weight
+        self.theta = theta
+        self.top_hot_threshold = top_hot_threshold
+        # 使用spawn创建分片进程，避免在gRPC已经启动线程后fork
+        context = multiprocessing.get_context("spawn")
+        self.task_queues = [context.Queue(maxsize=max_pending_batches) for _ in range(shard_count)]
+        self.result_queue = context.Queue()
+        self.request_ids = count()
+        self.request_lock = threading.Lock()  # 串行化需要等待所有分片应答的请求
+        self.processes = []
+        for shard_index in range(shard_count):
+            process = context.Process(
+                target=shard_main,
+                args=(shard_index, shard_count, weight, theta, self.task_queues[shard_index], self.result_queue),
+                daemon=True)
+            process.start()
+            self.processes.append(process)
+
+    def add_transaction(self, region_ids, weight=1):
+        """
+        添加一个事务，更新点权和边权。
+        :param region_ids: 事务访问的regionID列表
+        :param weight: 事务的权重，默认为1
+        """
+        self.add_transactions([region_ids], [weight])
+
+    def add_transactions(self, batch, weights=None):
+        """
+        批量添加事务：每个事务只发送给拥有其中某个顶点的分片，由各分片筛选自己拥有的顶点和边。
+        :param batch: 事务列表，每一项是一个regionID列表
+        :param weights: 与batch一一对应的事务权重列表，默认为None表示权重均为1
+        """
+        routed = route_transactions(batch, weights, self.shard_count)
+        for task_queue, (shard_batch, shard_weights) in zip(self.task_queues, routed):
+            if shard_batch:
+                task_queue.put(("apply", pickle.dumps((shard_batch, shard_weights))))
+
+    def broadcast(self, op, argument=None):
+        """
+        向所有分片发送请求并等待全部应答。由于任务队列先进先出，应答时此前提交的事务都已写入。
+        :param op: 请求类型
+        :param argument: 请求参数
+        :return: 按分片返回的结果列表
+        """
+        with self.request_lock:
+            request_id = next(self.request_ids)
+            for task_queue in self.task_queues:
+                task_queue.put((op, (request_id, argument)))
+            results = []
+            while len(results) < self.shard_count:
+                reply_id, result = self.result_queue.get()
+                if reply_id == request_id:
+                    results.append(result)
+            return results
+
+    def flush(self):
+        """
+        等待所有已提交的事务写入各分片。
+        """
+        self.broadcast("sync")
+
+    def export_weights(self):
+        """
+        导出所有分片的点权和边权，格式与Graph.export_weights相同。各分片拥有的顶点和边互不重叠，直接拼接。
+        :return: (点权字典, 边列表)
+        """
+        vertex_weights = {}
+        edge_weights = []
+        for shard_vertex_weights, shard_edge_weights in self.broadcast("export"):
+            vertex_weights.update(shard_vertex_weights)
+            edge_weights.extend(shard_edge_weights)
+        return vertex_weights, edge_weights
+
+    def merge(self):
+        """
+        合并所有分片的状态，得到一个完整的Graph对象。
+        :return: 合并后的Graph对象
+        """
+        graph = Graph(weight=self.weight, theta=self.theta, top_hot_threshold=self.top_hot_threshold)
+        graph.import_weights(*self.export_weights())
+        return graph
+
+    def get_top_hot_regions(self, k=None):
+        """
+        获取当前点权超过阈值的region列表，按点权降序排列。
+        每个分片只返回本分片按阈值筛选后的前k个region，再归并得到全局的前k个，不合并整个图。
+        :param k: 最多返回的region数量，默认为None表示返回所有超过阈值的region
+        :return: 列表，元素为(regionID, 点权)的元组
+        """
+        shard_results = self.broadcast("top", (self.top_hot_threshold, k))
+        return [(region_id, -neg_weight) for neg_weight, region_id in islice(heapq.merge(*shard_results), k)]
+
+    def get_hot_region(self, edge_thresh):
+        """
+        获取当前图中的热点闭包。
+        :param edge_thresh: 边权阈值，大于该值的边才会被认定为高关联
+        :return: 一个列表，每一项是一个Clump对象，表示一个热点闭包
+        """
+        return self.merge().get_hot_region(edge_thresh)
+
+    def save(self, filename):
+        """
+        将合并后的Graph对象保存到文件中，文件格式与Graph.save相同。
+        :param filename: 保存的文件名
+        """
+        self.merge().save(filename)
+
+    def close(self):
+        """
+        停止所有分片进程。
+        """
+        for task_queue in self.task_queues:
+            task_queue.put(("stop", None))
+        for process in self.processes:
+            process.join()
@@ -0,0 +1,384 @@
+import gc
+import gzip
+import logging
+import os
+import pickle
+import threading
+import time
+
+# 快照方式
+FORK = "fork"  # 暂停写入后fork子进程，子进程序列化写时复制的内存镜像，父进程立即恢复写入
+COPY = "copy"  # 暂停写入后在进程内复制图，复制完成即恢复写入，序列化在后台线程中进行
+FREEZE = "freeze"  # 序列化期间一直暂停写入，用于不支持fork的平台
+SAVE = "save"  # 直接调用save，由图自身保证一致性
+SNAPSHOT_MODES = (FORK, COPY, FREEZE, SAVE)
+SNAPSHOT_SUFFIXES = (".pkl", ".pkl.gz")  # 未压缩和gzip压缩的快照
+GZIP_MAGIC = b"\x1f\x8b"
+
+def list_snapshots(directory):
+    """
+    列出目录中的快照文件，不包含写了一半的临时文件和手工改名的文件。
+    :param directory: 快照文件所在目录
+    :return: 按时间戳升序排列的快照文件名列表
+    """
+    if not os.path.isdir(directory):
+        return []
+    snapshots = []
+    for name in os.listdir(directory):
+        stem, _, suffix = name.partition(".")
+        timestamp = stem[len("graph_"):]
+        if stem.startswith("graph_") and timestamp.isdigit() and f".{suffix}" in SNAPSHOT_SUFFIXES:
+            snapshots.append((int(timestamp), name, os.path.join(directory, name)))
+    return [filename for _, _, filename in sorted(snapshots)]
+
+def grpc_fork_support_enabled():
+    """
+    开启GRPC_ENABLE_FORK_SUPPORT时gRPC在fork前后暂停和重建自己的线程，只支持客户端，
+    在运行gRPC服务器的进程中fork可能一直等待服务器线程，冻结闸门期间写入也随之阻塞。
+    :return: 是否开启了gRPC的fork支持
+    """
+    return os.environ.get("GRPC_ENABLE_FORK_SUPPORT", "").strip().lower() in ("1", "true")
+
+def write_snapshot(graph, filename, compresslevel=0):
+    """
+    把图流式序列化到文件并fsync，压缩时pickle的输出直接写入gzip流，不在内存中生成完整的字节串。
+    fork子进程也调用该函数：Graph及其组件的__getstate__只复制属性、不获取锁，文件对象和gzip压缩器在调用时新建，
+    这里也不记录日志，因此不会等待fork时刻其他线程持有的锁。
+    :param graph: 要保存的图对象
+    :param filename: 文件名
+    :param compresslevel: gzip压缩级别，0表示不压缩
+    """
+    with open(filename, 'wb') as file:
+        if compresslevel:
+            with gzip.GzipFile(fileobj=file, mode='wb', compresslevel=compresslevel) as stream:
+                pickle.dump(graph, stream, protocol=pickle.HIGHEST_PROTOCOL)
+        else:
+            pickle.dump(graph, file, protocol=pickle.HIGHEST_PROTOCOL)
+        file.flush()
+        os.fsync(file.fileno())
+
+def read_snapshot(filename):
+    """
+    读取write_snapshot或save保存的快照，按文件头自动识别是否经过gzip压缩。
+    :param filename: 文件名
+    :return: 图对象
+    """
+    with open(filename, 'rb') as file:
+        compressed = file.read(2) == GZIP_MAGIC
+        file.seek(0)
+        if compressed:
+            with gzip.GzipFile(fileobj=file, mode='rb') as stream:
+                return pickle.load(stream)
+        return pickle.load(file)
+
+def sync_directory(directory):
+    """
+    fsync目录，使改名操作持久化，不支持打开目录的平台上跳过。
+    """
+    try:
+        descriptor = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+class SnapshotGate:
+    def __init__(self):
+        """
+        初始化写入闸门：写入方以共享方式进入，快照方冻结闸门后等待进行中的写入全部退出，
+        冻结期间新的写入被阻塞，从而得到一个没有写了一半的事务的时间点。
+        """
+        self.condition = threading.Condition(threading.Lock())
+        self.writers = 0  # 正在写入的线程数量
+        self.frozen = False
+        self.freeze_count = 0  # 冻结次数
+        self.frozen_seconds = 0  # 累计冻结时长（秒）
+        self.blocked_count = 0  # 因冻结被阻塞的写入次数
+        self.blocked_seconds = 0  # 写入被阻塞的累计时长（秒）
+        self.frozen_at = 0
+
+    def __enter__(self):
+        with self.condition:
+            if self.frozen:
+                start_time = time.perf_counter()
+                while self.frozen:
+                    self.condition.wait()
+                self.blocked_count += 1
+                self.blocked_seconds += time.perf_counter() - start_time
+            self.writers += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        with self.condition:
+            self.writers -= 1
+            if self.frozen and self.writers == 0:
+                self.condition.notify_all()
+
+    def freeze(self):
+        """
+        冻结闸门并等待进行中的写入退出，同一时间只能有一个线程冻结闸门。
+        """
+        with self.condition:
+            while self.frozen:
+                self.condition.wait()
+            self.frozen = True
+            self.frozen_at = time.perf_counter()
+            while self.writers:
+                self.condition.wait()
+
+    def thaw(self):
+        """
+        解除冻结，唤醒被阻塞的写入。
+        :return: 本次冻结的时长（秒），包含等待进行中的写入退出的时间
+        """
+        with self.condition:
+            stall = time.perf_counter() - self.frozen_at
+            self.frozen = False
+            self.freeze_count += 1
+            self.frozen_seconds += stall
+            self.condition.notify_all()
+        return stall
+
+    def get_stats(self):
+        """
+        获取闸门统计信息。
+        :return: 字典，包含冻结次数、累计冻结时长、被阻塞的写入次数和累计阻塞时长
+        """
+        with self.condition:
+            return {
+                "freezes": self.freeze_count,
+                "frozen_seconds": self.frozen_seconds,
+                "blocked_writes": self.blocked_count,
+                "blocked_seconds": self.blocked_seconds,
+            }
+
+class Snapshotter:
+    def __init__(self, graph, interval=60, max_saves=10, directory="history", mode=None, ingest_log=None,
+                 compresslevel=1, max_age=0):
+        """
+        初始化定时快照任务。快照先写入临时文件并fsync，完成后再改名，不会留下写了一半的快照文件。
+        保留策略按目录中实际存在的快照执行，重启前保存的快照同样会被轮转删除。
+        :param graph: Graph、DenseGraph或其他提供save的图对象
+        :param interval: 两次快照之间的间隔时间（秒）
+        :param max_saves: 最多保留的快照文件数量，超过时删除最旧的文件
+        :param directory: 快照文件所在目录
+        :param mode: 快照方式，默认为None表示按图的类型和平台自动选择
+        :param compresslevel: gzip压缩级别，0表示不压缩
+        :param max_age: 快照的最长保留时间（秒），0表示不按时间删除，最新的快照总是保留
+        :param ingest_log: 图挂载的IngestLog对象，不为None时快照记录日志检查点，保存成功后删除检查点之前的日志段
+        """
+        if mode is None:
+            mode = self.default_mode(graph)
+        if mode not in SNAPSHOT_MODES:
+            raise ValueError(f"Unknown snapshot mode: {mode}")
+        if mode in (FORK, FREEZE) and not hasattr(graph, 'snapshot_gate'):
+            raise ValueError(f"Snapshot mode {mode} requires a graph with a snapshot gate")
+        if mode == FORK and not hasattr(os, 'fork'):
+            raise ValueError("Snapshot mode fork is not supported on this platform")
+        if mode == FORK and grpc_fork_support_enabled():
+            raise ValueError("Snapshot mode fork cannot be used together with GRPC_ENABLE_FORK_SUPPORT")
+        if mode == COPY and not hasattr(graph, 'copy'):
+            raise ValueError("Snapshot mode copy requires a graph that supports copy")
+        if ingest_log is not None and mode not in (FORK, FREEZE):
+            raise ValueError(f"Snapshot mode {mode} does not support an ingest log")
+        self.graph = graph
+        self.interval = interval
+        self.max_saves = max_saves
+        self.directory = directory
+        self.mode = mode
+        self.ingest_log = ingest_log
+        self.compresslevel = compresslevel
+        self.max_age = max_age
+        self.snapshot_count = 0
+        self.failure_count = 0
+        self.last_duration = 0  # 最近一次快照的总时长（秒）
+        self.max_duration = 0
+        self.last_stall = 0  # 最近一次快照暂停写入的时长（秒）
+        self.max_stall = 0
+        self.last_bytes = 0  # 最近一次快照的文件字节数
+        self.total_bytes = 0
+        self.total_write_seconds = 0  # 所有成功快照的总时长，用于计算平均写入吞吐
+        self.removed_count = 0  # 轮转删除的快照数量
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    @staticmethod
+    def default_mode(graph):
+        """
+        按图的类型和平台选择快照方式。
+        :param graph: 图对象
+        :return: 快照方式
+        """
+        if hasattr(graph, 'snapshot_gate'):
+            return FORK if hasattr(os, 'fork') and not grpc_fork_support_enabled() else FREEZE
+        if hasattr(graph, 'copy'):
+            return COPY
+        return SAVE
+
+    def snapshot(self, filename):
+        """
+        保存一次快照。
+        :param filename: 快照文件名
+        :return: (总时长, 暂停写入的时长)，单位为秒；save方式无法得知暂停时长，返回None
+        """
+        temp_filename = f"{filename}.tmp"
+        start_time = time.perf_counter()
+        if self.mode == FORK:
+            stall = self.fork_save(temp_filename)
+        elif self.mode == COPY:
+            frozen = self.graph.copy()
+            stall = time.perf_counter() - start_time
+            write_snapshot(frozen, temp_filename, self.compresslevel)
+        elif self.mode == FREEZE:
+            self.graph.snapshot_gate.freeze()
+            try:
+                self.checkpoint()
+                write_snapshot(self.graph, temp_filename, self.compresslevel)
+            finally:
+                stall = self.graph.snapshot_gate.thaw()
+        else:
+            stall = None
+            # 分片和分区图保存合并后的Graph，Graph本身的merge用于合并其他图的增量
+            graph = self.graph if hasattr(self.graph, 'snapshot_gate') or not hasattr(self.graph, 'merge') \
+                else self.graph.merge()
+            write_snapshot(graph, temp_filename, self.compresslevel)
+        os.replace(temp_filename, filename)
+        sync_directory(self.directory)
+        if self.ingest_log is not None:
+            # 快照已经包含检查点之前的所有事务
+            self.ingest_log.truncate(self.graph.ingest_checkpoint)
+        return time.perf_counter() - start_time, stall
+
+    def checkpoint(self):
+        """
+        在冻结写入期间切换日志段，并把新段编号记录到图中，随快照一起保存。
+        """
+        if self.ingest_log is not None:
+            self.graph.ingest_checkpoint = self.ingest_log.rotate()
+
+    def fork_save(self, filename):
+        """
+        冻结写入后fork子进程，子进程保存fork时刻的图后退出，父进程在fork返回后立即恢复写入并等待子进程结束。
+        进程中运行着gRPC服务器和其他线程，fork时它们持有的锁在子进程中永远不会释放，子进程因此必须遵守：
+        只调用write_snapshot（不获取锁、不记录日志），关闭垃圾回收以免回收gRPC等对象时进入其内部的锁，
+        失败时只通过退出码报告，并用os._exit退出，不执行atexit和父进程的清理逻辑。
+        冻结闸门期间没有写入在进行，正在读图的线程不修改图，因此子进程看到的是一致的时间点。
+        :param filename: 快照文件名
+        :return: 暂停写入的时长（秒）
+        """
+        gate = self.graph.snapshot_gate
+        gate.freeze()
+        try:
+            self.checkpoint()
+            pid = os.fork()
+            if pid == 0:
+                gc.disable()
+                code = 0
+                try:
+                    write_snapshot(self.graph, filename, self.compresslevel)
+                except BaseException:
+                    code = 1
+                # 子进程不执行父进程的清理逻辑，直接退出
+                os._exit(code)
+        finally:
+            stall = gate.thaw()
+        _, status = os.waitpid(pid, 0)
+        if os.waitstatus_to_exitcode(status) != 0:
+            raise RuntimeError(f"Snapshot child process failed with status {status}")
+        return stall
+
+    def snapshot_once(self):
+        """
+        保存一次带时间戳的快照，并删除超出数量上限的旧快照。
+        :return: 快照文件名，失败时返回None
+        """
+        suffix = ".pkl.gz" if self.compresslevel else ".pkl"
+        filename = os.path.join(self.directory, f"graph_{int(time.time())}{suffix}")
+        try:
+            duration, stall = self.snapshot(filename)
+        except Exception:
+            self.failure_count += 1
+            logging.exception(f"Failed to save graph snapshot to {filename}")
+            return None
+        self.snapshot_count += 1
+        self.last_duration = duration
+        self.max_duration = max(self.max_duration, duration)
+        if stall is not None:
+            self.last_stall = stall
+            self.max_stall = max(self.max_stall, stall)
+        self.last_bytes = os.path.getsize(filename)
+        self.total_bytes += self.last_bytes
+        self.total_write_seconds += duration
+        logging.info(f"Graph saved to {filename} ({self.last_bytes} bytes) in {duration:.3f}s, ingest stalled {stall}s")
+        self.rotate()
+        return filename
+
+    def rotate(self):
+        """
+        按目录中实际存在的快照执行保留策略：超过数量上限或超过最长保留时间的旧快照被删除，最新的快照总是保留。
+        :return: 删除的快照文件名列表
+        """
+        snapshots = list_snapshots(self.directory)
+        expired = snapshots[:max(len(snapshots) - self.max_saves, 0)]
+        if self.max_age > 0:
+            deadline = time.time() - self.max_age
+            expired.extend(filename for filename in snapshots[len(expired):-1] if os.path.getmtime(filename) < deadline)
+        # 崩溃时留下的临时文件
+        expired.extend(os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                       if name.startswith("graph_") and name.endswith(".tmp"))
+        for filename in expired:
+            try:
+                os.remove(filename)
+            except FileNotFoundError:
+                continue
+            self.removed_count += 1
+            logging.info(f"Removed old file: {filename}")
+        return expired
+
+    def run(self):
+        while not self.stop_event.is_set():
+            self.snapshot_once()
+            self.stop_event.wait(self.interval)
+
+    def start(self):
+        """
+        启动后台快照线程。
+        """
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """
+        停止后台快照线程。
+        """
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+
+    def get_stats(self):
+        """
+        获取快照统计信息。
+        :return: 字典，包含快照方式、成功和失败次数、快照时长、暂停写入的时长、快照字节数和写入吞吐
+        """
+        stats = {
+            "mode": self.mode,
+            "snapshots": self.snapshot_count,
+            "failures": self.failure_count,
+            "last_duration": self.last_duration,
+            "max_duration": self.max_duration,
+            "last_stall": self.last_stall,
+            "max_stall": self.max_stall,
+            "last_bytes": self.last_bytes,
+            "total_bytes": self.total_bytes,
+            "bytes_per_second": self.total_bytes / self.total_write_seconds if self.total_write_seconds else 0,
+            "removed_snapshots": self.removed_count,
+        }
+        gate = getattr(self.graph, 'snapshot_gate', None)
+        if gate is not None:
+            stats.update(gate.get_stats())
+        return stats
@@ -45,4 +45,12 @@ class Vertex:
         :return: 相邻regionID的集合
         """
         with self.lock:
-            return self.adjacent_regions.copy()  # 返回副本以避免外部修改
\ No newline at end of file
+            return self.adjacent_regions.copy()  # 返回副本以避免外部修改
+
+    def remove_adjacent_region(self, region_id):
+        """
+        从邻接表中删除一个相邻的regionID。
+        :param region_id: 相邻的regionID
+        """
+        with self.lock:
+            self.adjacent_regions.discard(region_id)
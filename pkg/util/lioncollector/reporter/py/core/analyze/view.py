@@ -0,0 +1,461 @@
+from core.analyze.clump import Clump
+from itertools import chain, combinations, islice
+import logging
+import threading
+import time
+import numpy as np
+
+CONVERT_CHUNK_SIZE = 65536  # 发布时每次转换为数组的元素数量
+
+def sorted_key(region_ids):
+    """
+    把边或超边的frozenset键换算为按regionID升序排列的元组，自环边的键换算为两个相同的regionID。
+    写入路径每次累加都会新建frozenset，待发布的修改要保存到下一次发布，frozenset会被垃圾回收逐代提升到最老一代，
+    引发耗时与整个图的对象数成正比的完整回收；只包含整数的元组在第一次回收时就不再被跟踪。
+    :param region_ids: regionID的frozenset
+    :return: 元组
+    """
+    key = tuple(sorted(region_ids))
+    return key if len(key) > 1 else key * 2
+
+def chunked_array(iterable, count, dtype):
+    """
+    把可迭代对象分块转换为numpy数组，每块转换期间持有GIL，块与块之间写入线程可以取得GIL。
+    :param iterable: 可迭代对象
+    :param count: 元素数量
+    :param dtype: 数组的数据类型
+    :return: numpy数组
+    """
+    array = np.empty(count, dtype=dtype)
+    iterator = iter(iterable)
+    for start in range(0, count, CONVERT_CHUNK_SIZE):
+        size = min(CONVERT_CHUNK_SIZE, count - start)
+        array[start:start + size] = np.fromiter(islice(iterator, size), dtype=dtype, count=size)
+    return array
+
+class MaterializedView:
+    def __init__(self, version, region_ids, vertex_weights, edge_sources, edge_targets, edge_weights,
+                 top_hot_threshold=0, created=None, hyperedges=None):
+        """
+        初始化物化视图：某一时刻点权和边权的只读副本，查询只读取视图中的数组，不访问正在写入的图，也不获取图的任何锁。
+        视图创建后不再修改，刷新时整体替换为新的视图，正在使用旧视图的查询不受影响。
+        :param version: 视图版本号，每次刷新加1
+        :param region_ids: regionID列表
+        :param vertex_weights: 与region_ids一一对应的衰减后的点权
+        :param edge_sources: 边的一个端点的regionID列表
+        :param edge_targets: 与edge_sources一一对应的另一个端点的regionID列表
+        :param edge_weights: 与edge_sources一一对应的衰减后的边权
+        :param top_hot_threshold: 点权阈值，低于该值的region不计入热点
+        :param created: 视图的创建时间，默认为time.time()
+        :param hyperedges: 超边列表，元素为(regionID元组, 衰减后的超边权重)，默认为None表示没有超边
+        """
+        from core.analyze.components import index_regions
+
+        self.version = version
+        self.created = time.time() if created is None else created
+        self.top_hot_threshold = top_hot_threshold
+        hyperedges = hyperedges or []
+        members = [region_id for hyperedge_key, _ in hyperedges for region_id in hyperedge_key]
+        self.region_ids, vertex_positions, self.edge_sources, self.edge_targets, member_positions = index_regions(
+            region_ids, edge_sources, edge_targets, members)
+        # 超边保存为(升序排列的顶点下标元组, 权重)，不展开为两两之间的边
+        self.hyperedges = []
+        offset = 0
+        for hyperedge_key, weight in hyperedges:
+            positions = member_positions[offset:offset + len(hyperedge_key)]
+            self.hyperedges.append((tuple(sorted(positions.tolist())), weight))
+            offset += len(hyperedge_key)
+        self.edge_lookup = None  # 键为(较小下标, 较大下标)的边权字典，展开轻超边时才构建
+        values = np.asarray(vertex_weights)
+        self.vertex_weights = np.zeros(len(self.region_ids), dtype=values.dtype if len(values) else np.int64)
+        self.vertex_weights[vertex_positions] = values
+        self.edge_weights = np.asarray(edge_weights)
+        # 热点按(-点权, regionID)排序，只包含有点权且不低于阈值的region
+        hot = np.flatnonzero((self.vertex_weights > 0) & (self.vertex_weights >= top_hot_threshold))
+        self.hot_order = hot[np.argsort(-self.vertex_weights[hot], kind='stable')]
+        self.component_cache = {}  # 键为边权阈值，值为get_hot_components返回的数组
+
+    @classmethod
+    def from_graph(cls, graph, version):
+        """
+        由图当前的点权和边权构建视图，没有export_weights的分区图先合并为Graph。
+        开启了版本化读视图的Graph直接发布一个新版本，版本号由Graph维护，忽略version参数。
+        :param graph: Graph、DenseGraph、ShardedGraph或PartitionedGraph对象
+        :param version: 视图版本号
+        :return: MaterializedView对象
+        """
+        if getattr(graph, 'read_views', None) is not None:
+            return graph.get_read_view()
+        source = graph if hasattr(graph, 'export_weights') else graph.merge()
+        vertex_weights, edge_weights = source.export_weights()
+        # 逐项取出各列，不用zip(*edge_weights)在一次调用中展开所有边
+        return cls(version, list(vertex_weights), list(vertex_weights.values()), [edge[0] for edge in edge_weights],
+                   [edge[1] for edge in edge_weights], [edge[2] for edge in edge_weights], graph.top_hot_threshold)
+
+    def age(self, now=None):
+        """
+        视图创建以来经过的时间（秒）。
+        """
+        return (time.time() if now is None else now) - self.created
+
+    def vertex_count(self):
+        return len(self.region_ids)
+
+    def edge_count(self):
+        return len(self.edge_weights)
+
+    def get_top_hot_regions(self, k=None):
+        """
+        获取视图中点权不低于阈值的region，按点权降序排列。
+        :param k: 最多返回的region数量，默认为None表示返回所有
+        :return: 列表，元素为(regionID, 点权)的元组
+        """
+        order = self.hot_order if k is None else self.hot_order[:k]
+        return list(zip(self.region_ids[order].tolist(), self.vertex_weights[order].tolist()))
+
+    def get_hot_region(self, edge_thresh):
+        """
+        计算视图中的热点闭包，结果与创建视图时的图调用get_hot_region相同。
+        每次调用由get_hot_components缓存的数组构造新的Clump对象，视图不持有这些对象。
+        :param edge_thresh: 边权阈值，大于该值的边才会被认定为高关联
+        :return: 一个列表，每一项是一个Clump对象，表示一个热点闭包
+        """
+        region_ids, starts, hots = self.get_hot_components(edge_thresh)
+        region_ids = region_ids.tolist()
+        starts = starts.tolist()
+        return [Clump(set(region_ids[starts[index]:starts[index + 1]]), clump_hot)
+                for index, clump_hot in enumerate(hots.tolist())]
+
+    def get_hot_components(self, edge_thresh):
+        """
+        计算视图中的热点闭包，以数组返回，不构造Clump和集合对象。同一视图内相同阈值的结果只计算一次。
+        :param edge_thresh: 边权阈值，大于该值的边才会被认定为高关联
+        :return: (regionID数组, 起始位置数组, 闭包总点权数组)，第i个闭包的regionID为regionID数组[起始位置[i]:起始位置[i + 1]]，
+                 闭包的顺序与get_hot_region相同，每个闭包内的regionID按升序排列
+        """
+        from core.analyze.components import hot_components
+
+        cached = self.component_cache.get(edge_thresh)
+        if cached is not None:
+            return cached
+        # 种子按(-点权, regionID)排序，region_ids已按升序排列
+        seeds = np.flatnonzero(self.vertex_weights > 0)
+        seeds = seeds[np.argsort(-self.vertex_weights[seeds], kind='stable')]
+        hot = self.edge_weights > edge_thresh if len(self.edge_weights) else np.zeros(0, dtype=bool)
+        sources = self.edge_sources[hot]
+        targets = self.edge_targets[hot]
+        if self.hyperedges:
+            link_sources, link_targets = self.hyperedge_links(edge_thresh)
+            sources = np.concatenate((sources, link_sources))
+            targets = np.concatenate((targets, link_targets))
+        components = hot_components(len(self.region_ids), sources, targets, self.vertex_weights, seeds)
+        starts = np.zeros(len(components) + 1, dtype=np.int64)
+        np.cumsum([len(members) for members, _ in components], out=starts[1:])
+        members = np.concatenate([members for members, _ in components]) if components else np.zeros(0, dtype=np.int64)
+        hots = np.asarray([clump_hot for _, clump_hot in components], dtype=self.vertex_weights.dtype)
+        cached = (self.region_ids[members], starts, hots)
+        self.component_cache[edge_thresh] = cached
+        return cached
+
+    def hyperedge_links(self, edge_thresh):
+        """
+        超边在阈值下产生的高关联连接，与Graph.hyperedge_links相同：权重超过阈值的超边用星形连接表示，
+        其余超边两两展开后与普通边的边权累加，再与阈值比较。
+        :param edge_thresh: 边权阈值
+        :return: (端点下标数组, 另一个端点下标数组)
+        """
+        sources = []
+        targets = []
+        pair_weights = {}
+        for positions, weight in self.hyperedges:
+            if weight > edge_thresh:
+                center, *others = positions
+                sources += [center] * len(others)
+                targets += others
+            else:
+                for pair in combinations(positions, 2):
+                    pair_weights[pair] = pair_weights.get(pair, 0) + weight
+        if pair_weights:
+            if self.edge_lookup is None:
+                self.edge_lookup = {(min(source, target), max(source, target)): weight for source, target, weight in
+                                    zip(self.edge_sources.tolist(), self.edge_targets.tolist(),
+                                        self.edge_weights.tolist())}
+            for pair, weight in pair_weights.items():
+                if weight + self.edge_lookup.get(pair, 0) > edge_thresh:
+                    sources.append(pair[0])
+                    targets.append(pair[1])
+        return np.asarray(sources, dtype=np.int64), np.asarray(targets, dtype=np.int64)
+
+    def get_stats(self):
+        """
+        获取视图的统计信息。
+        :return: 字典，包含版本号、视图年龄、顶点数、边数、超边数和总点权
+        """
+        return {
+            "version": self.version,
+            "age": self.age(),
+            "vertices": self.vertex_count(),
+            "edges": self.edge_count(),
+            "hyperedges": len(self.hyperedges),
+            "total_vertex_weight": self.vertex_weights.sum().item(),
+        }
+
+class VersionedViews:
+    def __init__(self, max_age=1.0):
+        """
+        初始化Graph的版本化读视图：写入路径把对点权、边权和超边权重的累加量以及删除记录到待发布的修改中，
+        发布新版本时短暂冻结写入闸门，只交换待发布的修改，暂停时长与修改数量无关；
+        之后在闸门外把修改应用到上一版本保存的权重的副本上，生成新的MaterializedView。
+        读者拿到的视图对应某个事务边界，生成后不再修改，分析期间写入照常进行。
+        上一版本的权重在内存中另存一份，写入路径每次累加都要获取一次锁，因此只在需要时开启。
+        :param max_age: Graph.get_hot_region复用最近发布版本的最长时间（秒），0表示每次查询都发布新版本
+        """
+        self.max_age = max_age
+        self.vertex_changes = {}  # 上一版本之后对点权的累加量（乘以衰减系数后）
+        self.edge_changes = {}  # 上一版本之后对边权的累加量
+        self.hyperedge_changes = {}  # 上一版本之后对超边权重的累加量
+        self.removed_vertices = set()  # 上一版本之后删除或清零的regionID，之后的累加量仍记录在vertex_changes中
+        self.removed_edges = set()  # 上一版本之后删除的边键（元组）
+        self.lock = threading.Lock()  # 保护待发布的修改
+        self.vertex_weights = {}  # 上一版本的点权（乘以衰减系数后）
+        self.edge_weights = {}  # 上一版本的边权（乘以衰减系数后），键为sorted_key换算后的元组
+        self.hyperedge_weights = {}  # 上一版本的超边权重（乘以衰减系数后），键为sorted_key换算后的元组
+        self.decay_origin = None  # 上一版本保存的权重对应的衰减基准时间
+        self.version = 0
+        self.view = None  # 最近发布的MaterializedView
+        self.publish_lock = threading.Lock()  # 同一时间只有一个线程发布新版本
+        self.publish_count = 0
+        self.last_changes = 0  # 最近一次发布应用的修改数量
+        self.last_stall = 0  # 最近一次发布冻结写入的时长（秒）
+        self.max_stall = 0
+        self.last_duration = 0  # 最近一次发布的总耗时（秒）
+
+    def record_vertex(self, region_id, stored):
+        with self.lock:
+            self.vertex_changes[region_id] = self.vertex_changes.get(region_id, 0) + stored
+
+    def record_edge(self, edge_key, stored):
+        edge_key = sorted_key(edge_key)
+        with self.lock:
+            self.edge_changes[edge_key] = self.edge_changes.get(edge_key, 0) + stored
+
+    def record_hyperedge(self, hyperedge_key, stored):
+        hyperedge_key = sorted_key(hyperedge_key)
+        with self.lock:
+            self.hyperedge_changes[hyperedge_key] = self.hyperedge_changes.get(hyperedge_key, 0) + stored
+
+    def record_bulk(self, region_ids, vertex_stored, edge_keys, edge_stored):
+        """
+        记录一批聚合后的点权和边权累加，只获取一次锁。
+        """
+        edge_keys = [sorted_key(edge_key) for edge_key in edge_keys]
+        with self.lock:
+            vertex_changes = self.vertex_changes
+            for region_id, stored in zip(region_ids, vertex_stored):
+                vertex_changes[region_id] = vertex_changes.get(region_id, 0) + stored
+            edge_changes = self.edge_changes
+            for edge_key, stored in zip(edge_keys, edge_stored):
+                edge_changes[edge_key] = edge_changes.get(edge_key, 0) + stored
+
+    def remove_vertex(self, region_id):
+        """
+        记录顶点被删除或点权被清零，此前的累加量作废。
+        """
+        with self.lock:
+            self.vertex_changes.pop(region_id, None)
+            self.removed_vertices.add(region_id)
+
+    def remove_edge(self, edge_key):
+        """
+        记录边被删除，此前的累加量作废。
+        """
+        edge_key = sorted_key(edge_key)
+        with self.lock:
+            self.edge_changes.pop(edge_key, None)
+            self.removed_edges.add(edge_key)
+
+    def rescale(self, factor):
+        """
+        把待发布的累加量除以factor，用于衰减基准时间调整后保持一致，上一版本的权重在发布时按基准时间换算。
+        :param factor: 缩小的倍数
+        """
+        with self.lock:
+            for changes in (self.vertex_changes, self.edge_changes, self.hyperedge_changes):
+                for key in changes:
+                    changes[key] /= factor
+
+    def record_all(self, graph):
+        """
+        把图中当前的所有权重记为待发布的修改，第一次发布时读取全部权重，调用方需已冻结写入闸门。
+        :param graph: Graph对象
+        """
+        with self.lock:
+            self.vertex_changes = {region_id: vertex.weight for region_id, vertex in graph.vertices.items()}
+            self.edge_changes = {sorted_key(edge_key): edge.weight for edge_key, edge in graph.edges.items()}
+            self.hyperedge_changes = {sorted_key(key): hyperedge.weight for key, hyperedge in graph.hyperedges.items()}
+        self.decay_origin = graph.decay.origin
+
+    def current(self):
+        return self.view
+
+    def publish(self, graph, max_age=0):
+        """
+        发布一个新版本。
+        :param graph: Graph对象
+        :param max_age: 最近发布的视图不超过该时长（秒）时直接返回，0表示总是发布新版本
+        :return: MaterializedView对象
+        """
+        with self.publish_lock:
+            view = self.view
+            if view is not None and max_age > 0 and view.age() <= max_age:
+                return view
+            start_time = time.perf_counter()
+            graph.snapshot_gate.freeze()
+            try:
+                # 冻结期间只交换待发布的修改
+                with self.lock:
+                    vertex_changes, self.vertex_changes = self.vertex_changes, {}
+                    edge_changes, self.edge_changes = self.edge_changes, {}
+                    hyperedge_changes, self.hyperedge_changes = self.hyperedge_changes, {}
+                    removed_vertices, self.removed_vertices = self.removed_vertices, set()
+                    removed_edges, self.removed_edges = self.removed_edges, set()
+                origin = graph.decay.origin
+                created = time.time()
+            finally:
+                stall = graph.snapshot_gate.thaw()
+            # 冻结结束后再复制上一版本并应用修改，写入不再等待
+            scale = 1
+            if origin != self.decay_origin:
+                # 两个版本之间重新设定过衰减基准时间，上一版本的权重需要换算到新的基准
+                scale = 2.0 ** ((origin - self.decay_origin) / graph.decay.half_life)
+            weights = []
+            for previous, changes, removed in ((self.vertex_weights, vertex_changes, removed_vertices),
+                                               (self.edge_weights, edge_changes, removed_edges),
+                                               (self.hyperedge_weights, hyperedge_changes, ())):
+                current = previous.copy() if scale == 1 else {key: value / scale for key, value in previous.items()}
+                for key in removed:
+                    current.pop(key, None)
+                for key, stored in changes.items():
+                    current[key] = current.get(key, 0) + stored
+                weights.append(current)
+            self.vertex_weights, self.edge_weights, self.hyperedge_weights = weights
+            self.decay_origin = origin
+            self.version += 1
+            view = self.build_view(graph, created)
+            self.view = view
+            self.publish_count += 1
+            self.last_changes = (len(vertex_changes) + len(edge_changes) + len(hyperedge_changes) +
+                                 len(removed_vertices) + len(removed_edges))
+            self.last_stall = stall
+            self.max_stall = max(self.max_stall, stall)
+            self.last_duration = time.perf_counter() - start_time
+            return view
+
+    def build_view(self, graph, created):
+        """
+        由当前版本保存的权重构建MaterializedView，超边原样交给视图，不展开为两两之间的边。
+        """
+        # 发布时刻的衰减系数
+        factor = 2.0 ** ((created - self.decay_origin) / graph.decay.half_life) if graph.decay.enabled() else 1
+        # 边键都是两个regionID的元组，展开后偶数位置是一个端点，奇数位置是另一个端点
+        endpoints = chunked_array(chain.from_iterable(self.edge_weights), 2 * len(self.edge_weights), np.int64)
+        vertex_weights = np.asarray(list(self.vertex_weights.values()))
+        # 边权只用于与阈值比较，统一转换为浮点数
+        edge_weights = chunked_array(self.edge_weights.values(), len(self.edge_weights), np.float64)
+        if factor != 1:
+            vertex_weights = vertex_weights / factor
+            edge_weights = edge_weights / factor
+        hyperedges = [(hyperedge_key, stored / factor if factor != 1 else stored)
+                      for hyperedge_key, stored in self.hyperedge_weights.items()]
+        return MaterializedView(self.version, list(self.vertex_weights), vertex_weights, endpoints[0::2],
+                                endpoints[1::2], edge_weights, graph.top_hot_threshold, created, hyperedges)
+
+    def get_stats(self):
+        """
+        获取发布统计信息。
+        :return: 字典，包含当前版本号、发布次数、最近一次应用的修改数量、冻结写入的时长和发布耗时
+        """
+        return {
+            "version": self.version,
+            "publishes": self.publish_count,
+            "last_changes": self.last_changes,
+            "last_stall": self.last_stall,
+            "max_stall": self.max_stall,
+            "last_duration": self.last_duration,
+        }
+
+class ViewRefresher:
+    def __init__(self, graph, interval=5):
+        """
+        初始化物化视图的刷新器：在后台定时由图构建新的MaterializedView并替换当前视图。
+        替换只是一次引用赋值，查询线程拿到的视图在使用期间保持不变。
+        :param graph: 图对象
+        :param interval: 刷新间隔时间（秒）
+        """
+        self.graph = graph
+        self.interval = interval
+        self.view = None  # 当前视图，第一次刷新之前为None
+        self.refresh_count = 0
+        self.failure_count = 0
+        self.last_duration = 0  # 最近一次刷新耗时（秒）
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def refresh(self):
+        """
+        立即构建新视图并替换当前视图。
+        :return: 新的MaterializedView对象
+        """
+        start_time = time.perf_counter()
+        version = self.view.version + 1 if self.view else 1
+        view = MaterializedView.from_graph(self.graph, version)
+        self.view = view
+        self.last_duration = time.perf_counter() - start_time
+        self.refresh_count += 1
+        return view
+
+    def current(self):
+        """
+        获取当前视图。
+        :return: MaterializedView对象，尚未刷新过时为None
+        """
+        return self.view
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception:
+                self.failure_count += 1
+                logging.exception("Failed to refresh query view")
+
+    def start(self):
+        """
+        先同步刷新一次，再启动后台刷新线程。
+        """
+        self.refresh()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """
+        停止后台刷新线程。
+        """
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+
+    def get_stats(self):
+        """
+        获取刷新统计信息。
+        :return: 字典，包含当前视图版本号和年龄、刷新次数、失败次数和最近一次刷新耗时
+        """
+        view = self.view
+        return {
+            "version": view.version if view else 0,
+            "age": view.age() if view else None,
+            "refreshes": self.refresh_count,
+            "failures": self.failure_count,
+            "last_duration": self.last_duration,
+        }
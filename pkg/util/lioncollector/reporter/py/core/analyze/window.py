@@ -0,0 +1,111 @@
+from collections import deque
+
+class Epoch:
+    def __init__(self, start):
+        """
+        初始化一个时间片，记录该时间片内对点权和边权的累加量。
+        :param start: 时间片的开始时间
+        """
+        self.start = start
+        self.vertex_weights = {}  # 键为regionID，值为该时间片内累加的点权
+        self.edge_weights = {}  # 键为frozenset(regionID1, regionID2)，值为该时间片内累加的边权
+
+class EpochRing:
+    def __init__(self, window_seconds, epoch_count=6):
+        """
+        初始化滑动窗口：窗口由epoch_count个等长的时间片组成，最旧的时间片过期后从图中减去它的贡献。
+        窗口覆盖的时间在window_seconds减去一个时间片长度与window_seconds之间。
+        :param window_seconds: 窗口长度（秒）
+        :param epoch_count: 窗口中的时间片数量
+        """
+        if window_seconds <= 0 or epoch_count <= 0:
+            raise ValueError("window_seconds and epoch_count must be positive")
+        self.window_seconds = window_seconds
+        self.epoch_count = epoch_count
+        self.epoch_seconds = window_seconds / epoch_count  # 每个时间片的长度
+        self.epochs = deque()  # 按时间排列的时间片，最后一个是当前时间片
+
+    def current(self, now):
+        """
+        获取当前时间片，必要时先滚动窗口。
+        :param now: 当前时间
+        :return: (当前时间片, 过期的时间片列表)
+        """
+        expired = self.advance(now)
+        return self.epochs[-1], expired
+
+    def advance(self, now):
+        """
+        按当前时间滚动窗口。
+        :param now: 当前时间
+        :return: 过期的时间片列表，调用方需从图中减去它们的贡献
+        """
+        expired = []
+        if self.epochs and now - self.epochs[-1].start >= self.window_seconds:
+            # 空闲超过整个窗口时所有时间片都已过期
+            expired.extend(self.epochs)
+            self.epochs.clear()
+        if not self.epochs:
+            self.epochs.append(Epoch(now))
+            return expired
+        while now - self.epochs[-1].start >= self.epoch_seconds:
+            self.epochs.append(Epoch(self.epochs[-1].start + self.epoch_seconds))
+        while len(self.epochs) > self.epoch_count:
+            expired.append(self.epochs.popleft())
+        return expired
+
+    def record_vertex(self, region_id, value, now):
+        """
+        记录当前时间片内对点权的累加。
+        :return: 过期的时间片列表
+        """
+        epoch, expired = self.current(now)
+        epoch.vertex_weights[region_id] = epoch.vertex_weights.get(region_id, 0) + value
+        return expired
+
+    def record_edge(self, edge_key, value, now):
+        """
+        记录当前时间片内对边权的累加。
+        :return: 过期的时间片列表
+        """
+        epoch, expired = self.current(now)
+        epoch.edge_weights[edge_key] = epoch.edge_weights.get(edge_key, 0) + value
+        return expired
+
+    def forget_edge(self, edge_key):
+        """
+        删除所有时间片中某条边的累加记录。边被删除后再次创建时，过期时间片不会从新的边上扣减旧的贡献。
+        :param edge_key: 边的键
+        """
+        for epoch in self.epochs:
+            epoch.edge_weights.pop(edge_key, None)
+
+    def forget_vertex(self, region_id):
+        """
+        删除所有时间片中某个顶点的累加记录。
+        :param region_id: regionID
+        """
+        for epoch in self.epochs:
+            epoch.vertex_weights.pop(region_id, None)
+
+    def rescale(self, factor):
+        """
+        把所有时间片中记录的累加量除以factor，用于衰减基准时间调整后保持一致。
+        :param factor: 缩小的倍数
+        """
+        for epoch in self.epochs:
+            for region_id in epoch.vertex_weights:
+                epoch.vertex_weights[region_id] /= factor
+            for edge_key in epoch.edge_weights:
+                epoch.edge_weights[edge_key] /= factor
+
+    def get_stats(self):
+        """
+        获取窗口统计信息。
+        :return: 字典，包含时间片数量和记录的点、边累加项数量
+        """
+        return {
+            "epochs": len(self.epochs),
+            "recorded_vertices": sum(len(epoch.vertex_weights) for epoch in self.epochs),
+            "recorded_edges": sum(len(epoch.edge_weights) for epoch in self.epochs),
+        }
@@ -0,0 +1,181 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from core.ingest.coalescer import Coalescer
+from core.ingest.ingestqueue import BLOCK, REJECT, POLICIES, fill_sample_rate, shed_batch
+
+class AsyncBatcher:
+    def __init__(self, graph, max_batch_size=256, coalesce=False, capacity=0, policy=BLOCK,
+                 shed_watermark=0.5, min_sample_rate=0.01):
+        """
+        初始化异步批处理器，在事件循环中收集事务并整批写入Graph。
+        :param graph: Graph对象，用于存储和更新图结构
+        :param max_batch_size: 每次写入Graph的最大事务数量
+        :param coalesce: 是否在写入前合并同一批次中regionID集合相同的事务
+        :param capacity: offer最多积压的事务数，不含写线程正在写入的一批，小于等于0表示不限制
+        :param policy: 积压达到容量时的处理策略，取值为block、reject或shed，含义与IngestQueue相同
+        :param shed_watermark: shed策略下开始采样的占用比例
+        :param min_sample_rate: shed策略下的最小采样率
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overload policy: {policy}")
+        self.graph = graph
+        self.max_batch_size = max_batch_size
+        self.capacity = max(capacity, 0)
+        self.policy = policy
+        self.shed_watermark = shed_watermark
+        self.min_sample_rate = min_sample_rate
+        self.pending = []  # 等待写入的事务列表，只在事件循环线程中访问
+        self.pending_weights = []  # 与pending一一对应的权重
+        self.weighted = False  # pending中是否有权重不为1的事务，没有时写入Graph不传权重
+        self.wakeup = asyncio.Event()  # 有新事务到达时唤醒批处理协程
+        self.room = asyncio.Event()  # 批处理协程取走事务后置位，唤醒等待容量的写入方
+        self.idle = asyncio.Event()  # 没有待处理事务时置位
+        self.idle.set()
+        self.applied_count = 0  # 已写入Graph的事务数量
+        self.batch_count = 0  # 已写入Graph的批次数量
+        self.failed_count = 0  # 写入Graph失败的事务数量
+        self.dropped_count = 0  # shed策略下被丢弃的事务数量
+        self.rejected_count = 0  # reject策略下被拒绝的事务数量
+        self.sample_rate = 1.0  # 最近一次写入使用的采样率
+        self.coalescer = Coalescer() if coalesce else None
+        self.task = None
+        # 写图、预写日志的fsync和等待快照冻结都可能阻塞，放在单个写线程中执行，按放入顺序写入
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def put(self, region_ids, weight=1):
+        """
+        不经过容量限制放入一个事务，不等待其写入Graph。
+        :param region_ids: 事务访问的regionID列表
+        :param weight: 事务的权重
+        """
+        self.pending.append(tuple(region_ids))
+        self.pending_weights.append(weight)
+        self.weighted = self.weighted or weight != 1
+        self.idle.clear()
+        self.wakeup.set()
+
+    def put_many(self, batch, weights=None):
+        """
+        不经过容量限制放入一批事务，不等待其写入Graph。
+        :param batch: 事务列表，每一项是一个regionID列表
+        :param weights: 与batch一一对应的权重列表，默认为None表示权重均为1
+        """
+        count = len(self.pending)
+        self.pending.extend(tuple(region_ids) for region_ids in batch)
+        self.pending_weights.extend(weights if weights else [1] * (len(self.pending) - count))
+        self.weighted = self.weighted or bool(weights)
+        if self.pending:
+            self.idle.clear()
+            self.wakeup.set()
+
+    def fits(self, count):
+        """
+        队列为空时总能放入，避免超过容量的批次永远无法写入。
+        :param count: 要放入的事务数
+        :return: 是否可以放入
+        """
+        return self.capacity == 0 or not self.pending or len(self.pending) + count <= self.capacity
+
+    async def offer(self, batch, weights=None):
+        """
+        按策略放入一批事务：block策略等待批处理协程腾出容量，reject策略拒绝整批，shed策略按占用比例采样。
+        :param batch: 事务列表，每一项是一个regionID列表
+        :param weights: 与batch一一对应的权重列表，默认为None表示权重均为1
+        :return: 被拒绝时返回False，否则返回True（shed策略下部分事务可能被丢弃）
+        """
+        batch = [tuple(region_ids) for region_ids in batch]
+        if self.policy == BLOCK:
+            while not self.fits(len(batch)):
+                self.room.clear()
+                await self.room.wait()
+        elif self.policy == REJECT:
+            if not self.fits(len(batch)):
+                self.rejected_count += len(batch)
+                return False
+        elif self.capacity > 0:
+            count = len(batch)
+            sample_rate = fill_sample_rate(len(self.pending) / self.capacity, self.shed_watermark, self.min_sample_rate)
+            batch, weights, self.sample_rate = shed_batch(batch, weights, sample_rate,
+                                                          self.capacity - len(self.pending), self.min_sample_rate)
+            if batch and not self.fits(len(batch)):
+                # 达到最小采样率后仍然放不下，超出容量的部分直接丢弃
+                keep = max(self.capacity - len(self.pending), 0)
+                batch = batch[:keep]
+                weights = weights[:keep] if weights else weights
+            self.dropped_count += count - len(batch)
+        self.put_many(batch, weights)
+        return True
+
+    def start(self):
+        """
+        在当前事件循环中启动批处理协程。
+        """
+        self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def run(self):
+        """
+        批处理协程：取出所有待处理事务，按max_batch_size切分后交给写线程写入Graph。
+        写入期间事件循环继续接收请求；某一批写入失败时记录日志并继续处理后续批次。
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.wakeup.wait()
+            self.wakeup.clear()
+            while self.pending:
+                batch = self.pending[:self.max_batch_size]
+                weights = self.pending_weights[:self.max_batch_size] if self.weighted else None
+                del self.pending[:self.max_batch_size]
+                del self.pending_weights[:self.max_batch_size]
+                self.room.set()
+                try:
+                    await loop.run_in_executor(self.executor, self.apply, batch, weights)
+                    self.applied_count += len(batch)
+                except Exception:
+                    self.failed_count += len(batch)
+                    logging.exception(f"Failed to apply a batch of {len(batch)} transactions")
+                self.batch_count += 1
+            self.weighted = False
+            self.idle.set()
+
+    def apply(self, batch, weights=None):
+        """
+        在写线程中把一批事务写入Graph。
+        :param batch: 事务列表，每一项是一个regionID元组
+        :param weights: 与batch一一对应的权重列表
+        """
+        if self.coalescer:
+            self.coalescer.add(batch, weights)
+            self.graph.add_transactions(*self.coalescer.drain())
+        else:
+            self.graph.add_transactions(batch, weights)
+
+    def get_stats(self):
+        """
+        获取批处理器统计信息。
+        :return: 字典，包含积压事务数、已写入和失败的数量、丢弃数量、拒绝数量和采样率
+        """
+        return {
+            "pending": len(self.pending),
+            "applied": self.applied_count,
+            "batches": self.batch_count,
+            "failed": self.failed_count,
+            "dropped": self.dropped_count,
+            "rejected": self.rejected_count,
+            "sample_rate": self.sample_rate,
+        }
+
+    async def flush(self):
+        """
+        等待所有已放入的事务写入Graph。
+        """
+        await self.idle.wait()
+
+    async def stop(self):
+        """
+        写完剩余事务后停止批处理协程。
+        """
+        await self.flush()
+        if self.task:
+            self.task.cancel()
+        self.executor.shutdown(wait=False)
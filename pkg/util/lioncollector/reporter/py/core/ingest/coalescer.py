@@ -0,0 +1,55 @@
+import time
+
+class Coalescer:
+    def __init__(self, window_seconds=0.05, max_pending=10000):
+        """
+        初始化合并器：在一个时间窗口内把regionID集合相同的事务合并为一次带权写入。
+        :param window_seconds: 合并窗口的时长（秒）
+        :param max_pending: 窗口内最多保留的不同事务数量，达到后立即输出
+        """
+        self.window_seconds = window_seconds
+        self.max_pending = max_pending
+        self.pending = {}  # 键为regionID元组，值为累计权重
+        self.window_start = None  # 当前窗口第一条事务到达的时间
+        self.input_count = 0  # 合并前的事务数量
+        self.output_count = 0  # 合并后写入Graph的事务数量
+
+    def add(self, batch, weights=None):
+        """
+        放入一批事务，相同regionID元组的权重累加。
+        :param batch: 事务列表，每一项是一个regionID列表
+        :param weights: 与batch一一对应的权重列表，默认为None表示权重均为1
+        """
+        if self.window_start is None:
+            self.window_start = time.time()
+        for index, region_ids in enumerate(batch):
+            key = tuple(region_ids)
+            self.pending[key] = self.pending.get(key, 0) + (weights[index] if weights else 1)
+        self.input_count += len(batch)
+
+    def time_until_flush(self):
+        """
+        计算距离当前窗口结束的时间。
+        :return: 剩余秒数；没有待合并事务时返回None
+        """
+        if self.window_start is None:
+            return None
+        return max(0.0, self.window_start + self.window_seconds - time.time())
+
+    def should_flush(self):
+        """
+        判断是否应该输出：窗口已结束，或不同事务数量达到上限。
+        """
+        return bool(self.pending) and (len(self.pending) >= self.max_pending or self.time_until_flush() == 0)
+
+    def drain(self):
+        """
+        取出合并后的事务并开始新的窗口。
+        :return: (事务列表, 权重列表)
+        """
+        batch = list(self.pending.keys())
+        weights = list(self.pending.values())
+        self.pending = {}
+        self.window_start = None
+        self.output_count += len(batch)
+        return batch, weights
@@ -0,0 +1,212 @@
+import collections
+import queue
+import random
+import threading
+
+# 队列满时的处理策略
+BLOCK = "block"  # 阻塞写入方，形成反压
+REJECT = "reject"  # 拒绝请求，由客户端稍后重试
+SHED = "shed"  # 按采样率丢弃事务，保留的事务按采样率放大权重
+POLICIES = (BLOCK, REJECT, SHED)
+
+def fill_sample_rate(fill, shed_watermark, min_sample_rate):
+    """
+    根据占用比例计算shed策略的采样率：低于水位线时全部保留，之后线性下降到最小采样率。
+    :param fill: 已占用的容量比例
+    :param shed_watermark: 开始采样的占用比例
+    :param min_sample_rate: 最小采样率
+    :return: 采样率，取值范围(0, 1]
+    """
+    fill = min(fill, 1.0)
+    if fill < shed_watermark:
+        return 1.0
+    return max(min_sample_rate, (1 - fill) / (1 - shed_watermark))
+
+def sample(batch, weights, sample_rate):
+    """
+    按采样率保留事务，保留的事务权重除以采样率，使点权和边权的期望保持无偏。
+    :param batch: 事务列表
+    :param weights: 权重列表，为None表示权重均为1
+    :param sample_rate: 采样率
+    :return: 保留下来的(事务列表, 权重列表)
+    """
+    kept_batch = []
+    kept_weights = []
+    for index, region_ids in enumerate(batch):
+        if random.random() < sample_rate:
+            kept_batch.append(region_ids)
+            kept_weights.append((weights[index] if weights else 1) / sample_rate)
+    return kept_batch, kept_weights
+
+def shed_batch(batch, weights, sample_rate, room, min_sample_rate):
+    """
+    shed策略的采样：先按采样率采样，仍然放不下时把总采样率降到刚好放下，但不低于最小采样率。
+    :param batch: 事务列表
+    :param weights: 权重列表，为None表示权重均为1
+    :param sample_rate: 按占用比例得到的采样率
+    :param room: 还能容纳的事务数，None表示不限制
+    :param min_sample_rate: 最小采样率
+    :return: (保留的事务列表, 权重列表, 实际使用的总采样率)，调用方负责丢弃仍然超出容量的部分
+    """
+    if sample_rate < 1.0:
+        batch, weights = sample(batch, weights, sample_rate)
+    if room is not None and len(batch) > room > 0:
+        rate = max(min_sample_rate, sample_rate * room / len(batch))
+        batch, weights = sample(batch, weights, rate / sample_rate)
+        sample_rate = rate
+    return batch, weights, sample_rate
+
+class IngestQueue:
+    def __init__(self, capacity=0, policy=BLOCK, shed_watermark=0.5, min_sample_rate=0.01):
+        """
+        初始化有界写入队列，队列中的每一项是(事务列表, 权重列表)。
+        容量按积压的事务数计算，队列为空时单个超过容量的批次也会被接受，因此积压不超过max(容量, 最大批次)。
+        :param capacity: 队列最多积压的事务数，小于等于0表示不限制
+        :param policy: 队列满时的处理策略，取值为block、reject或shed
+        :param shed_watermark: shed策略下开始采样的队列占用比例
+        :param min_sample_rate: shed策略下的最小采样率
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overload policy: {policy}")
+        self.capacity = max(capacity, 0)
+        self.policy = policy
+        self.shed_watermark = shed_watermark
+        self.min_sample_rate = min_sample_rate
+        self.items = collections.deque()
+        self.pending = 0  # 队列中积压的事务数
+        self.unfinished = 0  # 已放入、尚未task_done的项数
+        self.mutex = threading.Lock()  # 保护队列、计数和统计信息的锁
+        self.not_empty = threading.Condition(self.mutex)
+        self.not_full = threading.Condition(self.mutex)
+        self.all_tasks_done = threading.Condition(self.mutex)
+        self.dropped_count = 0  # 被采样丢弃或因队列满被丢弃的事务数量
+        self.rejected_count = 0  # 被拒绝的事务数量
+        self.sample_rate = 1.0  # 最近一次写入使用的采样率
+
+    def room(self):
+        """
+        调用方需持有mutex。
+        :return: 队列还能容纳的事务数，不限制容量时返回None
+        """
+        if self.capacity == 0:
+            return None
+        return self.capacity - self.pending
+
+    def fits(self, count):
+        """
+        调用方需持有mutex。队列为空时总能放入，避免超过容量的批次永远无法写入。
+        :param count: 要放入的事务数
+        :return: 是否可以放入
+        """
+        return self.capacity == 0 or self.pending == 0 or self.pending + count <= self.capacity
+
+    def current_sample_rate(self):
+        """
+        调用方需持有mutex。根据队列占用比例计算采样率。
+        :return: 采样率，取值范围(0, 1]
+        """
+        if self.capacity == 0:
+            return 1.0
+        return fill_sample_rate(self.pending / self.capacity, self.shed_watermark, self.min_sample_rate)
+
+    def offer(self, batch, weights=None):
+        """
+        按策略写入一批事务。只有block策略会等待，reject和shed策略从不阻塞。
+        :param batch: 事务列表，每一项是一个regionID列表
+        :param weights: 与batch一一对应的权重列表，默认为None表示权重均为1
+        :return: 被拒绝时返回False，否则返回True（shed策略下部分事务可能被丢弃）
+        """
+        if self.policy == BLOCK:
+            with self.not_full:
+                while not self.fits(len(batch)):
+                    self.not_full.wait()
+                self.append((batch, weights))
+            return True
+        if self.policy == REJECT:
+            with self.mutex:
+                if not self.fits(len(batch)):
+                    self.rejected_count += len(batch)
+                    return False
+                self.append((batch, weights))
+            return True
+        count = len(batch)
+        with self.mutex:
+            sample_rate = self.current_sample_rate()
+            room = self.room()
+        # 采样在锁外进行，不阻塞其他写入方和工作线程
+        batch, weights, sample_rate = shed_batch(batch, weights, sample_rate, room, self.min_sample_rate)
+        with self.mutex:
+            self.sample_rate = sample_rate
+            if batch and not self.fits(len(batch)):
+                # 达到最小采样率后仍然放不下，超出容量的部分直接丢弃
+                keep = max(self.room(), 0)
+                batch = batch[:keep]
+                weights = weights[:keep] if weights else weights
+            self.dropped_count += count - len(batch)
+            if batch:
+                self.append((batch, weights))
+        return True
+
+    def append(self, item):
+        """
+        调用方需持有mutex。放入一项并唤醒等待的工作线程。
+        :param item: 队列项，None表示停止信号
+        """
+        self.items.append(item)
+        if item is not None:
+            self.pending += len(item[0])
+        self.unfinished += 1
+        self.not_empty.notify()
+
+    def put(self, item):
+        """
+        不经过策略和容量限制直接放入一项，用于发送停止信号。
+        :param item: 队列项
+        """
+        with self.mutex:
+            self.append(item)
+
+    def get(self, timeout=None):
+        """
+        取出一项，超时后抛出queue.Empty。
+        :param timeout: 等待的最长时间（秒），None表示一直等待
+        """
+        with self.not_empty:
+            if not self.not_empty.wait_for(lambda: self.items, timeout):
+                raise queue.Empty
+            item = self.items.popleft()
+            if item is not None:
+                self.pending -= len(item[0])
+                self.not_full.notify_all()
+            return item
+
+    def task_done(self, count=1):
+        with self.all_tasks_done:
+            self.unfinished -= count
+            if self.unfinished < 0:
+                raise ValueError("task_done() called too many times")
+            if self.unfinished == 0:
+                self.all_tasks_done.notify_all()
+
+    def join(self):
+        with self.all_tasks_done:
+            while self.unfinished:
+                self.all_tasks_done.wait()
+
+    def qsize(self):
+        with self.mutex:
+            return len(self.items)
+
+    def get_stats(self):
+        """
+        获取队列统计信息。
+        :return: 字典，包含队列深度、积压事务数、丢弃数量、拒绝数量和采样率
+        """
+        with self.mutex:
+            return {
+                "depth": len(self.items),
+                "pending": self.pending,
+                "dropped": self.dropped_count,
+                "rejected": self.rejected_count,
+                "sample_rate": self.sample_rate,
+            }
@@ -0,0 +1,103 @@
+from collections import OrderedDict
+import threading
+import time
+
+class TxnBuffer:
+    def __init__(self, timeout=1.0, max_regions_per_txn=1024, max_open_txns=100000):
+        """
+        初始化事务缓冲区：按txn_id合并同一事务中各条语句访问的region，事务结束后整体输出一次。
+        由于请求中没有事务结束标记，事务在空闲超过timeout后视为结束。
+        :param timeout: 事务的空闲超时时间（秒）
+        :param max_regions_per_txn: 单个事务最多缓存的不同region数量，超过后提前输出
+        :param max_open_txns: 最多同时缓存的事务数量，超过后输出最久未更新的事务
+        """
+        self.timeout = timeout
+        self.max_regions_per_txn = max_regions_per_txn
+        self.max_open_txns = max_open_txns
+        self.open_txns = OrderedDict()  # 键为txn_id，值为[region集合, 最近更新时间]，按最近更新时间排序
+        self.buffered_region_count = 0  # 所有未结束事务中缓存的region总数
+        self.lock = threading.Lock()
+        self.emitted_count = 0  # 已输出的事务数量
+        self.evicted_count = 0  # 因大小或数量限制被提前输出的事务数量
+
+    def add(self, txn_id, region_ids):
+        """
+        放入一条语句访问的region。
+        :param txn_id: 事务ID，为0表示语句不属于显式事务，直接输出
+        :param region_ids: 语句访问的regionID列表
+        :return: 需要写入Graph的regionID元组列表
+        """
+        if not txn_id:
+            return [tuple(region_ids)]
+        emitted = []
+        now = time.time()
+        with self.lock:
+            entry = self.open_txns.get(txn_id)
+            if entry is None:
+                if len(self.open_txns) >= self.max_open_txns:
+                    _, (oldest_regions, _) = self.open_txns.popitem(last=False)
+                    emitted.append(self.emit(oldest_regions))
+                    self.evicted_count += 1
+                entry = self.open_txns[txn_id] = [set(), now]
+            else:
+                self.open_txns.move_to_end(txn_id)
+                entry[1] = now
+            regions = entry[0]
+            size = len(regions)
+            regions.update(region_ids)
+            self.buffered_region_count += len(regions) - size
+            if len(regions) >= self.max_regions_per_txn:
+                del self.open_txns[txn_id]
+                emitted.append(self.emit(regions))
+                self.evicted_count += 1
+        return emitted
+
+    def emit(self, regions):
+        """
+        输出一个事务的region集合，调用方需持有锁。
+        :param regions: 事务访问的region集合
+        :return: 排序后的regionID元组
+        """
+        self.buffered_region_count -= len(regions)
+        self.emitted_count += 1
+        return tuple(sorted(regions))
+
+    def expire(self, now=None):
+        """
+        输出所有空闲超时的事务。
+        :param now: 当前时间，默认为time.time()
+        :return: 需要写入Graph的regionID元组列表
+        """
+        now = time.time() if now is None else now
+        emitted = []
+        with self.lock:
+            while self.open_txns:
+                txn_id, (regions, last_update) = next(iter(self.open_txns.items()))
+                if now - last_update < self.timeout:
+                    break
+                del self.open_txns[txn_id]
+                emitted.append(self.emit(regions))
+        return emitted
+
+    def flush(self):
+        """
+        输出所有未结束的事务。
+        :return: 需要写入Graph的regionID元组列表
+        """
+        with self.lock:
+            emitted = [self.emit(regions) for regions, _ in self.open_txns.values()]
+            self.open_txns.clear()
+        return emitted
+
+    def get_stats(self):
+        """
+        获取缓冲区统计信息。
+        :return: 字典，包含未结束事务数量、缓存的region总数、已输出和被提前输出的事务数量
+        """
+        with self.lock:
+            return {
+                "open_txns": len(self.open_txns),
+                "buffered_regions": self.buffered_region_count,
+                "emitted_txns": self.emitted_count,
+                "evicted_txns": self.evicted_count,
+            }
@@ -0,0 +1,241 @@
+from itertools import chain
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+import numpy as np
+
+RECORD_HEADER = struct.Struct("<IIIBd")  # 负载字节数、负载的crc32、事务数量、权重类型、写入时间
+INT_WEIGHTS = 0  # 权重保存为int64
+FLOAT_WEIGHTS = 1  # 权重保存为float64
+DELTA_MARKER = 2  # 不是事务记录，而是增量导出标记，负载为序号(uint64)和来源名称
+SEGMENT_PREFIX = "wal_"
+SEGMENT_SUFFIX = ".log"
+
+def encode_batch(batch, weights=None, timestamp=None):
+    """
+    将一批事务编码为日志记录：事务长度(int32)、事务权重、展平的regionID(int64)依次排列为连续数组。
+    :param batch: 事务列表，每一项是一个regionID列表
+    :param weights: 与batch一一对应的事务权重列表，默认为None表示权重均为1
+    :param timestamp: 事务的写入时间，默认为time.time()，重放时按该时间衰减
+    :return: 日志记录的字节串
+    """
+    lengths = np.fromiter(map(len, batch), dtype=np.int32, count=len(batch))
+    regions = np.fromiter(chain.from_iterable(batch), dtype=np.int64, count=int(lengths.sum()))
+    if weights is None:
+        weights = np.ones(len(batch), dtype=np.int64)
+    weights = np.asarray(weights)
+    weight_kind = INT_WEIGHTS if weights.dtype.kind in 'iub' else FLOAT_WEIGHTS
+    weights = weights.astype(np.int64 if weight_kind == INT_WEIGHTS else np.float64)
+    payload = lengths.tobytes() + weights.tobytes() + regions.tobytes()
+    timestamp = time.time() if timestamp is None else timestamp
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload), len(batch), weight_kind, timestamp) + payload
+
+def encode_delta_marker(source, sequence, timestamp=None):
+    """
+    将增量导出标记编码为日志记录：标记之前写入的事务都已包含在不大于该序号的增量中。
+    :param source: 增量的来源名称
+    :param sequence: 最近一次导出的增量序号
+    :param timestamp: 写入时间，默认为time.time()
+    :return: 日志记录的字节串
+    """
+    payload = struct.pack("<Q", sequence) + source.encode()
+    timestamp = time.time() if timestamp is None else timestamp
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload), 0, DELTA_MARKER, timestamp) + payload
+
+def decode_records(data):
+    """
+    解码一个日志段中的记录，遇到不完整或校验失败的记录时停止，这只会出现在崩溃时正在写入的段尾。
+    :param data: 日志段的内容
+    :return: (记录列表, 是否完整)，记录为(事务列表, 权重列表, 写入时间)，增量导出标记为(None, (来源名称, 序号), 写入时间)
+    """
+    records = []
+    offset = 0
+    while offset < len(data):
+        if offset + RECORD_HEADER.size > len(data):
+            return records, False
+        size, checksum, count, weight_kind, timestamp = RECORD_HEADER.unpack_from(data, offset)
+        payload = data[offset + RECORD_HEADER.size:offset + RECORD_HEADER.size + size]
+        if len(payload) < size or zlib.crc32(payload) != checksum:
+            return records, False
+        offset += RECORD_HEADER.size + size
+        if weight_kind == DELTA_MARKER:
+            records.append((None, (bytes(payload[8:]).decode(), struct.unpack_from("<Q", payload)[0]), timestamp))
+            continue
+        lengths = np.frombuffer(payload, dtype=np.int32, count=count)
+        weights = np.frombuffer(payload, dtype=np.int64 if weight_kind == INT_WEIGHTS else np.float64,
+                                count=count, offset=lengths.nbytes)
+        regions = np.frombuffer(payload, dtype=np.int64, offset=lengths.nbytes + weights.nbytes).tolist()
+        ends = np.cumsum(lengths).tolist()
+        batch = [regions[end - length:end] for end, length in zip(ends, lengths.tolist())]
+        records.append((batch, weights.tolist(), timestamp))
+    return records, True
+
+class IngestLog:
+    def __init__(self, directory, segment_bytes=64 << 20, sync_interval=1.0):
+        """
+        初始化预写日志：写入Graph前先把整批事务追加到日志，重启时从最新快照记录的位置重放。
+        日志由编号递增的段文件组成，每次打开都从新的段开始写入，不会接在崩溃时写了一半的段尾之后。
+        :param directory: 日志段所在目录
+        :param segment_bytes: 单个段的最大字节数，超过后切换到新段
+        :param sync_interval: 两次fsync之间的最短间隔（秒），小于等于0时每次追加都fsync
+        """
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.sync_interval = sync_interval
+        os.makedirs(directory, exist_ok=True)
+        segments = self.segments()
+        self.segment = (segments[-1] if segments else 0) + 1  # 当前写入的段编号
+        self.file = open(self.segment_path(self.segment), 'ab')
+        self.segment_size = 0
+        self.last_sync = time.time()
+        self.lock = threading.Lock()
+        self.appended_count = 0  # 追加的事务数量
+        self.appended_bytes = 0
+        self.truncated_count = 0  # 删除的段数量
+
+    def segment_path(self, segment):
+        return os.path.join(self.directory, f"{SEGMENT_PREFIX}{segment:020d}{SEGMENT_SUFFIX}")
+
+    def segments(self):
+        """
+        列出目录中的日志段编号。
+        :return: 升序排列的段编号列表
+        """
+        segments = []
+        for name in os.listdir(self.directory):
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+                segments.append(int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]))
+        return sorted(segments)
+
+    def append(self, batch, weights=None):
+        """
+        追加一批事务，写入操作系统缓冲区后返回，按sync_interval定期fsync。
+        :param batch: 事务列表，每一项是一个regionID列表
+        :param weights: 与batch一一对应的事务权重列表，默认为None表示权重均为1
+        """
+        self.write_record(encode_batch(batch, weights), len(batch))
+
+    def append_delta_marker(self, source, sequence):
+        """
+        追加增量导出标记，调用时必须已冻结写入，使标记在日志中的位置与增量包含的事务一致。
+        :param source: 增量的来源名称
+        :param sequence: 刚导出的增量序号
+        """
+        self.write_record(encode_delta_marker(source, sequence), 0)
+
+    def write_record(self, record, count):
+        """
+        追加一条编码后的记录，写入操作系统缓冲区后返回，按sync_interval定期fsync。
+        :param record: 日志记录的字节串
+        :param count: 记录中的事务数量
+        """
+        with self.lock:
+            if self.segment_size and self.segment_size + len(record) > self.segment_bytes:
+                self.switch_segment()
+            self.file.write(record)
+            self.file.flush()
+            self.segment_size += len(record)
+            self.appended_count += count
+            self.appended_bytes += len(record)
+            now = time.time()
+            if now - self.last_sync >= self.sync_interval:
+                os.fsync(self.file.fileno())
+                self.last_sync = now
+
+    def switch_segment(self):
+        """
+        关闭当前段并切换到下一个段，调用方需持有锁。
+        """
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        self.segment += 1
+        self.file = open(self.segment_path(self.segment), 'ab')
+        self.segment_size = 0
+
+    def rotate(self):
+        """
+        切换到新段并返回其编号，作为快照的检查点：调用时必须已冻结写入，
+        此后追加的事务都在检查点及之后的段中，之前的段中的事务都已经写入Graph。
+        :return: 检查点段编号
+        """
+        with self.lock:
+            self.switch_segment()
+            return self.segment
+
+    def truncate(self, checkpoint):
+        """
+        删除检查点之前的段，在包含该检查点的快照保存成功后调用。
+        :param checkpoint: 检查点段编号
+        """
+        for segment in self.segments():
+            if segment >= checkpoint:
+                break
+            os.remove(self.segment_path(segment))
+            self.truncated_count += 1
+
+    def replay(self, graph, checkpoint=0, chunk_size=100000):
+        """
+        把检查点及之后的段中的事务重放到Graph中，多个记录合并为大批次后批量写入，重放的事务不会再次写入日志。
+        开启衰减时按记录的写入时间换算权重，与当时直接写入Graph的结果相同。
+        遇到增量导出标记时先写入之前的事务，再让Graph丢弃已经导出的增量记录并恢复序号。
+        :param graph: Graph对象
+        :param checkpoint: 检查点段编号，默认为0表示重放所有段
+        :param chunk_size: 每次批量写入的最大事务数量
+        :return: 重放的事务数量
+        """
+        replayed = 0
+        batch = []
+        weights = []
+        now = time.time()
+        decay = getattr(graph, 'decay', None)
+        for segment in self.segments():
+            if segment < checkpoint or segment >= self.segment:
+                continue
+            with open(self.segment_path(segment), 'rb') as file:
+                records, complete = decode_records(file.read())
+            if not complete:
+                logging.warning(f"Ingest log segment {segment} ends with a torn record, replaying its complete prefix")
+            for record_batch, record_weights, timestamp in records:
+                if record_batch is None:
+                    if batch:
+                        graph.record_transactions(batch, weights)
+                        replayed += len(batch)
+                        batch, weights = [], []
+                    graph.restore_delta_marker(*record_weights)
+                    continue
+                if decay is not None and decay.enabled():
+                    scale = 2.0 ** ((timestamp - now) / decay.half_life)
+                    record_weights = [weight * scale for weight in record_weights]
+                batch.extend(record_batch)
+                weights.extend(record_weights)
+                if len(batch) >= chunk_size:
+                    graph.record_transactions(batch, weights)
+                    replayed += len(batch)
+                    batch, weights = [], []
+        if batch:
+            graph.record_transactions(batch, weights)
+            replayed += len(batch)
+        return replayed
+
+    def close(self):
+        with self.lock:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+
+    def get_stats(self):
+        """
+        获取日志统计信息。
+        :return: 字典，包含当前段编号、段数量、追加的事务数和字节数、删除的段数量
+        """
+        return {
+            "segment": self.segment,
+            "segments": len(self.segments()),
+            "appended_transactions": self.appended_count,
+            "appended_bytes": self.appended_bytes,
+            "truncated_segments": self.truncated_count,
+        }
@@ -35,4 +35,57 @@ class BucketedDict:
         bucket_index = self._get_bucket_index(key)
         with self.locks[bucket_index]:
             if key in self.buckets[bucket_index]:
-                del self.buckets[bucket_index][key]
\ No newline at end of file
+                del self.buckets[bucket_index][key]
+
+    def __getitem__(self, key):
+        bucket_index = self._get_bucket_index(key)
+        with self.locks[bucket_index]:
+            return self.buckets[bucket_index][key]
+
+    def __contains__(self, key):
+        bucket_index = self._get_bucket_index(key)
+        with self.locks[bucket_index]:
+            return key in self.buckets[bucket_index]
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self.buckets)
+
+    def items(self):
+        # 逐个桶加锁复制，返回的是各个桶的快照
+        items = []
+        for bucket_index, bucket in enumerate(self.buckets):
+            with self.locks[bucket_index]:
+                items.extend(bucket.items())
+        return items
+
+    def bucket_values(self, bucket_index):
+        # 复制单个桶中的值，用于增量遍历，每次只持有一个桶的锁
+        with self.locks[bucket_index]:
+            return list(self.buckets[bucket_index].values())
+
+    def setdefault_many(self, keys, factory):
+        # 批量查找键，不存在时用factory(下标)创建，每个键只进入一次对应桶的锁
+        # 返回(值列表, 是否新建的列表)，两个列表与keys一一对应
+        values = []
+        created = []
+        buckets = self.buckets
+        locks = self.locks
+        num_buckets = self.num_buckets
+        for position, key in enumerate(keys):
+            bucket_index = hash(key) % num_buckets
+            with locks[bucket_index]:
+                bucket = buckets[bucket_index]
+                value = bucket.get(key)
+                if value is None:
+                    value = bucket[key] = factory(position)
+                    created.append(True)
+                else:
+                    created.append(False)
+            values.append(value)
+        return values, created
+
+    def keys(self):
+        return [key for key, _ in self.items()]
+
+    def values(self):
+        return [value for _, value in self.items()]
@@ -0,0 +1,77 @@
+class DisjointSet:
+    def __init__(self):
+        """
+        初始化并查集：按集合大小合并并压缩路径，同时维护每个集合的成员列表、总权重和排序键最小的成员。
+        """
+        self.parent = {}  # 键为元素，值为父元素
+        self.members = {}  # 键为根元素，值为集合中的元素列表
+        self.totals = {}  # 键为根元素，值为集合中所有元素的权重之和
+        self.leaders = {}  # 键为根元素，值为集合中最小的排序键(-权重, 元素)
+
+    def __len__(self):
+        return len(self.members)
+
+    def __contains__(self, key):
+        return key in self.parent
+
+    def add(self, key, weight=0):
+        """
+        添加一个单元素集合，元素已存在时忽略。
+        :param key: 元素
+        :param weight: 元素的初始权重
+        """
+        if key in self.parent:
+            return
+        self.parent[key] = key
+        self.members[key] = [key]
+        self.totals[key] = weight
+        self.leaders[key] = (-weight, key)
+
+    def find(self, key):
+        """
+        查找元素所在集合的根元素。
+        :param key: 元素
+        :return: 根元素
+        """
+        root = key
+        while self.parent[root] != root:
+            root = self.parent[root]
+        # 路径压缩
+        while self.parent[key] != root:
+            self.parent[key], key = root, self.parent[key]
+        return root
+
+    def union(self, key1, key2):
+        """
+        合并两个元素所在的集合，成员较少的集合并入较多的集合。
+        :return: 发生合并时返回True
+        """
+        root1 = self.find(key1)
+        root2 = self.find(key2)
+        if root1 == root2:
+            return False
+        if len(self.members[root1]) < len(self.members[root2]):
+            root1, root2 = root2, root1
+        self.parent[root2] = root1
+        self.members[root1].extend(self.members.pop(root2))
+        self.totals[root1] += self.totals.pop(root2)
+        self.leaders[root1] = min(self.leaders[root1], self.leaders.pop(root2))
+        return True
+
+    def add_weight(self, key, delta, weight):
+        """
+        元素的权重增加后更新所在集合的总权重和排序键。
+        :param key: 元素
+        :param delta: 权重增量
+        :param weight: 元素增加后的权重
+        """
+        root = self.find(key)
+        self.totals[root] += delta
+        self.leaders[root] = min(self.leaders[root], (-weight, key))
+
+    def groups(self):
+        """
+        按排序键返回所有集合。
+        :return: 列表，元素为(排序键, 成员列表, 总权重)
+        """
+        return sorted((self.leaders[root], members, self.totals[root]) for root, members in self.members.items())
@@ -0,0 +1,101 @@
+import heapq
+
+class IndexedHeap:
+    def __init__(self):
+        """
+        初始化带索引的最小堆，堆中每个键只保留一项，堆项为(优先级, 键)。
+        通过位置索引原地更新优先级，更新和删除都是O(log n)。
+        """
+        self.heap = []  # 堆数组，元素为(优先级, 键)
+        self.positions = {}  # 键为堆中的键，值为它在堆数组中的下标
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, key):
+        return key in self.positions
+
+    def update(self, key, priority):
+        """
+        插入一个键，或原地更新已有键的优先级。
+        :param key: 键
+        :param priority: 优先级，越小越靠前
+        """
+        position = self.positions.get(key)
+        if position is None:
+            self.heap.append((priority, key))
+            self.positions[key] = len(self.heap) - 1
+            self.sift_up(len(self.heap) - 1)
+            return
+        old_priority = self.heap[position][0]
+        self.heap[position] = (priority, key)
+        if (priority, key) < (old_priority, key):
+            self.sift_up(position)
+        else:
+            self.sift_down(position)
+
+    def remove(self, key):
+        """
+        删除一个键，键不存在时忽略。
+        :param key: 键
+        """
+        position = self.positions.pop(key, None)
+        if position is None:
+            return
+        last = self.heap.pop()
+        if position < len(self.heap):
+            self.heap[position] = last
+            self.positions[last[1]] = position
+            self.sift_up(position)
+            self.sift_down(self.positions[last[1]])
+
+    def smallest(self, k=None, limit=None):
+        """
+        按优先级升序返回前k项，沿堆的树结构扩展候选项，复杂度为O(k log k)，不修改堆。
+        :param k: 最多返回的项数，None表示不限制
+        :param limit: 优先级上限，超过该值的项不再返回，None表示不限制
+        :return: 列表，元素为(优先级, 键)
+        """
+        heap = self.heap
+        result = []
+        candidates = [(heap[0], 0)] if heap else []
+        while candidates and (k is None or len(result) < k):
+            item, position = heapq.heappop(candidates)
+            if limit is not None and item[0] > limit:
+                break
+            result.append(item)
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(heap):
+                    heapq.heappush(candidates, (heap[child], child))
+        return result
+
+    def sift_up(self, position):
+        heap = self.heap
+        item = heap[position]
+        while position > 0:
+            parent = (position - 1) >> 1
+            if heap[parent] <= item:
+                break
+            heap[position] = heap[parent]
+            self.positions[heap[position][1]] = position
+            position = parent
+        heap[position] = item
+        self.positions[item[1]] = position
+
+    def sift_down(self, position):
+        heap = self.heap
+        size = len(heap)
+        item = heap[position]
+        while True:
+            child = 2 * position + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if item <= heap[child]:
+                break
+            heap[position] = heap[child]
+            self.positions[heap[position][1]] = position
+            position = child
+        heap[position] = item
+        self.positions[item[1]] = position
@@ -1,30 +1,75 @@
 import logging
 import grpc
+import asyncio
+import argparse
 from concurrent import futures
 import sql_info_pb2
 import sql_info_pb2_grpc
 from core.analyze.graph import Graph  # 导入Graph类
+from core.analyze.densegraph import DenseGraph
+from core.analyze.shardedgraph import ShardedGraph
+from core.analyze.partitionedgraph import PartitionedGraph
+from core.analyze.evictor import EdgeEvictor, CLOCK, EVICTION_POLICIES
+from core.analyze.snapshot import Snapshotter, list_snapshots
+from core.analyze.view import ViewRefresher
+from core.ingest.batcher import AsyncBatcher
+from core.ingest.ingestqueue import IngestQueue, BLOCK, POLICIES
+from core.ingest.coalescer import Coalescer
+from core.ingest.txnbuffer import TxnBuffer
+from core.ingest.wal import IngestLog
 import threading
-import time
 import queue
+import time
 import os
 
 class SQLInfoServicer(sql_info_pb2_grpc.SQLInfoServiceServicer):
-    def __init__(self, graph, queue_count=10, workers_per_queue=2):
+    def __init__(self, graph, queue_count=10, workers_per_queue=2, save_interval=60,
+                 queue_capacity=0, overload_policy=BLOCK, stats_interval=0,
+                 coalesce_window=0, coalesce_max_pending=10000,
+                 txn_timeout=0, txn_max_regions=1024, txn_max_open=100000, ingest_log=None, max_saves=10,
+                 snapshot_max_age=0, view_interval=0):
         """
         初始化服务类。
         :param graph: Graph对象，用于存储和更新图结构
         :param queue_count: 队列的数量
         :param workers_per_queue: 每个队列对应的线程数
+        :param save_interval: 定时保存的间隔时间（秒），小于等于0时不启动定时保存
+        :param queue_capacity: 每个队列最多积压的事务数，小于等于0表示不限制
+        :param overload_policy: 队列满时的处理策略，取值为block、reject或shed
+        :param stats_interval: 打印队列统计信息的间隔时间（秒），小于等于0时不打印
+        :param coalesce_window: 工作线程合并相同事务的窗口时长（秒），小于等于0时不合并
+        :param coalesce_max_pending: 合并窗口内最多保留的不同事务数量
+        :param txn_timeout: 按txn_id合并语句时事务的空闲超时时间（秒），小于等于0时每条语句单独作为一个事务
+        :param txn_max_regions: 单个事务最多缓存的不同region数量
+        :param txn_max_open: 最多同时缓存的事务数量
+        :param ingest_log: 图挂载的IngestLog对象，定时快照保存成功后删除已包含在快照中的日志段
+        :param max_saves: 快照目录中最多保留的快照数量
+        :param snapshot_max_age: 快照的最长保留时间（秒），0表示不按时间删除
+        :param view_interval: 查询使用的物化视图的刷新间隔时间（秒），小于等于0时不提供查询
         """
         self.graph = graph
+        self.ingest_log = ingest_log
         self.queue_count = queue_count
         self.workers_per_queue = workers_per_queue
-        self.task_queues = [queue.Queue() for _ in range(self.queue_count)]
+        self.task_queues = [IngestQueue(queue_capacity, overload_policy) for _ in range(self.queue_count)]
+        self.coalesce_window = coalesce_window
+        self.coalesce_max_pending = coalesce_max_pending
+        self.coalescers = []  # 各工作线程的合并器，用于统计
+        self.txn_buffer = None
+        self.txn_shed_count = 0  # 事务缓冲区输出后因队列满被丢弃的事务数量
+        self.txn_shed_lock = threading.Lock()
+        self.snapshotter = None
+        self.view_refresher = ViewRefresher(graph, view_interval).start() if view_interval > 0 else None
+        if txn_timeout > 0:
+            self.txn_buffer = TxnBuffer(txn_timeout, txn_max_regions, txn_max_open)
+            self.start_txn_expirer(interval=min(txn_timeout / 2, 1))
         # 启动定时保存任务
-        self.start_auto_save(interval=60, max_saves=10)  # 60秒保存一次，最多保存10个文件
+        if save_interval > 0:
+            self.start_auto_save(interval=save_interval, max_saves=max_saves, max_age=snapshot_max_age)
         # 启动工作线程池
         self.start_worker_pool()
+        if stats_interval > 0:
+            self.start_stats_reporter(stats_interval)
 
     def SendSQLInfo(self, request, context):
         """
@@ -34,40 +79,163 @@ class SQLInfoServicer(sql_info_pb2_grpc.SQLInfoServiceServicer):
         :return: SQLInfoResponse对象，表示处理结果
         """
         logging.info(f"Received SQL: {request.region_ids}")
-        # 计算哈希值，这里使用region_ids的哈希值
-        hash_value = hash(tuple(request.region_ids)) % self.queue_count
-        # 将任务放入对应的队列
-        self.task_queues[hash_value].put(request.region_ids)
+        if self.txn_buffer:
+            # 按txn_id缓存，事务结束时才放入队列；语句已被缓冲区接收，不再因队列满让客户端重试
+            self.dispatch_buffered(self.txn_buffer.add(request.txn_id, request.region_ids))
+        else:
+            # 计算哈希值，这里使用region_ids的哈希值
+            hash_value = hash(tuple(request.region_ids)) % self.queue_count
+            # 将任务放入对应的队列
+            if not self.task_queues[hash_value].offer([request.region_ids]):
+                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Ingest queue is full, retry later")
         # 返回成功响应
-        return sql_info_pb2.SQLInfoResponse(success=True)
+        return sql_info_pb2.SQLInfoResponse(success=True, accepted=1)
 
-    def start_auto_save(self, interval, max_saves=10):
+    def SendSQLInfoBatch(self, request_iterator, context):
         """
-        启动定时保存任务。
-        :param interval: 保存间隔时间（秒）
-        :param max_saves: 最大保存文件数量
+        处理客户端流式发送的批量SQL信息，每个批次按队列分组后整批放入队列。
+        :param request_iterator: SQLInfoBatchRequest对象的迭代器
+        :param context: gRPC上下文
+        :return: SQLInfoResponse对象，accepted为本次流中接收的语句数量
+        """
+        accepted = 0
+        for batch_request in request_iterator:
+            if self.txn_buffer:
+                batch = []
+                for info in batch_request.infos:
+                    batch.extend(self.txn_buffer.add(info.txn_id, info.region_ids))
+                # 语句都已进入事务缓冲区，被拒绝的是缓冲区输出的事务，按丢弃处理，不让客户端重复发送
+                self.dispatch_buffered(batch)
+                accepted += len(batch_request.infos)
+                continue
+            # 每条语句单独作为一个事务，被拒绝的事务数量即被拒绝的语句数量
+            rejected = self.dispatch_batch([info.region_ids for info in batch_request.infos])
+            accepted += len(batch_request.infos) - rejected
+            if rejected:
+                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED,
+                              f"Ingest queue is full, {accepted} statements accepted before rejection")
+        logging.debug(f"Received SQL batch stream: {accepted} statements")
+        return sql_info_pb2.SQLInfoResponse(success=True, accepted=accepted)
+
+    def current_view(self, context):
+        """
+        获取查询使用的物化视图，未开启时中止请求。
+        :param context: gRPC上下文
+        :return: MaterializedView对象
+        """
+        view = self.view_refresher.current() if self.view_refresher else None
+        if view is None:
+            context.abort(grpc.StatusCode.UNAVAILABLE, "Query view is not enabled")
+        return view
+
+    def GetTopHotRegions(self, request, context):
+        """
+        从物化视图中查询点权最高的region，不访问正在写入的图。
+        :param request: TopHotRegionsRequest对象，k为0时返回所有超过阈值的region
+        :param context: gRPC上下文
+        :return: TopHotRegionsResponse对象
+        """
+        return top_hot_regions_response(self.current_view(context), request.k)
+
+    def GetHotClumps(self, request, context):
+        """
+        从物化视图中查询热点闭包。
+        :param request: HotClumpsRequest对象，limit为0时返回所有闭包
+        :param context: gRPC上下文
+        :return: HotClumpsResponse对象
+        """
+        return hot_clumps_response(self.current_view(context), request.edge_thresh, request.limit)
+
+    def GetGraphStats(self, request, context):
+        """
+        查询物化视图中图的规模。
+        :param request: GraphStatsRequest对象
+        :param context: gRPC上下文
+        :return: GraphStatsResponse对象
+        """
+        return graph_stats_response(self.current_view(context), self.view_refresher)
+
+    def dispatch_batch(self, batch):
+        """
+        将一批事务按region_ids的哈希值分组，每个队列只放入一次。
+        :param batch: 事务列表，每一项是一个regionID列表
+        :return: 因队列满被拒绝的事务数量
+        """
+        grouped = {}
+        for region_ids in batch:
+            region_ids = tuple(region_ids)
+            grouped.setdefault(hash(region_ids) % self.queue_count, []).append(region_ids)
+        rejected = 0
+        for queue_index, region_ids_list in grouped.items():
+            if not self.task_queues[queue_index].offer(region_ids_list):
+                rejected += len(region_ids_list)
+        return rejected
+
+    def dispatch_buffered(self, batch):
+        """
+        把事务缓冲区输出的事务放入队列。这些事务包含的语句已经应答给客户端，
+        因队列满被拒绝时按shed处理：记录丢弃数量，不让当前请求失败，避免客户端重试已缓存的语句导致重复计数。
+        :param batch: 事务缓冲区输出的事务列表
         """
-        def save_graph_periodically():
-            saves = []  # 用于记录保存的文件名
+        rejected = self.dispatch_batch(batch)
+        if rejected:
+            with self.txn_shed_lock:
+                self.txn_shed_count += rejected
+            logging.warning(f"Ingest queue is full, shed {rejected} buffered transactions")
+
+    def get_ingest_stats(self):
+        """
+        获取所有队列的统计信息。
+        :return: 字典，包含各队列深度和积压事务数、总丢弃数量、总拒绝数量、各队列采样率以及合并、事务缓冲和快照等统计
+        """
+        queue_stats = [task_queue.get_stats() for task_queue in self.task_queues]
+        return {
+            "queue_depths": [stats["depth"] for stats in queue_stats],
+            "queue_pending": [stats["pending"] for stats in queue_stats],
+            "dropped": sum(stats["dropped"] for stats in queue_stats),
+            "rejected": sum(stats["rejected"] for stats in queue_stats),
+            "sample_rates": [stats["sample_rate"] for stats in queue_stats],
+            "coalesced_input": sum(coalescer.input_count for coalescer in self.coalescers),
+            "coalesced_output": sum(coalescer.output_count for coalescer in self.coalescers),
+            "txn_buffer": self.txn_buffer.get_stats() if self.txn_buffer else None,
+            "txn_shed": self.txn_shed_count,
+            "snapshot": self.snapshotter.get_stats() if self.snapshotter else None,
+            "ingest_log": self.ingest_log.get_stats() if self.ingest_log else None,
+            "view": self.view_refresher.get_stats() if self.view_refresher else None,
+        }
+
+    def start_txn_expirer(self, interval):
+        """
+        启动定时输出空闲超时事务的任务。
+        :param interval: 检查间隔时间（秒）
+        """
+        def expire_txns_periodically():
+            while True:
+                time.sleep(interval)
+                self.dispatch_buffered(self.txn_buffer.expire())
+
+        threading.Thread(target=expire_txns_periodically, daemon=True).start()
+
+    def start_stats_reporter(self, interval):
+        """
+        启动定时打印队列统计信息的任务。
+        :param interval: 打印间隔时间（秒）
+        """
+        def report_stats_periodically():
             while True:
-                # 生成文件名，包含当前时间戳
-                timestamp = int(time.time())
-                filename = f"history/graph_{timestamp}.pkl"
-                # 保存Graph对象
-                self.graph.save(filename)
-                logging.info(f"Graph saved to {filename}")
-                # 将文件名加入保存列表
-                saves.append(filename)
-                # 如果超过最大保存数量，删除最旧的文件
-                if len(saves) > max_saves:
-                    oldest_file = saves.pop(0)
-                    os.remove(oldest_file)
-                    logging.info(f"Removed old file: {oldest_file}")
-                # 等待指定间隔时间
                 time.sleep(interval)
+                logging.info(f"Ingest stats: {self.get_ingest_stats()}")
 
-        # 启动一个后台线程执行定时保存任务
-        threading.Thread(target=save_graph_periodically, daemon=True).start()
+        threading.Thread(target=report_stats_periodically, daemon=True).start()
+
+    def start_auto_save(self, interval, max_saves=10, max_age=0):
+        """
+        启动定时保存任务。
+        :param interval: 保存间隔时间（秒）
+        :param max_saves: 最大保存文件数量
+        :param max_age: 快照的最长保留时间（秒），0表示不按时间删除
+        """
+        self.snapshotter = start_auto_save(self.graph, interval, max_saves, self.ingest_log, max_age)
 
     def start_worker_pool(self):
         """
@@ -76,21 +244,273 @@ class SQLInfoServicer(sql_info_pb2_grpc.SQLInfoServiceServicer):
         def worker(thread_id):
             queue_index = thread_id % self.queue_count
             while True:
-                # 从指定的队列中取出任务
-                region_ids = self.task_queues[queue_index].get()
-                if region_ids is None:
+                # 从指定的队列中取出任务，每个任务是一批事务及其权重
+                item = self.task_queues[queue_index].get()
+                if item is None:
                     self.task_queues[queue_index].task_done()
                     break
                 # 执行任务
-                self.graph.add_transaction(region_ids)
+                batch, weights = item
+                self.graph.add_transactions(batch, weights)
                 # 标记任务完成
                 self.task_queues[queue_index].task_done()
 
+        def coalescing_worker(thread_id, coalescer):
+            task_queue = self.task_queues[thread_id % self.queue_count]
+            unfinished = 0  # 已放入合并器、尚未写入Graph的任务数量
+            while True:
+                try:
+                    item = task_queue.get(timeout=coalescer.time_until_flush())
+                except queue.Empty:
+                    item = ()
+                if item is None:
+                    unfinished += 1
+                elif item:
+                    coalescer.add(*item)
+                    unfinished += 1
+                # 窗口结束、合并数量达到上限或收到停止信号时写入Graph
+                if item is None or coalescer.should_flush():
+                    if coalescer.pending:
+                        batch, weights = coalescer.drain()
+                        self.graph.add_transactions(batch, weights)
+                    # 写入Graph后才标记任务完成，保证task_queue.join()返回时事务已生效
+                    task_queue.task_done(unfinished)
+                    unfinished = 0
+                if item is None:
+                    break
+
         # 启动工作线程
         for i in range(self.queue_count * self.workers_per_queue):
-            threading.Thread(target=worker, args=(i,), daemon=True).start()
+            if self.coalesce_window > 0:
+                coalescer = Coalescer(self.coalesce_window, self.coalesce_max_pending)
+                self.coalescers.append(coalescer)
+                threading.Thread(target=coalescing_worker, args=(i, coalescer), daemon=True).start()
+            else:
+                threading.Thread(target=worker, args=(i,), daemon=True).start()
+
+def start_auto_save(graph, interval, max_saves=10, ingest_log=None, max_age=0):
+    """
+    启动定时保存任务。Graph在冻结写入后fork子进程序列化，DenseGraph在锁内复制后序列化，
+    写入只在冻结或复制期间暂停，不再等待整个序列化过程。开启GRPC_ENABLE_FORK_SUPPORT时gRPC服务器不能安全fork，
+    Graph退回到序列化期间一直冻结写入的方式。快照以gzip流式压缩写入，
+    按目录中实际存在的快照执行保留策略。
+    :param graph: 需要保存的Graph对象
+    :param interval: 保存间隔时间（秒）
+    :param max_saves: 最大保存文件数量
+    :param ingest_log: 图挂载的IngestLog对象，快照保存成功后删除已包含在快照中的日志段
+    :param max_age: 快照的最长保留时间（秒），0表示不按时间删除
+    :return: Snapshotter对象
+    """
+    os.makedirs("history", exist_ok=True)
+    return Snapshotter(graph, interval=interval, max_saves=max_saves, directory="history",
+                       ingest_log=ingest_log, max_age=max_age).start()
+
+def recover_graph(graph, wal_directory, snapshot_directory="history"):
+    """
+    崩溃恢复：加载最新的快照（没有快照时使用传入的空图），再批量重放快照检查点之后的预写日志，
+    最后把日志挂载到图上，此后写入的事务都先追加到日志。
+    日志不支持滑动窗口：重放的事务会全部落入当前时间片，窗口统计不再准确。
+    :param graph: create_graph创建的空Graph对象，没有快照时使用
+    :param wal_directory: 预写日志所在目录
+    :param snapshot_directory: 快照文件所在目录
+    :return: (恢复后的Graph对象, IngestLog对象)
+    """
+    if not isinstance(graph, Graph):
+        raise ValueError("Ingest log is only supported by the default Graph backend")
+    snapshots = list_snapshots(snapshot_directory)
+    if snapshots:
+        # 快照中保存的图参数优先于命令行参数
+        graph = Graph.load(snapshots[-1])
+        logging.info(f"Loaded graph snapshot {snapshots[-1]}")
+    if graph.window is not None:
+        raise ValueError("Ingest log is not supported with a sliding window")
+    ingest_log = IngestLog(wal_directory)
+    start_time = time.time()
+    replayed = ingest_log.replay(graph, graph.ingest_checkpoint)
+    logging.info(f"Replayed {replayed} transactions from ingest log in {time.time() - start_time:.2f}s")
+    graph.attach_ingest_log(ingest_log)
+    return graph, ingest_log
 
-def serve(grpc_address, weight=10, theta=1, top_hot_threshold=0, queue_count=10, workers_per_queue=2):
+def view_info(view):
+    return sql_info_pb2.ViewInfo(version=view.version, age_seconds=view.age())
+
+def top_hot_regions_response(view, k):
+    """
+    由物化视图构建GetTopHotRegions的应答。
+    :param view: MaterializedView对象
+    :param k: 最多返回的region数量，0表示不限制
+    :return: TopHotRegionsResponse对象
+    """
+    regions = [sql_info_pb2.HotRegion(region_id=region_id, weight=weight)
+               for region_id, weight in view.get_top_hot_regions(k or None)]
+    return sql_info_pb2.TopHotRegionsResponse(view=view_info(view), regions=regions)
+
+def hot_clumps_response(view, edge_thresh, limit):
+    """
+    由物化视图构建GetHotClumps的应答。
+    :param view: MaterializedView对象
+    :param edge_thresh: 边权阈值
+    :param limit: 最多返回的闭包数量，0表示不限制
+    :return: HotClumpsResponse对象
+    """
+    region_ids, starts, hots = view.get_hot_components(edge_thresh)
+    count = min(limit, len(hots)) if limit > 0 else len(hots)
+    # 闭包内的regionID已按升序排列
+    clumps = [sql_info_pb2.HotClump(region_ids=region_ids[starts[index]:starts[index + 1]].tolist(),
+                                    hot=hots[index].item())
+              for index in range(count)]
+    return sql_info_pb2.HotClumpsResponse(view=view_info(view), clumps=clumps)
+
+def graph_stats_response(view, view_refresher):
+    """
+    由物化视图构建GetGraphStats的应答。
+    :param view: MaterializedView对象
+    :param view_refresher: 生成该视图的ViewRefresher对象
+    :return: GraphStatsResponse对象
+    """
+    stats = view.get_stats()
+    return sql_info_pb2.GraphStatsResponse(view=view_info(view), vertex_count=stats["vertices"],
+                                           edge_count=stats["edges"],
+                                           total_vertex_weight=stats["total_vertex_weight"],
+                                           refresh_seconds=view_refresher.last_duration)
+
+def start_edge_evictor(graph, max_edges, policy=CLOCK):
+    """
+    启动后台冷边淘汰任务，使边数保持在预算以内。
+    :param graph: Graph对象
+    :param max_edges: 边数预算
+    :param policy: 淘汰策略，取值为weight或clock
+    :return: EdgeEvictor对象
+    """
+    if not isinstance(graph, Graph):
+        raise ValueError("Edge eviction is only supported by the default Graph backend")
+    return EdgeEvictor(graph, max_edges, policy=policy).start()
+
+def enable_read_views(graph):
+    """
+    开启版本化读视图。
+    :param graph: Graph对象
+    """
+    if not isinstance(graph, Graph):
+        raise ValueError("Read views are only supported by the default Graph backend")
+    graph.enable_read_views()
+
+class AsyncSQLInfoServicer(sql_info_pb2_grpc.SQLInfoServiceServicer):
+    def __init__(self, batcher, txn_buffer=None, view_refresher=None):
+        """
+        初始化基于asyncio的服务类，请求直接在事件循环中交给批处理器。
+        :param batcher: AsyncBatcher对象，负责整批写入Graph
+        :param txn_buffer: TxnBuffer对象，不为None时按txn_id合并语句
+        :param view_refresher: ViewRefresher对象，为None时不提供查询
+        """
+        self.batcher = batcher
+        self.txn_buffer = txn_buffer
+        self.view_refresher = view_refresher
+        self.txn_shed_count = 0  # 事务缓冲区输出后因积压达到容量被丢弃的事务数量
+
+    async def SendSQLInfo(self, request, context):
+        """
+        处理接收到的SQL信息，放入批处理器后立即应答，批处理器积压达到容量时按策略处理。
+        :param request: SQLInfoRequest对象，包含SQL信息
+        :param context: gRPC上下文
+        :return: SQLInfoResponse对象，表示处理结果
+        """
+        if self.txn_buffer:
+            await self.dispatch_buffered(self.txn_buffer.add(request.txn_id, request.region_ids))
+        elif not await self.batcher.offer([request.region_ids]):
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Ingest queue is full, retry later")
+        return sql_info_pb2.SQLInfoResponse(success=True, accepted=1)
+
+    async def SendSQLInfoBatch(self, request_iterator, context):
+        """
+        处理客户端流式发送的批量SQL信息。
+        :param request_iterator: SQLInfoBatchRequest对象的异步迭代器
+        :param context: gRPC上下文
+        :return: SQLInfoResponse对象，accepted为本次流中接收的语句数量
+        """
+        accepted = 0
+        async for batch_request in request_iterator:
+            if self.txn_buffer:
+                batch = []
+                for info in batch_request.infos:
+                    batch.extend(self.txn_buffer.add(info.txn_id, info.region_ids))
+                await self.dispatch_buffered(batch)
+            elif not await self.batcher.offer([info.region_ids for info in batch_request.infos]):
+                await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED,
+                                    f"Ingest queue is full, {accepted} statements accepted before rejection")
+            accepted += len(batch_request.infos)
+        return sql_info_pb2.SQLInfoResponse(success=True, accepted=accepted)
+
+    async def dispatch_buffered(self, batch):
+        """
+        把事务缓冲区输出的事务交给批处理器，被拒绝时与线程池服务一样按shed处理，不让当前请求失败。
+        :param batch: 事务缓冲区输出的事务列表
+        """
+        if batch and not await self.batcher.offer(batch):
+            self.txn_shed_count += len(batch)
+            logging.warning(f"Ingest queue is full, shed {len(batch)} buffered transactions")
+
+    async def current_view(self, context):
+        """
+        获取查询使用的物化视图，未开启时中止请求。
+        """
+        view = self.view_refresher.current() if self.view_refresher else None
+        if view is None:
+            await context.abort(grpc.StatusCode.UNAVAILABLE, "Query view is not enabled")
+        return view
+
+    async def GetTopHotRegions(self, request, context):
+        return top_hot_regions_response(await self.current_view(context), request.k)
+
+    async def GetHotClumps(self, request, context):
+        return hot_clumps_response(await self.current_view(context), request.edge_thresh, request.limit)
+
+    async def GetGraphStats(self, request, context):
+        return graph_stats_response(await self.current_view(context), self.view_refresher)
+
+    async def expire_txns_periodically(self, interval):
+        """
+        定时把空闲超时的事务交给批处理器。
+        :param interval: 检查间隔时间（秒）
+        """
+        while True:
+            await asyncio.sleep(interval)
+            await self.dispatch_buffered(self.txn_buffer.expire())
+
+def create_graph(weight, theta, top_hot_threshold, shard_count=0, dense=False, partition_count=0, half_life=0,
+                 window_seconds=0, window_epochs=6, hyperedge_min_size=0):
+    """
+    创建服务端使用的图对象。
+    :param weight: 不同region之间的边权系数
+    :param theta: 相同region之间的边权系数
+    :param top_hot_threshold: 点权阈值
+    :param shard_count: 分片进程数量，大于0时使用多进程分片图
+    :param dense: 是否使用基于NumPy数组的DenseGraph
+    :param partition_count: 单写者分区线程数量，大于0时每个写线程独占一个分区
+    :param half_life: 点权和边权的半衰期（秒），小于等于0时不衰减，只对Graph和DenseGraph生效
+    :param window_seconds: 滑动窗口长度（秒），大于0时只保留最近窗口内的事务贡献，只对Graph生效
+    :param window_epochs: 滑动窗口中的时间片数量
+    :param hyperedge_min_size: 事务中不同region的数量不小于该值时保存为超边，只对Graph生效
+    :return: Graph、DenseGraph、ShardedGraph或PartitionedGraph对象
+    """
+    if window_seconds > 0 and (shard_count > 0 or partition_count > 0 or dense):
+        raise ValueError("Sliding window is only supported by the default Graph backend")
+    if hyperedge_min_size > 0 and (shard_count > 0 or partition_count > 0 or dense):
+        raise ValueError("Hyperedges are only supported by the default Graph backend")
+    if shard_count > 0:
+        return ShardedGraph(shard_count, weight=weight, theta=theta, top_hot_threshold=top_hot_threshold)
+    if partition_count > 0:
+        return PartitionedGraph(partition_count, weight=weight, theta=theta, top_hot_threshold=top_hot_threshold)
+    if dense:
+        return DenseGraph(weight=weight, theta=theta, top_hot_threshold=top_hot_threshold, half_life=half_life)
+    return Graph(weight=weight, theta=theta, top_hot_threshold=top_hot_threshold, half_life=half_life,
+                 window_seconds=window_seconds, window_epochs=window_epochs, hyperedge_min_size=hyperedge_min_size)
+
+def serve(grpc_address, weight=10, theta=1, top_hot_threshold=0, queue_count=10, workers_per_queue=2, save_interval=60, shard_count=0,
+          queue_capacity=0, overload_policy=BLOCK, coalesce_window=0, txn_timeout=0,
+          dense=False, partition_count=0, half_life=0, window_seconds=0, window_epochs=6, max_edges=0,
+          eviction_policy=CLOCK, hyperedge_min_size=0, wal_directory=None, max_saves=10, snapshot_max_age=0,
+          view_interval=0, read_views=False):
     """
     启动gRPC服务器。
     :param grpc_address: gRPC服务器地址
@@ -99,19 +519,116 @@ def serve(grpc_address, weight=10, theta=1, top_hot_threshold=0, queue_count=10,
     :param top_hot_threshold: 点权阈值，默认为0
     :param queue_count: 队列的数量
     :param workers_per_queue: 每个队列对应的线程数
+    :param save_interval: 定时保存的间隔时间（秒），小于等于0时不启动定时保存
+    :param shard_count: 分片进程数量，大于0时图的写入分散到多个进程
+    :param queue_capacity: 每个队列最多积压的事务数，小于等于0表示不限制
+    :param overload_policy: 队列满时的处理策略，取值为block、reject或shed
+    :param coalesce_window: 工作线程合并相同事务的窗口时长（秒），小于等于0时不合并
+    :param txn_timeout: 按txn_id合并语句时事务的空闲超时时间（秒），小于等于0时每条语句单独作为一个事务
+    :param dense: 是否使用基于NumPy数组的DenseGraph
+    :param partition_count: 单写者分区线程数量，大于0时每个写线程独占一个分区，写入路径不加锁
+    :param half_life: 点权和边权的半衰期（秒），小于等于0时不衰减
+    :param window_seconds: 滑动窗口长度（秒），大于0时热点闭包只统计最近窗口内的事务
+    :param window_epochs: 滑动窗口中的时间片数量
+    :param max_edges: 边数预算，大于0时在后台淘汰冷边
+    :param eviction_policy: 冷边淘汰策略，取值为weight或clock
+    :param hyperedge_min_size: 事务中不同region的数量不小于该值时保存为超边，0表示总是展开为两两之间的边
+    :param wal_directory: 预写日志所在目录，不为None时启动时从最新快照和日志恢复，并在写入前记录日志
+    :param max_saves: 快照目录中最多保留的快照数量
+    :param snapshot_max_age: 快照的最长保留时间（秒），0表示不按时间删除
+    :param view_interval: 查询使用的物化视图的刷新间隔时间（秒），小于等于0时不提供查询
+    :param read_views: 是否开启版本化读视图，开启后热点闭包和查询视图在增量发布的只读版本上计算，写入路径额外记录累加量
     """
-    graph = Graph(weight=weight, theta=theta, top_hot_threshold=top_hot_threshold)
+    graph = create_graph(weight, theta, top_hot_threshold, shard_count, dense, partition_count, half_life,
+                         window_seconds, window_epochs, hyperedge_min_size)
+    ingest_log = None
+    if wal_directory:
+        graph, ingest_log = recover_graph(graph, wal_directory)
+    if max_edges > 0:
+        start_edge_evictor(graph, max_edges, eviction_policy)
+    if read_views:
+        enable_read_views(graph)
     # 创建gRPC服务器
     server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
     # 注册服务
     sql_info_pb2_grpc.add_SQLInfoServiceServicer_to_server(
-        SQLInfoServicer(graph, queue_count, workers_per_queue), server)
+        SQLInfoServicer(graph, queue_count, workers_per_queue, save_interval,
+                        queue_capacity=queue_capacity, overload_policy=overload_policy, stats_interval=60,
+                        coalesce_window=coalesce_window, txn_timeout=txn_timeout, ingest_log=ingest_log,
+                        max_saves=max_saves, snapshot_max_age=snapshot_max_age, view_interval=view_interval), server)
     # 启动服务器
     server.add_insecure_port(grpc_address)
     logging.info(f"Server started on {grpc_address}")
     server.start()
     server.wait_for_termination()
 
+async def serve_async(grpc_address, weight=10, theta=1, top_hot_threshold=0, max_batch_size=256, save_interval=60, shard_count=0,
+                      queue_capacity=0, overload_policy=BLOCK, coalesce=False, txn_timeout=0, dense=False, partition_count=0, half_life=0,
+                      window_seconds=0, window_epochs=6, max_edges=0, eviction_policy=CLOCK, hyperedge_min_size=0,
+                      wal_directory=None, max_saves=10, snapshot_max_age=0, view_interval=0, read_views=False):
+    """
+    启动基于grpc.aio的gRPC服务器，请求在事件循环中接收并整批写入Graph。
+    :param grpc_address: gRPC服务器地址
+    :param weight: 不同region之间的边权系数，默认为10
+    :param theta: 相同region之间的边权系数，默认为1
+    :param top_hot_threshold: 点权阈值，默认为0
+    :param max_batch_size: 每次写入Graph的最大事务数量
+    :param save_interval: 定时保存的间隔时间（秒），小于等于0时不启动定时保存
+    :param shard_count: 分片进程数量，大于0时图的写入分散到多个进程
+    :param queue_capacity: 批处理器最多积压的事务数，小于等于0表示不限制
+    :param overload_policy: 积压达到容量时的处理策略，取值为block、reject或shed
+    :param coalesce: 是否在写入前合并同一批次中regionID集合相同的事务
+    :param txn_timeout: 按txn_id合并语句时事务的空闲超时时间（秒），小于等于0时每条语句单独作为一个事务
+    :param dense: 是否使用基于NumPy数组的DenseGraph
+    :param partition_count: 单写者分区线程数量，大于0时每个写线程独占一个分区，写入路径不加锁
+    :param half_life: 点权和边权的半衰期（秒），小于等于0时不衰减
+    :param window_seconds: 滑动窗口长度（秒），大于0时热点闭包只统计最近窗口内的事务
+    :param window_epochs: 滑动窗口中的时间片数量
+    :param max_edges: 边数预算，大于0时在后台淘汰冷边
+    :param eviction_policy: 冷边淘汰策略，取值为weight或clock
+    :param hyperedge_min_size: 事务中不同region的数量不小于该值时保存为超边，0表示总是展开为两两之间的边
+    :param wal_directory: 预写日志所在目录，不为None时启动时从最新快照和日志恢复，并在写入前记录日志
+    :param max_saves: 快照目录中最多保留的快照数量
+    :param snapshot_max_age: 快照的最长保留时间（秒），0表示不按时间删除
+    :param view_interval: 查询使用的物化视图的刷新间隔时间（秒），小于等于0时不提供查询
+    :param read_views: 是否开启版本化读视图，开启后热点闭包和查询视图在增量发布的只读版本上计算，写入路径额外记录累加量
+    """
+    graph = create_graph(weight, theta, top_hot_threshold, shard_count, dense, partition_count, half_life,
+                         window_seconds, window_epochs, hyperedge_min_size)
+    ingest_log = None
+    if wal_directory:
+        graph, ingest_log = recover_graph(graph, wal_directory)
+    if max_edges > 0:
+        start_edge_evictor(graph, max_edges, eviction_policy)
+    if read_views:
+        enable_read_views(graph)
+    batcher = AsyncBatcher(graph, max_batch_size=max_batch_size, coalesce=coalesce, capacity=queue_capacity,
+                           policy=overload_policy)
+    batcher.start()
+    if save_interval > 0:
+        start_auto_save(graph, interval=save_interval, max_saves=max_saves, ingest_log=ingest_log,
+                        max_age=snapshot_max_age)
+    # 创建gRPC服务器
+    server = grpc.aio.server()
+    # 注册服务
+    txn_buffer = TxnBuffer(txn_timeout) if txn_timeout > 0 else None
+    view_refresher = ViewRefresher(graph, view_interval).start() if view_interval > 0 else None
+    servicer = AsyncSQLInfoServicer(batcher, txn_buffer, view_refresher)
+    expirer = None
+    if txn_buffer:
+        expirer = asyncio.get_running_loop().create_task(servicer.expire_txns_periodically(min(txn_timeout / 2, 1)))
+    sql_info_pb2_grpc.add_SQLInfoServiceServicer_to_server(servicer, server)
+    # 启动服务器
+    server.add_insecure_port(grpc_address)
+    logging.info(f"Async server started on {grpc_address}")
+    await server.start()
+    try:
+        await server.wait_for_termination()
+    finally:
+        if expirer:
+            expirer.cancel()
+        await batcher.stop()
+
 if __name__ == "__main__":
     # 配置日志
     logging.basicConfig(level=logging.INFO)
@@ -119,5 +636,46 @@ if __name__ == "__main__":
     weight = 10  # 不同region之间的边权系数
     theta = 1  # 相同region之间的边权系数
     top_hot_threshold = 5  # 点权阈值，根据需要调整
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--address", default="[::]:50051", help="gRPC服务器地址")
+    parser.add_argument("--mode", choices=["thread", "async"], default="thread", help="服务器模式：线程池或asyncio")
+    parser.add_argument("--shards", type=int, default=0, help="分片进程数量，0表示在单个进程中写图")
+    parser.add_argument("--queue-capacity", type=int, default=0, help="每个队列最多积压的事务数，0表示不限制")
+    parser.add_argument("--overload-policy", choices=POLICIES, default=BLOCK, help="队列满时的处理策略")
+    parser.add_argument("--coalesce-window", type=float, default=0, help="合并相同事务的窗口时长（秒），0表示不合并")
+    parser.add_argument("--partitions", type=int, default=0, help="单写者分区线程数量，0表示所有工作线程共享加锁的图")
+    parser.add_argument("--half-life", type=float, default=0, help="点权和边权的半衰期（秒），0表示不衰减")
+    parser.add_argument("--window", type=float, default=0, help="滑动窗口长度（秒），0表示统计所有历史事务")
+    parser.add_argument("--window-epochs", type=int, default=6, help="滑动窗口中的时间片数量")
+    parser.add_argument("--max-edges", type=int, default=0, help="边数预算，0表示不淘汰冷边")
+    parser.add_argument("--eviction-policy", choices=EVICTION_POLICIES, default=CLOCK, help="冷边淘汰策略")
+    parser.add_argument("--hyperedge-min-size", type=int, default=0, help="不同region数不小于该值的事务保存为超边，0表示总是展开")
+    parser.add_argument("--save-interval", type=float, default=60, help="定时快照的间隔时间（秒），0表示不保存快照")
+    parser.add_argument("--max-saves", type=int, default=10, help="快照目录中最多保留的快照数量")
+    parser.add_argument("--snapshot-max-age", type=float, default=0, help="快照的最长保留时间（秒），0表示不按时间删除")
+    parser.add_argument("--view-interval", type=float, default=0, help="查询使用的物化视图的刷新间隔时间（秒），0表示不提供查询")
+    parser.add_argument("--read-views", action="store_true", help="开启版本化读视图，分析在增量发布的只读版本上计算")
+    parser.add_argument("--wal-dir", default=None, help="预写日志目录，设置后启动时从最新快照和日志恢复")
+    parser.add_argument("--dense", action="store_true", help="使用基于NumPy数组的DenseGraph存储图")
+    parser.add_argument("--txn-timeout", type=float, default=0, help="按txn_id合并语句时事务的空闲超时时间（秒），0表示不合并")
+    args = parser.parse_args()
     # 启动gRPC服务器
-    serve("[::]:50051", weight=weight, theta=theta, top_hot_threshold=top_hot_threshold, queue_count=10, workers_per_queue=2)
\ No newline at end of file
+    if args.mode == "async":
+        asyncio.run(serve_async(args.address, weight=weight, theta=theta, top_hot_threshold=top_hot_threshold,
+                                shard_count=args.shards, queue_capacity=args.queue_capacity,
+                                overload_policy=args.overload_policy, coalesce=args.coalesce_window > 0, txn_timeout=args.txn_timeout,
+                                dense=args.dense, partition_count=args.partitions, half_life=args.half_life,
+                                window_seconds=args.window, window_epochs=args.window_epochs, max_edges=args.max_edges,
+                                eviction_policy=args.eviction_policy, hyperedge_min_size=args.hyperedge_min_size,
+                                wal_directory=args.wal_dir, save_interval=args.save_interval,
+                                max_saves=args.max_saves, snapshot_max_age=args.snapshot_max_age,
+                                view_interval=args.view_interval, read_views=args.read_views))
+    else:
+        serve(args.address, weight=weight, theta=theta, top_hot_threshold=top_hot_threshold, queue_count=10, workers_per_queue=2,
+              shard_count=args.shards, queue_capacity=args.queue_capacity, overload_policy=args.overload_policy,
+              coalesce_window=args.coalesce_window, txn_timeout=args.txn_timeout, dense=args.dense,
+              partition_count=args.partitions, half_life=args.half_life, window_seconds=args.window,
+              window_epochs=args.window_epochs, max_edges=args.max_edges, eviction_policy=args.eviction_policy,
+              hyperedge_min_size=args.hyperedge_min_size, wal_directory=args.wal_dir, save_interval=args.save_interval,
+              max_saves=args.max_saves, snapshot_max_age=args.snapshot_max_age, view_interval=args.view_interval,
+              read_views=args.read_views)
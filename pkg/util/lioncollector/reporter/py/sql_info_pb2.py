@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0esql_info.proto\x12\x02pb\"T\n\x0eSQLInfoRequest\x12\x10\n\x08sql_text\x18\x01 \x01(\t\x12\x0e\n\x06txn_id\x18\x02 \x01(\x05\x12\x0c\n\x04keys\x18\x03 \x03(\x05\x12\x12\n\nregion_ids\x18\x04 \x03(\x05\"\"\n\x0fSQLInfoResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x32H\n\x0eSQLInfoService\x12\x36\n\x0bSendSQLInfo\x12\x12.pb.SQLInfoRequest\x1a\x13.pb.SQLInfoResponseB\x06Z\x04./pbb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0esql_info.proto\x12\x02pb\"T\n\x0eSQLInfoRequest\x12\x10\n\x08sql_text\x18\x01 \x01(\t\x12\x0e\n\x06txn_id\x18\x02 \x01(\x05\x12\x0c\n\x04keys\x18\x03 \x03(\x05\x12\x12\n\nregion_ids\x18\x04 \x03(\x05\"8\n\x13SQLInfoBatchRequest\x12!\n\x05infos\x18\x01 \x03(\x0b\x32\x12.pb.SQLInfoRequest\"4\n\x0fSQLInfoResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x10\n\x08\x61\x63\x63\x65pted\x18\x02 \x01(\x03\"0\n\x08ViewInfo\x12\x0f\n\x07version\x18\x01 \x01(\x03\x12\x13\n\x0b\x61ge_seconds\x18\x02 \x01(\x01\"!\n\x14TopHotRegionsRequest\x12\t\n\x01k\x18\x01 \x01(\x05\".\n\tHotRegion\x12\x11\n\tregion_id\x18\x01 \x01(\x03\x12\x0e\n\x06weight\x18\x02 \x01(\x01\"S\n\x15TopHotRegionsResponse\x12\x1a\n\x04view\x18\x01 \x01(\x0b\x32\x0c.pb.ViewInfo\x12\x1e\n\x07regions\x18\x02 \x03(\x0b\x32\r.pb.HotRegion\"6\n\x10HotClumpsRequest\x12\x13\n\x0b\x65\x64ge_thresh\x18\x01 \x01(\x01\x12\r\n\x05limit\x18\x02 \x01(\x05\"+\n\x08HotClump\x12\x12\n\nregion_ids\x18\x01 \x03(\x03\x12\x0b\n\x03hot\x18\x02 \x01(\x01\"M\n\x11HotClumpsResponse\x12\x1a\n\x04view\x18\x01 \x01(\x0b\x32\x0c.pb.ViewInfo\x12\x1c\n\x06\x63lumps\x18\x02 \x03(\x0b\x32\x0c.pb.HotClump\"\x13\n\x11GraphStatsRequest\"\x90\x01\n\x12GraphStatsResponse\x12\x1a\n\x04view\x18\x01 \x01(\x0b\x32\x0c.pb.ViewInfo\x12\x14\n\x0cvertex_count\x18\x02 \x01(\x03\x12\x12\n\nedge_count\x18\x03 \x01(\x03\x12\x1b\n\x13total_vertex_weight\x18\x04 \x01(\x01\x12\x17\n\x0frefresh_seconds\x18\x05 \x01(\x01\x32\xd2\x02\n\x0eSQLInfoService\x12\x36\n\x0bSendSQLInfo\x12\x12.pb.SQLInfoRequest\x1a\x13.pb.SQLInfoResponse\x12\x42\n\x10SendSQLInfoBatch\x12\x17.pb.SQLInfoBatchRequest\x1a\x13.pb.SQLInfoResponse(\x01\x12G\n\x10GetTopHotRegions\x12\x18.pb.TopHotRegionsRequest\x1a\x19.pb.TopHotRegionsResponse\x12;\n\x0cGetHotClumps\x12\x14.pb.HotClumpsRequest\x1a\x15.pb.HotClumpsResponse\x12>\n\rGetGraphStats\x12\x15.pb.GraphStatsRequest\x1a\x16.pb.GraphStatsResponseB\x06Z\x04./pbb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -34,8 +34,28 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['DESCRIPTOR']._serialized_options = b'Z\004./pb'
   _globals['_SQLINFOREQUEST']._serialized_start=22
   _globals['_SQLINFOREQUEST']._serialized_end=106
-  _globals['_SQLINFORESPONSE']._serialized_start=108
-  _globals['_SQLINFORESPONSE']._serialized_end=142
-  _globals['_SQLINFOSERVICE']._serialized_start=144
-  _globals['_SQLINFOSERVICE']._serialized_end=216
+  _globals['_SQLINFOBATCHREQUEST']._serialized_start=108
+  _globals['_SQLINFOBATCHREQUEST']._serialized_end=164
+  _globals['_SQLINFORESPONSE']._serialized_start=166
+  _globals['_SQLINFORESPONSE']._serialized_end=218
+  _globals['_VIEWINFO']._serialized_start=220
+  _globals['_VIEWINFO']._serialized_end=268
+  _globals['_TOPHOTREGIONSREQUEST']._serialized_start=270
+  _globals['_TOPHOTREGIONSREQUEST']._serialized_end=303
+  _globals['_HOTREGION']._serialized_start=305
+  _globals['_HOTREGION']._serialized_end=351
+  _globals['_TOPHOTREGIONSRESPONSE']._serialized_start=353
+  _globals['_TOPHOTREGIONSRESPONSE']._serialized_end=436
+  _globals['_HOTCLUMPSREQUEST']._serialized_start=438
+  _globals['_HOTCLUMPSREQUEST']._serialized_end=492
+  _globals['_HOTCLUMP']._serialized_start=494
+  _globals['_HOTCLUMP']._serialized_end=537
+  _globals['_HOTCLUMPSRESPONSE']._serialized_start=539
+  _globals['_HOTCLUMPSRESPONSE']._serialized_end=616
+  _globals['_GRAPHSTATSREQUEST']._serialized_start=618
+  _globals['_GRAPHSTATSREQUEST']._serialized_end=637
+  _globals['_GRAPHSTATSRESPONSE']._serialized_start=640
+  _globals['_GRAPHSTATSRESPONSE']._serialized_end=784
+  _globals['_SQLINFOSERVICE']._serialized_start=787
+  _globals['_SQLINFOSERVICE']._serialized_end=1125
 # @@protoc_insertion_point(module_scope)
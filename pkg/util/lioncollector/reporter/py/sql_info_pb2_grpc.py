@@ -39,6 +39,26 @@ class SQLInfoServiceStub(object):
                 request_serializer=sql__info__pb2.SQLInfoRequest.SerializeToString,
                 response_deserializer=sql__info__pb2.SQLInfoResponse.FromString,
                 _registered_method=True)
+        self.SendSQLInfoBatch = channel.stream_unary(
+                '/pb.SQLInfoService/SendSQLInfoBatch',
+                request_serializer=sql__info__pb2.SQLInfoBatchRequest.SerializeToString,
+                response_deserializer=sql__info__pb2.SQLInfoResponse.FromString,
+                _registered_method=True)
+        self.GetTopHotRegions = channel.unary_unary(
+                '/pb.SQLInfoService/GetTopHotRegions',
+                request_serializer=sql__info__pb2.TopHotRegionsRequest.SerializeToString,
+                response_deserializer=sql__info__pb2.TopHotRegionsResponse.FromString,
+                _registered_method=True)
+        self.GetHotClumps = channel.unary_unary(
+                '/pb.SQLInfoService/GetHotClumps',
+                request_serializer=sql__info__pb2.HotClumpsRequest.SerializeToString,
+                response_deserializer=sql__info__pb2.HotClumpsResponse.FromString,
+                _registered_method=True)
+        self.GetGraphStats = channel.unary_unary(
+                '/pb.SQLInfoService/GetGraphStats',
+                request_serializer=sql__info__pb2.GraphStatsRequest.SerializeToString,
+                response_deserializer=sql__info__pb2.GraphStatsResponse.FromString,
+                _registered_method=True)
 
 
 class SQLInfoServiceServicer(object):
@@ -50,6 +70,30 @@ class SQLInfoServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def SendSQLInfoBatch(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetTopHotRegions(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetHotClumps(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetGraphStats(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_SQLInfoServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -58,6 +102,26 @@ def add_SQLInfoServiceServicer_to_server(servicer, server):
                     request_deserializer=sql__info__pb2.SQLInfoRequest.FromString,
                     response_serializer=sql__info__pb2.SQLInfoResponse.SerializeToString,
             ),
+            'SendSQLInfoBatch': grpc.stream_unary_rpc_method_handler(
+                    servicer.SendSQLInfoBatch,
+                    request_deserializer=sql__info__pb2.SQLInfoBatchRequest.FromString,
+                    response_serializer=sql__info__pb2.SQLInfoResponse.SerializeToString,
+            ),
+            'GetTopHotRegions': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetTopHotRegions,
+                    request_deserializer=sql__info__pb2.TopHotRegionsRequest.FromString,
+                    response_serializer=sql__info__pb2.TopHotRegionsResponse.SerializeToString,
+            ),
+            'GetHotClumps': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetHotClumps,
+                    request_deserializer=sql__info__pb2.HotClumpsRequest.FromString,
+                    response_serializer=sql__info__pb2.HotClumpsResponse.SerializeToString,
+            ),
+            'GetGraphStats': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetGraphStats,
+                    request_deserializer=sql__info__pb2.GraphStatsRequest.FromString,
+                    response_serializer=sql__info__pb2.GraphStatsResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'pb.SQLInfoService', rpc_method_handlers)
@@ -95,3 +159,111 @@ class SQLInfoService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def SendSQLInfoBatch(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            '/pb.SQLInfoService/SendSQLInfoBatch',
+            sql__info__pb2.SQLInfoBatchRequest.SerializeToString,
+            sql__info__pb2.SQLInfoResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetTopHotRegions(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/pb.SQLInfoService/GetTopHotRegions',
+            sql__info__pb2.TopHotRegionsRequest.SerializeToString,
+            sql__info__pb2.TopHotRegionsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetHotClumps(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/pb.SQLInfoService/GetHotClumps',
+            sql__info__pb2.HotClumpsRequest.SerializeToString,
+            sql__info__pb2.HotClumpsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetGraphStats(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/pb.SQLInfoService/GetGraphStats',
+            sql__info__pb2.GraphStatsRequest.SerializeToString,
+            sql__info__pb2.GraphStatsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
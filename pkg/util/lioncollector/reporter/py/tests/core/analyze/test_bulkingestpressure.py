@@ -0,0 +1,66 @@
+import sys
+import os
+import random
+import time
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.analyze.graph import Graph
+
+# Constants
+NUM_TRANSACTIONS = 100000  # 总事务数量
+MAX_REGION_ID = 20000      # 最大region ID
+MIN_REGIONS = 1            # 事务中最小region数量
+MAX_REGIONS = 5            # 事务中最大region数量
+BATCH_SIZES = [4, 16, 64, 256, 10000, NUM_TRANSACTIONS]  # add_transactions每次提交的事务数量
+
+
+class TestBulkIngestPerformance:
+    def __init__(self):
+        random.seed(0)
+        # 热点region被反复访问，重放时同一批次中会出现重复的顶点和边
+        hot_regions = list(range(1, MAX_REGION_ID // 20))
+        self.transactions = [
+            random.sample(hot_regions if random.random() < 0.8 else range(1, MAX_REGION_ID + 1),
+                          random.randint(MIN_REGIONS, MAX_REGIONS))
+            for _ in range(NUM_TRANSACTIONS)]
+        self.weights = [random.randint(1, 3) for _ in range(NUM_TRANSACTIONS)]
+
+    def run_single(self):
+        graph = Graph(weight=10, theta=1, top_hot_threshold=5)
+        start_time = time.time()
+        for region_ids, weight in zip(self.transactions, self.weights):
+            graph.add_transaction(region_ids, weight)
+        return graph, NUM_TRANSACTIONS / (time.time() - start_time)
+
+    def run_bulk(self, batch_size):
+        graph = Graph(weight=10, theta=1, top_hot_threshold=5)
+        start_time = time.time()
+        for start in range(0, NUM_TRANSACTIONS, batch_size):
+            graph.add_transactions(self.transactions[start:start + batch_size], self.weights[start:start + batch_size])
+        return graph, NUM_TRANSACTIONS / (time.time() - start_time)
+
+    @staticmethod
+    def snapshot(graph):
+        vertex_weights, edge_weights = graph.export_weights()
+        return vertex_weights, sorted((min(a, b), max(a, b), w) for a, b, w in edge_weights)
+
+    def run_performance_test(self):
+        print("Performance Test Parameters:")
+        print(f"  Total Transactions: {NUM_TRANSACTIONS}")
+        print(f"  Max Region ID: {MAX_REGION_ID}")
+        print(f"  Min Regions per Transaction: {MIN_REGIONS}")
+        print(f"  Max Regions per Transaction: {MAX_REGIONS}")
+        print("Starting performance test...")
+        graph, single_throughput = self.run_single()
+        expected = self.snapshot(graph)
+        print(f"  [add_transaction] Throughput: {single_throughput:.2f} transactions/second")
+        for batch_size in BATCH_SIZES:
+            graph, throughput = self.run_bulk(batch_size)
+            print(f"  [add_transactions, batch={batch_size}] Throughput: {throughput:.2f} transactions/second, "
+                  f"Speedup: {throughput / single_throughput:.2f}x, Same Result: {self.snapshot(graph) == expected}")
+
+if __name__ == '__main__':
+    tester = TestBulkIngestPerformance()
+    tester.run_performance_test()
@@ -0,0 +1,59 @@
+import sys
+import os
+import random
+import time
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.analyze.graph import Graph
+
+# Constants
+NUM_TRANSACTIONS = 100000  # 总事务数量
+MAX_REGION_ID = 20000      # 最大region ID
+MIN_REGIONS = 1            # 事务中最小region数量
+MAX_REGIONS = 5            # 事务中最大region数量
+EDGE_THRESH = 1            # 注册的边权阈值
+NUM_QUERIES = 5            # 查询次数
+
+
+class TestClumpIndexPerformance:
+    def __init__(self):
+        random.seed(0)
+        self.transactions = [
+            (random.sample(range(1, MAX_REGION_ID + 1), random.randint(MIN_REGIONS, MAX_REGIONS)), random.randint(1, 2))
+            for _ in range(NUM_TRANSACTIONS)]
+
+    def build(self, register):
+        graph = Graph(weight=1, theta=1, top_hot_threshold=5)
+        if register:
+            graph.register_clump_threshold(EDGE_THRESH)
+        start_time = time.time()
+        for regions, weight in self.transactions:
+            graph.add_transaction(regions, weight)
+        return graph, NUM_TRANSACTIONS / (time.time() - start_time)
+
+    def query(self, graph):
+        start_time = time.time()
+        for _ in range(NUM_QUERIES):
+            clumps = graph.get_hot_region(EDGE_THRESH)
+        return (time.time() - start_time) / NUM_QUERIES, clumps
+
+    def run_performance_test(self):
+        print("Performance Test Parameters:")
+        print(f"  Total Transactions: {NUM_TRANSACTIONS}")
+        print(f"  Max Region ID: {MAX_REGION_ID}")
+        print(f"  Edge Threshold: {EDGE_THRESH}")
+        print("Starting performance test...")
+        graph, bfs_throughput = self.build(register=False)
+        bfs_time, bfs_clumps = self.query(graph)
+        graph, index_throughput = self.build(register=True)
+        index_time, index_clumps = self.query(graph)
+        same = [(c.region_ids, c.hot) for c in bfs_clumps] == [(c.region_ids, c.hot) for c in index_clumps]
+        print(f"  [bfs] Ingest: {bfs_throughput:.2f} transactions/second, Query: {bfs_time * 1000:.2f} milliseconds")
+        print(f"  [union-find] Ingest: {index_throughput:.2f} transactions/second, Query: {index_time * 1000:.2f} milliseconds")
+        print(f"  Clumps: {len(index_clumps)}, Same Result: {same}, Query Speedup: {bfs_time / index_time:.2f}x")
+
+if __name__ == '__main__':
+    tester = TestClumpIndexPerformance()
+    tester.run_performance_test()
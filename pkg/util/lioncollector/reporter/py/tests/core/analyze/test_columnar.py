@@ -0,0 +1,91 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.analyze.columnar import ColumnarSnapshot, save_columnar, convert_pickle, COLUMNAR_VERSION, ALIGNMENT
+from core.analyze.densegraph import DenseGraph
+from core.analyze.graph import Graph
+
+
+class TestColumnar(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "graph.lion")
+        random.seed(4)
+        self.graph = Graph(weight=2, theta=1, top_hot_threshold=3)
+        for _ in range(400):
+            self.graph.add_transaction(random.sample(range(150), random.randint(1, 4)), random.randint(1, 3))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def clumps(self, graph, edge_thresh):
+        return [(clump.region_ids, clump.hot) for clump in graph.get_hot_region(edge_thresh)]
+
+    def test_round_trip(self):
+        save_columnar(self.graph, self.filename)
+        with ColumnarSnapshot(self.filename) as snapshot:
+            self.assertEqual(snapshot.version, COLUMNAR_VERSION)
+            self.assertEqual(snapshot.graph_params(), {"weight": 2, "theta": 1, "top_hot_threshold": 3, "half_life": 0})
+            # 各列直接映射到文件，起始偏移按对齐要求排列
+            for offset, _, _ in snapshot.header["columns"].values():
+                self.assertEqual(offset % ALIGNMENT, 0)
+            self.assertEqual(list(snapshot.region_ids), sorted(snapshot.region_ids))
+            vertex_weights, edge_weights = snapshot.export_weights()
+            expected_vertex_weights, expected_edge_weights = self.graph.export_weights()
+            self.assertEqual(vertex_weights, expected_vertex_weights)
+            self.assertEqual(sorted((min(a, b), max(a, b), w) for a, b, w in edge_weights),
+                             sorted((min(a, b), max(a, b), w) for a, b, w in expected_edge_weights))
+            for edge_thresh in (0, 4, 10):
+                self.assertEqual(self.clumps(snapshot, edge_thresh), self.clumps(self.graph, edge_thresh))
+
+    def test_to_graph_and_dense_graph(self):
+        save_columnar(self.graph, self.filename)
+        with ColumnarSnapshot(self.filename) as snapshot:
+            graph = snapshot.to_graph()
+            dense = snapshot.to_dense_graph()
+        edge = next(iter(self.graph.edges.values()))
+        for loaded in (graph, dense):
+            self.assertEqual(loaded.get_edge_weight(edge.region_id1, edge.region_id2), edge.weight)
+            self.assertEqual(self.clumps(loaded, 4), self.clumps(self.graph, 4))
+        self.assertEqual(graph.get_top_hot_regions(), self.graph.get_top_hot_regions())
+
+    def test_save_dense_graph(self):
+        dense = DenseGraph.from_graph(self.graph)
+        save_columnar(dense, self.filename)
+        with ColumnarSnapshot(self.filename) as snapshot:
+            self.assertEqual(snapshot.vertex_weights.dtype.kind, 'f')
+            self.assertEqual(self.clumps(snapshot, 4), self.clumps(self.graph, 4))
+
+    def test_convert_pickle(self):
+        pickle_filename = os.path.join(self.directory.name, "graph.pkl")
+        self.graph.save(pickle_filename)
+        convert_pickle(pickle_filename, self.filename)
+        with ColumnarSnapshot(self.filename) as snapshot:
+            self.assertEqual(self.clumps(snapshot, 0), self.clumps(self.graph, 0))
+
+    def test_empty_graph(self):
+        save_columnar(Graph(), self.filename)
+        with ColumnarSnapshot(self.filename) as snapshot:
+            self.assertEqual(len(snapshot.region_ids), 0)
+            self.assertEqual(snapshot.get_hot_region(0), [])
+
+    def test_rejects_other_files(self):
+        pickle_filename = os.path.join(self.directory.name, "graph.pkl")
+        self.graph.save(pickle_filename)
+        with self.assertRaises(ValueError):
+            ColumnarSnapshot(pickle_filename)
+        graph = Graph()
+        graph.add_transaction(["a", "b"])
+        with self.assertRaises(ValueError):
+            save_columnar(graph, self.filename)
+
+
+if __name__ == '__main__':
+    unittest.main()
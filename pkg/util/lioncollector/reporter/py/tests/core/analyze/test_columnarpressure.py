@@ -0,0 +1,69 @@
+import sys
+import os
+import random
+import tempfile
+import time
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.analyze.graph import Graph
+from core.analyze.columnar import ColumnarSnapshot, save_columnar
+
+# Constants
+NUM_TRANSACTIONS = 100000  # 总事务数量
+MAX_REGION_ID = 20000      # 最大region ID
+MIN_REGIONS = 1            # 事务中最小region数量
+MAX_REGIONS = 5            # 事务中最大region数量
+EDGE_THRESH = 20           # 查询使用的边权阈值
+
+
+class TestColumnarPerformance:
+    def __init__(self):
+        random.seed(0)
+        self.graph = Graph(weight=10, theta=1)
+        self.graph.add_transactions([random.sample(range(1, MAX_REGION_ID + 1), random.randint(MIN_REGIONS, MAX_REGIONS))
+                                     for _ in range(NUM_TRANSACTIONS)])
+
+    def run_performance_test(self):
+        print("Performance Test Parameters:")
+        print(f"  Total Transactions: {NUM_TRANSACTIONS}")
+        print(f"  Max Region ID: {MAX_REGION_ID}")
+        print(f"  Edge Threshold: {EDGE_THRESH}")
+        print("Starting performance test...")
+        with tempfile.TemporaryDirectory() as directory:
+            pickle_filename = os.path.join(directory, "graph.pkl")
+            columnar_filename = os.path.join(directory, "graph.lion")
+            start_time = time.time()
+            self.graph.save(pickle_filename)
+            pickle_save = time.time() - start_time
+            start_time = time.time()
+            save_columnar(self.graph, columnar_filename)
+            columnar_save = time.time() - start_time
+
+            start_time = time.time()
+            graph = Graph.load(pickle_filename)
+            pickle_load = time.time() - start_time
+            start_time = time.time()
+            pickle_clumps = graph.get_hot_region(EDGE_THRESH)
+            pickle_query = time.time() - start_time
+
+            start_time = time.time()
+            snapshot = ColumnarSnapshot(columnar_filename)
+            columnar_load = time.time() - start_time
+            start_time = time.time()
+            columnar_clumps = snapshot.get_hot_region(EDGE_THRESH)
+            columnar_query = time.time() - start_time
+            same = [(c.region_ids, c.hot) for c in pickle_clumps] == [(c.region_ids, c.hot) for c in columnar_clumps]
+
+            print(f"  [pickle] Size: {os.path.getsize(pickle_filename)} bytes, Save: {pickle_save * 1000:.2f} ms, "
+                  f"Load: {pickle_load * 1000:.2f} ms, Query: {pickle_query * 1000:.2f} ms")
+            print(f"  [columnar] Size: {os.path.getsize(columnar_filename)} bytes, Save: {columnar_save * 1000:.2f} ms, "
+                  f"Load: {columnar_load * 1000:.2f} ms, Query: {columnar_query * 1000:.2f} ms")
+            print(f"  Same Result: {same}, Load + Query Speedup: "
+                  f"{(pickle_load + pickle_query) / (columnar_load + columnar_query):.2f}x")
+            snapshot.close()
+
+if __name__ == '__main__':
+    tester = TestColumnarPerformance()
+    tester.run_performance_test()
@@ -0,0 +1,70 @@
+import sys
+import os
+import glob
+import random
+import time
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.analyze.graph import Graph
+from core.analyze.densegraph import DenseGraph
+import core.analyze.components  # 提前导入scipy，不计入查询时间
+
+# Constants
+NUM_TRANSACTIONS = 120000  # 总事务数量
+MAX_REGION_ID = 200000     # 最大region ID
+MIN_REGIONS = 3            # 事务中最小region数量
+MAX_REGIONS = 6            # 事务中最大region数量
+EDGE_THRESH = 0            # 边权阈值
+HISTORY_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../history'))
+
+
+class TestComponentsPerformance:
+    def __init__(self):
+        random.seed(0)
+        self.graph = Graph(weight=1, theta=1, top_hot_threshold=2)
+        for _ in range(NUM_TRANSACTIONS):
+            self.graph.add_transaction(random.sample(range(1, MAX_REGION_ID + 1), random.randint(MIN_REGIONS, MAX_REGIONS)))
+
+    @staticmethod
+    def compare(graph, edge_thresh):
+        start_time = time.time()
+        bfs_clumps = graph.get_hot_region(edge_thresh)
+        bfs_time = time.time() - start_time
+        start_time = time.time()
+        vectorized_clumps = graph.get_hot_region(edge_thresh, vectorized=True)
+        vectorized_time = time.time() - start_time
+        same = [(c.region_ids, c.hot) for c in bfs_clumps] == [(c.region_ids, c.hot) for c in vectorized_clumps]
+        # 离线分析时把快照转换为列式的DenseGraph，转换一次后可以在不同阈值下反复查询
+        start_time = time.time()
+        dense = DenseGraph.from_graph(graph)
+        convert_time = time.time() - start_time
+        start_time = time.time()
+        dense_clumps = dense.get_hot_region(edge_thresh, vectorized=True)
+        dense_time = time.time() - start_time
+        dense_same = [(c.region_ids, c.hot) for c in bfs_clumps] == [(c.region_ids, c.hot) for c in dense_clumps]
+        return bfs_time, vectorized_time, convert_time, dense_time, len(vectorized_clumps), same and dense_same
+
+    @staticmethod
+    def report(name, bfs_time, vectorized_time, convert_time, dense_time, clump_count, same):
+        print(f"  [{name}] BFS: {bfs_time * 1000:.2f} ms, Vectorized: {vectorized_time * 1000:.2f} ms "
+              f"({bfs_time / vectorized_time:.2f}x), DenseGraph Vectorized: {dense_time * 1000:.2f} ms "
+              f"({bfs_time / dense_time:.2f}x, conversion {convert_time * 1000:.2f} ms), "
+              f"Clumps: {clump_count}, Same Result: {same}")
+
+    def run_performance_test(self):
+        print("Performance Test Parameters:")
+        print(f"  Total Transactions: {NUM_TRANSACTIONS}")
+        print(f"  Max Region ID: {MAX_REGION_ID}")
+        print(f"  Vertices: {len(self.graph.vertices)}, Edges: {len(self.graph.edges)}")
+        print(f"  Edge Threshold: {EDGE_THRESH}")
+        print("Starting performance test...")
+        self.report("synthetic", *self.compare(self.graph, EDGE_THRESH))
+        for filename in sorted(glob.glob(os.path.join(HISTORY_DIR, 'graph_*.pkl*'))):
+            graph = Graph.load(filename)
+            self.report(f"{os.path.basename(filename)}, {len(graph.edges)} edges", *self.compare(graph, graph.theta))
+
+if __name__ == '__main__':
+    tester = TestComponentsPerformance()
+    tester.run_performance_test()
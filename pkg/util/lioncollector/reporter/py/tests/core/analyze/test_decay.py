@@ -0,0 +1,72 @@
+import os
+import sys
+import unittest
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.analyze.decay import DecayScale
+from core.analyze.densegraph import DenseGraph
+from core.analyze.graph import Graph
+
+
+def elapse(graph, seconds):
+    # 把衰减基准时间往前移，相当于经过了seconds秒
+    graph.decay.origin -= seconds
+
+
+class TestDecay(unittest.TestCase):
+
+    def test_decay_scale(self):
+        decay = DecayScale(half_life=10, max_exponent=4)
+        self.assertAlmostEqual(decay.factor(decay.origin + 20), 4)
+        self.assertFalse(decay.needs_rebase(decay.origin + 40))
+        self.assertTrue(decay.needs_rebase(decay.origin + 50))
+        now = decay.origin + 50
+        self.assertAlmostEqual(decay.rebase(now), 32)
+        self.assertAlmostEqual(decay.factor(now), 1)
+        self.assertEqual(DecayScale().factor(), 1)
+
+    def check_decayed_graph(self, graph):
+        graph.add_transaction([1, 2], weight=8)
+        elapse(graph, 60)
+        graph.add_transaction([3, 4], weight=6)
+        self.assertAlmostEqual(graph.get_vertex_weight(1), 4, places=3)
+        self.assertAlmostEqual(graph.get_edge_weight(1, 2), 4, places=3)
+        # 旧热点衰减后排在新热点之后
+        # 同一事务中的region在不同时刻写入，衰减量有极小差异，因此只比较先后两组
+        order = [region_id for region_id, _ in graph.get_top_hot_regions()]
+        self.assertEqual((set(order[:2]), set(order[2:])), ({3, 4}, {1, 2}))
+        top_regions = dict(graph.get_top_hot_regions())
+        self.assertAlmostEqual(top_regions[1], 4, places=3)
+        self.assertAlmostEqual(top_regions[3], 6, places=3)
+        hot_clumps = graph.get_hot_region(edge_thresh=5)
+        self.assertEqual(hot_clumps[0].region_ids, {3, 4})
+        self.assertEqual(sorted(clump.region_ids.pop() for clump in hot_clumps[1:]), [1, 2])
+        self.assertAlmostEqual(hot_clumps[0].hot, 12, places=3)
+        vertex_weights, _ = graph.export_weights()
+        self.assertAlmostEqual(vertex_weights[2], 4, places=3)
+        # 阈值按衰减后的点权比较
+        graph.top_hot_threshold = 5
+        self.assertEqual({region_id for region_id, _ in graph.get_top_hot_regions()}, {3, 4})
+
+    def test_graph_decay(self):
+        self.check_decayed_graph(Graph(weight=1, theta=1, half_life=60))
+
+    def test_dense_graph_decay(self):
+        self.check_decayed_graph(DenseGraph(weight=1, theta=1, half_life=60))
+
+    def test_rebase(self):
+        for graph in (Graph(weight=1, theta=1, half_life=60), DenseGraph(weight=1, theta=1, half_life=60)):
+            graph.decay.max_exponent = 8
+            graph.add_transaction([1, 2], weight=1024)
+            elapse(graph, 600)
+            graph.add_transaction([1], weight=1)
+            self.assertAlmostEqual(graph.decay.factor(), 1, places=3)
+            self.assertAlmostEqual(graph.get_vertex_weight(1), 2, places=3)
+            self.assertAlmostEqual(graph.get_edge_weight(1, 2), 1, places=3)
+            self.assertEqual(graph.get_top_hot_regions(k=1)[0][0], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
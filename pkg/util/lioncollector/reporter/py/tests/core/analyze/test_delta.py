@@ -0,0 +1,131 @@
+import os
+import pickle
+import random
+import sys
+import tempfile
+import unittest
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.analyze.delta import GraphDelta
+from core.analyze.graph import Graph
+
+
+class TestGraphDelta(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(7)
+        self.batches = [[random.sample(range(60), random.randint(1, 4)) for _ in range(40)] for _ in range(12)]
+
+    def assert_same_graph(self, graph, expected):
+        vertex_weights, edge_weights = graph.export_weights()
+        expected_vertex_weights, expected_edge_weights = expected.export_weights()
+        self.assertEqual(vertex_weights, expected_vertex_weights)
+        self.assertEqual(sorted((min(a, b), max(a, b), w) for a, b, w in edge_weights),
+                         sorted((min(a, b), max(a, b), w) for a, b, w in expected_edge_weights))
+
+    def test_merge_deltas_from_collectors(self):
+        expected = Graph(weight=1, theta=1)
+        aggregator = Graph(weight=1, theta=1)
+        collectors = [Graph(weight=1, theta=1) for _ in range(3)]
+        for index, collector in enumerate(collectors):
+            collector.start_delta_tracking(f"collector-{index}")
+        for position, batch in enumerate(self.batches):
+            collector = collectors[position % 3]
+            # 批量写入和单个事务写入都计入增量
+            collector.add_transactions(batch)
+            collector.add_transaction(batch[0], 2)
+            expected.add_transactions(batch)
+            expected.add_transaction(batch[0], 2)
+            if position % 2:
+                for collector in collectors:
+                    self.assertTrue(aggregator.merge(collector.export_delta()))
+        for collector in collectors:
+            aggregator.merge(collector.export_delta())
+        self.assert_same_graph(aggregator, expected)
+        self.assertEqual(aggregator.get_top_hot_regions(10), expected.get_top_hot_regions(10))
+
+    def test_delta_only_contains_changes(self):
+        graph = Graph(weight=1, theta=1)
+        graph.start_delta_tracking("a")
+        graph.add_transaction([1, 2])
+        graph.export_delta()
+        graph.add_transaction([2, 3], 2)
+        delta = graph.export_delta()
+        self.assertEqual((delta.source, delta.sequence), ("a", 2))
+        self.assertEqual(delta.vertex_weights, {2: 2, 3: 2})
+        self.assertEqual(delta.edge_weights, {frozenset({2, 3}): 2})
+        self.assertEqual(len(graph.export_delta()), 0)
+
+    def test_duplicate_delta_is_ignored(self):
+        collector = Graph(weight=1, theta=1)
+        collector.start_delta_tracking("a")
+        collector.add_transaction([1, 2])
+        delta = collector.export_delta()
+        aggregator = Graph(weight=1, theta=1)
+        self.assertTrue(aggregator.merge(delta))
+        self.assertFalse(aggregator.merge(delta))
+        self.assertEqual(aggregator.get_edge_weight(1, 2), 1)
+        self.assertEqual(aggregator.merged_sequences, {"a": 1})
+
+    def test_encode_decode(self):
+        collector = Graph(weight=1, theta=1, hyperedge_min_size=4)
+        collector.start_delta_tracking("collector-1")
+        collector.add_transaction([1, 2, 3, 4, 5])
+        collector.add_transaction([6, 7], 0.5)
+        collector.add_edge(8, 8)
+        delta = collector.export_delta()
+        decoded = GraphDelta.decode(delta.encode())
+        self.assertEqual((decoded.source, decoded.sequence), ("collector-1", 1))
+        self.assertEqual(decoded.vertex_weights, delta.vertex_weights)
+        self.assertEqual(decoded.edge_weights, delta.edge_weights)
+        self.assertEqual(decoded.hyperedge_weights, {frozenset({1, 2, 3, 4, 5}): 1})
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "delta.bin")
+            delta.save(filename)
+            loaded = GraphDelta.load(filename)
+        # 超边按汇总节点的配置保存或展开
+        for min_size in (0, 4):
+            aggregator = Graph(weight=1, theta=1, hyperedge_min_size=min_size)
+            aggregator.merge(loaded)
+            self.assertEqual(len(aggregator.hyperedges), 1 if min_size else 0)
+            self.assertEqual(aggregator.get_edge_weight(2, 5), 1)
+            self.assertEqual(aggregator.get_edge_weight(6, 7), 0.5)
+            self.assertEqual(aggregator.get_edge_weight(8, 8), 1)
+        with self.assertRaises(ValueError):
+            GraphDelta.decode(b"x" * 64)
+        with self.assertRaises(ValueError):
+            GraphDelta(vertex_weights={"region": 1}).encode()
+
+    def test_merge_whole_graph(self):
+        graph = Graph(weight=1, theta=1)
+        for batch in self.batches:
+            graph.add_transactions(batch)
+        aggregator = Graph(weight=1, theta=1)
+        self.assertTrue(aggregator.merge(graph))
+        self.assert_same_graph(aggregator, graph)
+
+    def test_merge_with_decay(self):
+        collector = Graph(weight=1, theta=1, half_life=3600)
+        collector.start_delta_tracking("a")
+        aggregator = Graph(weight=1, theta=1, half_life=3600)
+        collector.add_transaction([1, 2], 4)
+        aggregator.merge(collector.export_delta())
+        self.assertAlmostEqual(aggregator.get_vertex_weight(1), collector.get_vertex_weight(1), delta=0.01)
+        self.assertAlmostEqual(aggregator.get_edge_weight(1, 2), collector.get_edge_weight(1, 2), delta=0.01)
+
+    def test_pending_delta_survives_snapshot(self):
+        graph = Graph(weight=1, theta=1)
+        graph.start_delta_tracking("a")
+        graph.add_transaction([1, 2])
+        restored = pickle.loads(pickle.dumps(graph))
+        restored.add_transaction([1, 2])
+        delta = restored.export_delta()
+        self.assertEqual(delta.edge_weights, {frozenset({1, 2}): 2})
+        with self.assertRaises(ValueError):
+            Graph().export_delta()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import sys
+import os
+import random
+import time
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.analyze.delta import GraphDelta
+from core.analyze.graph import Graph
+
+# Constants
+NUM_COLLECTORS = 3        # 采集节点数量
+NUM_TRANSACTIONS = 100000  # 每个采集节点预先写入的事务数量
+NUM_ROUNDS = 3            # 合并的轮数
+ROUND_TRANSACTIONS = 2000  # 每轮每个采集节点新写入的事务数量
+MAX_REGION_ID = 20000      # 最大region ID
+MIN_REGIONS = 1            # 事务中最小region数量
+MAX_REGIONS = 5            # 事务中最大region数量
+BATCH_SIZE = 64            # 每批写入的事务数量
+
+
+class TestDeltaMergePerformance:
+    def __init__(self):
+        random.seed(0)
+        self.collectors = []
+        for index in range(NUM_COLLECTORS):
+            collector = Graph(weight=1, theta=1)
+            collector.start_delta_tracking(f"collector-{index}")
+            self.collectors.append(collector)
+
+    def ingest(self, collector, count):
+        transactions = [random.sample(range(1, MAX_REGION_ID + 1), random.randint(MIN_REGIONS, MAX_REGIONS))
+                        for _ in range(count)]
+        for i in range(0, count, BATCH_SIZE):
+            collector.add_transactions(transactions[i:i + BATCH_SIZE])
+
+    def run_performance_test(self):
+        print("Performance Test Parameters:")
+        print(f"  Collectors: {NUM_COLLECTORS}")
+        print(f"  Initial Transactions per Collector: {NUM_TRANSACTIONS}")
+        print(f"  Transactions per Collector per Round: {ROUND_TRANSACTIONS}")
+        print(f"  Max Region ID: {MAX_REGION_ID}")
+        print("Starting performance test...")
+        for collector in self.collectors:
+            self.ingest(collector, NUM_TRANSACTIONS)
+        aggregator = Graph(weight=1, theta=1)
+        start_time = time.time()
+        for collector in self.collectors:
+            aggregator.merge(GraphDelta.decode(collector.export_delta().encode()))
+        initial_time = time.time() - start_time
+        print(f"  [initial] Merge: {initial_time:.2f} seconds")
+        delta_times = []
+        full_times = []
+        delta_bytes = 0
+        for _ in range(NUM_ROUNDS):
+            for collector in self.collectors:
+                self.ingest(collector, ROUND_TRANSACTIONS)
+            start_time = time.time()
+            for collector in self.collectors:
+                data = collector.export_delta().encode()
+                delta_bytes += len(data)
+                aggregator.merge(GraphDelta.decode(data))
+            delta_times.append(time.time() - start_time)
+            # 对照：每轮重新合并所有采集节点的完整图
+            start_time = time.time()
+            rebuilt = Graph(weight=1, theta=1)
+            for collector in self.collectors:
+                rebuilt.merge(collector)
+            full_times.append(time.time() - start_time)
+        same = aggregator.get_top_hot_regions(100) == rebuilt.get_top_hot_regions(100)
+        delta_time = sum(delta_times) / NUM_ROUNDS
+        full_time = sum(full_times) / NUM_ROUNDS
+        print(f"  [delta] Merge per Round: {delta_time * 1000:.2f} milliseconds, "
+              f"Size per Round: {delta_bytes // NUM_ROUNDS} bytes")
+        print(f"  [full] Merge per Round: {full_time * 1000:.2f} milliseconds")
+        print(f"  Speedup: {full_time / delta_time:.2f}x, Same Top Hot Regions: {same}")
+
+if __name__ == '__main__':
+    tester = TestDeltaMergePerformance()
+    tester.run_performance_test()
@@ -0,0 +1,89 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.analyze.densegraph import DenseGraph
+from core.analyze.graph import Graph
+
+
+class TestDenseGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = DenseGraph(weight=1, theta=1, top_hot_threshold=5, compact_min=4)
+
+    def test_add_transaction(self):
+        self.graph.add_transaction([1, 2, 3])
+        self.graph.add_transaction([2, 1], weight=2)
+        self.assertEqual(self.graph.get_vertex_weight(1), 3)
+        self.assertEqual(self.graph.get_vertex_weight(3), 1)
+        self.assertEqual(self.graph.get_edge_weight(2, 1), 3)
+        self.assertEqual(self.graph.get_edge_weight(1, 3), 1)
+        self.assertIsNone(self.graph.get_edge_weight(1, 4))
+        self.assertEqual(self.graph.edge_count(), 3)
+        self.assertEqual(self.graph.get_adjacent_regions(1), {2, 3})
+
+    def test_single_region_transaction(self):
+        self.graph.add_transaction([1, 1])
+        self.assertEqual(self.graph.get_vertex_weight(1), 2)
+        self.assertEqual(self.graph.edge_count(), 0)
+
+    def test_get_hot_region(self):
+        self.graph.add_transaction([1, 2], weight=10)
+        self.graph.add_transaction([2, 3], weight=10)
+        self.graph.add_transaction([3, 4], weight=5)
+        hot_clumps = self.graph.get_hot_region(edge_thresh=8)
+        self.assertEqual([clump.region_ids for clump in hot_clumps], [{1, 2, 3}, {4}])
+        self.assertEqual(hot_clumps[0].hot, 45)
+        self.assertEqual(self.graph.get_top_hot_regions(), [(2, 20), (3, 15), (1, 10), (4, 5)])
+
+    def test_matches_graph(self):
+        random.seed(1)
+        graph = Graph(weight=10, theta=1, top_hot_threshold=0)
+        dense = DenseGraph(weight=10, theta=1, top_hot_threshold=0, compact_min=16)
+        for _ in range(500):
+            region_ids = [random.randint(1, 60) for _ in range(random.randint(1, 4))]
+            weight = random.randint(1, 5)
+            graph.add_transaction(region_ids, weight)
+            dense.add_transaction(region_ids, weight)
+        vertex_weights, edge_weights = graph.export_weights()
+        dense_vertex_weights, dense_edge_weights = dense.export_weights()
+        self.assertEqual(dense_vertex_weights, vertex_weights)
+        self.assertEqual(sorted((min(a, b), max(a, b), w) for a, b, w in dense_edge_weights),
+                         sorted((min(a, b), max(a, b), w) for a, b, w in edge_weights))
+        self.assertEqual([(clump.region_ids, clump.hot) for clump in dense.get_hot_region(150)],
+                         [(clump.region_ids, clump.hot) for clump in graph.get_hot_region(150)])
+        for edge_thresh in (0, 50, 150):
+            self.assertEqual([(clump.region_ids, clump.hot) for clump in dense.get_hot_region(edge_thresh, vectorized=True)],
+                             [(clump.region_ids, clump.hot) for clump in dense.get_hot_region(edge_thresh)])
+
+    def test_grow_vertex_weights(self):
+        # 顶点数超过点权数组的初始容量
+        dense = DenseGraph(weight=1, theta=1, top_hot_threshold=0)
+        dense.import_weights({region_id: 1 for region_id in range(3000)}, [])
+        for region_id in range(3000, 5000):
+            dense.increment_vertex_weight(region_id, 2)
+        self.assertEqual(dense.get_vertex_weight(1500), 1)
+        self.assertEqual(dense.get_vertex_weight(4999), 2)
+
+    def test_from_graph_and_save_load(self):
+        graph = Graph(weight=1, theta=1, top_hot_threshold=0)
+        graph.add_transaction([1, 2])
+        dense = DenseGraph.from_graph(graph)
+        dense.add_transaction([2, 3])
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "dense.pkl")
+            dense.save(filename)
+            loaded = DenseGraph.load(filename)
+        self.assertEqual(loaded.get_vertex_weight(2), 2)
+        self.assertEqual(loaded.get_edge_weight(1, 2), 1)
+        loaded.add_transaction([1, 3])
+        self.assertEqual(loaded.get_edge_weight(3, 1), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
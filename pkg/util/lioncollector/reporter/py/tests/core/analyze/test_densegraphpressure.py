@@ -0,0 +1,76 @@
+import sys
+import os
+import gc
+import glob
+import random
+import time
+import tracemalloc
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.analyze.graph import Graph
+from core.analyze.densegraph import DenseGraph
+
+# Constants
+HISTORY_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../history'))
+NUM_TRANSACTIONS = 200000  # 合成负载的事务数量
+MAX_REGION_ID = 100000     # 最大region ID
+MIN_REGIONS = 1            # 事务中最小region数量
+MAX_REGIONS = 5            # 事务中最大region数量
+
+
+def measure(build):
+    """
+    测量构建对象后常驻的内存。
+    :param build: 构建对象的函数
+    :return: (对象, 常驻字节数, 耗时秒数)
+    """
+    gc.collect()
+    tracemalloc.start()
+    start_time = time.time()
+    result = build()
+    elapsed = time.time() - start_time
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+class TestDenseGraphMemory:
+    def __init__(self):
+        random.seed(0)
+        self.transactions = [
+            (random.sample(range(1, MAX_REGION_ID + 1), random.randint(MIN_REGIONS, MAX_REGIONS)), random.randint(1, 10))
+            for _ in range(NUM_TRANSACTIONS)]
+
+    def build(self, graph):
+        for region_ids, weight in self.transactions:
+            graph.add_transaction(region_ids, weight)
+        return graph
+
+    def report(self, name, graph_size, dense_size, vertex_count, edge_count):
+        print(f"  [{name}] Vertices: {vertex_count}, Edges: {edge_count}, "
+              f"Graph: {graph_size / 1024:.1f} KiB, DenseGraph: {dense_size / 1024:.1f} KiB, "
+              f"Reduction: {graph_size / dense_size:.1f}x")
+
+    def run_history_test(self):
+        print("History snapshots:")
+        for filename in sorted(glob.glob(os.path.join(HISTORY_DIR, 'graph_*.pkl.*'))):
+            graph, graph_size, _ = measure(lambda: Graph.load(filename))
+            dense, dense_size, _ = measure(lambda: DenseGraph.from_graph(graph))
+            self.report(os.path.basename(filename), graph_size, dense_size, dense.vertex_count(), dense.edge_count())
+
+    def run_synthetic_test(self):
+        print(f"Synthetic workload ({NUM_TRANSACTIONS} transactions, {MAX_REGION_ID} regions):")
+        graph, graph_size, graph_time = measure(lambda: self.build(Graph(weight=1, theta=1, top_hot_threshold=5)))
+        del graph
+        dense, dense_size, dense_time = measure(lambda: self.build(DenseGraph(weight=1, theta=1, top_hot_threshold=5)))
+        self.report("synthetic", graph_size, dense_size, dense.vertex_count(), dense.edge_count())
+        print(f"  Build Throughput: Graph {NUM_TRANSACTIONS / graph_time:.2f}, "
+              f"DenseGraph {NUM_TRANSACTIONS / dense_time:.2f} transactions/second")
+
+if __name__ == '__main__':
+    tester = TestDenseGraphMemory()
+    tester.run_history_test()
+    tester.run_synthetic_test()
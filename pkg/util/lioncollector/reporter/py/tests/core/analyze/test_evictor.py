@@ -0,0 +1,129 @@
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.analyze.evictor import EdgeEvictor, LOWEST_WEIGHT, CLOCK
+from core.analyze.graph import Graph
+
+
+class TestEdgeEvictor(unittest.TestCase):
+
+    def build_graph(self):
+        graph = Graph(weight=1, theta=1, top_hot_threshold=0)
+        graph.add_edge(1, 2, 10)
+        graph.add_edge(1, 3, 1)
+        graph.add_edge(4, 5, 2)
+        graph.add_edge(6, 7, 5)
+        graph.increment_vertex_weight(1, 3)
+        return graph
+
+    def test_evict_lowest_weight(self):
+        graph = self.build_graph()
+        evictor = EdgeEvictor(graph, max_edges=2, policy=LOWEST_WEIGHT)
+        self.assertEqual(evictor.evict_step(), 2)
+        self.assertEqual(sorted(sorted(key) for key in graph.edges.keys()), [[1, 2], [6, 7]])
+        # 邻接表被清理，点权为0的孤立顶点被删除，有点权的顶点保留
+        self.assertEqual(graph.get_adjacent_regions(1), {2})
+        self.assertEqual(sorted(graph.vertices.keys()), [1, 2, 6, 7])
+        self.assertEqual(evictor.evict_step(), 0)
+        self.assertEqual(evictor.get_stats()["evicted_edges"], 2)
+
+    def test_clock_gives_second_chance(self):
+        graph = self.build_graph()
+        evictor = EdgeEvictor(graph, max_edges=3, policy=CLOCK)
+        # 所有边刚被写入，第一轮只清除访问标记
+        self.assertEqual(evictor.evict_step(), 0)
+        graph.add_edge(1, 3, 1)
+        self.assertEqual(evictor.evict_step(), 1)
+        self.assertNotIn(frozenset({4, 5}), graph.edges)
+        self.assertIn(frozenset({1, 3}), graph.edges)
+
+    def test_background_thread(self):
+        graph = Graph(weight=1, theta=1, top_hot_threshold=0)
+        evictor = EdgeEvictor(graph, max_edges=50, interval=0.01).start()
+        try:
+            for region_id in range(200):
+                graph.add_transaction([region_id, region_id + 1000])
+            deadline = time.time() + 5
+            while len(graph.edges) > 50 and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            evictor.stop()
+        self.assertLessEqual(len(graph.edges), 50)
+
+    def test_evict_with_sliding_window(self):
+        clock = [1000.0]
+        with mock.patch('time.time', lambda: clock[0]):
+            graph = Graph(weight=1, theta=1, window_seconds=6, window_epochs=3)
+            graph.add_edge(1, 2, 5)
+            evictor = EdgeEvictor(graph, max_edges=0, policy=LOWEST_WEIGHT)
+            self.assertEqual(evictor.evict_step(), 1)
+            # 淘汰后重新创建的边只包含新的贡献，旧时间片过期时不会被扣减
+            clock[0] += 2.5
+            graph.add_edge(1, 2, 1)
+            clock[0] += 4
+            graph.expire_window()
+            self.assertEqual(graph.get_edge_weight(1, 2), 1)
+            clock[0] += 2
+            graph.expire_window()
+            self.assertIsNone(graph.get_edge_weight(1, 2))
+
+    def test_skip_victim_written_after_selection(self):
+        graph = self.build_graph()
+        evictor = EdgeEvictor(graph, max_edges=3, policy=LOWEST_WEIGHT)
+        collect_candidates = evictor.collect_candidates
+
+        def collect_then_write(count):
+            candidates = collect_candidates(count)
+            # 选出候选边后、删除前又被写入
+            graph.add_edge(1, 3, 100)
+            return candidates
+
+        evictor.collect_candidates = collect_then_write
+        self.assertEqual(evictor.evict_step(), 0)
+        self.assertIn(frozenset({1, 3}), graph.edges)
+
+    def test_writers_wait_for_eviction(self):
+        graph = self.build_graph()
+        EdgeEvictor(graph, max_edges=3, policy=LOWEST_WEIGHT)
+        written = threading.Event()
+        # 没有滑动窗口时写入也与删除边共用window_lock，单条和批量写入都要等待淘汰完成
+        with graph.window_lock:
+            writers = [threading.Thread(target=lambda: (graph.add_transaction([1, 3]), written.set())),
+                       threading.Thread(target=lambda: graph.add_transactions([[4, 5]] * 64))]
+            for writer in writers:
+                writer.start()
+            self.assertFalse(written.wait(0.05))
+        for writer in writers:
+            writer.join()
+        self.assertEqual(graph.get_edge_weight(1, 3), 2)
+        self.assertEqual(graph.get_edge_weight(4, 5), 66)
+
+    def test_clump_index_kept_for_cold_edges(self):
+        graph = self.build_graph()
+        graph.register_clump_threshold(5)
+        evictor = EdgeEvictor(graph, max_edges=3, policy=LOWEST_WEIGHT)
+        # 淘汰低于阈值的边不影响并查集，不需要重建
+        self.assertEqual(evictor.evict_step(), 1)
+        evictor.max_edges = 1
+        self.assertEqual(evictor.evict_step(), 2)
+        self.assertFalse(graph.clump_dirty)
+        # 淘汰超过阈值的边后闭包需要拆分
+        evictor.max_edges = 0
+        self.assertEqual(evictor.evict_step(), 1)
+        self.assertTrue(graph.clump_dirty)
+        self.assertEqual([clump.region_ids for clump in graph.get_clumps()], [{1}])
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            EdgeEvictor(Graph(), max_edges=1, policy="random")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import sys
+import os
+import gc
+import random
+import time
+import tracemalloc
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.analyze.graph import Graph
+from core.analyze.evictor import EdgeEvictor
+
+# Constants，与test_graphpressure.py的负载相同
+NUM_TRANSACTIONS = 100000  # 总事务数量
+MAX_REGION_ID = 100000     # 最大region ID
+MIN_REGIONS = 1            # 事务中最小region数量
+MAX_REGIONS = 5            # 事务中最大region数量
+MIN_WEIGHT = 1             # 最小事务权重
+MAX_WEIGHT = 10            # 最大事务权重
+MAX_EDGES = 50000          # 边数预算
+
+
+class TestEdgeEvictorPerformance:
+    def __init__(self):
+        random.seed(0)
+        self.transactions = [
+            (random.sample(range(1, MAX_REGION_ID + 1), random.randint(MIN_REGIONS, MAX_REGIONS)),
+             random.randint(MIN_WEIGHT, MAX_WEIGHT))
+            for _ in range(NUM_TRANSACTIONS)]
+
+    def run_graph(self, max_edges):
+        gc.collect()
+        tracemalloc.start()
+        graph = Graph(weight=1, theta=1, top_hot_threshold=5)
+        evictor = EdgeEvictor(graph, max_edges).start() if max_edges else None
+        latencies = []
+        peak_edges = 0
+        start_time = time.time()
+        for index, (regions, weight) in enumerate(self.transactions):
+            txn_start = time.perf_counter()
+            graph.add_transaction(regions, weight)
+            latencies.append(time.perf_counter() - txn_start)
+            if index % 1000 == 0:
+                peak_edges = max(peak_edges, len(graph.edges))
+        elapsed = time.time() - start_time
+        if evictor:
+            evictor.stop()
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        latencies.sort()
+        name = f"budget {max_edges}" if max_edges else "unbounded"
+        print(f"  [{name}] Throughput: {NUM_TRANSACTIONS / elapsed:.2f} transactions/second, "
+              f"P99 Latency: {latencies[int(len(latencies) * 0.99)] * 1000:.3f} milliseconds, "
+              f"Max Latency: {latencies[-1] * 1000:.3f} milliseconds, "
+              f"Peak Edges: {peak_edges}, Final Edges: {len(graph.edges)}, Memory: {size / 1024 / 1024:.1f} MiB")
+
+    def run_performance_test(self):
+        print("Performance Test Parameters:")
+        print(f"  Total Transactions: {NUM_TRANSACTIONS}")
+        print(f"  Max Region ID: {MAX_REGION_ID}")
+        print(f"  Regions per Transaction: {MIN_REGIONS}-{MAX_REGIONS}")
+        print(f"  Edge Budget: {MAX_EDGES}")
+        print("Starting performance test...")
+        self.run_graph(0)
+        self.run_graph(MAX_EDGES)
+
+if __name__ == '__main__':
+    tester = TestEdgeEvictorPerformance()
+    tester.run_performance_test()
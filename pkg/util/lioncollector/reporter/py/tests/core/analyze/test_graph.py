@@ -1,7 +1,9 @@
 import sys
 import os
 import unittest
+import random
 from collections import deque
+from unittest import mock
 
 # 确保能够导入核心模块
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
@@ -77,5 +79,142 @@ class TestGraph(unittest.TestCase):
         clump2 = [clump for clump in hot_clumps if 4 in clump.region_ids][0]
         self.assertEqual(clump2.region_ids, set([4]))
 
+    def test_top_hot_regions(self):
+        # 每个region在热点索引中只保留一项，按点权降序返回
+        for _ in range(3):
+            self.graph.add_transaction([1, 2], weight=2)
+        self.graph.add_transaction([3], weight=10)
+        self.graph.add_transaction([4], weight=1)
+        self.assertEqual(len(self.graph.top_hot_index), 4)
+        self.assertEqual(self.graph.get_top_hot_regions(), [(3, 10), (1, 6), (2, 6)])
+        self.assertEqual(self.graph.get_top_hot_regions(k=2), [(3, 10), (1, 6)])
+        # 查询不会改变热点索引
+        self.assertEqual(self.graph.get_top_hot_regions(), [(3, 10), (1, 6), (2, 6)])
+
+    def test_load_legacy_snapshot(self):
+        # 旧版本快照使用不断增长的优先队列，加载后按顶点去重
+        self.graph.add_transaction([1, 2], weight=3)
+        self.graph.add_transaction([1], weight=4)
+        state = self.graph.__getstate__()
+        del state['top_hot_index']
+        state['top_hot_queue'] = [(-3, 1), (-3, 2), (-7, 1)]
+        legacy = Graph.__new__(Graph)
+        legacy.__setstate__(state)
+        self.assertEqual(legacy.get_top_hot_regions(), [(1, 7)])
+        self.assertEqual(len(legacy.top_hot_index), 2)
+
+    def test_incremental_clumps_match_bfs(self):
+        random.seed(4)
+        graph = Graph(weight=1, theta=1, top_hot_threshold=0)
+        graph.add_transaction([1, 2], weight=3)
+        graph.register_clump_threshold(4)
+        for _ in range(400):
+            graph.add_transaction(random.sample(range(80), random.randint(1, 3)), random.randint(1, 3))
+        # 暂时取消注册，得到BFS的结果
+        graph.clump_threshold, threshold = None, graph.clump_threshold
+        bfs = [(clump.region_ids, clump.hot) for clump in graph.get_hot_region(4)]
+        graph.clump_threshold = threshold
+        self.assertEqual([(clump.region_ids, clump.hot) for clump in graph.get_clumps()], bfs)
+        self.assertEqual([(clump.region_ids, clump.hot) for clump in graph.get_hot_region(4)], bfs)
+
+    def test_incremental_clumps_rebuild_after_removal(self):
+        self.graph.register_clump_threshold(0)
+        self.graph.add_transaction([1, 2])
+        self.graph.add_transaction([3])
+        self.assertEqual([clump.region_ids for clump in self.graph.get_clumps()], [{1, 2}, {3}])
+        self.graph.remove_edge(1, 2)
+        self.assertEqual([clump.region_ids for clump in self.graph.get_clumps()], [{1}, {2}, {3}])
+
+    def test_vectorized_hot_region_matches_bfs(self):
+        random.seed(5)
+        graph = Graph(weight=1, theta=1, top_hot_threshold=6)
+        for _ in range(400):
+            graph.add_transaction(random.sample(range(100), random.randint(1, 4)), random.randint(1, 3))
+        for edge_thresh in (0, 2, 4, 100):
+            self.assertEqual([(clump.region_ids, clump.hot) for clump in graph.get_hot_region(edge_thresh, vectorized=True)],
+                             [(clump.region_ids, clump.hot) for clump in graph.get_hot_region(edge_thresh)])
+        self.assertEqual(Graph().get_hot_region(0, vectorized=True), [])
+
+    def test_bulk_add_transactions_matches_single_calls(self):
+        random.seed(9)
+        batch = [[random.randint(1, 40) for _ in range(random.randint(0, 6))] for _ in range(300)]
+        weights = [random.randint(1, 4) for _ in batch]
+        single = Graph(weight=3, theta=2, top_hot_threshold=0)
+        for region_ids, weight in zip(batch, weights):
+            single.add_transaction(region_ids, weight)
+        bulk = Graph(weight=3, theta=2, top_hot_threshold=0)
+        bulk.add_transactions(batch[:150], weights[:150])
+        bulk.add_transactions(batch[150:], weights[150:])
+        vertex_weights, edge_weights = bulk.export_weights()
+        single_vertex_weights, single_edge_weights = single.export_weights()
+        self.assertEqual(vertex_weights, single_vertex_weights)
+        self.assertEqual(sorted((min(a, b), max(a, b), w) for a, b, w in edge_weights),
+                         sorted((min(a, b), max(a, b), w) for a, b, w in single_edge_weights))
+        self.assertEqual(bulk.get_top_hot_regions(), single.get_top_hot_regions())
+        self.assertEqual([(clump.region_ids, clump.hot) for clump in bulk.get_hot_region(20)],
+                         [(clump.region_ids, clump.hot) for clump in single.get_hot_region(20)])
+
+    def test_bulk_add_transactions_with_decay(self):
+        batch = [[1, 2, 3], [2, 3], [3, 4]] * 20
+        # 使用固定的时钟，两个图的衰减基准时间和写入、读取时间完全相同
+        clock = [1000.0]
+        with mock.patch('time.time', lambda: clock[0]):
+            single = Graph(weight=2, theta=1, half_life=3600)
+            bulk = Graph(weight=2, theta=1, half_life=3600)
+            clock[0] += 1800
+            for region_ids in batch:
+                single.add_transaction(region_ids)
+            bulk.add_transactions(batch)
+            clock[0] += 3600
+            for region_id1, region_id2 in [(1, 2), (2, 3), (3, 4), (1, 4)]:
+                self.assertAlmostEqual(bulk.get_edge_weight(region_id1, region_id2) or 0,
+                                       single.get_edge_weight(region_id1, region_id2) or 0, places=3)
+            self.assertAlmostEqual(single.get_edge_weight(2, 3), 80 / 2, places=3)
+        self.assertEqual(bulk.get_adjacent_regions(3), single.get_adjacent_regions(3))
+
+    def test_bulk_add_transactions_with_string_regions(self):
+        # 批量足够大时才走NumPy聚合
+        self.graph.add_transactions([["a", "b", "a"], ["b"], []] * 20)
+        self.assertEqual(self.graph.get_vertex_weight("a"), 40)
+        self.assertEqual(self.graph.get_vertex_weight("b"), 40)
+        self.assertEqual(self.graph.get_edge_weight("a", "b"), 40)
+
+    def test_hyperedges_match_clique_expansion(self):
+        random.seed(8)
+        clique = Graph(weight=2, theta=1, top_hot_threshold=0)
+        hyper = Graph(weight=2, theta=1, top_hot_threshold=0, hyperedge_min_size=4)
+        for _ in range(300):
+            region_ids = random.sample(range(60), random.choice([2, 3, 5, 8]))
+            weight = random.randint(1, 3)
+            clique.add_transaction(region_ids, weight)
+            hyper.add_transaction(region_ids, weight)
+        self.assertGreater(len(hyper.hyperedges), 0)
+        self.assertLess(len(hyper.edges), len(clique.edges))
+        for region_id1, region_id2 in [(1, 2), (3, 40), (7, 59)]:
+            self.assertEqual(hyper.get_edge_weight(region_id1, region_id2), clique.get_edge_weight(region_id1, region_id2))
+            self.assertEqual(hyper.get_adjacent_regions(region_id1), clique.get_adjacent_regions(region_id1))
+        vertex_weights, edge_weights = hyper.export_weights()
+        clique_vertex_weights, clique_edge_weights = clique.export_weights()
+        self.assertEqual(vertex_weights, clique_vertex_weights)
+        self.assertEqual(sorted((min(a, b), max(a, b), w) for a, b, w in edge_weights),
+                         sorted((min(a, b), max(a, b), w) for a, b, w in clique_edge_weights))
+        for edge_thresh in (0, 4, 10, 20):
+            expected = [(clump.region_ids, clump.hot) for clump in clique.get_hot_region(edge_thresh)]
+            self.assertEqual([(clump.region_ids, clump.hot) for clump in hyper.get_hot_region(edge_thresh)], expected)
+            self.assertEqual([(clump.region_ids, clump.hot) for clump in hyper.get_hot_region(edge_thresh, vectorized=True)],
+                             expected)
+
+    def test_hyperedges_reject_window_and_clump_index(self):
+        with self.assertRaises(ValueError):
+            Graph(window_seconds=60, hyperedge_min_size=8)
+        with self.assertRaises(ValueError):
+            Graph(hyperedge_min_size=8).register_clump_threshold(1)
+
+    def test_incremental_clumps_reject_decay(self):
+        with self.assertRaises(ValueError):
+            Graph(half_life=60).register_clump_threshold(1)
+        with self.assertRaises(ValueError):
+            Graph().get_clumps()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,46 @@
+import sys
+import os
+import unittest
+import random
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.analyze.graph import Graph
+from core.analyze.hierarchy import ClumpHierarchy
+
+class TestClumpHierarchy(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(6)
+        self.graph = Graph(weight=1, theta=1, top_hot_threshold=0)
+        for _ in range(500):
+            self.graph.add_transaction(random.sample(range(120), random.randint(1, 4)), random.randint(1, 3))
+        self.hierarchy = ClumpHierarchy.from_graph(self.graph)
+
+    def test_forest_size(self):
+        self.assertLess(len(self.hierarchy.forest_weights), len(self.hierarchy.region_ids))
+        self.assertTrue((self.hierarchy.forest_weights[:-1] >= self.hierarchy.forest_weights[1:]).all())
+
+    def test_get_hot_region_matches_bfs(self):
+        for edge_thresh in (0, 1, 2, 3, 5, 8, 100):
+            self.assertEqual([(clump.region_ids, clump.hot) for clump in self.hierarchy.get_hot_region(edge_thresh)],
+                             [(clump.region_ids, clump.hot) for clump in self.graph.get_hot_region(edge_thresh)])
+
+    def test_sweep(self):
+        thresholds = [3, 0, 8, 1, 3]
+        levels = self.hierarchy.sweep(thresholds)
+        self.assertEqual([level["edge_thresh"] for level in levels], thresholds)
+        for level in levels:
+            clumps = self.graph.get_hot_region(level["edge_thresh"])
+            self.assertEqual(level["clump_count"], len(clumps))
+            self.assertEqual(level["sizes"], sorted((len(clump.region_ids) for clump in clumps), reverse=True))
+            self.assertEqual(level["largest_clump"], level["sizes"][0])
+
+    def test_empty_graph(self):
+        hierarchy = ClumpHierarchy.from_graph(Graph())
+        self.assertEqual(hierarchy.get_hot_region(0), [])
+        self.assertEqual(hierarchy.sweep([0]), [{"edge_thresh": 0, "clump_count": 0, "largest_clump": 0, "sizes": []}])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import sys
+import os
+import glob
+import random
+import time
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.analyze.graph import Graph
+from core.analyze.hierarchy import ClumpHierarchy
+
+# Constants
+NUM_TRANSACTIONS = 60000   # 总事务数量
+MAX_REGION_ID = 100000     # 最大region ID
+MIN_REGIONS = 2            # 事务中最小region数量
+MAX_REGIONS = 6            # 事务中最大region数量
+MAX_WEIGHT = 3             # 事务的最大权重
+THRESHOLDS = [0, 1, 2, 3, 4, 6, 8, 12]  # 扫描的边权阈值
+HISTORY_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../history'))
+
+
+class TestClumpHierarchyPerformance:
+    def __init__(self):
+        random.seed(0)
+        self.graph = Graph(weight=1, theta=1, top_hot_threshold=0)
+        for _ in range(NUM_TRANSACTIONS):
+            self.graph.add_transaction(random.sample(range(1, MAX_REGION_ID + 1), random.randint(MIN_REGIONS, MAX_REGIONS)),
+                                       random.randint(1, MAX_WEIGHT))
+
+    @staticmethod
+    def compare(graph, thresholds):
+        # 逐个阈值调用get_hot_region，每次都遍历整个图
+        start_time = time.time()
+        bfs_levels = []
+        for edge_thresh in thresholds:
+            clumps = graph.get_hot_region(edge_thresh)
+            bfs_levels.append(sorted((len(clump.region_ids) for clump in clumps), reverse=True))
+        bfs_time = time.time() - start_time
+        # 构建一次最大生成森林后一次遍历得到所有阈值的结果
+        start_time = time.time()
+        hierarchy = ClumpHierarchy.from_graph(graph)
+        build_time = time.time() - start_time
+        start_time = time.time()
+        levels = hierarchy.sweep(thresholds)
+        sweep_time = time.time() - start_time
+        same = [level["sizes"] for level in levels] == bfs_levels
+        return bfs_time, build_time, sweep_time, len(hierarchy.forest_weights), levels, same
+
+    def run_performance_test(self):
+        print("Performance Test Parameters:")
+        print(f"  Total Transactions: {NUM_TRANSACTIONS}")
+        print(f"  Max Region ID: {MAX_REGION_ID}")
+        print(f"  Vertices: {len(self.graph.vertices)}, Edges: {len(self.graph.edges)}")
+        print(f"  Thresholds: {THRESHOLDS}")
+        print("Starting performance test...")
+        bfs_time, build_time, sweep_time, forest_edges, levels, same = self.compare(self.graph, THRESHOLDS)
+        for level in levels:
+            print(f"  [edge_thresh={level['edge_thresh']}] Clumps: {level['clump_count']}, Largest: {level['largest_clump']}")
+        print(f"  [synthetic] BFS per threshold: {bfs_time * 1000:.2f} ms, Hierarchy build: {build_time * 1000:.2f} ms "
+              f"({forest_edges} forest edges), Sweep: {sweep_time * 1000:.2f} ms, "
+              f"Speedup: {bfs_time / (build_time + sweep_time):.2f}x, Same Result: {same}")
+        for filename in sorted(glob.glob(os.path.join(HISTORY_DIR, 'graph_*.pkl*'))):
+            graph = Graph.load(filename)
+            bfs_time, build_time, sweep_time, forest_edges, levels, same = self.compare(graph, THRESHOLDS)
+            print(f"  [{os.path.basename(filename)}] BFS per threshold: {bfs_time * 1000:.2f} ms, "
+                  f"Hierarchy build: {build_time * 1000:.2f} ms, Sweep: {sweep_time * 1000:.2f} ms, "
+                  f"Speedup: {bfs_time / (build_time + sweep_time):.2f}x, Same Result: {same}")
+
+if __name__ == '__main__':
+    tester = TestClumpHierarchyPerformance()
+    tester.run_performance_test()
@@ -0,0 +1,59 @@
+import sys
+import os
+import random
+import time
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.analyze.graph import Graph
+
+# Constants
+NUM_TRANSACTIONS = 2000    # 总事务数量
+MAX_REGION_ID = 5000       # 最大region ID
+NUM_SCAN_RANGES = 50       # 扫描事务访问的不同region范围数量
+NARROW_RATIO = 0.5         # 窄事务（点查）的比例
+HYPEREDGE_MIN_SIZE = 16    # 保存为超边的最小region数量
+EDGE_THRESH = 10           # 边权阈值
+
+
+class TestHypergraphPerformance:
+    def __init__(self):
+        random.seed(0)
+        scan_ranges = []
+        for _ in range(NUM_SCAN_RANGES):
+            width = random.choice([50, 100, 200])
+            start = random.randrange(MAX_REGION_ID - width)
+            scan_ranges.append(list(range(start, start + width)))
+        self.transactions = [random.sample(range(MAX_REGION_ID), random.randint(1, 3)) if random.random() < NARROW_RATIO
+                             else random.choice(scan_ranges) for _ in range(NUM_TRANSACTIONS)]
+
+    def run_graph(self, hyperedge_min_size):
+        graph = Graph(weight=1, theta=1, top_hot_threshold=0, hyperedge_min_size=hyperedge_min_size)
+        start_time = time.time()
+        for region_ids in self.transactions:
+            graph.add_transaction(region_ids)
+        ingest_time = time.time() - start_time
+        start_time = time.time()
+        clumps = graph.get_hot_region(EDGE_THRESH)
+        query_time = time.time() - start_time
+        return graph, ingest_time, query_time, clumps
+
+    def run_performance_test(self):
+        region_count = sum(len(region_ids) for region_ids in self.transactions)
+        print("Performance Test Parameters:")
+        print(f"  Total Transactions: {NUM_TRANSACTIONS}, Total Region Accesses: {region_count}")
+        print(f"  Scan Ranges: {NUM_SCAN_RANGES}, Narrow Ratio: {NARROW_RATIO}, Hyperedge Min Size: {HYPEREDGE_MIN_SIZE}")
+        print("Starting performance test...")
+        results = {}
+        for name, hyperedge_min_size in (("clique", 0), ("hyperedge", HYPEREDGE_MIN_SIZE)):
+            graph, ingest_time, query_time, clumps = self.run_graph(hyperedge_min_size)
+            results[name] = [(clump.region_ids, clump.hot) for clump in clumps]
+            print(f"  [{name}] Ingest: {NUM_TRANSACTIONS / ingest_time:.2f} transactions/second "
+                  f"({region_count / ingest_time:.2f} region accesses/second), Query: {query_time * 1000:.2f} ms, "
+                  f"Edges: {len(graph.edges)}, Hyperedges: {len(graph.hyperedges)}, Clumps: {len(clumps)}")
+        print(f"  Same Result: {results['clique'] == results['hyperedge']}")
+
+if __name__ == '__main__':
+    tester = TestHypergraphPerformance()
+    tester.run_performance_test()
@@ -0,0 +1,54 @@
+import os
+import sys
+import random
+import threading
+import unittest
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.analyze.graph import Graph
+from core.analyze.partitionedgraph import PartitionedGraph
+
+
+class TestPartitionedGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.partitioned_graph = PartitionedGraph(4, weight=10, theta=1, top_hot_threshold=5)
+
+    def tearDown(self):
+        self.partitioned_graph.close()
+
+    def test_concurrent_writers_match_single_graph(self):
+        random.seed(2)
+        graph = Graph(weight=10, theta=1, top_hot_threshold=5)
+        batch = [random.sample(range(50), random.randint(1, 4)) for _ in range(800)]
+        weights = [random.randint(1, 3) for _ in batch]
+        graph.add_transactions(batch, weights)
+        writers = [threading.Thread(target=self.partitioned_graph.add_transactions,
+                                    args=(batch[start::4], weights[start::4])) for start in range(4)]
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join()
+
+        merged = self.partitioned_graph.merge()
+        vertex_weights, edge_weights = graph.export_weights()
+        merged_vertex_weights, merged_edge_weights = merged.export_weights()
+        self.assertEqual(merged_vertex_weights, vertex_weights)
+        self.assertEqual(sorted((min(a, b), max(a, b), w) for a, b, w in merged_edge_weights),
+                         sorted((min(a, b), max(a, b), w) for a, b, w in edge_weights))
+        expected = sorted((sorted(c.region_ids), c.hot) for c in graph.get_hot_region(40))
+        actual = sorted((sorted(c.region_ids), c.hot) for c in self.partitioned_graph.get_hot_region(40))
+        self.assertEqual(actual, expected)
+
+    def test_add_transaction(self):
+        self.partitioned_graph.add_transaction([1, 2, 2], weight=2)
+        self.partitioned_graph.flush()
+        merged = self.partitioned_graph.merge()
+        self.assertEqual(merged.vertices[2].weight, 4)
+        self.assertEqual(merged.edges[frozenset({1, 2})].weight, 40)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import sys
+import os
+import random
+import time
+import threading
+import types
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+import core.analyze.graph
+import core.analyze.vertex
+import core.analyze.edge
+import core.util.bucketDict
+from core.analyze.graph import Graph
+from core.analyze.partitionedgraph import PartitionedGraph
+
+# Constants，与test_graphpressure.py的负载相同
+NUM_TRANSACTIONS = 100000  # 总事务数量
+MAX_REGION_ID = 100000     # 最大region ID
+MIN_REGIONS = 1            # 事务中最小region数量
+MAX_REGIONS = 5            # 事务中最大region数量
+MIN_WEIGHT = 1             # 最小事务权重
+MAX_WEIGHT = 10            # 最大事务权重
+NUM_THREADS = 10           # 线程数量
+
+LOCK_WAITS = []  # 每次发生竞争时的等待时间（秒）
+
+
+class TimedLock:
+    """
+    记录竞争等待时间的锁：先尝试非阻塞获取，失败时才计时。
+    """
+    def __init__(self):
+        self.lock = threading._allocate_lock()
+
+    def acquire(self, blocking=True, timeout=-1):
+        if self.lock.acquire(False):
+            return True
+        if not blocking:
+            return False
+        start_time = time.perf_counter()
+        acquired = self.lock.acquire(True, timeout)
+        LOCK_WAITS.append(time.perf_counter() - start_time)
+        return acquired
+
+    def release(self):
+        self.lock.release()
+
+    def locked(self):
+        return self.lock.locked()
+
+    __enter__ = acquire
+
+    def __exit__(self, *args):
+        self.release()
+
+
+# 让图模块和队列使用计时锁，统计写入路径上所有锁的等待时间
+timed_threading = types.SimpleNamespace(Lock=TimedLock, Condition=threading.Condition)
+for module in (core.analyze.graph, core.analyze.vertex, core.analyze.edge, core.util.bucketDict, queue):
+    module.threading = timed_threading
+
+
+class TestPartitionedGraphPerformance:
+    def __init__(self):
+        random.seed(0)
+        self.transactions = [
+            (random.sample(range(1, MAX_REGION_ID + 1), random.randint(MIN_REGIONS, MAX_REGIONS)),
+             random.randint(MIN_WEIGHT, MAX_WEIGHT))
+            for _ in range(NUM_TRANSACTIONS)]
+
+    def run_graph(self, graph):
+        LOCK_WAITS.clear()
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=NUM_THREADS) as executor:
+            futures = [executor.submit(graph.add_transaction, regions, weight) for regions, weight in self.transactions]
+            for future in futures:
+                future.result()
+        if isinstance(graph, PartitionedGraph):
+            graph.flush()
+        elapsed = time.time() - start_time
+        return NUM_TRANSACTIONS / elapsed, len(LOCK_WAITS), sum(LOCK_WAITS)
+
+    def report(self, name, throughput, contended, lock_wait):
+        print(f"  [{name}] Throughput: {throughput:.2f} transactions/second, "
+              f"Contended Acquisitions: {contended}, Total Lock Wait: {lock_wait * 1000:.2f} milliseconds")
+
+    def run_performance_test(self):
+        print("Performance Test Parameters:")
+        print(f"  Total Transactions: {NUM_TRANSACTIONS}")
+        print(f"  Max Region ID: {MAX_REGION_ID}")
+        print(f"  Regions per Transaction: {MIN_REGIONS}-{MAX_REGIONS}")
+        print(f"  Number of Threads: {NUM_THREADS}")
+        print("Starting performance test...")
+        self.report("locked graph", *self.run_graph(Graph(weight=1, theta=1, top_hot_threshold=5)))
+        graph = PartitionedGraph(NUM_THREADS, weight=1, theta=1, top_hot_threshold=5)
+        try:
+            self.report("partitioned graph", *self.run_graph(graph))
+        finally:
+            graph.close()
+
+if __name__ == '__main__':
+    tester = TestPartitionedGraphPerformance()
+    tester.run_performance_test()
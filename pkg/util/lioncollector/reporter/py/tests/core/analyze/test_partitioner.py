@@ -0,0 +1,53 @@
+import sys
+import os
+import unittest
+import random
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.analyze.graph import Graph
+from core.analyze.partitioner import GraphPartitioner
+
+class TestGraphPartitioner(unittest.TestCase):
+
+    def setUp(self):
+        # 4个社区，社区之间只有少量事务
+        random.seed(7)
+        self.graph = Graph(weight=1, theta=1, top_hot_threshold=0)
+        for _ in range(4000):
+            community = random.randrange(4)
+            self.graph.add_transaction(random.sample(range(community * 100, community * 100 + 100), random.randint(2, 4)))
+        for _ in range(50):
+            self.graph.add_transaction(random.sample(range(400), 2))
+
+    def cut_ratio(self, clumps):
+        parts = {region_id: index for index, clump in enumerate(clumps) for region_id in clump.region_ids}
+        _, edge_weights = self.graph.export_weights()
+        cut = sum(weight for region_id1, region_id2, weight in edge_weights if parts[region_id1] != parts[region_id2])
+        return cut / sum(weight for _, _, weight in edge_weights)
+
+    def test_balanced_low_cut(self):
+        clumps = GraphPartitioner(4, imbalance=0.05).partition_graph(self.graph)
+        self.assertEqual(len(clumps), 4)
+        vertex_weights, _ = self.graph.export_weights()
+        total = sum(vertex_weights.values())
+        self.assertEqual(sum(clump.hot for clump in clumps), total)
+        self.assertEqual(set().union(*(clump.region_ids for clump in clumps)), set(vertex_weights))
+        self.assertLessEqual(max(clump.hot for clump in clumps), total / 4 * 1.05)
+        self.assertEqual([clump.hot for clump in clumps], sorted((clump.hot for clump in clumps), reverse=True))
+        self.assertLess(self.cut_ratio(clumps), 0.1)
+
+    def test_more_parts_than_regions(self):
+        graph = Graph(weight=1, theta=1)
+        graph.add_transaction([1, 2])
+        clumps = GraphPartitioner(5).partition_graph(graph)
+        self.assertEqual(sorted(len(clump.region_ids) for clump in clumps), [1, 1])
+
+    def test_empty_and_invalid(self):
+        self.assertEqual(GraphPartitioner(3).partition_graph(Graph()), [])
+        with self.assertRaises(ValueError):
+            GraphPartitioner(0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import sys
+import os
+import heapq
+import random
+import time
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.analyze.densegraph import DenseGraph
+from core.analyze.partitioner import GraphPartitioner
+
+# Constants
+NUM_TRANSACTIONS = 150000  # 总事务数量
+MAX_REGION_ID = 200000     # 最大region ID
+NUM_COMMUNITIES = 40       # 共访问社区数量
+CROSS_RATIO = 0.1          # 跨社区事务的比例
+MIN_REGIONS = 3            # 事务中最小region数量
+MAX_REGIONS = 6            # 事务中最大region数量
+NUM_STORES = 5             # store数量
+EDGE_THRESH = 0            # BFS闭包的边权阈值
+
+
+class TestGraphPartitionerPerformance:
+    def __init__(self):
+        random.seed(0)
+        self.graph = DenseGraph(weight=1, theta=1, top_hot_threshold=0)
+        community_size = MAX_REGION_ID // NUM_COMMUNITIES
+        batch = []
+        for _ in range(NUM_TRANSACTIONS):
+            count = random.randint(MIN_REGIONS, MAX_REGIONS)
+            if random.random() < CROSS_RATIO:
+                batch.append(random.sample(range(MAX_REGION_ID), count))
+            else:
+                start = random.randrange(NUM_COMMUNITIES) * community_size
+                batch.append(random.sample(range(start, start + community_size), count))
+        self.graph.add_transactions(batch)
+        self.vertex_weights, self.edge_weights = self.graph.export_weights()
+
+    def evaluate(self, clumps):
+        # 按总点权降序把闭包依次放到负载最小的store上，与规划器的均衡目标一致
+        loads = [(0, store) for store in range(NUM_STORES)]
+        parts = {}
+        for clump in sorted(clumps, key=lambda clump: -clump.hot):
+            load, store = heapq.heappop(loads)
+            heapq.heappush(loads, (load + clump.hot, store))
+            for region_id in clump.region_ids:
+                parts[region_id] = store
+        store_loads = [load for load, _ in loads]
+        cut = sum(weight for region_id1, region_id2, weight in self.edge_weights
+                  if parts.get(region_id1, -1) != parts.get(region_id2, -2))
+        total = sum(weight for _, _, weight in self.edge_weights)
+        return max(store_loads) / (sum(store_loads) / NUM_STORES), cut / total
+
+    def run_performance_test(self):
+        print("Performance Test Parameters:")
+        print(f"  Total Transactions: {NUM_TRANSACTIONS}")
+        print(f"  Vertices: {len(self.vertex_weights)}, Edges: {len(self.edge_weights)}")
+        print(f"  Communities: {NUM_COMMUNITIES}, Cross Ratio: {CROSS_RATIO}, Stores: {NUM_STORES}")
+        print("Starting performance test...")
+        start_time = time.time()
+        bfs_clumps = self.graph.get_hot_region(EDGE_THRESH, vectorized=True)
+        bfs_time = time.time() - start_time
+        max_load, cut = self.evaluate(bfs_clumps)
+        print(f"  [bfs clumps] Time: {bfs_time:.2f} s, Clumps: {len(bfs_clumps)}, "
+              f"Largest: {max(len(clump.region_ids) for clump in bfs_clumps)}, "
+              f"Max/Mean Store Load: {max_load:.3f}, Cut Ratio: {cut:.3f}")
+        start_time = time.time()
+        clumps = GraphPartitioner(NUM_STORES).partition_weights(self.vertex_weights, self.edge_weights)
+        partition_time = time.time() - start_time
+        max_load, cut = self.evaluate(clumps)
+        print(f"  [k-way partition] Time: {partition_time:.2f} s, Clumps: {len(clumps)}, "
+              f"Largest: {max(len(clump.region_ids) for clump in clumps)}, "
+              f"Max/Mean Store Load: {max_load:.3f}, Cut Ratio: {cut:.3f}")
+
+if __name__ == '__main__':
+    tester = TestGraphPartitionerPerformance()
+    tester.run_performance_test()
@@ -0,0 +1,95 @@
+import sys
+import os
+import random
+import threading
+import time
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.analyze.graph import Graph
+
+# Constants
+NUM_TRANSACTIONS = 100000  # 预先写入的事务数量
+MAX_REGION_ID = 20000      # 最大region ID
+MIN_REGIONS = 1            # 事务中最小region数量
+MAX_REGIONS = 5            # 事务中最大region数量
+BATCH_SIZE = 64            # 写入线程每批写入的事务数量
+DURATION_SECONDS = 10      # 每种方式持续分析的时长
+EDGE_THRESH = 1            # 分析使用的边权阈值
+ANALYSIS_INTERVAL = 1      # 两次分析开始之间的最小间隔（秒）
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class TestReadViewPerformance:
+    def __init__(self):
+        random.seed(0)
+        self.transactions = [random.sample(range(1, MAX_REGION_ID + 1), random.randint(MIN_REGIONS, MAX_REGIONS))
+                             for _ in range(NUM_TRANSACTIONS)]
+
+    def run_mode(self, mode):
+        graph = Graph(weight=1, theta=1)
+        for i in range(0, NUM_TRANSACTIONS, BATCH_SIZE):
+            graph.add_transactions(self.transactions[i:i + BATCH_SIZE])
+        if mode == "versioned":
+            graph.enable_read_views()
+            graph.get_read_view()  # 第一次发布读取全部权重，不计入测试
+        stop = threading.Event()
+        latencies = []
+        analyses = []
+
+        def write():
+            position = 0
+            while not stop.is_set():
+                batch = self.transactions[position:position + BATCH_SIZE]
+                position = (position + BATCH_SIZE) % NUM_TRANSACTIONS
+                start_time = time.perf_counter()
+                graph.add_transactions(batch)
+                latencies.append(time.perf_counter() - start_time)
+
+        def analyze():
+            while not stop.is_set():
+                start_time = time.perf_counter()
+                graph.get_hot_region(EDGE_THRESH)
+                analyses.append(time.perf_counter() - start_time)
+                stop.wait(max(0, ANALYSIS_INTERVAL - analyses[-1]))
+
+        threads = [threading.Thread(target=write)]
+        if mode != "idle":
+            threads.append(threading.Thread(target=analyze))
+        for thread in threads:
+            thread.start()
+        time.sleep(DURATION_SECONDS)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        stats = graph.read_views.get_stats() if graph.read_views else None
+        return latencies, analyses, stats
+
+    def run_performance_test(self):
+        print("Performance Test Parameters:")
+        print(f"  Total Transactions: {NUM_TRANSACTIONS}")
+        print(f"  Max Region ID: {MAX_REGION_ID}")
+        print(f"  Writer Batch Size: {BATCH_SIZE}")
+        print(f"  Duration: {DURATION_SECONDS} seconds per mode, Analysis Interval: {ANALYSIS_INTERVAL} seconds")
+        print("Starting performance test...")
+        for mode in ("idle", "live", "versioned"):
+            latencies, analyses, stats = self.run_mode(mode)
+            line = (f"  [{mode}] Ingest: {len(latencies) * BATCH_SIZE / DURATION_SECONDS:.2f} transactions/second, "
+                    f"Batch p50: {percentile(latencies, 0.5) * 1000:.2f} milliseconds, "
+                    f"p99: {percentile(latencies, 0.99) * 1000:.2f} milliseconds, "
+                    f"max: {max(latencies) * 1000:.2f} milliseconds")
+            if analyses:
+                line += f", Analyses: {len(analyses)}, Analysis: {sum(analyses) / len(analyses) * 1000:.2f} milliseconds"
+            if stats:
+                line += (f", Publish Stall: {stats['max_stall'] * 1000:.2f} milliseconds max "
+                         f"({stats['last_changes']} changes last)")
+            print(line)
+
+if __name__ == '__main__':
+    tester = TestReadViewPerformance()
+    tester.run_performance_test()
@@ -0,0 +1,53 @@
+import os
+import sys
+import random
+import unittest
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.analyze.graph import Graph
+from core.analyze.shardedgraph import ShardedGraph
+
+
+class TestShardedGraph(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.sharded_graph = ShardedGraph(3, weight=10, theta=1, top_hot_threshold=5)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.sharded_graph.close()
+
+    def test_merge_matches_single_graph(self):
+        random.seed(1)
+        graph = Graph(weight=10, theta=1, top_hot_threshold=5)
+        batch = [random.sample(range(50), random.randint(1, 4)) for _ in range(500)]
+        weights = [random.randint(1, 3) for _ in batch]
+        graph.add_transactions(batch, weights)
+        self.sharded_graph.add_transactions(batch[:250], weights[:250])
+        self.sharded_graph.add_transactions(batch[250:], weights[250:])
+
+        merged = self.sharded_graph.merge()
+        vertex_weights, edge_weights = graph.export_weights()
+        merged_vertex_weights, merged_edge_weights = merged.export_weights()
+        self.assertEqual(merged_vertex_weights, vertex_weights)
+        self.assertEqual(sorted((min(a, b), max(a, b), w) for a, b, w in merged_edge_weights),
+                         sorted((min(a, b), max(a, b), w) for a, b, w in edge_weights))
+
+        expected = sorted((sorted(c.region_ids), c.hot) for c in graph.get_hot_region(40))
+        actual = sorted((sorted(c.region_ids), c.hot) for c in self.sharded_graph.get_hot_region(40))
+        self.assertEqual(actual, expected)
+
+        top_regions = self.sharded_graph.get_top_hot_regions()
+        self.assertEqual(top_regions, sorted(top_regions, key=lambda item: (-item[1], item[0])))
+        self.assertEqual({region_id for region_id, _ in top_regions},
+                         {region_id for region_id, weight in vertex_weights.items() if weight >= 5})
+        # 各分片的前k个归并后与单个图的结果相同
+        for k in (1, 7, None):
+            self.assertEqual(self.sharded_graph.get_top_hot_regions(k), graph.get_top_hot_regions(k))
+
+
+if __name__ == '__main__':
+    unittest.main()
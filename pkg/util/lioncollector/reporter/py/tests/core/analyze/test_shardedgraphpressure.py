@@ -0,0 +1,67 @@
+import sys
+import os
+import random
+import time
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.analyze.graph import Graph
+from core.analyze.shardedgraph import ShardedGraph
+
+# Constants
+NUM_TRANSACTIONS = 100000  # 总事务数量
+MAX_REGION_ID = 100000     # 最大region ID
+MIN_REGIONS = 1            # 事务中最小region数量
+MAX_REGIONS = 5            # 事务中最大region数量
+MIN_WEIGHT = 1             # 最小事务权重
+MAX_WEIGHT = 10            # 最大事务权重
+BATCH_SIZE = 1000          # 每次提交给图的事务数量
+SHARD_COUNTS = [1, 2, 4, 8]  # 测试的分片进程数量
+
+
+class TestShardedGraphPerformance:
+    def __init__(self):
+        random.seed(0)
+        self.batches = []
+        for _ in range(NUM_TRANSACTIONS // BATCH_SIZE):
+            batch = [random.sample(range(1, MAX_REGION_ID + 1), random.randint(MIN_REGIONS, MAX_REGIONS))
+                     for _ in range(BATCH_SIZE)]
+            weights = [random.randint(MIN_WEIGHT, MAX_WEIGHT) for _ in range(BATCH_SIZE)]
+            self.batches.append((batch, weights))
+
+    def run_graph(self, graph):
+        start_time = time.time()
+        for batch, weights in self.batches:
+            graph.add_transactions(batch, weights)
+        if isinstance(graph, ShardedGraph):
+            graph.flush()
+        return NUM_TRANSACTIONS / (time.time() - start_time)
+
+    def run_performance_test(self):
+        print("Performance Test Parameters:")
+        print(f"  Total Transactions: {NUM_TRANSACTIONS}")
+        print(f"  Max Region ID: {MAX_REGION_ID}")
+        print(f"  Regions per Transaction: {MIN_REGIONS}-{MAX_REGIONS}")
+        print(f"  Batch Size: {BATCH_SIZE}")
+        print(f"  Shard Counts: {SHARD_COUNTS}")
+        print(f"  CPU Count: {os.cpu_count()}")
+        print("Starting performance test...")
+
+        baseline = self.run_graph(Graph(weight=1, theta=1, top_hot_threshold=5))
+        print(f"  [single process] Throughput: {baseline:.2f} transactions/second")
+        for shard_count in SHARD_COUNTS:
+            graph = ShardedGraph(shard_count, weight=1, theta=1, top_hot_threshold=5)
+            try:
+                throughput = self.run_graph(graph)
+                start_time = time.time()
+                graph.get_top_hot_regions()
+                merge_time = time.time() - start_time
+            finally:
+                graph.close()
+            print(f"  [{shard_count} shards] Throughput: {throughput:.2f} transactions/second, "
+                  f"Speedup: {throughput / baseline:.2f}x, Merge Time: {merge_time:.2f} seconds")
+
+if __name__ == '__main__':
+    tester = TestShardedGraphPerformance()
+    tester.run_performance_test()
@@ -0,0 +1,184 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.analyze.snapshot import Snapshotter, SnapshotGate, list_snapshots, write_snapshot, FORK, COPY, FREEZE, SAVE
+from core.analyze.graph import Graph
+from core.analyze.densegraph import DenseGraph
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assert_consistent(self, graph):
+        # 每个事务恰好访问两个region，一致的快照中点权之和等于边权之和的两倍
+        vertex_weights, edge_weights = graph.export_weights()
+        self.assertEqual(sum(vertex_weights.values()), 2 * sum(weight for _, _, weight in edge_weights))
+
+    def snapshot_while_writing(self, graph, mode):
+        stop = threading.Event()
+
+        def write():
+            region_id = 0
+            while not stop.is_set():
+                graph.add_transactions([[region_id % 50, region_id % 50 + 1]] * 40)
+                region_id += 1
+
+        writers = [threading.Thread(target=write) for _ in range(2)]
+        for writer in writers:
+            writer.start()
+        time.sleep(0.05)
+        snapshotter = Snapshotter(graph, max_saves=2, directory=self.directory.name, mode=mode)
+        filename = snapshotter.snapshot_once()
+        stop.set()
+        for writer in writers:
+            writer.join()
+        self.assertIsNotNone(filename)
+        self.assertFalse(os.path.exists(f"{filename}.tmp"))
+        return snapshotter, filename
+
+    @unittest.skipUnless(hasattr(os, 'fork'), "fork is not available")
+    def test_fork_snapshot_is_consistent(self):
+        graph = Graph(weight=1, theta=1)
+        snapshotter, filename = self.snapshot_while_writing(graph, FORK)
+        self.assert_consistent(Graph.load(filename))
+        stats = snapshotter.get_stats()
+        self.assertEqual((stats["mode"], stats["snapshots"], stats["failures"], stats["freezes"]), (FORK, 1, 0, 1))
+        self.assertLessEqual(stats["last_stall"], stats["last_duration"])
+
+    def test_freeze_snapshot_is_consistent(self):
+        graph = Graph(weight=1, theta=1)
+        _, filename = self.snapshot_while_writing(graph, FREEZE)
+        self.assert_consistent(Graph.load(filename))
+
+    def test_copy_snapshot_of_dense_graph(self):
+        graph = DenseGraph(weight=1, theta=1)
+        snapshotter, filename = self.snapshot_while_writing(graph, COPY)
+        self.assertEqual(snapshotter.mode, Snapshotter.default_mode(graph))
+        self.assert_consistent(DenseGraph.load(filename))
+
+    def test_dense_graph_copy_is_independent(self):
+        graph = DenseGraph(weight=1, theta=1)
+        graph.add_transaction([1, 2])
+        frozen = graph.copy()
+        graph.add_transaction([1, 2])
+        self.assertEqual(frozen.get_edge_weight(1, 2), 1)
+        self.assertEqual(graph.get_edge_weight(1, 2), 2)
+
+    def test_rotation_uses_directory_contents(self):
+        # 重启前留下的快照和临时文件，以及不属于快照的文件
+        for name in ("graph_100.pkl", "graph_200.pkl.gz", "graph_300.pkl.tmp", "graph_400.pkl.skew"):
+            with open(os.path.join(self.directory.name, name), 'wb') as file:
+                file.write(b"old")
+        graph = Graph(weight=1, theta=1)
+        graph.add_transaction([1, 2])
+        snapshotter = Snapshotter(graph, max_saves=2, directory=self.directory.name, mode=SAVE)
+        filename = snapshotter.snapshot_once()
+        self.assertEqual(list_snapshots(self.directory.name), [os.path.join(self.directory.name, "graph_200.pkl.gz"), filename])
+        self.assertEqual(sorted(os.listdir(self.directory.name)),
+                         sorted(["graph_200.pkl.gz", "graph_400.pkl.skew", os.path.basename(filename)]))
+
+    def test_rotation_by_age_keeps_latest(self):
+        for name in ("graph_100.pkl.gz", "graph_200.pkl.gz"):
+            filename = os.path.join(self.directory.name, name)
+            with open(filename, 'wb') as file:
+                file.write(b"old")
+            os.utime(filename, (0, 0))
+        snapshotter = Snapshotter(Graph(), directory=self.directory.name, mode=SAVE, max_age=3600)
+        self.assertEqual(len(snapshotter.rotate()), 1)
+        self.assertEqual(len(list_snapshots(self.directory.name)), 1)
+        filename = snapshotter.snapshot_once()
+        self.assertEqual(list_snapshots(self.directory.name), [filename])
+
+    def test_compressed_snapshot(self):
+        graph = Graph(weight=1, theta=1)
+        for region_id in range(200):
+            graph.add_transaction([region_id, region_id + 1])
+        snapshotter = Snapshotter(graph, directory=self.directory.name, mode=FREEZE, compresslevel=6)
+        filename = snapshotter.snapshot_once()
+        self.assertTrue(filename.endswith(".pkl.gz"))
+        uncompressed = os.path.join(self.directory.name, "plain.pkl")
+        graph.save(uncompressed)
+        self.assertLess(os.path.getsize(filename), os.path.getsize(uncompressed))
+        self.assertEqual(Graph.load(filename).get_edge_weight(3, 4), 1)
+        stats = snapshotter.get_stats()
+        self.assertEqual(stats["last_bytes"], os.path.getsize(filename))
+        self.assertGreater(stats["bytes_per_second"], 0)
+
+    def test_failure_is_counted(self):
+        snapshotter = Snapshotter(Graph(), directory=os.path.join(self.directory.name, "missing"), mode=FREEZE)
+        self.assertIsNone(snapshotter.snapshot_once())
+        self.assertEqual(snapshotter.get_stats()["failures"], 1)
+        # 失败后闸门已解除冻结
+        self.assertFalse(snapshotter.graph.snapshot_gate.frozen)
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            Snapshotter(Graph(), mode="unknown")
+        with self.assertRaises(ValueError):
+            Snapshotter(DenseGraph(), mode=FORK)
+
+    def test_fork_refused_with_grpc_fork_support(self):
+        with mock.patch.dict(os.environ, {"GRPC_ENABLE_FORK_SUPPORT": "true"}):
+            self.assertEqual(Snapshotter.default_mode(Graph()), FREEZE)
+            with self.assertRaises(ValueError):
+                Snapshotter(Graph(), mode=FORK)
+
+    def test_write_snapshot_takes_no_graph_locks(self):
+        # fork子进程中其他线程持有的锁不会释放，序列化不能获取图中的任何锁
+        graph = Graph(weight=1, theta=1, hyperedge_min_size=3)
+        graph.add_transactions([[1, 2], [2, 3], [4, 5, 6]] * 40)
+        graph.start_delta_tracking("a")
+        graph.add_transaction([3, 4])
+        locks = [graph.queue_lock, graph.decay_lock, graph.window_lock, graph.clump_lock, graph.hyperedge_lock,
+                 graph.snapshot_gate.condition, graph.delta_tracker.lock]
+        for table in (graph.vertices, graph.edges, graph.hyperedges):
+            locks.extend(table.locks)
+        locks.extend(element.lock for element in graph.vertices.values() + graph.edges.values())
+        for lock in locks:
+            lock.acquire()
+        try:
+            filename = os.path.join(self.directory.name, "graph.pkl.gz")
+            writer = threading.Thread(target=write_snapshot, args=(graph, filename, 1), daemon=True)
+            writer.start()
+            writer.join(5)
+            self.assertFalse(writer.is_alive())
+        finally:
+            for lock in locks:
+                lock.release()
+        self.assertEqual(Graph.load(filename).export_weights(), graph.export_weights())
+
+    def test_gate_blocks_writers_while_frozen(self):
+        gate = SnapshotGate()
+        gate.freeze()
+        entered = threading.Event()
+
+        def write():
+            with gate:
+                entered.set()
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        self.assertFalse(entered.wait(0.05))
+        gate.thaw()
+        writer.join()
+        self.assertTrue(entered.is_set())
+        stats = gate.get_stats()
+        self.assertEqual((stats["freezes"], stats["blocked_writes"]), (1, 1))
+        self.assertGreater(stats["blocked_seconds"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
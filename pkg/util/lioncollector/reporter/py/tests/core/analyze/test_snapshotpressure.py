@@ -0,0 +1,69 @@
+import sys
+import os
+import random
+import tempfile
+import threading
+import time
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.analyze.graph import Graph
+from core.analyze.snapshot import Snapshotter, FORK, FREEZE
+
+# Constants
+NUM_TRANSACTIONS = 100000  # 预先写入的事务数量
+MAX_REGION_ID = 20000      # 最大region ID
+MIN_REGIONS = 1            # 事务中最小region数量
+MAX_REGIONS = 5            # 事务中最大region数量
+BATCH_SIZE = 64            # 快照期间写入线程每批写入的事务数量
+
+
+class TestSnapshotPerformance:
+    def __init__(self):
+        random.seed(0)
+        self.transactions = [random.sample(range(1, MAX_REGION_ID + 1), random.randint(MIN_REGIONS, MAX_REGIONS))
+                             for _ in range(NUM_TRANSACTIONS)]
+
+    def run_mode(self, mode, directory, compresslevel):
+        graph = Graph(weight=1, theta=1)
+        graph.add_transactions(self.transactions)
+        snapshotter = Snapshotter(graph, directory=directory, mode=mode, compresslevel=compresslevel)
+        stop = threading.Event()
+        latencies = []
+
+        def write():
+            position = 0
+            while not stop.is_set():
+                batch = self.transactions[position:position + BATCH_SIZE]
+                position = (position + BATCH_SIZE) % NUM_TRANSACTIONS
+                start_time = time.perf_counter()
+                graph.add_transactions(batch)
+                latencies.append(time.perf_counter() - start_time)
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        time.sleep(0.5)
+        snapshotter.snapshot_once()
+        stop.set()
+        writer.join()
+        return snapshotter.get_stats(), max(latencies)
+
+    def run_performance_test(self):
+        print("Performance Test Parameters:")
+        print(f"  Total Transactions: {NUM_TRANSACTIONS}")
+        print(f"  Max Region ID: {MAX_REGION_ID}")
+        print(f"  Writer Batch Size: {BATCH_SIZE}")
+        print("Starting performance test...")
+        runs = [(FREEZE, 0)] + ([(FORK, 0), (FORK, 1), (FORK, 6)] if hasattr(os, 'fork') else [])
+        with tempfile.TemporaryDirectory() as directory:
+            for mode, compresslevel in runs:
+                stats, max_latency = self.run_mode(mode, directory, compresslevel)
+                print(f"  [{mode}, compresslevel={compresslevel}] Snapshot: {stats['last_duration'] * 1000:.2f} milliseconds, "
+                      f"Size: {stats['last_bytes']} bytes, Write: {stats['bytes_per_second'] / 1e6:.2f} MB/second, "
+                      f"Ingest Stall: {stats['last_stall'] * 1000:.2f} milliseconds, "
+                      f"Max Batch Latency: {max_latency * 1000:.2f} milliseconds")
+
+if __name__ == '__main__':
+    tester = TestSnapshotPerformance()
+    tester.run_performance_test()
@@ -0,0 +1,165 @@
+import os
+import random
+import sys
+import threading
+import time
+import unittest
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.analyze.view import MaterializedView, ViewRefresher
+from core.analyze.graph import Graph
+from core.analyze.densegraph import DenseGraph
+
+
+class TestMaterializedView(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(3)
+        self.graph = Graph(weight=1, theta=1, top_hot_threshold=2)
+        for _ in range(500):
+            self.graph.add_transaction(random.sample(range(80), random.randint(1, 4)))
+
+    def assert_same_clumps(self, clumps, expected):
+        self.assertEqual([(clump.region_ids, clump.hot) for clump in clumps],
+                         [(clump.region_ids, clump.hot) for clump in expected])
+
+    def test_matches_graph(self):
+        view = MaterializedView.from_graph(self.graph, 1)
+        self.assertEqual(view.get_top_hot_regions(10), self.graph.get_top_hot_regions(10))
+        self.assertEqual(view.get_top_hot_regions(), self.graph.get_top_hot_regions())
+        for edge_thresh in (1, 2, 3):
+            self.assert_same_clumps(view.get_hot_region(edge_thresh), self.graph.get_hot_region(edge_thresh))
+        # 相同阈值的结果以数组缓存，每次返回新的Clump对象
+        self.assertIs(view.get_hot_components(2), view.get_hot_components(2))
+        self.assertIsNot(view.get_hot_region(2)[0], view.get_hot_region(2)[0])
+        stats = view.get_stats()
+        self.assertEqual((stats["version"], stats["vertices"], stats["edges"]),
+                         (1, len(self.graph.vertices), len(self.graph.edges)))
+
+    def test_view_is_immutable(self):
+        view = MaterializedView.from_graph(self.graph, 1)
+        expected = view.get_top_hot_regions(5)
+        for _ in range(50):
+            self.graph.add_transaction([1000, 1001])
+        self.assertEqual(view.get_top_hot_regions(5), expected)
+        self.assertEqual(MaterializedView.from_graph(self.graph, 2).get_top_hot_regions(1)[0][0], 1000)
+
+    def test_dense_graph_and_empty_graph(self):
+        dense = DenseGraph(weight=1, theta=1)
+        dense.add_transaction([1, 2])
+        dense.add_transaction([1, 3])
+        view = MaterializedView.from_graph(dense, 1)
+        self.assertEqual(view.get_top_hot_regions(1), [(1, 2)])
+        self.assertEqual([clump.region_ids for clump in view.get_hot_region(0)], [{1, 2, 3}])
+        empty = MaterializedView.from_graph(Graph(), 1)
+        self.assertEqual((empty.get_top_hot_regions(), empty.get_hot_region(0)), ([], []))
+
+    def test_refresher(self):
+        refresher = ViewRefresher(self.graph, interval=60).start()
+        self.assertEqual(refresher.current().version, 1)
+        self.graph.add_transaction([1000, 1001], 100)
+        self.assertNotEqual(refresher.current().get_top_hot_regions(1)[0][0], 1000)
+        refresher.refresh()
+        refresher.stop()
+        self.assertEqual(refresher.current().get_top_hot_regions(1)[0][0], 1000)
+        stats = refresher.get_stats()
+        self.assertEqual((stats["version"], stats["refreshes"], stats["failures"]), (2, 2, 0))
+
+
+class TestVersionedViews(unittest.TestCase):
+
+    def assert_same_clumps(self, clumps, expected):
+        self.assertEqual(sorted((sorted(clump.region_ids), clump.hot) for clump in clumps),
+                         sorted((sorted(clump.region_ids), clump.hot) for clump in expected))
+
+    def check_versions(self, graph, write):
+        random.seed(11)
+        write(graph)
+        graph.enable_read_views()
+        previous = None
+        for _ in range(3):
+            write(graph)
+            view = graph.get_read_view()
+            # get_hot_region复用刚发布的版本，不再发布新版本
+            self.assertEqual(view.version, previous.version + 1 if previous else 1)
+            previous = view
+            self.assertEqual(view.get_top_hot_regions(), graph.get_top_hot_regions())
+            # 超边保存在视图中，不展开为两两之间的边
+            self.assertEqual((view.vertex_count(), view.edge_count(), view.get_stats()["hyperedges"]),
+                             (len(graph.vertices), len(graph.edges), len(graph.hyperedges)))
+            # get_hot_region在读视图上计算，结果与直接遍历图相同
+            read_views, graph.read_views = graph.read_views, None
+            expected = graph.get_hot_region(2)
+            graph.read_views = read_views
+            self.assert_same_clumps(graph.get_hot_region(2), expected)
+            self.assertIs(graph.read_views.current(), view)
+
+    def test_incremental_versions(self):
+        def write(graph):
+            graph.add_transactions([random.sample(range(40), random.randint(1, 4)) for _ in range(100)])
+            graph.add_transaction(random.sample(range(40), 3), 2)
+            graph.remove_edge(*random.sample(range(40), 2))
+            # 自环边的键只有一个region
+            graph.add_edge_weight(*[random.randrange(40)] * 2, 3)
+        self.check_versions(Graph(weight=1, theta=1), write)
+
+    def test_versions_with_hyperedges(self):
+        def write(graph):
+            for _ in range(30):
+                graph.add_transaction(random.sample(range(40), random.randint(1, 6)))
+            # 权重超过阈值的超边
+            graph.add_transaction(random.sample(range(40, 50), 4), 3)
+        self.check_versions(Graph(weight=1, theta=1, hyperedge_min_size=4), write)
+
+    def test_versions_with_decay(self):
+        graph = Graph(weight=1, theta=1, half_life=3600)
+        graph.enable_read_views()
+        graph.add_transaction([1, 2], 4)
+        graph.get_read_view()
+        # 重新设定衰减基准时间后，上一版本保存的权重换算到新的基准
+        graph.decay_lock.acquire()
+        graph.rebase_decay(graph.decay.origin + 3600)
+        graph.decay_lock.release()
+        graph.add_transaction([2, 3], 2)
+        view = graph.get_read_view()
+        self.assertAlmostEqual(dict(view.get_top_hot_regions())[1], graph.get_vertex_weight(1), delta=0.01)
+        self.assertAlmostEqual(dict(view.get_top_hot_regions())[3], graph.get_vertex_weight(3), delta=0.01)
+
+    def test_view_is_consistent_while_writing(self):
+        graph = Graph(weight=1, theta=1)
+        graph.enable_read_views()
+        stop = threading.Event()
+
+        def write():
+            region_id = 0
+            while not stop.is_set():
+                graph.add_transactions([[region_id % 50, region_id % 50 + 1]] * 40)
+                region_id += 1
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        views = []
+        for _ in range(5):
+            time.sleep(0.01)
+            views.append(graph.get_read_view())
+        stop.set()
+        writer.join()
+        for view in views:
+            # 每个事务恰好访问两个region，一致的版本中点权之和等于边权之和的两倍
+            self.assertEqual(view.get_stats()["total_vertex_weight"], 2 * view.edge_weights.sum())
+        stats = graph.read_views.get_stats()
+        self.assertEqual((stats["version"], stats["publishes"]), (5, 5))
+        self.assertIs(graph.get_read_view(max_age=60), graph.get_read_view(max_age=60))
+        # max_age为0时每次分析都发布新版本
+        graph.read_views.max_age = 0
+        graph.get_hot_region(1)
+        graph.get_hot_region(1)
+        self.assertEqual(graph.read_views.get_stats()["version"], 7)
+        with self.assertRaises(ValueError):
+            Graph().get_read_view()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import sys
+import os
+import random
+import time
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.analyze.graph import Graph
+from core.analyze.view import ViewRefresher
+
+# Constants
+NUM_TRANSACTIONS = 100000  # 预先写入的事务数量
+MAX_REGION_ID = 20000      # 最大region ID
+MIN_REGIONS = 1            # 事务中最小region数量
+MAX_REGIONS = 5            # 事务中最大region数量
+BATCH_SIZE = 64            # 每批写入的事务数量
+NUM_QUERIES = 20           # 每种查询的次数
+EDGE_THRESHOLDS = (1, 2, 5, 10)  # 查询使用的边权阈值
+
+
+class TestViewPerformance:
+    def __init__(self):
+        random.seed(0)
+        transactions = [random.sample(range(1, MAX_REGION_ID + 1), random.randint(MIN_REGIONS, MAX_REGIONS))
+                        for _ in range(NUM_TRANSACTIONS)]
+        self.graph = Graph(weight=1, theta=1)
+        for i in range(0, NUM_TRANSACTIONS, BATCH_SIZE):
+            self.graph.add_transactions(transactions[i:i + BATCH_SIZE])
+
+    def time_queries(self, query):
+        start_time = time.perf_counter()
+        for index in range(NUM_QUERIES):
+            query(EDGE_THRESHOLDS[index % len(EDGE_THRESHOLDS)])
+        return (time.perf_counter() - start_time) / NUM_QUERIES
+
+    def run_performance_test(self):
+        print("Performance Test Parameters:")
+        print(f"  Total Transactions: {NUM_TRANSACTIONS}")
+        print(f"  Max Region ID: {MAX_REGION_ID}")
+        print(f"  Queries: {NUM_QUERIES}, Edge Thresholds: {EDGE_THRESHOLDS}")
+        print("Starting performance test...")
+        refresher = ViewRefresher(self.graph)
+        refresher.refresh()
+        view = refresher.current()
+        live_clumps = self.time_queries(self.graph.get_hot_region)
+        view_clumps = self.time_queries(view.get_hot_region)
+        live_top = self.time_queries(lambda _: self.graph.get_top_hot_regions(100))
+        view_top = self.time_queries(lambda _: view.get_top_hot_regions(100))
+        same = view.get_top_hot_regions(100) == self.graph.get_top_hot_regions(100)
+        print(f"  [refresh] Duration: {refresher.last_duration * 1000:.2f} milliseconds, "
+              f"Vertices: {view.vertex_count()}, Edges: {view.edge_count()}")
+        print(f"  [clumps] Live Graph: {live_clumps * 1000:.2f} milliseconds/query, "
+              f"View: {view_clumps * 1000:.2f} milliseconds/query")
+        print(f"  [top hot] Live Graph: {live_top * 1000:.3f} milliseconds/query, "
+              f"View: {view_top * 1000:.3f} milliseconds/query, Same Top Hot Regions: {same}")
+
+if __name__ == '__main__':
+    tester = TestViewPerformance()
+    tester.run_performance_test()
@@ -0,0 +1,62 @@
+import os
+import sys
+import unittest
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.analyze.graph import Graph
+from core.analyze.window import EpochRing
+
+
+class TestEpochRing(unittest.TestCase):
+
+    def test_advance(self):
+        ring = EpochRing(60, epoch_count=3)
+        self.assertEqual(ring.record_vertex(1, 5, now=100), [])
+        self.assertEqual(ring.advance(125), [])
+        self.assertEqual([epoch.start for epoch in ring.epochs], [100, 120])
+        expired = ring.advance(161)
+        self.assertEqual([epoch.vertex_weights for epoch in expired], [{1: 5}])
+        self.assertEqual([epoch.start for epoch in ring.epochs], [120, 140, 160])
+        # 空闲超过整个窗口后所有时间片都过期
+        self.assertEqual(len(ring.advance(500)), 3)
+        self.assertEqual([epoch.start for epoch in ring.epochs], [500])
+        with self.assertRaises(ValueError):
+            EpochRing(0)
+
+
+class TestWindowedGraph(unittest.TestCase):
+
+    def test_expire_old_transactions(self):
+        graph = Graph(weight=1, theta=1, top_hot_threshold=0, window_seconds=60, window_epochs=3)
+        graph.add_transaction([1, 2], weight=5)
+        start = graph.window.epochs[0].start
+        graph.expire_window(start + 45)
+        graph.add_transaction([2, 3])
+        self.assertEqual(len(graph.vertices), 3)
+        self.assertEqual(graph.get_vertex_weight(2), 6)
+
+        graph.expire_window(start + 61)
+        self.assertEqual(sorted(graph.vertices.keys()), [2, 3])
+        self.assertEqual(graph.edges.keys(), [frozenset({2, 3})])
+        self.assertEqual(graph.get_adjacent_regions(2), {3})
+        self.assertEqual(graph.get_top_hot_regions(), [(2, 1), (3, 1)])
+        self.assertEqual([clump.region_ids for clump in graph.get_hot_region(0)], [{2, 3}])
+
+        graph.expire_window(start + 1000)
+        self.assertEqual(len(graph.vertices), 0)
+        self.assertEqual(len(graph.edges), 0)
+        self.assertEqual(len(graph.top_hot_index), 0)
+        self.assertEqual(graph.window.get_stats()["recorded_vertices"], 0)
+
+    def test_window_with_decay(self):
+        graph = Graph(weight=1, theta=1, half_life=60, window_seconds=60, window_epochs=2)
+        graph.add_transaction([1, 2], weight=4)
+        graph.expire_window(graph.window.epochs[0].start + 1000)
+        self.assertEqual(len(graph.vertices), 0)
+        self.assertEqual(len(graph.edges), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import sys
+import asyncio
+import random
+import unittest
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.analyze.graph import Graph
+from core.ingest.batcher import AsyncBatcher
+from core.ingest.ingestqueue import BLOCK, REJECT, SHED
+
+
+class TestAsyncBatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = Graph(weight=1, theta=1, top_hot_threshold=0)
+
+    def test_flush_applies_all_transactions(self):
+        async def run():
+            batcher = AsyncBatcher(self.graph, max_batch_size=2)
+            batcher.start()
+            batcher.put([1, 2])
+            batcher.put_many([[2, 3], [1, 2], [4]])
+            await batcher.flush()
+            await batcher.stop()
+            return batcher
+
+        batcher = asyncio.run(run())
+        self.assertEqual(batcher.applied_count, 4)
+        self.assertEqual(batcher.batch_count, 2)
+        self.assertEqual(self.graph.vertices.get(1).weight, 2)
+        self.assertEqual(self.graph.vertices.get(4).weight, 1)
+        self.assertEqual(self.graph.edges.get(frozenset({1, 2})).weight, 2)
+
+    def test_flush_without_transactions(self):
+        async def run():
+            batcher = AsyncBatcher(self.graph)
+            batcher.start()
+            await batcher.flush()
+            await batcher.stop()
+            return batcher
+
+        self.assertEqual(asyncio.run(run()).applied_count, 0)
+
+    def test_failed_batch_does_not_stop_batcher(self):
+        async def run():
+            batcher = AsyncBatcher(self.graph, max_batch_size=1)
+            batcher.start()
+            # 不可哈希的regionID使该批写入失败
+            batcher.put_many([[1, 2], [[1], [2]], [2, 3]])
+            await asyncio.wait_for(batcher.flush(), timeout=5)
+            batcher.put([3, 4])
+            await asyncio.wait_for(batcher.stop(), timeout=5)
+            return batcher
+
+        batcher = asyncio.run(run())
+        self.assertEqual((batcher.applied_count, batcher.failed_count), (3, 1))
+        self.assertEqual(self.graph.edges.get(frozenset({3, 4})).weight, 1)
+
+    def test_reject_when_full(self):
+        async def run():
+            batcher = AsyncBatcher(self.graph, capacity=2, policy=REJECT)
+            # 未启动批处理协程，事务一直积压
+            self.assertTrue(await batcher.offer([[1], [2]]))
+            self.assertFalse(await batcher.offer([[3]]))
+            return batcher
+
+        stats = asyncio.run(run()).get_stats()
+        self.assertEqual((stats["pending"], stats["rejected"]), (2, 1))
+
+    def test_block_waits_for_writer(self):
+        async def run():
+            batcher = AsyncBatcher(self.graph, capacity=2, policy=BLOCK)
+            await batcher.offer([[1, 2], [2, 3]])
+            offer = asyncio.get_running_loop().create_task(batcher.offer([[3, 4]]))
+            await asyncio.sleep(0.01)
+            self.assertFalse(offer.done())
+            batcher.start()
+            self.assertTrue(await asyncio.wait_for(offer, timeout=5))
+            await batcher.stop()
+            return batcher
+
+        self.assertEqual(asyncio.run(run()).applied_count, 3)
+        self.assertEqual(self.graph.edges.get(frozenset({3, 4})).weight, 1)
+
+    def test_shed_never_exceeds_capacity(self):
+        async def run():
+            batcher = AsyncBatcher(self.graph, capacity=100, policy=SHED, min_sample_rate=0.1)
+            await batcher.offer([[1]])
+            await batcher.offer([[2]] * 1000, [2] * 1000)
+            stats = batcher.get_stats()
+            self.assertLessEqual(stats["pending"], 100)
+            self.assertEqual(stats["dropped"] + stats["pending"], 1001)
+            batcher.start()
+            await batcher.stop()
+
+        random.seed(0)
+        asyncio.run(run())
+        # 保留事务的权重放大后，点权之和仍是无偏估计
+        self.assertAlmostEqual(self.graph.vertices.get(2).weight / 2000, 1.0, delta=0.15)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import os
+import sys
+import time
+import unittest
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.ingest.coalescer import Coalescer
+
+
+class TestCoalescer(unittest.TestCase):
+
+    def test_merge_identical_transactions(self):
+        coalescer = Coalescer(window_seconds=60)
+        coalescer.add([(1, 2), (3,), (1, 2)])
+        coalescer.add([[1, 2]], [2.5])
+        self.assertFalse(coalescer.should_flush())
+        batch, weights = coalescer.drain()
+        self.assertEqual(dict(zip(batch, weights)), {(1, 2): 4.5, (3,): 1})
+        self.assertEqual(coalescer.input_count, 4)
+        self.assertEqual(coalescer.output_count, 2)
+        self.assertIsNone(coalescer.time_until_flush())
+
+    def test_flush_on_max_pending(self):
+        coalescer = Coalescer(window_seconds=60, max_pending=2)
+        coalescer.add([(1,), (1,)])
+        self.assertFalse(coalescer.should_flush())
+        coalescer.add([(2,)])
+        self.assertTrue(coalescer.should_flush())
+
+    def test_flush_on_window(self):
+        coalescer = Coalescer(window_seconds=0.01)
+        self.assertFalse(coalescer.should_flush())
+        coalescer.add([(1,)])
+        time.sleep(0.02)
+        self.assertEqual(coalescer.time_until_flush(), 0)
+        self.assertTrue(coalescer.should_flush())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import sys
+import os
+import random
+import time
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from lionserver import SQLInfoServicer
+from core.analyze.graph import Graph
+
+# Constants
+NUM_TRANSACTIONS = 200000  # 总事务数量
+NUM_PATTERNS = 100         # 不同访问模式（regionID集合）的数量
+ZIPF_S = 1.2               # 访问模式的Zipf偏斜系数
+MAX_REGION_ID = 1000       # 最大region ID
+MAX_REGIONS = 5            # 事务中最大region数量
+BATCH_SIZE = 500           # 每次放入队列的事务数量
+COALESCE_WINDOW = 0.05     # 合并窗口（秒）
+
+
+class CountingGraph(Graph):
+    """
+    统计add_transaction调用次数（即图的写入次数）的Graph。
+    """
+    def __init__(self):
+        super().__init__(weight=10, theta=1, top_hot_threshold=5)
+        self.mutation_count = 0
+
+    def add_transaction(self, region_ids, weight=1):
+        self.mutation_count += 1
+        super().add_transaction(region_ids, weight)
+
+
+class TestCoalescerPerformance:
+    def __init__(self):
+        random.seed(0)
+        patterns = [random.sample(range(1, MAX_REGION_ID + 1), random.randint(1, MAX_REGIONS)) for _ in range(NUM_PATTERNS)]
+        zipf_weights = [1 / (rank + 1) ** ZIPF_S for rank in range(NUM_PATTERNS)]
+        self.transactions = random.choices(patterns, weights=zipf_weights, k=NUM_TRANSACTIONS)
+
+    def run_servicer(self, coalesce_window):
+        graph = CountingGraph()
+        servicer = SQLInfoServicer(graph, queue_count=10, workers_per_queue=2, save_interval=0,
+                                   coalesce_window=coalesce_window)
+        start_time = time.time()
+        for i in range(0, NUM_TRANSACTIONS, BATCH_SIZE):
+            servicer.dispatch_batch(self.transactions[i:i + BATCH_SIZE])
+        for task_queue in servicer.task_queues:
+            task_queue.join()
+        elapsed = time.time() - start_time
+        return graph, elapsed
+
+    def run_performance_test(self):
+        print("Performance Test Parameters:")
+        print(f"  Total Transactions: {NUM_TRANSACTIONS}")
+        print(f"  Access Patterns: {NUM_PATTERNS} (zipf s={ZIPF_S})")
+        print(f"  Coalesce Window: {COALESCE_WINDOW} seconds")
+        print("Starting performance test...")
+
+        plain_graph, plain_time = self.run_servicer(0)
+        coalesced_graph, coalesced_time = self.run_servicer(COALESCE_WINDOW)
+        # 合并前后的点权应完全一致
+        assert plain_graph.export_weights()[0] == coalesced_graph.export_weights()[0]
+
+        print("\nPerformance Test Completed:")
+        print(f"  Without Coalescing: {plain_graph.mutation_count} graph mutations, "
+              f"{NUM_TRANSACTIONS / plain_time:.2f} transactions/second")
+        print(f"  With Coalescing: {coalesced_graph.mutation_count} graph mutations, "
+              f"{NUM_TRANSACTIONS / coalesced_time:.2f} transactions/second")
+        print(f"  Mutation Reduction: {plain_graph.mutation_count / max(coalesced_graph.mutation_count, 1):.1f}x")
+
+if __name__ == '__main__':
+    tester = TestCoalescerPerformance()
+    tester.run_performance_test()
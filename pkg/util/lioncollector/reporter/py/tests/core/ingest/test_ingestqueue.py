@@ -0,0 +1,108 @@
+import os
+import sys
+import queue
+import random
+import threading
+import unittest
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.ingest.ingestqueue import IngestQueue, BLOCK, REJECT, SHED
+
+
+class TestIngestQueue(unittest.TestCase):
+
+    def test_unbounded_block(self):
+        ingest_queue = IngestQueue(policy=BLOCK)
+        for _ in range(100):
+            self.assertTrue(ingest_queue.offer([(1, 2)]))
+        self.assertEqual(ingest_queue.get_stats()["depth"], 100)
+        self.assertEqual(ingest_queue.get(), ([(1, 2)], None))
+
+    def test_reject_when_full(self):
+        ingest_queue = IngestQueue(capacity=2, policy=REJECT)
+        self.assertTrue(ingest_queue.offer([(1,)]))
+        self.assertTrue(ingest_queue.offer([(2,)]))
+        self.assertFalse(ingest_queue.offer([(3,), (4,)]))
+        stats = ingest_queue.get_stats()
+        self.assertEqual(stats["depth"], 2)
+        self.assertEqual(stats["rejected"], 2)
+
+    def test_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            IngestQueue(policy="drop")
+
+    def test_reject_counts_transactions(self):
+        # 容量按事务数计算，一个大批次不能绕过容量限制
+        ingest_queue = IngestQueue(capacity=4, policy=REJECT)
+        self.assertTrue(ingest_queue.offer([(1,), (2,), (3,)]))
+        self.assertFalse(ingest_queue.offer([(4,), (5,)]))
+        self.assertTrue(ingest_queue.offer([(4,)]))
+        self.assertEqual(ingest_queue.get_stats()["pending"], 4)
+        ingest_queue.get()
+        # 队列为空时接受超过容量的批次
+        ingest_queue.get()
+        self.assertTrue(ingest_queue.offer([(6,)] * 10))
+        self.assertEqual(ingest_queue.get_stats()["pending"], 10)
+
+    def test_block_waits_for_room(self):
+        ingest_queue = IngestQueue(capacity=2, policy=BLOCK)
+        ingest_queue.offer([(1,), (2,)])
+        offered = threading.Event()
+        thread = threading.Thread(target=lambda: (ingest_queue.offer([(3,)]), offered.set()))
+        thread.start()
+        self.assertFalse(offered.wait(0.1))
+        self.assertEqual(ingest_queue.get(), ([(1,), (2,)], None))
+        self.assertTrue(offered.wait(1))
+        thread.join()
+        ingest_queue.task_done()
+        ingest_queue.get()
+        ingest_queue.task_done()
+        ingest_queue.join()
+        with self.assertRaises(queue.Empty):
+            ingest_queue.get(timeout=0.01)
+
+    def test_shed_scales_weights(self):
+        random.seed(0)
+        ingest_queue = IngestQueue(capacity=20000, policy=SHED, shed_watermark=0.5, min_sample_rate=0.1)
+        # 低于水位线时不采样
+        ingest_queue.offer([(1,)] * 5000)
+        ingest_queue.offer([(1,)] * 5000)
+        self.assertEqual(ingest_queue.get_stats()["sample_rate"], 1.0)
+        # 占用一半后按(1 - 0.5) / (1 - 0.5) = 1.0采样，占用3/4后按0.5采样
+        ingest_queue.offer([(1,)] * 5000)
+        batch = [(2,)] * 8000
+        ingest_queue.offer(batch, [2] * len(batch))
+        stats = ingest_queue.get_stats()
+        self.assertEqual(stats["sample_rate"], 0.5)
+        for _ in range(3):
+            ingest_queue.get()
+        kept_batch, kept_weights = ingest_queue.get()
+        self.assertEqual(set(kept_weights), {4.0})
+        self.assertEqual(stats["dropped"], len(batch) - len(kept_batch))
+        # 保留事务的权重之和是原始权重之和的无偏估计
+        self.assertAlmostEqual(sum(kept_weights) / (2 * len(batch)), 1.0, delta=0.05)
+
+    def test_shed_never_exceeds_capacity(self):
+        random.seed(0)
+        ingest_queue = IngestQueue(capacity=10, policy=SHED, min_sample_rate=1.0)
+        self.assertTrue(ingest_queue.offer([(1,)] * 8))
+        self.assertTrue(ingest_queue.offer([(2,)] * 5, [2] * 5))
+        stats = ingest_queue.get_stats()
+        self.assertEqual((stats["pending"], stats["dropped"]), (10, 3))
+        # 放不下时把采样率降到刚好放下，保留事务的权重之和仍是无偏估计
+        ingest_queue = IngestQueue(capacity=1000, policy=SHED, min_sample_rate=0.1)
+        ingest_queue.offer([(1,)])
+        batch = [(2,)] * 10000
+        self.assertTrue(ingest_queue.offer(batch))
+        stats = ingest_queue.get_stats()
+        self.assertLessEqual(stats["pending"], 1000)
+        self.assertEqual(stats["sample_rate"], 0.1)
+        ingest_queue.get()
+        tail_batch, tail_weights = ingest_queue.get()
+        self.assertEqual(stats["dropped"], len(batch) - len(tail_batch))
+        self.assertAlmostEqual(sum(tail_weights) / len(batch), 1.0, delta=0.1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import sys
+import time
+import unittest
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.ingest.txnbuffer import TxnBuffer
+
+
+class TestTxnBuffer(unittest.TestCase):
+
+    def test_merge_statements_by_txn_id(self):
+        buffer = TxnBuffer(timeout=60)
+        self.assertEqual(buffer.add(7, [3, 1]), [])
+        self.assertEqual(buffer.add(8, [5]), [])
+        self.assertEqual(buffer.add(7, [2, 1]), [])
+        self.assertEqual(buffer.get_stats()["open_txns"], 2)
+        self.assertEqual(buffer.get_stats()["buffered_regions"], 4)
+        self.assertEqual(sorted(buffer.flush()), [(1, 2, 3), (5,)])
+        self.assertEqual(buffer.get_stats()["buffered_regions"], 0)
+
+    def test_statement_without_txn_passes_through(self):
+        buffer = TxnBuffer(timeout=60)
+        self.assertEqual(buffer.add(0, [1, 2, 1]), [(1, 2, 1)])
+        self.assertEqual(buffer.get_stats()["open_txns"], 0)
+
+    def test_expire_idle_txns(self):
+        buffer = TxnBuffer(timeout=1)
+        buffer.add(1, [1])
+        buffer.add(2, [2])
+        now = time.time()
+        buffer.open_txns[1][1] = now - 2
+        self.assertEqual(buffer.expire(now), [(1,)])
+        self.assertEqual(list(buffer.open_txns), [2])
+
+    def test_evict_on_limits(self):
+        buffer = TxnBuffer(timeout=60, max_regions_per_txn=3, max_open_txns=2)
+        buffer.add(1, [1, 2])
+        self.assertEqual(buffer.add(1, [3]), [(1, 2, 3)])
+        buffer.add(2, [4])
+        buffer.add(3, [5])
+        self.assertEqual(buffer.add(4, [6]), [(4,)])
+        self.assertEqual(buffer.get_stats()["evicted_txns"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.ingest.wal import IngestLog, encode_batch, encode_delta_marker, decode_records
+from core.analyze.graph import Graph
+from core.analyze.snapshot import Snapshotter, FREEZE, FORK
+
+
+class TestIngestLog(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.wal_directory = os.path.join(self.directory.name, "wal")
+        self.snapshot_directory = os.path.join(self.directory.name, "history")
+        os.makedirs(self.snapshot_directory)
+        random.seed(5)
+        self.batches = [[random.sample(range(100), random.randint(1, 4)) for _ in range(20)] for _ in range(30)]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assert_same_graph(self, graph, expected):
+        vertex_weights, edge_weights = graph.export_weights()
+        expected_vertex_weights, expected_edge_weights = expected.export_weights()
+        self.assertEqual(vertex_weights, expected_vertex_weights)
+        self.assertEqual(sorted((min(a, b), max(a, b), w) for a, b, w in edge_weights),
+                         sorted((min(a, b), max(a, b), w) for a, b, w in expected_edge_weights))
+
+    def test_encode_decode(self):
+        data = encode_batch([[1, 2], [], [3]], [2, 1, 5], 100.5) + encode_batch([[4, 5]], [0.5], 101)
+        records, complete = decode_records(data)
+        self.assertTrue(complete)
+        self.assertEqual(records, [([[1, 2], [], [3]], [2, 1, 5], 100.5), ([[4, 5]], [0.5], 101)])
+        records, complete = decode_records(encode_delta_marker("collector", 7, 102) + encode_batch([[6]], None, 103))
+        self.assertTrue(complete)
+        self.assertEqual(records, [(None, ("collector", 7), 102), ([[6]], [1], 103)])
+        self.assertEqual(decode_records(encode_batch([[7]], timestamp=7))[0], [([[7]], [1], 7)])
+
+    def test_torn_tail_is_skipped(self):
+        data = encode_batch([[1, 2]], timestamp=1) + encode_batch([[3, 4]], timestamp=2)
+        records, complete = decode_records(data[:-3])
+        self.assertFalse(complete)
+        self.assertEqual(records, [([[1, 2]], [1], 1)])
+        corrupted = bytearray(data)
+        corrupted[-1] ^= 0xFF
+        self.assertEqual(decode_records(bytes(corrupted))[0], [([[1, 2]], [1], 1)])
+
+    def test_replay_after_restart(self):
+        expected = Graph(weight=1, theta=1)
+        graph = Graph(weight=1, theta=1)
+        graph.attach_ingest_log(IngestLog(self.wal_directory, segment_bytes=1024))
+        for batch in self.batches:
+            expected.add_transactions(batch)
+            graph.add_transactions(batch)
+        graph.add_transaction([1, 2], 3)
+        expected.add_transaction([1, 2], 3)
+        graph.ingest_log.close()
+        self.assertGreater(len(graph.ingest_log.segments()), 1)
+        # 重启后从新的段开始写入，之前的段全部重放
+        recovered = Graph(weight=1, theta=1)
+        ingest_log = IngestLog(self.wal_directory)
+        self.assertEqual(ingest_log.replay(recovered), 30 * 20 + 1)
+        self.assert_same_graph(recovered, expected)
+        # 重放不会再次写入日志
+        self.assertEqual(ingest_log.get_stats()["appended_transactions"], 0)
+
+    def test_replay_with_decay_uses_record_time(self):
+        clock = [1000.0]
+        with mock.patch('time.time', lambda: clock[0]):
+            graph = Graph(weight=1, theta=1, half_life=600)
+            graph.attach_ingest_log(IngestLog(self.wal_directory))
+            graph.add_transactions([[1, 2]] * 4)
+            graph.ingest_log.close()
+            # 停机一小时后重放，权重按写入时间衰减，而不是按重放时间
+            clock[0] += 3600
+            recovered = Graph(weight=1, theta=1, half_life=600)
+            IngestLog(self.wal_directory).replay(recovered)
+            self.assertAlmostEqual(recovered.get_edge_weight(1, 2), graph.get_edge_weight(1, 2))
+            self.assertAlmostEqual(recovered.get_vertex_weight(1), 4 / 64)
+
+    def check_snapshot_and_truncate(self, mode):
+        expected = Graph(weight=1, theta=1)
+        graph = Graph(weight=1, theta=1)
+        ingest_log = IngestLog(self.wal_directory, segment_bytes=1024)
+        graph.attach_ingest_log(ingest_log)
+        snapshotter = Snapshotter(graph, directory=self.snapshot_directory, mode=mode, ingest_log=ingest_log)
+        for batch in self.batches[:20]:
+            expected.add_transactions(batch)
+            graph.add_transactions(batch)
+        filename = snapshotter.snapshot_once()
+        # 检查点之前的段已删除
+        self.assertEqual(ingest_log.segments(), [graph.ingest_checkpoint])
+        for batch in self.batches[20:]:
+            expected.add_transactions(batch)
+            graph.add_transactions(batch)
+        ingest_log.close()
+        recovered = Graph.load(filename)
+        self.assertEqual(recovered.ingest_checkpoint, graph.ingest_checkpoint)
+        self.assertEqual(IngestLog(self.wal_directory).replay(recovered, recovered.ingest_checkpoint), 10 * 20)
+        self.assert_same_graph(recovered, expected)
+
+    def test_freeze_snapshot_truncates_log(self):
+        self.check_snapshot_and_truncate(FREEZE)
+
+    @unittest.skipUnless(hasattr(os, 'fork'), "fork is not available")
+    def test_fork_snapshot_truncates_log(self):
+        self.check_snapshot_and_truncate(FORK)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import sys
+import os
+import random
+import tempfile
+import time
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.analyze.graph import Graph
+from core.ingest.wal import IngestLog
+
+# Constants
+TXN_PER_SECOND = 100       # 模拟的线上写入速率
+DURATION_SECONDS = 3600    # 模拟的流量时长，即一小时
+MAX_REGION_ID = 20000      # 最大region ID
+MIN_REGIONS = 1            # 事务中最小region数量
+MAX_REGIONS = 5            # 事务中最大region数量
+BATCH_SIZE = 64            # 每批写入的事务数量
+
+
+class TestIngestLogPerformance:
+    def __init__(self):
+        random.seed(0)
+        self.total = TXN_PER_SECOND * DURATION_SECONDS
+        transactions = [random.sample(range(1, MAX_REGION_ID + 1), random.randint(MIN_REGIONS, MAX_REGIONS))
+                        for _ in range(self.total)]
+        self.batches = [transactions[i:i + BATCH_SIZE] for i in range(0, self.total, BATCH_SIZE)]
+
+    def ingest(self, ingest_log):
+        graph = Graph(weight=10, theta=1)
+        if ingest_log:
+            graph.attach_ingest_log(ingest_log)
+        start_time = time.time()
+        for batch in self.batches:
+            graph.add_transactions(batch)
+        return graph, self.total / (time.time() - start_time)
+
+    def run_performance_test(self):
+        print("Performance Test Parameters:")
+        print(f"  Total Transactions: {self.total} ({DURATION_SECONDS}s at {TXN_PER_SECOND} transactions/second)")
+        print(f"  Max Region ID: {MAX_REGION_ID}")
+        print(f"  Batch Size: {BATCH_SIZE}")
+        print("Starting performance test...")
+        _, plain_throughput = self.ingest(None)
+        with tempfile.TemporaryDirectory() as directory:
+            ingest_log = IngestLog(directory)
+            graph, logged_throughput = self.ingest(ingest_log)
+            ingest_log.close()
+            log_bytes = ingest_log.get_stats()["appended_bytes"]
+            start_time = time.time()
+            recovered = Graph(weight=10, theta=1)
+            replayed = IngestLog(directory).replay(recovered)
+            recovery_time = time.time() - start_time
+        same = recovered.get_top_hot_regions(100) == graph.get_top_hot_regions(100)
+        print(f"  [ingest] Without Log: {plain_throughput:.2f} transactions/second, "
+              f"With Log: {logged_throughput:.2f} transactions/second")
+        print(f"  [log] Size: {log_bytes} bytes")
+        print(f"  [recovery] Replayed: {replayed} transactions in {recovery_time:.2f} seconds "
+              f"({replayed / recovery_time:.2f} transactions/second), Same Top Hot Regions: {same}")
+
+if __name__ == '__main__':
+    tester = TestIngestLogPerformance()
+    tester.run_performance_test()
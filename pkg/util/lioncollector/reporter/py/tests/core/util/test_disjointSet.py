@@ -0,0 +1,29 @@
+import os
+import sys
+import unittest
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.util.disjointSet import DisjointSet
+
+
+class TestDisjointSet(unittest.TestCase):
+
+    def test_union_tracks_members_and_totals(self):
+        disjoint_set = DisjointSet()
+        for key, weight in [(1, 5), (2, 1), (3, 2), (4, 7)]:
+            disjoint_set.add(key, weight)
+        disjoint_set.add(1, 100)  # 已存在的元素被忽略
+        self.assertTrue(disjoint_set.union(1, 2))
+        self.assertTrue(disjoint_set.union(3, 2))
+        self.assertFalse(disjoint_set.union(1, 3))
+        self.assertEqual(len(disjoint_set), 2)
+        self.assertEqual(disjoint_set.find(3), disjoint_set.find(1))
+        disjoint_set.add_weight(3, 10, 12)
+        groups = [(leader, sorted(members), total) for leader, members, total in disjoint_set.groups()]
+        self.assertEqual(groups, [((-12, 3), [1, 2, 3], 18), ((-7, 4), [4], 7)])
+
+
+if __name__ == '__main__':
+    unittest.main()
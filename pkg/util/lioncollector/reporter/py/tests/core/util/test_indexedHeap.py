@@ -0,0 +1,41 @@
+import os
+import sys
+import random
+import unittest
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.util.indexedHeap import IndexedHeap
+
+
+class TestIndexedHeap(unittest.TestCase):
+
+    def test_update_in_place(self):
+        random.seed(3)
+        heap = IndexedHeap()
+        priorities = {}
+        for _ in range(2000):
+            key = random.randint(0, 200)
+            priorities[key] = random.randint(-100, 100)
+            heap.update(key, priorities[key])
+        self.assertEqual(len(heap), len(priorities))
+        expected = sorted((priority, key) for key, priority in priorities.items())
+        self.assertEqual(heap.smallest(), expected)
+        self.assertEqual(heap.smallest(10), expected[:10])
+        self.assertEqual(heap.smallest(limit=0), [item for item in expected if item[0] <= 0])
+
+    def test_remove(self):
+        heap = IndexedHeap()
+        for key in range(20):
+            heap.update(key, -key)
+        for key in range(0, 20, 3):
+            heap.remove(key)
+        heap.remove(100)
+        self.assertNotIn(3, heap)
+        self.assertEqual([key for _, key in heap.smallest()],
+                         [key for key in range(19, -1, -1) if key % 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
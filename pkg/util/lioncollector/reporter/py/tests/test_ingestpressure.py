@@ -0,0 +1,180 @@
+import sys
+import os
+import random
+import time
+import asyncio
+import threading
+import multiprocessing
+from concurrent import futures
+
+import grpc
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import sql_info_pb2
+import sql_info_pb2_grpc
+from lionserver import SQLInfoServicer, serve, serve_async
+from core.analyze.graph import Graph
+
+# Constants
+NUM_TRANSACTIONS = 10000   # 每种模式发送的事务数量
+MAX_REGION_ID = 1000       # 最大region ID
+MIN_REGIONS = 1            # 事务中最小region数量
+MAX_REGIONS = 5            # 事务中最大region数量
+BATCH_SIZE = 500           # 流式接口每个批次包含的事务数量
+LATENCY_CLIENTS = 16       # 延迟测试中并发发送单条请求的客户端线程数
+GRPC_ADDRESS = "localhost:50061"
+LATENCY_GRPC_ADDRESS = "localhost:50062"
+
+
+def generate_transactions():
+    random.seed(0)
+    transactions = []
+    for _ in range(NUM_TRANSACTIONS):
+        num_regions = random.randint(MIN_REGIONS, MAX_REGIONS)
+        transactions.append(random.sample(range(1, MAX_REGION_ID + 1), num_regions))
+    return transactions
+
+
+def run_unary_client(transactions):
+    with grpc.insecure_channel(GRPC_ADDRESS) as channel:
+        stub = sql_info_pb2_grpc.SQLInfoServiceStub(channel)
+        for region_ids in transactions:
+            stub.SendSQLInfo(sql_info_pb2.SQLInfoRequest(region_ids=region_ids))
+
+
+def run_batch_client(transactions):
+    def batch_iterator():
+        for i in range(0, len(transactions), BATCH_SIZE):
+            yield sql_info_pb2.SQLInfoBatchRequest(infos=[
+                sql_info_pb2.SQLInfoRequest(region_ids=region_ids)
+                for region_ids in transactions[i:i + BATCH_SIZE]
+            ])
+
+    with grpc.insecure_channel(GRPC_ADDRESS) as channel:
+        stub = sql_info_pb2_grpc.SQLInfoServiceStub(channel)
+        response = stub.SendSQLInfoBatch(batch_iterator())
+        assert response.accepted == len(transactions)
+
+
+def run_latency_client(address, transactions):
+    latencies = []
+    lock = threading.Lock()
+
+    def send(stub, part):
+        local_latencies = []
+        for region_ids in part:
+            start_time = time.time()
+            stub.SendSQLInfo(sql_info_pb2.SQLInfoRequest(region_ids=region_ids))
+            local_latencies.append((time.time() - start_time) * 1000)  # 转换为毫秒
+        with lock:
+            latencies.extend(local_latencies)
+
+    with grpc.insecure_channel(address) as channel:
+        stub = sql_info_pb2_grpc.SQLInfoServiceStub(channel)
+        with futures.ThreadPoolExecutor(max_workers=LATENCY_CLIENTS) as executor:
+            for future in [executor.submit(send, stub, transactions[i::LATENCY_CLIENTS]) for i in range(LATENCY_CLIENTS)]:
+                future.result()
+    return latencies
+
+
+def client_process(mode, transactions, result_queue):
+    # 客户端运行在独立进程中，避免与服务端争抢GIL
+    start_time = time.time()
+    if mode == "unary":
+        run_unary_client(transactions)
+    else:
+        run_batch_client(transactions)
+    result_queue.put(time.time() - start_time)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def server_process(mode, address):
+    # 延迟测试中服务端运行在独立进程中，两种模式都从空图开始
+    if mode == "async":
+        asyncio.run(serve_async(address, weight=10, theta=1, top_hot_threshold=5, save_interval=0))
+    else:
+        serve(address, weight=10, theta=1, top_hot_threshold=5, save_interval=0)
+
+
+class TestIngestPerformance:
+    def __init__(self):
+        self.graph = Graph(weight=10, theta=1, top_hot_threshold=5)
+        self.servicer = SQLInfoServicer(self.graph, queue_count=10, workers_per_queue=2, save_interval=0)
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+        sql_info_pb2_grpc.add_SQLInfoServiceServicer_to_server(self.servicer, self.server)
+        self.server.add_insecure_port(GRPC_ADDRESS)
+        self.transactions = generate_transactions()
+
+    def run_mode(self, mode):
+        # gRPC不支持在服务端启动后fork，客户端进程使用spawn方式创建
+        context = multiprocessing.get_context("spawn")
+        result_queue = context.Queue()
+        client = context.Process(target=client_process, args=(mode, self.transactions, result_queue))
+        start_time = time.time()
+        client.start()
+        ack_time = result_queue.get()
+        client.join()
+        # 等待所有工作线程处理完队列中的事务
+        self.drain_task_queues()
+        drain_time = time.time() - start_time
+        ack_throughput = NUM_TRANSACTIONS / ack_time
+        print(f"  [{mode}] Ack Time: {ack_time:.2f} seconds, "
+              f"Ack Throughput: {ack_throughput:.2f} transactions/second, "
+              f"Applied Throughput: {NUM_TRANSACTIONS / drain_time:.2f} transactions/second")
+        return ack_throughput
+
+    def run_latency(self, mode, address):
+        context = multiprocessing.get_context("spawn")
+        server = context.Process(target=server_process, args=(mode, address), daemon=True)
+        server.start()
+        try:
+            with grpc.insecure_channel(address) as channel:
+                grpc.channel_ready_future(channel).result(timeout=30)
+            start_time = time.time()
+            latencies = run_latency_client(address, self.transactions)
+            ack_time = time.time() - start_time
+        finally:
+            server.kill()
+            server.join()
+        p50, p99 = percentile(latencies, 50), percentile(latencies, 99)
+        print(f"  [{mode}] Ack Throughput: {NUM_TRANSACTIONS / ack_time:.2f} transactions/second, "
+              f"P50 Ack Latency: {p50:.2f} milliseconds, P99 Ack Latency: {p99:.2f} milliseconds")
+        return p99
+
+    def drain_task_queues(self):
+        for task_queue in self.servicer.task_queues:
+            task_queue.join()
+
+    def run_performance_test(self):
+        print("Performance Test Parameters:")
+        print(f"  Transactions per Mode: {NUM_TRANSACTIONS}")
+        print(f"  Max Region ID: {MAX_REGION_ID}")
+        print(f"  Regions per Transaction: {MIN_REGIONS}-{MAX_REGIONS}")
+        print(f"  Batch Size: {BATCH_SIZE}")
+        print(f"  Latency Clients: {LATENCY_CLIENTS}")
+        print("Starting performance test...")
+
+        self.server.start()
+        try:
+            unary_throughput = self.run_mode("unary")
+            batch_throughput = self.run_mode("batch")
+        finally:
+            self.server.stop(None)
+        thread_p99 = self.run_latency("thread", LATENCY_GRPC_ADDRESS)
+        async_p99 = self.run_latency("async", LATENCY_GRPC_ADDRESS)
+
+        print("\nPerformance Test Completed:")
+        print(f"  Unary Throughput: {unary_throughput:.2f} transactions/second")
+        print(f"  Batch Throughput: {batch_throughput:.2f} transactions/second")
+        print(f"  Speedup: {batch_throughput / unary_throughput:.2f}x")
+        print(f"  P99 Ack Latency (thread / async): {thread_p99:.2f} / {async_p99:.2f} milliseconds")
+
+if __name__ == '__main__':
+    tester = TestIngestPerformance()
+    tester.run_performance_test()
@@ -0,0 +1,201 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import grpc
+
+# 确保能够导入核心模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import sql_info_pb2
+from lionserver import SQLInfoServicer, recover_graph
+from core.analyze.graph import Graph
+from core.ingest.ingestqueue import REJECT
+from core.analyze.snapshot import Snapshotter, FREEZE
+
+
+class AbortContext:
+    def abort(self, code, details):
+        self.code = code
+        raise RuntimeError(details)
+
+
+class TestSQLInfoServicer(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = Graph(weight=1, theta=1, top_hot_threshold=0)
+        self.servicer = SQLInfoServicer(self.graph, queue_count=4, workers_per_queue=1, save_interval=0)
+
+    def wait_for_workers(self):
+        for task_queue in self.servicer.task_queues:
+            task_queue.join()
+
+    def test_send_sql_info(self):
+        response = self.servicer.SendSQLInfo(sql_info_pb2.SQLInfoRequest(region_ids=[1, 2]), None)
+        self.assertTrue(response.success)
+        self.assertEqual(response.accepted, 1)
+        self.wait_for_workers()
+        self.assertEqual(self.graph.vertices.get(1).weight, 1)
+        self.assertEqual(self.graph.edges.get(frozenset({1, 2})).weight, 1)
+
+    def test_send_sql_info_batch(self):
+        batches = [
+            sql_info_pb2.SQLInfoBatchRequest(infos=[
+                sql_info_pb2.SQLInfoRequest(region_ids=[1, 2]),
+                sql_info_pb2.SQLInfoRequest(region_ids=[2, 3]),
+            ]),
+            sql_info_pb2.SQLInfoBatchRequest(infos=[
+                sql_info_pb2.SQLInfoRequest(region_ids=[1, 2]),
+            ]),
+        ]
+        response = self.servicer.SendSQLInfoBatch(iter(batches), None)
+        self.assertTrue(response.success)
+        self.assertEqual(response.accepted, 3)
+        self.wait_for_workers()
+        self.assertEqual(self.graph.vertices.get(1).weight, 2)
+        self.assertEqual(self.graph.vertices.get(2).weight, 3)
+        self.assertEqual(self.graph.edges.get(frozenset({1, 2})).weight, 2)
+        self.assertEqual(self.graph.edges.get(frozenset({2, 3})).weight, 1)
+
+
+    def test_coalesce_identical_transactions(self):
+        graph = Graph(weight=1, theta=1, top_hot_threshold=0)
+        servicer = SQLInfoServicer(graph, queue_count=2, workers_per_queue=1, save_interval=0, coalesce_window=0.01)
+        servicer.dispatch_batch([[1, 2]] * 100 + [[3, 4]] * 50)
+        for task_queue in servicer.task_queues:
+            task_queue.join()
+        self.assertEqual(graph.vertices.get(1).weight, 100)
+        self.assertEqual(graph.edges.get(frozenset({3, 4})).weight, 50)
+        stats = servicer.get_ingest_stats()
+        self.assertEqual(stats["coalesced_input"], 150)
+        self.assertEqual(stats["coalesced_output"], 2)
+
+    def test_merge_statements_by_txn_id(self):
+        graph = Graph(weight=1, theta=1, top_hot_threshold=0)
+        servicer = SQLInfoServicer(graph, queue_count=2, workers_per_queue=1, save_interval=0, txn_timeout=60)
+        servicer.SendSQLInfo(sql_info_pb2.SQLInfoRequest(txn_id=9, region_ids=[1]), None)
+        servicer.SendSQLInfoBatch(iter([sql_info_pb2.SQLInfoBatchRequest(infos=[
+            sql_info_pb2.SQLInfoRequest(txn_id=9, region_ids=[2]),
+            sql_info_pb2.SQLInfoRequest(txn_id=0, region_ids=[3, 4]),
+        ])]), None)
+        self.assertEqual(servicer.get_ingest_stats()["txn_buffer"]["open_txns"], 1)
+        servicer.dispatch_batch(servicer.txn_buffer.flush())
+        for task_queue in servicer.task_queues:
+            task_queue.join()
+        # 同一事务的两条语句合并后才产生跨语句的边
+        self.assertEqual(graph.edges.get(frozenset({1, 2})).weight, 1)
+        self.assertEqual(graph.edges.get(frozenset({3, 4})).weight, 1)
+        self.assertEqual(graph.vertices.get(1).weight, 1)
+
+    def test_reject_when_queue_full(self):
+        graph = Graph(weight=1, theta=1, top_hot_threshold=0)
+        servicer = SQLInfoServicer(graph, queue_count=1, workers_per_queue=0, save_interval=0,
+                                   queue_capacity=1, overload_policy=REJECT)
+        servicer.SendSQLInfo(sql_info_pb2.SQLInfoRequest(region_ids=[1]), AbortContext())
+        context = AbortContext()
+        with self.assertRaises(RuntimeError):
+            servicer.SendSQLInfo(sql_info_pb2.SQLInfoRequest(region_ids=[1]), context)
+        self.assertEqual(context.code, grpc.StatusCode.RESOURCE_EXHAUSTED)
+        self.assertEqual(servicer.get_ingest_stats()["rejected"], 1)
+        self.assertEqual(servicer.get_ingest_stats()["queue_depths"], [1])
+
+    def test_batch_accepted_counts_statements(self):
+        graph = Graph(weight=1, theta=1, top_hot_threshold=0)
+        servicer = SQLInfoServicer(graph, queue_count=1, workers_per_queue=0, save_interval=0, queue_capacity=1,
+                                   overload_policy=REJECT, txn_timeout=60, txn_max_regions=2, txn_max_open=1)
+        batches = [
+            sql_info_pb2.SQLInfoBatchRequest(infos=[
+                sql_info_pb2.SQLInfoRequest(txn_id=1, region_ids=[1]),
+                sql_info_pb2.SQLInfoRequest(txn_id=2, region_ids=[2]),
+            ]),
+            # 一条语句使缓冲区输出两个事务，两个事务都被拒绝
+            sql_info_pb2.SQLInfoBatchRequest(infos=[
+                sql_info_pb2.SQLInfoRequest(txn_id=3, region_ids=[3, 4]),
+            ]),
+        ]
+        # 语句已被缓冲区接收，输出的事务被拒绝时按丢弃处理，请求不失败
+        response = servicer.SendSQLInfoBatch(iter(batches), AbortContext())
+        self.assertEqual(response.accepted, 3)
+        response = servicer.SendSQLInfo(sql_info_pb2.SQLInfoRequest(txn_id=4, region_ids=[5, 6]), AbortContext())
+        self.assertTrue(response.success)
+        stats = servicer.get_ingest_stats()
+        self.assertEqual((stats["txn_shed"], stats["rejected"]), (3, 3))
+
+    def test_query_from_view(self):
+        graph = Graph(weight=1, theta=1, top_hot_threshold=0)
+        graph.add_transactions([[1, 2]] * 3 + [[2, 3]] + [[7, 8]] * 2)
+        servicer = SQLInfoServicer(graph, queue_count=1, workers_per_queue=0, save_interval=0, view_interval=60)
+        response = servicer.GetTopHotRegions(sql_info_pb2.TopHotRegionsRequest(k=2), None)
+        self.assertEqual(response.view.version, 1)
+        self.assertGreaterEqual(response.view.age_seconds, 0)
+        self.assertEqual([(region.region_id, region.weight) for region in response.regions], [(2, 4), (1, 3)])
+        response = servicer.GetHotClumps(sql_info_pb2.HotClumpsRequest(edge_thresh=1), None)
+        self.assertEqual([(list(clump.region_ids), clump.hot) for clump in response.clumps],
+                         [([1, 2], 7), ([7, 8], 4), ([3], 1)])
+        response = servicer.GetHotClumps(sql_info_pb2.HotClumpsRequest(edge_thresh=1, limit=1), None)
+        self.assertEqual(len(response.clumps), 1)
+        response = servicer.GetGraphStats(sql_info_pb2.GraphStatsRequest(), None)
+        self.assertEqual((response.vertex_count, response.edge_count, response.total_vertex_weight), (5, 3, 12))
+        self.assertEqual(servicer.get_ingest_stats()["view"]["version"], 1)
+        servicer.view_refresher.stop()
+
+    def test_query_without_view(self):
+        context = AbortContext()
+        with self.assertRaises(RuntimeError):
+            self.servicer.GetGraphStats(sql_info_pb2.GraphStatsRequest(), context)
+        self.assertEqual(context.code, grpc.StatusCode.UNAVAILABLE)
+
+
+class TestRecoverGraph(unittest.TestCase):
+
+    def test_recover_from_snapshot_and_log(self):
+        with tempfile.TemporaryDirectory() as directory:
+            wal_directory = os.path.join(directory, "wal")
+            graph, ingest_log = recover_graph(Graph(weight=1, theta=1), wal_directory, directory)
+            self.assertIs(graph.ingest_log, ingest_log)
+            graph.add_transactions([[1, 2]] * 3)
+            Snapshotter(graph, directory=directory, mode=FREEZE, ingest_log=ingest_log).snapshot_once()
+            graph.add_transaction([2, 3], 2)
+            ingest_log.close()
+            recovered, recovered_log = recover_graph(Graph(), wal_directory, directory)
+            recovered_log.close()
+            self.assertEqual(recovered.weight, 1)  # 使用快照中的图参数
+            self.assertEqual(recovered.get_edge_weight(1, 2), 3)
+            self.assertEqual(recovered.get_edge_weight(2, 3), 2)
+            self.assertEqual(recovered.get_vertex_weight(2), 5)
+        with self.assertRaises(ValueError):
+            recover_graph(object(), "unused")
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertRaises(ValueError):
+                recover_graph(Graph(window_seconds=60), os.path.join(directory, "wal"), directory)
+
+    def test_delta_export_survives_crash(self):
+        # 快照 -> 导出两次 -> 崩溃 -> 从快照和日志恢复 -> 继续导出，汇总节点既不丢失也不重复合并
+        aggregator = Graph(weight=1, theta=1)
+        with tempfile.TemporaryDirectory() as directory:
+            wal_directory = os.path.join(directory, "wal")
+            graph, ingest_log = recover_graph(Graph(weight=1, theta=1), wal_directory, directory)
+            graph.start_delta_tracking("collector")
+            graph.add_transaction([1, 2])
+            Snapshotter(graph, directory=directory, mode=FREEZE, ingest_log=ingest_log).snapshot_once()
+            graph.add_transaction([2, 3])
+            self.assertTrue(aggregator.merge(graph.export_delta()))
+            graph.add_transaction([3, 4])
+            self.assertTrue(aggregator.merge(graph.export_delta()))
+            graph.add_transaction([4, 5])  # 崩溃前尚未导出
+            ingest_log.close()
+            recovered, recovered_log = recover_graph(Graph(), wal_directory, directory)
+            recovered.start_delta_tracking("collector")
+            recovered.add_transaction([5, 6])
+            delta = recovered.export_delta()
+            recovered_log.close()
+        self.assertEqual(delta.sequence, 3)
+        self.assertEqual(set(delta.edge_weights), {frozenset({4, 5}), frozenset({5, 6})})
+        self.assertTrue(aggregator.merge(delta))
+        self.assertEqual(sorted(sorted(key) + [aggregator.get_edge_weight(*key)] for key in aggregator.edges.keys()),
+                         [[1, 2, 1], [2, 3, 1], [3, 4, 1], [4, 5, 1], [5, 6, 1]])
+
+
+if __name__ == '__main__':
+    unittest.main()